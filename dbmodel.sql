@@ -110,7 +110,7 @@ CREATE TABLE IF NOT EXISTS `sequence_participant` (
 -- Game state tracking
 CREATE TABLE IF NOT EXISTS `game_state` (
   `state_key` varchar(32) NOT NULL,
-  `state_value` text,
+  `state_value` mediumtext,
   PRIMARY KEY (`state_key`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 
@@ -22,6 +22,8 @@ use Bga\Games\Zoomquest\Helpers\Deck;
 use Bga\Games\Zoomquest\Helpers\ActionSequenceResolver;
 use Bga\Games\Zoomquest\Helpers\GameStateHelper;
 use Bga\Games\Zoomquest\Helpers\GoalTracker;
+use Bga\Games\Zoomquest\Helpers\QueryProfiler;
+use Bga\Games\Zoomquest\Helpers\TagStore;
 use Bga\Games\Zoomquest\States\RoundStart;
 
 require_once("constants.inc.php");
@@ -34,6 +36,9 @@ class Game extends \Bga\GameFramework\Table
     private ?ActionSequenceResolver $actionSequenceResolver = null;
     private ?GameStateHelper $gameStateHelper = null;
     private ?GoalTracker $goalTracker = null;
+    private ?TagStore $tagStore = null;
+    /** What helpers and states query through (see getDb()) */
+    private $queryTarget = null;
 
     function __construct()
     {
@@ -41,13 +46,41 @@ class Game extends \Bga\GameFramework\Table
         $this->initGameStateLabels([]);
     }
 
+    /**
+     * Get the object helpers and states run queries through: the game itself,
+     * or a QueryProfiler wrapping it when the PROFILE_QUERIES_ENV environment
+     * variable is set (no code change needed to turn profiling on)
+     */
+    public function getDb()
+    {
+        if ($this->queryTarget === null) {
+            $this->queryTarget = $this;
+            $profileFile = (string)getenv(PROFILE_QUERIES_ENV);
+            if ($profileFile !== '' && $profileFile !== '0') {
+                if ($profileFile === '1') {
+                    $profileFile = sys_get_temp_dir() . '/zoomquest_profile.jsonl';
+                }
+                $profiler = new QueryProfiler($this, $profileFile);
+                // The dump is filed under the round the request started in; the
+                // shutdown callback only writes the file, the request is over by then
+                $round = $this->getUniqueValueFromDB(
+                    "SELECT state_value FROM game_state WHERE state_key = '" . STATE_ROUND . "'"
+                );
+                $profiler->setRound($round !== null ? (int)$round : null);
+                register_shutdown_function([$profiler, 'dump']);
+                $this->queryTarget = $profiler;
+            }
+        }
+        return $this->queryTarget;
+    }
+
     /**
      * Get ConfigLoader helper (lazy initialization)
      */
     public function getConfigLoader(): ConfigLoader
     {
         if ($this->configLoader === null) {
-            $this->configLoader = new ConfigLoader($this);
+            $this->configLoader = new ConfigLoader($this->getDb());
         }
         return $this->configLoader;
     }
@@ -58,7 +91,7 @@ class Game extends \Bga\GameFramework\Table
     public function getDeck(): Deck
     {
         if ($this->deck === null) {
-            $this->deck = new Deck($this);
+            $this->deck = new Deck($this->getDb());
         }
         return $this->deck;
     }
@@ -69,18 +102,29 @@ class Game extends \Bga\GameFramework\Table
     public function getActionSequenceResolver(): ActionSequenceResolver
     {
         if ($this->actionSequenceResolver === null) {
-            $this->actionSequenceResolver = new ActionSequenceResolver($this, $this->getDeck());
+            $this->actionSequenceResolver = new ActionSequenceResolver($this->getDb(), $this->getDeck(), $this->getTagStore());
         }
         return $this->actionSequenceResolver;
     }
 
+    /**
+     * Get TagStore (lazy initialization)
+     */
+    public function getTagStore(): TagStore
+    {
+        if ($this->tagStore === null) {
+            $this->tagStore = new TagStore($this->getDb());
+        }
+        return $this->tagStore;
+    }
+
     /**
      * Get GameStateHelper (lazy initialization)
      */
     public function getGameStateHelper(): GameStateHelper
     {
         if ($this->gameStateHelper === null) {
-            $this->gameStateHelper = new GameStateHelper($this);
+            $this->gameStateHelper = new GameStateHelper($this->getDb());
         }
         return $this->gameStateHelper;
     }
@@ -91,18 +135,26 @@ class Game extends \Bga\GameFramework\Table
     public function getGoalTracker(): GoalTracker
     {
         if ($this->goalTracker === null) {
-            $this->goalTracker = new GoalTracker($this);
+            $this->goalTracker = new GoalTracker($this->getDb());
         }
         return $this->goalTracker;
     }
 
+    /**
+     * How battles are resolved: BATTLE_MODE_STEP or BATTLE_MODE_AUTO (table option)
+     */
+    public function getBattleMode(): int
+    {
+        return (int)($this->tableOptions->get(OPTION_BATTLE_MODE) ?? BATTLE_MODE_STEP);
+    }
+
     /**
      * Setup a new game from configuration
      */
     protected function setupNewGame($players, $options = [])
     {
         // Load scenario configuration
-        $scenarioOption = (int)($this->tableOptions->get(100) ?? 1);
+        $scenarioOption = (int)($this->tableOptions->get(OPTION_SCENARIO) ?? 1);
         $configLoader = $this->getConfigLoader();
         $filename = $configLoader->getScenarioFilename($scenarioOption);
         $config = $configLoader->loadScenario($filename);
@@ -110,6 +162,13 @@ class Game extends \Bga\GameFramework\Table
         // Store level name and faction matrix
         $this->getGameStateHelper()->set(STATE_LEVEL_NAME, $config['level_name']);
         $this->getGameStateHelper()->set(STATE_ROUND, '0');
+
+        // Keep the map index's adjacency with the game, so a later edit to the
+        // scenario file cannot change the map under a game in progress
+        $graphIndex = $configLoader->loadGraphIndex($filename);
+        if ($graphIndex !== null) {
+            $this->getGameStateHelper()->set(STATE_ADJACENCY, json_encode($graphIndex['adjacency']));
+        }
         
         // Store faction matrix from config
         if (isset($config['factions']['matrix'])) {
@@ -170,6 +229,9 @@ class Game extends \Bga\GameFramework\Table
             );
         }
 
+        // Map, background and victory never change from here on
+        $this->getGameStateHelper()->storeStaticData();
+
         // Setup player entities - randomly select characters for each player
         $playerIds = array_keys($players);
         $playerCount = count($playerIds);
@@ -265,29 +327,40 @@ class Game extends \Bga\GameFramework\Table
             "SELECT player_id id, player_score score, player_color color, player_name name FROM player"
         );
 
-        // Current round
-        $result['round'] = $this->getGameStateHelper()->getRound();
+        // Current round and faction relationships (steals can change them)
+        $stateHelper = $this->getGameStateHelper();
+        $state = $stateHelper->getMany([STATE_ROUND, STATE_FACTION_MATRIX]);
+        $result['round'] = (int)($state[STATE_ROUND] ?? 0);
+        $result['faction_matrix'] = $state[STATE_FACTION_MATRIX] ? json_decode($state[STATE_FACTION_MATRIX], true) : [];
 
-        // Map data
-        $result['map'] = $this->getGameStateHelper()->getMap();
+        // Map, background image and victory condition, stored once at setup
+        $static = $stateHelper->getStaticData();
+        $result['static_version'] = $static['version'];
+        $result['static'] = $static['data'];
 
-        // All entities with their deck counts and items
-        $entities = $this->getGameStateHelper()->getAllEntities();
+        // All entities with their deck counts and items, in one query each
+        $entities = $stateHelper->getAllEntities();
         $deck = $this->getDeck();
+        $deck->loadEntities(array_column($entities, 'entity_id'));
+
+        $itemsByEntity = [];
+        $items = $this->getObjectListFromDB(
+            "SELECT item_id, entity_id, item_name, item_type, item_data FROM item ORDER BY item_id"
+        );
+        foreach ($items as $item) {
+            $entityId = (int)$item['entity_id'];
+            unset($item['entity_id']);
+            $item['item_data'] = json_decode($item['item_data'], true) ?? [];
+            $itemsByEntity[$entityId][] = $item;
+        }
 
         foreach ($entities as &$entity) {
             $entityId = (int)$entity['entity_id'];
             $entity['deck_counts'] = $deck->getPileCounts($entityId);
-            
-            // Get items for this entity
-            $entity['items'] = $this->getObjectListFromDB(
-                "SELECT item_id, item_name, item_type, item_data FROM item WHERE entity_id = $entityId"
-            );
-            // Parse item_data JSON
-            foreach ($entity['items'] as &$item) {
-                $item['item_data'] = json_decode($item['item_data'], true) ?? [];
-            }
+            $entity['items'] = $itemsByEntity[$entityId] ?? [];
         }
+        unset($entity);
+        $deck->clearCache();
         $result['entities'] = $entities;
 
         // Current move choices (if in move selection phase)
@@ -295,12 +368,6 @@ class Game extends \Bga\GameFramework\Table
             "SELECT player_id, target_location FROM move_choice"
         );
 
-        // Victory condition
-        $result['victory'] = $this->getGameStateHelper()->getVictoryCondition();
-
-        // Background image for the map (if any)
-        $result['background_image'] = $this->getGameStateHelper()->get(STATE_BACKGROUND_IMAGE);
-
         // Individual goals (each player only sees their own)
         $result['player_goals'] = [];
         $goalTracker = $this->getGoalTracker();
@@ -23,12 +23,21 @@ class ActionSequenceResolver
 {
     private $game;
     private Deck $deck;
+    private TagStore $tags;
     private array $factionMatrix = [];
 
-    public function __construct($game, Deck $deck)
+    /** In-request cache of the sequence loaded with loadSequence() */
+    private ?int $sequenceId = null;
+    private array $entities = [];
+    /** @var array<int, array> entity_id => sequence_participant round columns (plus drawn_card_type) */
+    private array $rounds = [];
+    private bool $roundsDirty = false;
+
+    public function __construct($game, Deck $deck, TagStore $tags)
     {
         $this->game = $game;
         $this->deck = $deck;
+        $this->tags = $tags;
         $this->loadFactionMatrix();
     }
 
@@ -37,6 +46,11 @@ class ActionSequenceResolver
      */
     private function getPlayerIdForEntity(int $entityId): ?int
     {
+        if (isset($this->entities[$entityId])) {
+            $entity = $this->entities[$entityId];
+            return $entity['entity_type'] === 'player' ? (int)$entity['player_id'] : null;
+        }
+
         $result = $this->game->getUniqueValueFromDB(
             "SELECT player_id FROM entity WHERE entity_id = $entityId AND entity_type = 'player'"
         );
@@ -62,9 +76,7 @@ class ActionSequenceResolver
         $playerId = $this->getPlayerIdForEntity($killerEntityId);
         if ($playerId !== null) {
             // Get victim's faction for faction-specific tracking
-            $victim = $this->game->getObjectFromDB(
-                "SELECT faction FROM entity WHERE entity_id = $victimEntityId"
-            );
+            $victim = $this->getEntity($victimEntityId);
             $victimFaction = $victim ? $victim['faction'] : 'unknown';
             
             $this->game->getGoalTracker()->trackKillingBlow($playerId, $victimFaction);
@@ -102,6 +114,22 @@ class ActionSequenceResolver
         );
     }
 
+    /**
+     * Check if any two of the given entities are hostile to each other
+     */
+    public function hasHostiles(array $participants): bool
+    {
+        foreach ($participants as $p1) {
+            foreach ($participants as $p2) {
+                if ($p1['entity_id'] !== $p2['entity_id']
+                    && $this->getRelationship($p1['faction'], $p2['faction']) === RELATION_HOSTILE) {
+                    return true;
+                }
+            }
+        }
+        return false;
+    }
+
     /**
      * Check if an action sequence should occur at a location
      * Sequences happen wherever there are players
@@ -164,11 +192,7 @@ class ActionSequenceResolver
      */
     public function hasTag(int $entityId, string $tagName): bool
     {
-        $count = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COUNT(*) FROM entity_tag 
-             WHERE entity_id = $entityId AND tag_name = '$tagName'"
-        );
-        return $count > 0;
+        return $this->tags->has($entityId, $tagName);
     }
 
     /**
@@ -176,11 +200,7 @@ class ActionSequenceResolver
      */
     public function getTagValue(int $entityId, string $tagName): int
     {
-        $value = $this->game->getUniqueValueFromDB(
-            "SELECT tag_value FROM entity_tag 
-             WHERE entity_id = $entityId AND tag_name = '$tagName'"
-        );
-        return $value !== null ? (int)$value : 0;
+        return $this->tags->getValue($entityId, $tagName);
     }
 
     /**
@@ -188,11 +208,7 @@ class ActionSequenceResolver
      */
     public function setTag(int $entityId, string $tagName, int $value = 1, int $round = 0): void
     {
-        $this->game->DbQuery(
-            "INSERT INTO entity_tag (entity_id, tag_name, tag_value, round_applied) 
-             VALUES ($entityId, '$tagName', $value, $round)
-             ON DUPLICATE KEY UPDATE tag_value = $value, round_applied = $round"
-        );
+        $this->tags->set($entityId, $tagName, $value, $round);
     }
 
     /**
@@ -209,60 +225,242 @@ class ActionSequenceResolver
      */
     public function removeTag(int $entityId, string $tagName): void
     {
-        $this->game->DbQuery(
-            "DELETE FROM entity_tag WHERE entity_id = $entityId AND tag_name = '$tagName'"
-        );
+        $this->tags->remove($entityId, $tagName);
     }
 
     /**
-     * Clear expired tags (called at end of round)
+     * Clear expired tags (called at the start of each sequence round)
      */
     public function clearExpiredTags(int $currentRound): void
     {
-        // Hidden expires after 1 round
-        $this->game->DbQuery(
-            "DELETE FROM entity_tag WHERE tag_name = '" . TAG_HIDDEN . "' AND round_applied < $currentRound"
+        $this->tags->expire($currentRound);
+    }
+
+    /**
+     * Get all tags for an entity
+     */
+    public function getTags(int $entityId): array
+    {
+        return $this->tags->getAll($entityId);
+    }
+
+    /**
+     * Load a sequence's participants and their cards into the in-request
+     * cache (one query for entities, one for cards; tags live in TagStore)
+     */
+    public function loadSequence(int $sequenceId): void
+    {
+        $this->flush();
+        $this->cacheSequence($sequenceId);
+    }
+
+    /**
+     * Make $sequenceId the cached sequence without flushing card, tag or goal
+     * changes (only the participant rows of the previous sequence are written)
+     */
+    private function cacheSequence(int $sequenceId): void
+    {
+        $this->flushRounds();
+
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT e.entity_id, e.entity_type, e.entity_name, e.faction, e.player_id,
+                    e.location_id, e.is_defeated,
+                    sp.drawn_card_id, sp.target_entity_id, sp.block_count, sp.is_resolved,
+                    c.card_type AS drawn_card_type
+             FROM sequence_participant sp
+             JOIN entity e ON sp.entity_id = e.entity_id
+             LEFT JOIN card c ON sp.drawn_card_id = c.card_id
+             WHERE sp.sequence_id = $sequenceId
+             ORDER BY e.entity_id"
         );
-        
-        // Poisoned expires after 3 rounds
+
+        $this->sequenceId = $sequenceId;
+        $this->entities = [];
+        $this->rounds = [];
+        foreach ($rows as $row) {
+            $entityId = (int)$row['entity_id'];
+            $this->entities[$entityId] = [
+                'entity_id' => $entityId,
+                'entity_type' => $row['entity_type'],
+                'entity_name' => $row['entity_name'],
+                'faction' => $row['faction'],
+                'player_id' => $row['player_id'],
+                'location_id' => $row['location_id'],
+                'is_defeated' => (int)$row['is_defeated'],
+            ];
+            $this->rounds[$entityId] = [
+                'drawn_card_id' => $row['drawn_card_id'] !== null ? (int)$row['drawn_card_id'] : null,
+                'target_entity_id' => $row['target_entity_id'] !== null ? (int)$row['target_entity_id'] : null,
+                'block_count' => (int)$row['block_count'],
+                'is_resolved' => (int)$row['is_resolved'],
+                'drawn_card_type' => $row['drawn_card_type'],
+            ];
+        }
+
+        $this->deck->loadEntities(array_keys($this->entities));
+    }
+
+    /**
+     * Write cached tag, card, participant and goal changes and drop the cache
+     * (called at the end of each state)
+     */
+    public function flush(): void
+    {
+        $this->tags->flush();
+        $this->deck->clearCache();
+        $this->flushRounds();
+        $this->game->getGoalTracker()->flush();
+
+        $this->sequenceId = null;
+        $this->entities = [];
+        $this->rounds = [];
+    }
+
+    /**
+     * Whether card, tag or participant changes are waiting for flush()
+     */
+    public function hasPendingWrites(): bool
+    {
+        return $this->roundsDirty || $this->deck->hasPendingWrites() || $this->tags->hasPendingWrites();
+    }
+
+    /**
+     * A state that loads a sequence and returns without flush() would drop
+     * its changes silently; make that show up in the error log instead
+     */
+    public function __destruct()
+    {
+        if ($this->hasPendingWrites()) {
+            trigger_error(
+                "ActionSequenceResolver: sequence {$this->sequenceId} changes were never flushed",
+                E_USER_WARNING
+            );
+        }
+    }
+
+    /**
+     * Write the round columns of every participant of the loaded sequence in one upsert
+     */
+    private function flushRounds(): void
+    {
+        if (!$this->roundsDirty) {
+            return;
+        }
+        $this->roundsDirty = false;
+
+        $values = [];
+        foreach ($this->rounds as $entityId => $r) {
+            $values[] = "({$this->sequenceId}, $entityId, " . ($r['drawn_card_id'] ?? 'NULL') . ", "
+                . ($r['target_entity_id'] ?? 'NULL') . ", {$r['block_count']}, {$r['is_resolved']})";
+        }
         $this->game->DbQuery(
-            "DELETE FROM entity_tag WHERE tag_name = '" . TAG_POISONED . "' AND round_applied < ($currentRound - 2)"
+            "INSERT INTO sequence_participant (sequence_id, entity_id, drawn_card_id, target_entity_id, block_count, is_resolved)
+             VALUES " . implode(', ', $values) . "
+             ON DUPLICATE KEY UPDATE drawn_card_id = VALUES(drawn_card_id), target_entity_id = VALUES(target_entity_id),
+                 block_count = VALUES(block_count), is_resolved = VALUES(is_resolved)"
         );
-        
-        // Marked expires after 2 rounds
+    }
+
+    /**
+     * Get a participant's round column (from the loaded sequence when possible)
+     */
+    private function getRoundValue(int $sequenceId, int $entityId, string $column): ?int
+    {
+        if ($this->sequenceId === $sequenceId) {
+            return $this->rounds[$entityId][$column] ?? null;
+        }
+
+        $value = $this->game->getUniqueValueFromDB(
+            "SELECT $column FROM sequence_participant
+             WHERE sequence_id = $sequenceId AND entity_id = $entityId"
+        );
+        return $value !== null ? (int)$value : null;
+    }
+
+    /**
+     * Set round columns of one participant, or of all when $entityId is null
+     * (held until flush() for the loaded sequence, otherwise written right away)
+     */
+    private function setRoundValues(int $sequenceId, ?int $entityId, array $values): void
+    {
+        if ($this->sequenceId === $sequenceId) {
+            foreach ($entityId === null ? array_keys($this->rounds) : [$entityId] as $id) {
+                if (isset($this->rounds[$id])) {
+                    $this->rounds[$id] = array_merge($this->rounds[$id], $values);
+                }
+            }
+            $this->roundsDirty = true;
+            return;
+        }
+
+        $set = [];
+        foreach ($values as $column => $value) {
+            $set[] = "$column = " . ($value === null ? 'NULL' : (int)$value);
+        }
         $this->game->DbQuery(
-            "DELETE FROM entity_tag WHERE tag_name = '" . TAG_MARKED . "' AND round_applied < ($currentRound - 1)"
+            "UPDATE sequence_participant SET " . implode(', ', $set) . "
+             WHERE sequence_id = $sequenceId" . ($entityId !== null ? " AND entity_id = $entityId" : "")
         );
     }
 
     /**
-     * Get all tags for an entity
+     * Get an entity row (from the loaded sequence when possible)
      */
-    public function getTags(int $entityId): array
+    private function getEntity(int $entityId): ?array
+    {
+        if (isset($this->entities[$entityId])) {
+            return $this->entities[$entityId];
+        }
+
+        return $this->game->getObjectFromDB(
+            "SELECT entity_id, entity_type, entity_name, faction, player_id, location_id, is_defeated
+             FROM entity WHERE entity_id = $entityId"
+        );
+    }
+
+    /**
+     * Get the participants of a sequence (from the loaded sequence when possible)
+     */
+    private function getParticipants(int $sequenceId, bool $includeDefeated = false): array
     {
+        if ($this->sequenceId === $sequenceId) {
+            return array_values(array_filter(
+                $this->entities,
+                fn($e) => $includeDefeated || $e['is_defeated'] == 0
+            ));
+        }
+
         return $this->game->getObjectListFromDB(
-            "SELECT tag_name, tag_value FROM entity_tag WHERE entity_id = $entityId"
+            "SELECT e.entity_id, e.entity_type, e.entity_name, e.faction, e.player_id,
+                    e.location_id, e.is_defeated
+             FROM sequence_participant sp
+             JOIN entity e ON sp.entity_id = e.entity_id
+             WHERE sp.sequence_id = $sequenceId" . ($includeDefeated ? "" : " AND e.is_defeated = 0")
         );
     }
 
+    /**
+     * Flag an entity as defeated
+     */
+    private function markDefeated(int $entityId): void
+    {
+        $this->game->DbQuery("UPDATE entity SET is_defeated = 1 WHERE entity_id = $entityId");
+        if (isset($this->entities[$entityId])) {
+            $this->entities[$entityId]['is_defeated'] = 1;
+        }
+    }
+
     /**
      * Get lowest health target with specific relationship to actor
      */
     private function getLowestHealthTarget(int $sequenceId, int $actorEntityId, string $relationship, bool $includeHidden = true): ?array
     {
         // Get actor's faction
-        $actor = $this->game->getObjectFromDB(
-            "SELECT faction FROM entity WHERE entity_id = $actorEntityId"
-        );
+        $actor = $this->getEntity($actorEntityId);
         $actorFaction = $actor['faction'];
 
         // Get all non-defeated participants
-        $participants = $this->game->getObjectListFromDB(
-            "SELECT e.entity_id, e.entity_name, e.faction
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             WHERE sp.sequence_id = $sequenceId AND e.is_defeated = 0"
-        );
+        $participants = $this->getParticipants($sequenceId);
 
         $candidates = [];
         foreach ($participants as $p) {
@@ -306,17 +504,10 @@ class ActionSequenceResolver
         $this->clearExpiredTags($currentRound);
 
         // Reset block counts at start of round
-        $this->game->DbQuery(
-            "UPDATE sequence_participant SET block_count = 0 WHERE sequence_id = $sequenceId"
-        );
+        $this->setRoundValues($sequenceId, null, ['block_count' => 0]);
 
         // Get non-defeated participants
-        $participants = $this->game->getObjectListFromDB(
-            "SELECT sp.entity_id, e.entity_type, e.entity_name, e.faction 
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             WHERE sp.sequence_id = $sequenceId AND e.is_defeated = 0"
-        );
+        $participants = $this->getParticipants($sequenceId);
 
         $drawnCards = [];
         foreach ($participants as $p) {
@@ -330,20 +521,19 @@ class ActionSequenceResolver
                 // Determine target based on card type and faction
                 $targetId = $this->determineTarget($sequenceId, $entityId, $cardType);
 
-                $this->game->DbQuery(
-                    "UPDATE sequence_participant 
-                     SET drawn_card_id = $cardId, 
-                         target_entity_id = " . ($targetId !== null ? $targetId : "NULL") . ",
-                         is_resolved = 0 
-                     WHERE sequence_id = $sequenceId AND entity_id = $entityId"
-                );
+                $this->setRoundValues($sequenceId, $entityId, [
+                    'drawn_card_id' => $cardId,
+                    'target_entity_id' => $targetId,
+                    'is_resolved' => 0,
+                ]);
+                if (isset($this->rounds[$entityId])) {
+                    $this->rounds[$entityId]['drawn_card_type'] = $cardType;
+                }
 
                 // Get target name
                 $targetName = null;
                 if ($targetId !== null) {
-                    $target = $this->game->getObjectFromDB(
-                        "SELECT entity_name FROM entity WHERE entity_id = $targetId"
-                    );
+                    $target = $this->getEntity($targetId);
                     $targetName = $target ? $target['entity_name'] : null;
                 }
 
@@ -418,9 +608,7 @@ class ActionSequenceResolver
     private function getNeutralWithItems(int $sequenceId, int $actorEntityId): ?array
     {
         // Get actor's faction
-        $actor = $this->game->getObjectFromDB(
-            "SELECT faction FROM entity WHERE entity_id = $actorEntityId"
-        );
+        $actor = $this->getEntity($actorEntityId);
         $actorFaction = $actor['faction'];
 
         // Get all non-defeated participants with items
@@ -466,14 +654,33 @@ class ActionSequenceResolver
         $results = [];
 
         // Get all drawn cards
-        $cards = $this->game->getObjectListFromDB(
-            "SELECT sp.entity_id, sp.drawn_card_id, sp.target_entity_id,
-                    e.entity_type, e.entity_name, e.faction, c.card_type
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             JOIN card c ON sp.drawn_card_id = c.card_id
-             WHERE sp.sequence_id = $sequenceId AND sp.drawn_card_id IS NOT NULL"
-        );
+        if ($this->sequenceId === $sequenceId) {
+            $cards = [];
+            foreach ($this->rounds as $entityId => $r) {
+                if ($r['drawn_card_id'] === null) {
+                    continue;
+                }
+                $e = $this->entities[$entityId];
+                $cards[] = [
+                    'entity_id' => $entityId,
+                    'drawn_card_id' => $r['drawn_card_id'],
+                    'target_entity_id' => $r['target_entity_id'],
+                    'entity_type' => $e['entity_type'],
+                    'entity_name' => $e['entity_name'],
+                    'faction' => $e['faction'],
+                    'card_type' => $r['drawn_card_type'],
+                ];
+            }
+        } else {
+            $cards = $this->game->getObjectListFromDB(
+                "SELECT sp.entity_id, sp.drawn_card_id, sp.target_entity_id,
+                        e.entity_type, e.entity_name, e.faction, c.card_type
+                 FROM sequence_participant sp
+                 JOIN entity e ON sp.entity_id = e.entity_id
+                 JOIN card c ON sp.drawn_card_id = c.card_id
+                 WHERE sp.sequence_id = $sequenceId AND sp.drawn_card_id IS NOT NULL"
+            );
+        }
 
         // Group by card type for phased resolution
         $byType = [];
@@ -495,9 +702,7 @@ class ActionSequenceResolver
                 $results[] = $result;
                 
                 // Mark this entity's location as watched
-                $location = $this->game->getUniqueValueFromDB(
-                    "SELECT location_id FROM entity WHERE entity_id = " . $card['entity_id']
-                );
+                $location = $this->getEntity((int)$card['entity_id'])['location_id'];
                 $watchedLocations[$location] = true;
             }
         }
@@ -611,9 +816,7 @@ class ActionSequenceResolver
         }
 
         // Mark all as resolved
-        $this->game->DbQuery(
-            "UPDATE sequence_participant SET is_resolved = 1 WHERE sequence_id = $sequenceId"
-        );
+        $this->setRoundValues($sequenceId, null, ['is_resolved' => 1]);
 
         return $results;
     }
@@ -637,9 +840,7 @@ class ActionSequenceResolver
         ];
 
         // Get all hidden hostile entities at this location
-        $location = $this->game->getUniqueValueFromDB(
-            "SELECT location_id FROM entity WHERE entity_id = $entityId"
-        );
+        $location = $this->getEntity($entityId)['location_id'];
 
         $entities = $this->getEntitiesAtLocation($location);
         foreach ($entities as $e) {
@@ -680,9 +881,7 @@ class ActionSequenceResolver
         ];
 
         // Check if at a watched location
-        $location = $this->game->getUniqueValueFromDB(
-            "SELECT location_id FROM entity WHERE entity_id = $entityId"
-        );
+        $location = $this->getEntity($entityId)['location_id'];
 
         if (isset($watchedLocations[$location])) {
             // Sneak fails - someone is watching!
@@ -721,9 +920,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -764,9 +961,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -806,9 +1001,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -816,10 +1009,8 @@ class ActionSequenceResolver
         }
 
         // Add block using participant table for this sequence
-        $this->game->DbQuery(
-            "UPDATE sequence_participant SET block_count = block_count + 1 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $blockCount = (int)$this->getRoundValue($sequenceId, $targetId, 'block_count') + 1;
+        $this->setRoundValues($sequenceId, $targetId, ['block_count' => $blockCount]);
 
         $result['target_name'] = $target['entity_name'];
         $result['effect'] = 'block';
@@ -832,11 +1023,6 @@ class ActionSequenceResolver
             }
         }
 
-        // Get new block count
-        $blockCount = (int)$this->game->getUniqueValueFromDB(
-            "SELECT block_count FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
         $result['block_count'] = $blockCount;
 
         return $result;
@@ -872,9 +1058,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -885,10 +1069,7 @@ class ActionSequenceResolver
         $result['target_name'] = $target['entity_name'];
 
         // Check for blocks (backstab can be blocked)
-        $blockCount = (int)$this->game->getUniqueValueFromDB(
-            "SELECT block_count FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $blockCount = (int)$this->getRoundValue($sequenceId, $targetId, 'block_count');
 
         // Calculate damage (3 base, +1 if marked)
         $damage = 3;
@@ -902,10 +1083,7 @@ class ActionSequenceResolver
         $damageDealt = $damage - $blocksUsed;
 
         if ($blocksUsed > 0) {
-            $this->game->DbQuery(
-                "UPDATE sequence_participant SET block_count = block_count - $blocksUsed 
-                 WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-            );
+            $this->setRoundValues($sequenceId, $targetId, ['block_count' => $blockCount - $blocksUsed]);
             $result['blocks_used'] = $blocksUsed;
             $result['blocks_remaining'] = $blockCount - $blocksUsed;
         }
@@ -920,10 +1098,7 @@ class ActionSequenceResolver
         $result['damage'] = $damageDealt;
         $result['destroyed_cards'] = [];
 
-        $targetDrawnCardId = $this->game->getUniqueValueFromDB(
-            "SELECT drawn_card_id FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $targetDrawnCardId = $this->getRoundValue($sequenceId, $targetId, 'drawn_card_id');
         $excludeCards = $targetDrawnCardId ? [(int)$targetDrawnCardId] : [];
 
         for ($i = 0; $i < $damageDealt; $i++) {
@@ -938,7 +1113,7 @@ class ActionSequenceResolver
 
         // Check if target is now defeated
         if ($this->deck->isDefeated($targetId)) {
-            $this->game->DbQuery("UPDATE entity SET is_defeated = 1 WHERE entity_id = $targetId");
+            $this->markDefeated($targetId);
             $result['target_defeated'] = true;
             
             // Track killing blow for goals
@@ -977,9 +1152,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -997,10 +1170,7 @@ class ActionSequenceResolver
         }
 
         // Check for blocks
-        $blockCount = (int)$this->game->getUniqueValueFromDB(
-            "SELECT block_count FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $blockCount = (int)$this->getRoundValue($sequenceId, $targetId, 'block_count');
 
         // Calculate damage (3 base, +1 if marked)
         $damage = 3;
@@ -1014,10 +1184,7 @@ class ActionSequenceResolver
         $damageDealt = $damage - $blocksUsed;
 
         if ($blocksUsed > 0) {
-            $this->game->DbQuery(
-                "UPDATE sequence_participant SET block_count = block_count - $blocksUsed 
-                 WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-            );
+            $this->setRoundValues($sequenceId, $targetId, ['block_count' => $blockCount - $blocksUsed]);
             $result['blocks_used'] = $blocksUsed;
             $result['blocks_remaining'] = $blockCount - $blocksUsed;
         }
@@ -1032,10 +1199,7 @@ class ActionSequenceResolver
         $result['damage'] = $damageDealt;
         $result['destroyed_cards'] = [];
 
-        $targetDrawnCardId = $this->game->getUniqueValueFromDB(
-            "SELECT drawn_card_id FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $targetDrawnCardId = $this->getRoundValue($sequenceId, $targetId, 'drawn_card_id');
         $excludeCards = $targetDrawnCardId ? [(int)$targetDrawnCardId] : [];
 
         for ($i = 0; $i < $damageDealt; $i++) {
@@ -1050,7 +1214,7 @@ class ActionSequenceResolver
 
         // Check if target is now defeated
         if ($this->deck->isDefeated($targetId)) {
-            $this->game->DbQuery("UPDATE entity SET is_defeated = 1 WHERE entity_id = $targetId");
+            $this->markDefeated($targetId);
             $result['target_defeated'] = true;
             
             // Track killing blow for goals
@@ -1089,9 +1253,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -1108,10 +1270,7 @@ class ActionSequenceResolver
         }
 
         // Check for blocks
-        $blockCount = (int)$this->game->getUniqueValueFromDB(
-            "SELECT block_count FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $blockCount = (int)$this->getRoundValue($sequenceId, $targetId, 'block_count');
 
         // Calculate damage (1 base, +1 if marked)
         $damage = 1;
@@ -1125,10 +1284,7 @@ class ActionSequenceResolver
         $damageDealt = $damage - $blocksUsed;
 
         if ($blocksUsed > 0) {
-            $this->game->DbQuery(
-                "UPDATE sequence_participant SET block_count = block_count - $blocksUsed 
-                 WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-            );
+            $this->setRoundValues($sequenceId, $targetId, ['block_count' => $blockCount - $blocksUsed]);
             $result['blocks_used'] = $blocksUsed;
             $result['blocks_remaining'] = $blockCount - $blocksUsed;
         }
@@ -1139,10 +1295,7 @@ class ActionSequenceResolver
         }
 
         // Deal damage - destroy cards
-        $targetDrawnCardId = $this->game->getUniqueValueFromDB(
-            "SELECT drawn_card_id FROM sequence_participant 
-             WHERE sequence_id = $sequenceId AND entity_id = $targetId"
-        );
+        $targetDrawnCardId = $this->getRoundValue($sequenceId, $targetId, 'drawn_card_id');
         $excludeCards = $targetDrawnCardId ? [(int)$targetDrawnCardId] : [];
         
         $result['effect'] = 'destroy';
@@ -1167,7 +1320,7 @@ class ActionSequenceResolver
 
         // Check if target is now defeated
         if ($this->deck->isDefeated($targetId)) {
-            $this->game->DbQuery("UPDATE entity SET is_defeated = 1 WHERE entity_id = $targetId");
+            $this->markDefeated($targetId);
             $result['target_defeated'] = true;
             
             // Track killing blow for goals
@@ -1206,9 +1359,7 @@ class ActionSequenceResolver
         }
 
         // Check target is still alive
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, is_defeated FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target || $target['is_defeated'] == 1) {
             $result['effect'] = 'target_defeated';
@@ -1287,9 +1438,7 @@ class ActionSequenceResolver
         }
 
         // Check target exists and has items
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target) {
             return $result;
@@ -1354,9 +1503,7 @@ class ActionSequenceResolver
         }
 
         // Get target info
-        $target = $this->game->getObjectFromDB(
-            "SELECT entity_name, faction FROM entity WHERE entity_id = $targetId"
-        );
+        $target = $this->getEntity($targetId);
 
         if (!$target) {
             return $result;
@@ -1365,9 +1512,7 @@ class ActionSequenceResolver
         $result['target_name'] = $target['entity_name'];
 
         // Check if location is watched - stealing is caught!
-        $location = $this->game->getUniqueValueFromDB(
-            "SELECT location_id FROM entity WHERE entity_id = $entityId"
-        );
+        $location = $this->getEntity($entityId)['location_id'];
 
         if (isset($watchedLocations[$location])) {
             // Caught stealing! Faction becomes hostile
@@ -1477,12 +1622,7 @@ class ActionSequenceResolver
      */
     public function getEliminatedFaction(int $sequenceId): ?string
     {
-        $participants = $this->game->getObjectListFromDB(
-            "SELECT e.faction, e.is_defeated
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             WHERE sp.sequence_id = $sequenceId"
-        );
+        $participants = $this->getParticipants($sequenceId, true);
 
         // Group by faction and count alive
         $factionAlive = [];
@@ -1511,12 +1651,7 @@ class ActionSequenceResolver
      */
     public function isEveryoneOutOfCards(int $sequenceId): bool
     {
-        $participants = $this->game->getObjectListFromDB(
-            "SELECT sp.entity_id
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             WHERE sp.sequence_id = $sequenceId AND e.is_defeated = 0"
-        );
+        $participants = $this->getParticipants($sequenceId);
 
         foreach ($participants as $p) {
             if ($this->deck->hasActiveCards((int)$p['entity_id'])) {
@@ -1532,12 +1667,7 @@ class ActionSequenceResolver
      */
     public function getParticipantStatus(int $sequenceId): array
     {
-        $participants = $this->game->getObjectListFromDB(
-            "SELECT e.entity_id, e.entity_name, e.entity_type, e.faction, e.is_defeated
-             FROM sequence_participant sp
-             JOIN entity e ON sp.entity_id = e.entity_id
-             WHERE sp.sequence_id = $sequenceId"
-        );
+        $participants = $this->getParticipants($sequenceId, true);
 
         $status = [];
         foreach ($participants as $p) {
@@ -1560,17 +1690,105 @@ class ActionSequenceResolver
         return $status;
     }
 
+    /**
+     * Play rounds of the loaded sequence back to back, as SequenceDrawCards,
+     * SequenceResolve and SequenceRoundEnd do one state at a time, until a
+     * faction is eliminated, everyone is out of cards or $maxRounds rounds
+     * have been played. Changes stay in the cache until flush().
+     *
+     * @return array rounds (round, drawn_cards, resolutions, status), last_round,
+     *               eliminated_faction and is_over
+     */
+    public function resolveSequence(int $sequenceId, int $lastRound, int $maxRounds): array
+    {
+        $rounds = [];
+        $eliminatedFaction = null;
+        $isOver = false;
+
+        while (!$isOver && count($rounds) < $maxRounds) {
+            $round = ++$lastRound;
+
+            $drawnCards = $this->drawCardsForSequence($sequenceId, $round);
+            $resolutions = empty($drawnCards) ? [] : $this->resolveRound($sequenceId, $round);
+            foreach ($this->applyPoisonTicks($sequenceId) as $pr) {
+                $resolutions[] = $pr;
+            }
+            $status = $this->getParticipantStatus($sequenceId);
+
+            $eliminatedFaction = $this->getEliminatedFaction($sequenceId);
+            $isOver = $eliminatedFaction !== null || $this->isEveryoneOutOfCards($sequenceId);
+            if (!$isOver) {
+                $this->resetSequenceRound($sequenceId);
+            }
+
+            $rounds[] = [
+                'round' => $round,
+                'drawn_cards' => $drawnCards,
+                'resolutions' => $resolutions,
+                'status' => $status,
+            ];
+        }
+
+        return [
+            'rounds' => $rounds,
+            'last_round' => $lastRound,
+            'eliminated_faction' => $eliminatedFaction,
+            'is_over' => $isOver,
+        ];
+    }
+
+    /**
+     * Resolve the battles at several locations in one pass, in the given order
+     *
+     * Each location with hostiles gets a sequence that is played out with
+     * resolveSequence() and closed with endSequence(). Battles share no
+     * entities, so card, tag and goal changes of all of them stay cached until
+     * flush(). Stops after a battle that is still going after $maxRounds
+     * rounds; that sequence is left loaded and open.
+     *
+     * @return array Per battle: location_id, sequence_id, participants and the
+     *               resolveSequence() result
+     */
+    public function resolveLocations(array $locationIds, int $maxRounds): array
+    {
+        $battles = [];
+        foreach ($locationIds as $locationId) {
+            $participants = $this->getEntitiesAtLocation($locationId);
+            if (!$this->hasHostiles($participants)) {
+                continue;
+            }
+
+            $sequenceId = $this->createSequence($locationId);
+            $this->cacheSequence($sequenceId);
+            $result = $this->resolveSequence($sequenceId, 0, $maxRounds);
+
+            $battles[] = [
+                'location_id' => $locationId,
+                'sequence_id' => $sequenceId,
+                'participants' => $participants,
+            ] + $result;
+
+            if (!$result['is_over']) {
+                break;
+            }
+            $this->endSequence($sequenceId);
+        }
+
+        return $battles;
+    }
+
     /**
      * Clean up after a sequence ends
      */
     public function endSequence(int $sequenceId): void
     {
         $this->game->DbQuery("UPDATE action_sequence SET is_resolved = 1 WHERE sequence_id = $sequenceId");
-        $this->game->DbQuery(
-            "UPDATE sequence_participant 
-             SET drawn_card_id = NULL, target_entity_id = NULL, block_count = 0, is_resolved = 0 
-             WHERE sequence_id = $sequenceId"
-        );
+        $this->setRoundValues($sequenceId, null, [
+            'drawn_card_id' => null,
+            'target_entity_id' => null,
+            'block_count' => 0,
+            'is_resolved' => 0,
+        ]);
     }
 
     /**
@@ -1578,11 +1796,12 @@ class ActionSequenceResolver
      */
     public function resetSequenceRound(int $sequenceId): void
     {
-        $this->game->DbQuery(
-            "UPDATE sequence_participant 
-             SET drawn_card_id = NULL, target_entity_id = NULL, block_count = 0, is_resolved = 0 
-             WHERE sequence_id = $sequenceId"
-        );
+        $this->setRoundValues($sequenceId, null, [
+            'drawn_card_id' => null,
+            'target_entity_id' => null,
+            'block_count' => 0,
+            'is_resolved' => 0,
+        ]);
     }
 
     /**
@@ -1593,33 +1812,33 @@ class ActionSequenceResolver
     {
         $results = [];
 
-        // Get all poisoned participants
-        $poisonedEntities = $this->game->getObjectListFromDB(
-            "SELECT et.entity_id, e.entity_name, e.entity_type, et.tag_value as rounds_remaining
-             FROM entity_tag et
-             JOIN entity e ON et.entity_id = e.entity_id
-             JOIN sequence_participant sp ON e.entity_id = sp.entity_id
-             WHERE sp.sequence_id = $sequenceId 
-               AND et.tag_name = '" . TAG_POISONED . "'
-               AND e.is_defeated = 0"
-        );
+        // Drawn cards are excluded from poison damage
+        if ($this->sequenceId === $sequenceId) {
+            $drawnCardIds = array_map(fn($r) => $r['drawn_card_id'], $this->rounds);
+        } else {
+            $drawnCardIds = $this->game->getCollectionFromDb(
+                "SELECT entity_id, drawn_card_id FROM sequence_participant 
+                 WHERE sequence_id = $sequenceId",
+                true
+            );
+        }
 
-        foreach ($poisonedEntities as $pe) {
+        // Get all poisoned participants
+        foreach ($this->getParticipants($sequenceId) as $pe) {
             $entityId = (int)$pe['entity_id'];
+            if (!$this->hasTag($entityId, TAG_POISONED)) {
+                continue;
+            }
             
             $result = [
                 'entity_id' => $entityId,
                 'entity_name' => $pe['entity_name'],
                 'entity_type' => $pe['entity_type'],
                 'effect' => 'poison_tick',
-                'rounds_remaining' => (int)$pe['rounds_remaining'],
+                'rounds_remaining' => $this->getTagValue($entityId, TAG_POISONED),
             ];
 
-            // Get their drawn card to exclude it
-            $drawnCardId = $this->game->getUniqueValueFromDB(
-                "SELECT drawn_card_id FROM sequence_participant 
-                 WHERE sequence_id = $sequenceId AND entity_id = $entityId"
-            );
+            $drawnCardId = $drawnCardIds[$entityId] ?? null;
             $excludeCards = $drawnCardId ? [(int)$drawnCardId] : [];
 
             // Destroy one card from poison
@@ -1631,7 +1850,7 @@ class ActionSequenceResolver
 
                 // Check if now defeated
                 if ($this->deck->isDefeated($entityId)) {
-                    $this->game->DbQuery("UPDATE entity SET is_defeated = 1 WHERE entity_id = $entityId");
+                    $this->markDefeated($entityId);
                     $result['defeated'] = true;
                 }
             } else {
@@ -4,6 +4,8 @@ declare(strict_types=1);
 
 namespace Bga\Games\Zoomquest\Helpers;
 
+require_once(dirname(__DIR__) . '/constants.inc.php');
+
 /**
  * Loads and validates game configuration from JSON files
  */
@@ -192,6 +194,33 @@ class ConfigLoader
         }
     }
 
+    /**
+     * Load the precomputed map index for a scenario (built by tools/graph_index.py).
+     * Only read at setup: setupNewGame keeps the adjacency in game_state.
+     * @param string $filename The scenario JSON file name (without path)
+     * @return array|null The index, or null if missing or built from a different scenario file
+     */
+    public function loadGraphIndex(string $filename): ?array
+    {
+        $configDir = dirname(__DIR__, 3) . '/configs/';
+        $indexPath = $configDir . 'graph/' . basename($filename);
+        if (!file_exists($indexPath) || !file_exists($configDir . $filename)) {
+            return null;
+        }
+
+        $index = json_decode(file_get_contents($indexPath), true);
+        if (!is_array($index) || ($index['version'] ?? null) !== GRAPH_INDEX_VERSION) {
+            return null;
+        }
+
+        // Ignore stale indexes rather than serving an outdated map
+        if (($index['source_sha256'] ?? '') !== hash_file('sha256', $configDir . $filename)) {
+            return null;
+        }
+
+        return $index;
+    }
+
     /**
      * Get the default scenario filename based on game option
      */
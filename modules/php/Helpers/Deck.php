@@ -8,28 +8,111 @@ require_once(dirname(__DIR__) . '/constants.inc.php');
 
 /**
  * Helper class for deck/card operations
+ *
+ * Entities passed to loadEntities() are served from an in-request cache:
+ * reads come from memory and changes are held until flush(), which writes
+ * every changed card in one statement. Other entities go straight to SQL.
  */
 class Deck
 {
     private $game;
 
+    /** @var array<int, array<int, array>> entity_id => card_id => card row */
+    private array $cards = [];
+
+    /** @var array<int, int> card_id => entity_id for cached cards changed since the last flush */
+    private array $dirty = [];
+
     public function __construct($game)
     {
         $this->game = $game;
     }
 
+    /**
+     * Load all cards of the given entities into the cache (one query)
+     */
+    public function loadEntities(array $entityIds): void
+    {
+        $entityIds = array_values(array_unique(array_map('intval', $entityIds)));
+        if (empty($entityIds)) {
+            return;
+        }
+
+        // Don't let a reload drop pending changes (other cached entities keep theirs)
+        if (!empty(array_intersect_key($this->cards, array_flip($entityIds)))) {
+            $this->flush();
+        }
+
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT card_id, entity_id, card_type, card_pile, card_order FROM card
+             WHERE entity_id IN (" . implode(',', $entityIds) . ")"
+        );
+
+        foreach ($entityIds as $entityId) {
+            $this->cards[$entityId] = [];
+        }
+        foreach ($rows as $row) {
+            $card = $this->toCard($row);
+            $this->cards[$card['entity_id']][$card['card_id']] = $card;
+        }
+    }
+
+    /**
+     * Write all cached card changes in a single statement
+     */
+    public function flush(): void
+    {
+        if (empty($this->dirty)) {
+            return;
+        }
+
+        $changed = [];
+        foreach ($this->dirty as $cardId => $entityId) {
+            $changed[] = $this->cards[$entityId][$cardId];
+        }
+        $this->dirty = [];
+
+        $this->writeCards($changed);
+    }
+
+    /**
+     * Whether cached card changes are waiting for flush()
+     */
+    public function hasPendingWrites(): bool
+    {
+        return !empty($this->dirty);
+    }
+
+    /**
+     * Flush and forget all cached entities
+     */
+    public function clearCache(): void
+    {
+        $this->flush();
+        $this->cards = [];
+    }
+
     /**
      * Create cards for an entity from an array of card types
      */
     public function createDeck(int $entityId, array $cardTypes): void
     {
-        $order = 0;
-        foreach ($cardTypes as $cardType) {
-            $this->game->DbQuery(
-                "INSERT INTO card (entity_id, card_type, card_pile, card_order) 
-                 VALUES ($entityId, '$cardType', 'active', $order)"
-            );
-            $order++;
+        if (empty($cardTypes)) {
+            return;
+        }
+
+        $values = [];
+        foreach (array_values($cardTypes) as $order => $cardType) {
+            $values[] = "($entityId, '$cardType', 'active', $order)";
+        }
+        $this->game->DbQuery(
+            "INSERT INTO card (entity_id, card_type, card_pile, card_order)
+             VALUES " . implode(', ', $values)
+        );
+
+        // A cached entity must pick up the new ids
+        if (isset($this->cards[$entityId])) {
+            $this->loadEntities([$entityId]);
         }
     }
 
@@ -38,24 +121,21 @@ class Deck
      */
     public function shuffleActive(int $entityId): void
     {
-        // Get all active cards
-        $cards = $this->game->getObjectListFromDB(
-            "SELECT card_id FROM card WHERE entity_id = $entityId AND card_pile = 'active'"
-        );
+        $cards = $this->getPile($entityId, 'active');
 
         if (empty($cards)) {
             return;
         }
 
         // Assign random order
-        $cardIds = array_column($cards, 'card_id');
-        shuffle($cardIds);
+        shuffle($cards);
 
-        foreach ($cardIds as $order => $cardId) {
-            $this->game->DbQuery(
-                "UPDATE card SET card_order = $order WHERE card_id = $cardId"
-            );
+        foreach ($cards as $order => &$card) {
+            $card['card_order'] = $order;
         }
+        unset($card);
+
+        $this->save($entityId, $cards);
     }
 
     /**
@@ -65,13 +145,18 @@ class Deck
      */
     public function drawTop(int $entityId): ?array
     {
+        if (isset($this->cards[$entityId])) {
+            $active = $this->getPile($entityId, 'active');
+            return $active ? $this->publicCard($active[0]) : null;
+        }
+
         $card = $this->game->getObjectFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active' 
+            "SELECT card_id, card_type FROM card
+             WHERE entity_id = $entityId AND card_pile = 'active'
              ORDER BY card_order ASC LIMIT 1"
         );
 
-        return $card ?: null;
+        return $card ? $this->publicCard($card) : null;
     }
 
     /**
@@ -79,6 +164,10 @@ class Deck
      */
     public function hasActiveCards(int $entityId): bool
     {
+        if (isset($this->cards[$entityId])) {
+            return $this->getPileCounts($entityId)['active'] > 0;
+        }
+
         $count = (int)$this->game->getUniqueValueFromDB(
             "SELECT COUNT(*) FROM card WHERE entity_id = $entityId AND card_pile = 'active'"
         );
@@ -91,11 +180,16 @@ class Deck
      */
     public function getActiveCards(int $entityId): array
     {
-        return $this->game->getObjectListFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active' 
+        if (isset($this->cards[$entityId])) {
+            return array_map([$this, 'publicCard'], $this->getPile($entityId, 'active'));
+        }
+
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT card_id, card_type FROM card
+             WHERE entity_id = $entityId AND card_pile = 'active'
              ORDER BY card_order ASC"
         );
+        return array_map([$this, 'publicCard'], $rows);
     }
 
     /**
@@ -105,14 +199,23 @@ class Deck
      */
     public function reorderActive(int $entityId, array $cardIds): void
     {
+        $active = [];
+        foreach ($this->getPile($entityId, 'active') as $card) {
+            $active[$card['card_id']] = $card;
+        }
+
+        // Only cards that belong to this entity and are in the active pile move
+        $changed = [];
         foreach ($cardIds as $order => $cardId) {
             $cardId = (int)$cardId;
-            // Verify this card belongs to this entity and is in active pile
-            $this->game->DbQuery(
-                "UPDATE card SET card_order = $order 
-                 WHERE card_id = $cardId AND entity_id = $entityId AND card_pile = 'active'"
-            );
+            if (isset($active[$cardId])) {
+                $card = $active[$cardId];
+                $card['card_order'] = $order;
+                $changed[] = $card;
+            }
         }
+
+        $this->save($entityId, $changed);
     }
 
     /**
@@ -121,27 +224,7 @@ class Deck
      */
     public function moveActiveToDiscard(int $entityId): void
     {
-        // Get current max order in discard pile
-        $maxDiscardOrder = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COALESCE(MAX(card_order), -1) FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'discard'"
-        );
-
-        // Get active cards in order
-        $activeCards = $this->game->getObjectListFromDB(
-            "SELECT card_id FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active' 
-             ORDER BY card_order ASC"
-        );
-
-        // Move each to discard, maintaining order
-        foreach ($activeCards as $index => $card) {
-            $newOrder = $maxDiscardOrder + 1 + $index;
-            $this->game->DbQuery(
-                "UPDATE card SET card_pile = 'discard', card_order = $newOrder 
-                 WHERE card_id = {$card['card_id']}"
-            );
-        }
+        $this->appendPile($entityId, 'active', 'discard');
     }
 
     /**
@@ -149,9 +232,7 @@ class Deck
      */
     public function discard(int $cardId): void
     {
-        $this->game->DbQuery(
-            "UPDATE card SET card_pile = 'discard' WHERE card_id = $cardId"
-        );
+        $this->setPile($cardId, 'discard');
     }
 
     /**
@@ -159,9 +240,7 @@ class Deck
      */
     public function destroy(int $cardId): void
     {
-        $this->game->DbQuery(
-            "UPDATE card SET card_pile = 'destroyed' WHERE card_id = $cardId"
-        );
+        $this->setPile($cardId, 'destroyed');
     }
 
     /**
@@ -170,25 +249,20 @@ class Deck
      */
     public function healOne(int $entityId): ?array
     {
-        $card = $this->game->getObjectFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'destroyed' 
-             ORDER BY RAND() LIMIT 1"
-        );
+        $cards = $this->getCards($entityId);
+        $destroyed = $this->filterPile($cards, 'destroyed');
 
-        if ($card) {
-            // Move to top of discard (highest order)
-            $maxOrder = (int)$this->game->getUniqueValueFromDB(
-                "SELECT COALESCE(MAX(card_order), -1) FROM card 
-                 WHERE entity_id = $entityId AND card_pile = 'discard'"
-            );
-            $this->game->DbQuery(
-                "UPDATE card SET card_pile = 'discard', card_order = " . ($maxOrder + 1) . " 
-                 WHERE card_id = {$card['card_id']}"
-            );
+        if (empty($destroyed)) {
+            return null;
         }
 
-        return $card;
+        // Move to top of discard (highest order)
+        $card = $destroyed[array_rand($destroyed)];
+        $card['card_pile'] = 'discard';
+        $card['card_order'] = $this->maxOrder($cards, 'discard') + 1;
+        $this->save($entityId, [$card]);
+
+        return $this->publicCard($card);
     }
 
     /**
@@ -200,36 +274,25 @@ class Deck
      */
     public function destroyOneCard(int $entityId, array $excludeCardIds = []): ?array
     {
-        $excludeClause = '';
-        if (!empty($excludeCardIds)) {
-            $ids = implode(',', array_map('intval', $excludeCardIds));
-            $excludeClause = " AND card_id NOT IN ($ids)";
+        $cards = $this->getCards($entityId);
+        foreach ($excludeCardIds as $cardId) {
+            unset($cards[(int)$cardId]);
         }
 
-        // Try active pile first
-        $card = $this->game->getObjectFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active' $excludeClause
-             ORDER BY RAND() LIMIT 1"
-        );
+        // Try active pile first, then discard pile
+        foreach (['active', 'discard'] as $pile) {
+            $candidates = $this->filterPile($cards, $pile);
+            if (empty($candidates)) {
+                continue;
+            }
 
-        if ($card) {
-            $this->destroy((int)$card['card_id']);
-            $card['from_pile'] = 'active';
-            return $card;
-        }
+            $card = $candidates[array_rand($candidates)];
+            $card['card_pile'] = 'destroyed';
+            $this->save($entityId, [$card]);
 
-        // Try discard pile
-        $card = $this->game->getObjectFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'discard' $excludeClause
-             ORDER BY RAND() LIMIT 1"
-        );
-
-        if ($card) {
-            $this->destroy((int)$card['card_id']);
-            $card['from_pile'] = 'discard';
-            return $card;
+            $result = $this->publicCard($card);
+            $result['from_pile'] = $pile;
+            return $result;
         }
 
         return null;
@@ -241,12 +304,20 @@ class Deck
      */
     public function getPileCounts(int $entityId): array
     {
+        $counts = ['active' => 0, 'discard' => 0, 'destroyed' => 0, 'inactive' => 0];
+
+        if (isset($this->cards[$entityId])) {
+            foreach ($this->cards[$entityId] as $card) {
+                $counts[$card['card_pile']]++;
+            }
+            return $counts;
+        }
+
         $result = $this->game->getObjectListFromDB(
-            "SELECT card_pile, COUNT(*) as count FROM card 
+            "SELECT card_pile, COUNT(*) as count FROM card
              WHERE entity_id = $entityId GROUP BY card_pile"
         );
 
-        $counts = ['active' => 0, 'discard' => 0, 'destroyed' => 0, 'inactive' => 0];
         foreach ($result as $row) {
             $counts[$row['card_pile']] = (int)$row['count'];
         }
@@ -269,27 +340,7 @@ class Deck
      */
     public function refreshDeck(int $entityId): void
     {
-        // Get current max order in active pile
-        $maxActiveOrder = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COALESCE(MAX(card_order), -1) FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active'"
-        );
-
-        // Get discard cards in order
-        $discardCards = $this->game->getObjectListFromDB(
-            "SELECT card_id FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'discard' 
-             ORDER BY card_order ASC"
-        );
-
-        // Move each discard card to bottom of active, maintaining order
-        foreach ($discardCards as $index => $card) {
-            $newOrder = $maxActiveOrder + 1 + $index;
-            $this->game->DbQuery(
-                "UPDATE card SET card_pile = 'active', card_order = $newOrder 
-                 WHERE card_id = {$card['card_id']}"
-            );
-        }
+        $this->appendPile($entityId, 'discard', 'active');
     }
 
     /**
@@ -297,12 +348,23 @@ class Deck
      */
     public function shuffleDiscardIntoActive(int $entityId): void
     {
-        // Move discard to active
-        $this->game->DbQuery(
-            "UPDATE card SET card_pile = 'active' WHERE entity_id = $entityId AND card_pile = 'discard'"
-        );
+        $cards = $this->getCards($entityId);
+        foreach ($cards as &$card) {
+            if ($card['card_pile'] === 'discard') {
+                $card['card_pile'] = 'active';
+            }
+        }
+        unset($card);
+
         // Shuffle
-        $this->shuffleActive($entityId);
+        $active = $this->filterPile($cards, 'active');
+        shuffle($active);
+        foreach ($active as $order => &$card) {
+            $card['card_order'] = $order;
+        }
+        unset($card);
+
+        $this->save($entityId, $active);
     }
 
     /**
@@ -310,14 +372,11 @@ class Deck
      */
     public function getAllCards(int $entityId): array
     {
-        $cards = $this->game->getObjectListFromDB(
-            "SELECT card_id, card_type, card_pile, card_order FROM card 
-             WHERE entity_id = $entityId ORDER BY card_pile, card_order"
-        );
+        $cards = $this->getCards($entityId);
 
         $result = ['active' => [], 'discard' => [], 'destroyed' => [], 'inactive' => []];
-        foreach ($cards as $card) {
-            $result[$card['card_pile']][] = $card;
+        foreach (array_keys($result) as $pile) {
+            $result[$pile] = $this->filterPile($cards, $pile);
         }
 
         return $result;
@@ -329,11 +388,16 @@ class Deck
      */
     public function getInactiveCards(int $entityId): array
     {
-        return $this->game->getObjectListFromDB(
-            "SELECT card_id, card_type FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'inactive' 
+        if (isset($this->cards[$entityId])) {
+            return array_map([$this, 'publicCard'], $this->getPile($entityId, 'inactive'));
+        }
+
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT card_id, card_type FROM card
+             WHERE entity_id = $entityId AND card_pile = 'inactive'
              ORDER BY card_order ASC"
         );
+        return array_map([$this, 'publicCard'], $rows);
     }
 
     /**
@@ -341,25 +405,7 @@ class Deck
      */
     public function moveToInactive(int $cardId): void
     {
-        // Get the entity_id from the card
-        $card = $this->game->getObjectFromDB(
-            "SELECT entity_id FROM card WHERE card_id = $cardId"
-        );
-        if (!$card) {
-            return;
-        }
-        $entityId = (int)$card['entity_id'];
-        
-        // Get max order in inactive pile
-        $maxOrder = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COALESCE(MAX(card_order), -1) FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'inactive'"
-        );
-        
-        $this->game->DbQuery(
-            "UPDATE card SET card_pile = 'inactive', card_order = " . ($maxOrder + 1) . " 
-             WHERE card_id = $cardId"
-        );
+        $this->moveToTopOf($cardId, 'inactive');
     }
 
     /**
@@ -367,25 +413,7 @@ class Deck
      */
     public function moveToActive(int $cardId): void
     {
-        // Get the entity_id from the card
-        $card = $this->game->getObjectFromDB(
-            "SELECT entity_id FROM card WHERE card_id = $cardId"
-        );
-        if (!$card) {
-            return;
-        }
-        $entityId = (int)$card['entity_id'];
-        
-        // Get max order in active pile
-        $maxOrder = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COALESCE(MAX(card_order), -1) FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'active'"
-        );
-        
-        $this->game->DbQuery(
-            "UPDATE card SET card_pile = 'active', card_order = " . ($maxOrder + 1) . " 
-             WHERE card_id = $cardId"
-        );
+        $this->moveToTopOf($cardId, 'active');
     }
 
     /**
@@ -396,18 +424,221 @@ class Deck
      */
     public function addCardToInactive(int $entityId, string $cardType): int
     {
-        // Get max order in inactive pile
-        $maxOrder = (int)$this->game->getUniqueValueFromDB(
-            "SELECT COALESCE(MAX(card_order), -1) FROM card 
-             WHERE entity_id = $entityId AND card_pile = 'inactive'"
+        $order = $this->maxOrder($this->getCards($entityId), 'inactive') + 1;
+
+        $this->game->DbQuery(
+            "INSERT INTO card (entity_id, card_type, card_pile, card_order)
+             VALUES ($entityId, '$cardType', 'inactive', $order)"
+        );
+
+        $cardId = (int)$this->game->getUniqueValueFromDB("SELECT LAST_INSERT_ID()");
+
+        if (isset($this->cards[$entityId])) {
+            $this->cards[$entityId][$cardId] = [
+                'card_id' => $cardId,
+                'entity_id' => $entityId,
+                'card_type' => $cardType,
+                'card_pile' => 'inactive',
+                'card_order' => $order,
+            ];
+        }
+
+        return $cardId;
+    }
+
+    /**
+     * Get all cards of an entity keyed by card_id (from the cache, or one query)
+     */
+    private function getCards(int $entityId): array
+    {
+        if (isset($this->cards[$entityId])) {
+            return $this->cards[$entityId];
+        }
+
+        $cards = [];
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT card_id, entity_id, card_type, card_pile, card_order FROM card
+             WHERE entity_id = $entityId"
         );
-        
+        foreach ($rows as $row) {
+            $card = $this->toCard($row);
+            $cards[$card['card_id']] = $card;
+        }
+
+        return $cards;
+    }
+
+    /**
+     * Get one pile of an entity, ordered by card_order
+     */
+    private function getPile(int $entityId, string $pile): array
+    {
+        return $this->filterPile($this->getCards($entityId), $pile);
+    }
+
+    /**
+     * Filter cards to one pile, ordered by card_order
+     */
+    private function filterPile(array $cards, string $pile): array
+    {
+        $result = array_values(array_filter($cards, fn($c) => $c['card_pile'] === $pile));
+        usort($result, fn($a, $b) => [$a['card_order'], $a['card_id']] <=> [$b['card_order'], $b['card_id']]);
+        return $result;
+    }
+
+    /**
+     * Highest card_order in a pile (-1 if empty)
+     */
+    private function maxOrder(array $cards, string $pile): int
+    {
+        $max = -1;
+        foreach ($cards as $card) {
+            if ($card['card_pile'] === $pile && $card['card_order'] > $max) {
+                $max = $card['card_order'];
+            }
+        }
+        return $max;
+    }
+
+    /**
+     * Move a whole pile under another one, maintaining its order
+     */
+    private function appendPile(int $entityId, string $from, string $to): void
+    {
+        $cards = $this->getCards($entityId);
+        $nextOrder = $this->maxOrder($cards, $to) + 1;
+
+        $moved = [];
+        foreach ($this->filterPile($cards, $from) as $card) {
+            $card['card_pile'] = $to;
+            $card['card_order'] = $nextOrder++;
+            $moved[] = $card;
+        }
+
+        $this->save($entityId, $moved);
+    }
+
+    /**
+     * Move a single card to another pile, keeping its order
+     */
+    private function setPile(int $cardId, string $pile): void
+    {
+        $entityId = $this->findCachedOwner($cardId);
+        if ($entityId === null) {
+            $this->game->DbQuery(
+                "UPDATE card SET card_pile = '$pile' WHERE card_id = $cardId"
+            );
+            return;
+        }
+
+        $card = $this->cards[$entityId][$cardId];
+        $card['card_pile'] = $pile;
+        $this->save($entityId, [$card]);
+    }
+
+    /**
+     * Move a single card to the top (highest order) of another pile
+     */
+    private function moveToTopOf(int $cardId, string $pile): void
+    {
+        $entityId = $this->findCachedOwner($cardId);
+        if ($entityId === null) {
+            // Get the entity_id from the card
+            $entityId = $this->game->getUniqueValueFromDB(
+                "SELECT entity_id FROM card WHERE card_id = $cardId"
+            );
+            if ($entityId === null) {
+                return;
+            }
+            $entityId = (int)$entityId;
+        }
+
+        $cards = $this->getCards($entityId);
+        $card = $cards[$cardId];
+        $card['card_pile'] = $pile;
+        $card['card_order'] = $this->maxOrder($cards, $pile) + 1;
+        $this->save($entityId, [$card]);
+    }
+
+    /**
+     * Find which cached entity owns a card (null if not cached)
+     */
+    private function findCachedOwner(int $cardId): ?int
+    {
+        if (isset($this->dirty[$cardId])) {
+            return $this->dirty[$cardId];
+        }
+        foreach ($this->cards as $entityId => $cards) {
+            if (isset($cards[$cardId])) {
+                return $entityId;
+            }
+        }
+        return null;
+    }
+
+    /**
+     * Store changed cards: in the cache until flush() for cached entities,
+     * otherwise written right away
+     */
+    private function save(int $entityId, array $changed): void
+    {
+        if (!isset($this->cards[$entityId])) {
+            $this->writeCards($changed);
+            return;
+        }
+
+        foreach ($changed as $card) {
+            $this->cards[$entityId][$card['card_id']] = $card;
+            $this->dirty[$card['card_id']] = $entityId;
+        }
+    }
+
+    /**
+     * Write pile and order for a set of cards in one UPDATE
+     */
+    private function writeCards(array $cards): void
+    {
+        if (empty($cards)) {
+            return;
+        }
+
+        $ids = [];
+        $piles = '';
+        $orders = '';
+        foreach ($cards as $card) {
+            $cardId = (int)$card['card_id'];
+            $ids[] = $cardId;
+            $piles .= " WHEN $cardId THEN '{$card['card_pile']}'";
+            $orders .= " WHEN $cardId THEN " . (int)$card['card_order'];
+        }
+
         $this->game->DbQuery(
-            "INSERT INTO card (entity_id, card_type, card_pile, card_order) 
-             VALUES ($entityId, '$cardType', 'inactive', " . ($maxOrder + 1) . ")"
+            "UPDATE card
+             SET card_pile = CASE card_id$piles END,
+                 card_order = CASE card_id$orders END
+             WHERE card_id IN (" . implode(',', $ids) . ")"
         );
-        
-        return (int)$this->game->getUniqueValueFromDB("SELECT LAST_INSERT_ID()");
     }
-}
 
+    /**
+     * Normalize a card row from the database
+     */
+    private function toCard(array $row): array
+    {
+        return [
+            'card_id' => (int)$row['card_id'],
+            'entity_id' => (int)$row['entity_id'],
+            'card_type' => $row['card_type'],
+            'card_pile' => $row['card_pile'],
+            'card_order' => (int)$row['card_order'],
+        ];
+    }
+
+    /**
+     * The id/type view of a card returned to callers (int id, cached or not)
+     */
+    private function publicCard(array $card): array
+    {
+        return ['card_id' => (int)$card['card_id'], 'card_type' => $card['card_type']];
+    }
+}
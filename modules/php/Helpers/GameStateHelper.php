@@ -12,6 +12,8 @@ require_once(dirname(__DIR__) . '/constants.inc.php');
 class GameStateHelper
 {
     private $game;
+    private ?array $adjacency = null;
+    private bool $adjacencyLoaded = false;
 
     public function __construct($game)
     {
@@ -44,6 +46,23 @@ class GameStateHelper
         );
     }
 
+    /**
+     * Get several game state values with one query (null for missing keys)
+     */
+    public function getMany(array $keys): array
+    {
+        $values = array_fill_keys($keys, null);
+        $rows = $this->game->getCollectionFromDb(
+            "SELECT state_key, state_value FROM game_state
+             WHERE state_key IN ('" . implode("','", array_map('addslashes', $keys)) . "')",
+            true
+        );
+        foreach ($rows as $key => $value) {
+            $values[$key] = $value;
+        }
+        return $values;
+    }
+
     /**
      * Get current round number
      */
@@ -75,12 +94,9 @@ class GameStateHelper
         );
 
         // Add tags to each entity
+        $tagStore = $this->game->getTagStore();
         foreach ($entities as &$entity) {
-            $entityId = (int)$entity['entity_id'];
-            $tags = $this->game->getObjectListFromDB(
-                "SELECT tag_name, tag_value FROM entity_tag WHERE entity_id = $entityId"
-            );
-            $entity['tags'] = $tags;
+            $entity['tags'] = $tagStore->getAll((int)$entity['entity_id']);
         }
 
         return $entities;
@@ -153,11 +169,71 @@ class GameStateHelper
         ];
     }
 
+    /**
+     * Build the static client payload and store it with its content hash
+     *
+     * Nothing in it changes after setupNewGame, so getAllDatas sends the stored
+     * string instead of reloading the map, and the client keys what it builds
+     * from it by version.
+     */
+    public function storeStaticData(): void
+    {
+        $json = json_encode($this->buildStaticData());
+        $this->set(STATE_STATIC_DATA, $json);
+        $this->set(STATE_STATIC_VERSION, substr(sha1($json), 0, 16));
+    }
+
+    /**
+     * Get the static client payload as ['version' => ..., 'data' => ...]
+     */
+    public function getStaticData(): array
+    {
+        $state = $this->getMany([STATE_STATIC_DATA, STATE_STATIC_VERSION]);
+        if ($state[STATE_STATIC_DATA] === null) {
+            // Games set up before the payload was stored
+            $json = json_encode($this->buildStaticData());
+            return ['version' => substr(sha1($json), 0, 16), 'data' => json_decode($json, true)];
+        }
+        return ['version' => $state[STATE_STATIC_VERSION], 'data' => json_decode($state[STATE_STATIC_DATA], true)];
+    }
+
+    /**
+     * Map, background image and victory condition, as sent to the client
+     */
+    private function buildStaticData(): array
+    {
+        return [
+            'map' => $this->getMap(),
+            'background_image' => $this->get(STATE_BACKGROUND_IMAGE),
+            'victory' => $this->getVictoryCondition(),
+        ];
+    }
+
+    /**
+     * Get the adjacency stored from the map index at setup (loaded once per
+     * request), or null for games set up without an index
+     */
+    private function getAdjacency(): ?array
+    {
+        if (!$this->adjacencyLoaded) {
+            $this->adjacencyLoaded = true;
+            $json = $this->get(STATE_ADJACENCY);
+            $this->adjacency = $json ? json_decode($json, true) : null;
+        }
+        return $this->adjacency;
+    }
+
     /**
      * Get adjacent locations for a given location
      */
     public function getAdjacentLocations(string $locationId): array
     {
+        // Served from the stored map index when available (same rows as the queries below)
+        $adjacency = $this->getAdjacency();
+        if ($adjacency !== null && isset($adjacency[$locationId])) {
+            return $adjacency[$locationId];
+        }
+
         $locationId = addslashes($locationId);
         
         // Get connections going from this location (with destination name)
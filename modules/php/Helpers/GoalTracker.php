@@ -8,11 +8,36 @@ require_once(dirname(__DIR__) . '/constants.inc.php');
 
 /**
  * Tracks individual player goals and progress
+ *
+ * Progress counters, visited locations and assigned goals are loaded once per
+ * request. Tracking events update them in memory, along with the progress of
+ * every goal in individual_goals, and are buffered until flush() writes them
+ * as one goal_progress upsert and one player_visited insert.
  */
 class GoalTracker
 {
     private $game;
 
+    private bool $loaded = false;
+    /** @var array<string, array{0: string, 1: string}>|null location_id => [terrain, direction] */
+    private ?array $locations = null;
+    /** @var array<int, array> player_id => player_goal row */
+    private array $playerGoals = [];
+    /** @var array<string, array> goal_id => goal definition */
+    private array $goals = [];
+    /** @var array<string, array<string, string[]>> track_type => track_filter => goal ids */
+    private array $goalIndex = [];
+    /** @var array<int, array<string, array<string, int>>> player_id => track_type => track_filter => progress */
+    private array $counters = [];
+    /** @var array<int, array<string, bool>> player_id => location_id => true */
+    private array $visited = [];
+    /** @var array<int, array<string, int>> player_id => goal_id => progress, for every goal */
+    private array $goalProgress = [];
+    /** @var array<int, array<string, array<string, int>>> Unwritten progress increments */
+    private array $pendingProgress = [];
+    /** @var array<int, array{0: int, 1: string}> Unwritten [player_id, location_id] visits */
+    private array $pendingVisits = [];
+
     public function __construct($game)
     {
         $this->game = $game;
@@ -31,6 +56,7 @@ class GoalTracker
         shuffle($availableGoals);
         $goalIndex = 0;
 
+        $values = [];
         foreach ($players as $playerId => $player) {
             // Cycle through goals if more players than goals
             $goal = $availableGoals[$goalIndex % count($availableGoals)];
@@ -40,19 +66,25 @@ class GoalTracker
             $goalName = addslashes($goal['name']);
             $goalDesc = addslashes($goal['description']);
             // Store icon as plain text (emoji) - use a simple fallback if not set
-            $goalIcon = $goal['icon'] ?? 'target';
+            $goalIcon = addslashes($goal['icon'] ?? 'target');
             $threshold = (int)($goal['threshold'] ?? 1);
             $compare = addslashes($goal['compare'] ?? 'gte');
             $points = (int)($goal['points'] ?? 1);
 
-            $this->game->DbQuery(
-                "INSERT INTO player_goal (player_id, goal_id, goal_name, goal_description, goal_icon, threshold, compare, points)
-                 VALUES ($playerId, '$goalId', '$goalName', '$goalDesc', '$goalIcon', $threshold, '$compare', $points)"
-            );
+            $values[] = "($playerId, '$goalId', '$goalName', '$goalDesc', '$goalIcon', $threshold, '$compare', $points)";
         }
 
+        $this->game->DbQuery(
+            "INSERT INTO player_goal (player_id, goal_id, goal_name, goal_description, goal_icon, threshold, compare, points)
+             VALUES " . implode(', ', $values)
+        );
+
         // Store available goals in game state for reference
         $this->game->getGameStateHelper()->set(STATE_INDIVIDUAL_GOALS, json_encode($availableGoals));
+
+        // Reload goals and assignments on next use
+        $this->flush();
+        $this->loaded = false;
     }
 
     /**
@@ -60,9 +92,8 @@ class GoalTracker
      */
     public function getPlayerGoal(int $playerId): ?array
     {
-        return $this->game->getObjectFromDB(
-            "SELECT * FROM player_goal WHERE player_id = $playerId"
-        );
+        $this->load();
+        return $this->playerGoals[$playerId] ?? null;
     }
 
     /**
@@ -70,10 +101,8 @@ class GoalTracker
      */
     public function getAllPlayerGoals(): array
     {
-        return $this->game->getCollectionFromDb(
-            "SELECT player_id, goal_id, goal_name, goal_description, goal_icon, threshold, compare, points 
-             FROM player_goal"
-        );
+        $this->load();
+        return $this->playerGoals;
     }
 
     /**
@@ -81,14 +110,8 @@ class GoalTracker
      */
     public function getProgress(int $playerId, string $trackType, ?string $filter = null): int
     {
-        $trackType = addslashes($trackType);
-        $filterValue = $filter !== null ? addslashes($filter) : '';
-        
-        $result = $this->game->getUniqueValueFromDB(
-            "SELECT progress FROM goal_progress 
-             WHERE player_id = $playerId AND track_type = '$trackType' AND track_filter = '$filterValue'"
-        );
-        return $result !== null ? (int)$result : 0;
+        $this->load();
+        return $this->counters[$playerId][$trackType][$filter ?? ''] ?? 0;
     }
 
     /**
@@ -96,14 +119,18 @@ class GoalTracker
      */
     public function incrementProgress(int $playerId, string $trackType, ?string $filter = null, int $amount = 1): void
     {
-        $trackType = addslashes($trackType);
-        $filterValue = $filter !== null ? addslashes($filter) : '';
-        
-        $this->game->DbQuery(
-            "INSERT INTO goal_progress (player_id, track_type, track_filter, progress)
-             VALUES ($playerId, '$trackType', '$filterValue', $amount)
-             ON DUPLICATE KEY UPDATE progress = progress + $amount"
-        );
+        $this->load();
+        $filter = $filter ?? '';
+
+        $this->counters[$playerId][$trackType][$filter] = ($this->counters[$playerId][$trackType][$filter] ?? 0) + $amount;
+        $this->pendingProgress[$playerId][$trackType][$filter] = ($this->pendingProgress[$playerId][$trackType][$filter] ?? 0) + $amount;
+
+        // Goals already evaluated for this player move with the event
+        if (isset($this->goalProgress[$playerId])) {
+            foreach ($this->goalIndex[$trackType][$filter] ?? [] as $goalId) {
+                $this->goalProgress[$playerId][$goalId] += $amount;
+            }
+        }
     }
 
     /**
@@ -111,21 +138,20 @@ class GoalTracker
      */
     public function recordLocationVisit(int $playerId, string $locationId): bool
     {
-        $locationId = addslashes($locationId);
-        
-        // Check if already visited
-        $exists = $this->game->getUniqueValueFromDB(
-            "SELECT COUNT(*) FROM player_visited 
-             WHERE player_id = $playerId AND location_id = '$locationId'"
-        );
-        
-        if ((int)$exists === 0) {
-            $this->game->DbQuery(
-                "INSERT INTO player_visited (player_id, location_id) VALUES ($playerId, '$locationId')"
-            );
-            return true; // New location
+        $this->load();
+        if (isset($this->visited[$playerId][$locationId])) {
+            return false; // Already visited
+        }
+
+        $this->visited[$playerId][$locationId] = true;
+        $this->pendingVisits[] = [$playerId, $locationId];
+
+        if (isset($this->goalProgress[$playerId])) {
+            foreach ($this->goalIndex[TRACK_LOCATIONS_VISITED][''] ?? [] as $goalId) {
+                $this->goalProgress[$playerId][$goalId]++;
+            }
         }
-        return false; // Already visited
+        return true; // New location
     }
 
     /**
@@ -133,9 +159,8 @@ class GoalTracker
      */
     public function getLocationsVisitedCount(int $playerId): int
     {
-        return (int)$this->game->getUniqueValueFromDB(
-            "SELECT COUNT(*) FROM player_visited WHERE player_id = $playerId"
-        );
+        $this->load();
+        return count($this->visited[$playerId] ?? []);
     }
 
     /**
@@ -143,19 +168,23 @@ class GoalTracker
      */
     public function trackTurnAtLocation(int $playerId, string $locationId): void
     {
-        // Get location attributes
-        $location = $this->game->getObjectFromDB(
-            "SELECT terrain, direction FROM location WHERE location_id = '" . addslashes($locationId) . "'"
-        );
+        if ($this->locations === null) {
+            $this->locations = [];
+            $rows = $this->game->getObjectListFromDB("SELECT location_id, terrain, direction FROM location");
+            foreach ($rows as $row) {
+                $this->locations[$row['location_id']] = [(string)$row['terrain'], (string)$row['direction']];
+            }
+        }
 
-        if ($location) {
+        if (isset($this->locations[$locationId])) {
+            [$terrain, $direction] = $this->locations[$locationId];
             // Track terrain
-            if (!empty($location['terrain'])) {
-                $this->incrementProgress($playerId, TRACK_TURNS_IN_TERRAIN, $location['terrain']);
+            if ($terrain !== '') {
+                $this->incrementProgress($playerId, TRACK_TURNS_IN_TERRAIN, $terrain);
             }
             // Track direction
-            if (!empty($location['direction'])) {
-                $this->incrementProgress($playerId, TRACK_TURNS_IN_DIRECTION, $location['direction']);
+            if ($direction !== '') {
+                $this->incrementProgress($playerId, TRACK_TURNS_IN_DIRECTION, $direction);
             }
         }
     }
@@ -188,6 +217,60 @@ class GoalTracker
         $this->incrementProgress($playerId, TRACK_CARD_PLAYS, $cardType);
     }
 
+    /**
+     * Write buffered progress as one upsert and new visits as one insert
+     */
+    public function flush(): void
+    {
+        if (!empty($this->pendingProgress)) {
+            $values = [];
+            foreach ($this->pendingProgress as $playerId => $tracks) {
+                foreach ($tracks as $trackType => $filters) {
+                    foreach ($filters as $filter => $amount) {
+                        $values[] = "($playerId, '" . addslashes((string)$trackType) . "', '"
+                            . addslashes((string)$filter) . "', $amount)";
+                    }
+                }
+            }
+            $this->game->DbQuery(
+                "INSERT INTO goal_progress (player_id, track_type, track_filter, progress)
+                 VALUES " . implode(', ', $values) . "
+                 ON DUPLICATE KEY UPDATE progress = progress + VALUES(progress)"
+            );
+            $this->pendingProgress = [];
+        }
+
+        if (!empty($this->pendingVisits)) {
+            $values = [];
+            foreach ($this->pendingVisits as [$playerId, $locationId]) {
+                $values[] = "($playerId, '" . addslashes($locationId) . "')";
+            }
+            $this->game->DbQuery(
+                "INSERT INTO player_visited (player_id, location_id) VALUES " . implode(', ', $values)
+            );
+            $this->pendingVisits = [];
+        }
+    }
+
+    /**
+     * Whether progress or visits are waiting for flush()
+     */
+    public function hasPendingWrites(): bool
+    {
+        return !empty($this->pendingProgress) || !empty($this->pendingVisits);
+    }
+
+    /**
+     * Progress tracked without a flush() afterwards would be lost silently;
+     * make that show up in the error log instead
+     */
+    public function __destruct()
+    {
+        if ($this->hasPendingWrites()) {
+            trigger_error('GoalTracker: goal progress was never flushed', E_USER_WARNING);
+        }
+    }
+
     /**
      * Check if a player's goal is complete
      */
@@ -219,31 +302,27 @@ class GoalTracker
             return 0;
         }
 
-        // Load the full goal definition to get track type and filter
-        $goalsJson = $this->game->getGameStateHelper()->get(STATE_INDIVIDUAL_GOALS);
-        $goals = $goalsJson ? json_decode($goalsJson, true) : [];
-        
-        $goalDef = null;
-        foreach ($goals as $g) {
-            if ($g['id'] === $goal['goal_id']) {
-                $goalDef = $g;
-                break;
-            }
-        }
-
-        if (!$goalDef) {
-            return 0;
-        }
-
-        $trackType = $goalDef['track'] ?? '';
-        $filter = $goalDef['filter'] ?? null;
+        return $this->getAllGoalProgress($playerId)[$goal['goal_id']] ?? 0;
+    }
 
-        // Special case for locations_visited
-        if ($trackType === TRACK_LOCATIONS_VISITED) {
-            return $this->getLocationsVisitedCount($playerId);
+    /**
+     * Progress of a player toward every goal in individual_goals (goal_id => progress)
+     */
+    public function getAllGoalProgress(int $playerId): array
+    {
+        $this->load();
+        if (!isset($this->goalProgress[$playerId])) {
+            $progress = [];
+            foreach ($this->goals as $goalId => $goal) {
+                $trackType = $goal['track'] ?? '';
+                // Special case for locations_visited
+                $progress[$goalId] = $trackType === TRACK_LOCATIONS_VISITED
+                    ? count($this->visited[$playerId] ?? [])
+                    : ($this->counters[$playerId][$trackType][$goal['filter'] ?? ''] ?? 0);
+            }
+            $this->goalProgress[$playerId] = $progress;
         }
-
-        return $this->getProgress($playerId, $trackType, $filter);
+        return $this->goalProgress[$playerId];
     }
 
     /**
@@ -277,5 +356,47 @@ class GoalTracker
 
         return $status;
     }
-}
 
+    /**
+     * Load goal definitions, assignments, counters and visits in four queries
+     */
+    private function load(): void
+    {
+        if ($this->loaded) {
+            return;
+        }
+        $this->loaded = true;
+
+        // Goal definitions indexed by the event that advances them
+        $goalsJson = $this->game->getGameStateHelper()->get(STATE_INDIVIDUAL_GOALS);
+        $this->goals = [];
+        $this->goalIndex = [];
+        foreach ($goalsJson ? json_decode($goalsJson, true) : [] as $goal) {
+            $this->goals[$goal['id']] = $goal;
+            $trackType = $goal['track'] ?? '';
+            $filter = $trackType === TRACK_LOCATIONS_VISITED ? '' : ($goal['filter'] ?? '');
+            $this->goalIndex[$trackType][$filter][] = $goal['id'];
+        }
+
+        $this->playerGoals = $this->game->getCollectionFromDb(
+            "SELECT player_id, goal_id, goal_name, goal_description, goal_icon, threshold, compare, points 
+             FROM player_goal"
+        );
+
+        $this->counters = [];
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT player_id, track_type, track_filter, progress FROM goal_progress"
+        );
+        foreach ($rows as $row) {
+            $this->counters[(int)$row['player_id']][$row['track_type']][$row['track_filter']] = (int)$row['progress'];
+        }
+
+        $this->visited = [];
+        $rows = $this->game->getObjectListFromDB("SELECT player_id, location_id FROM player_visited");
+        foreach ($rows as $row) {
+            $this->visited[(int)$row['player_id']][$row['location_id']] = true;
+        }
+
+        $this->goalProgress = [];
+    }
+}
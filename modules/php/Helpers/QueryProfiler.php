@@ -0,0 +1,189 @@
+<?php
+
+declare(strict_types=1);
+
+namespace Bga\Games\Zoomquest\Helpers;
+
+/**
+ * Wraps the game's query methods to record query counts, rows and wall time
+ *
+ * Everything else is forwarded to the game, so helpers can be built with the
+ * profiler in place of the game (see Game::getDb()). Each query is filed under
+ * its folded call stack ("State::method;Helper::method;query"), the format
+ * flame graph tools read; tools/profile_report.py aggregates the dumps.
+ */
+class QueryProfiler
+{
+    private const NAMESPACE_PREFIX = 'Bga\\Games\\Zoomquest\\';
+
+    private $game;
+    private string $outputFile;
+    private string $context = '';
+    private ?int $round = null;
+    private int $startedAt;
+
+    /** @var array<string, array> folded stack => ['queries' => int, 'rows' => int, 'us' => int] */
+    private array $stacks = [];
+
+    public function __construct($game, string $outputFile)
+    {
+        $this->game = $game;
+        $this->outputFile = $outputFile;
+        $this->startedAt = hrtime(true);
+    }
+
+    /**
+     * Label for queries issued outside any state class (e.g. a harness phase)
+     */
+    public function setContext(string $context): void
+    {
+        $this->context = $context;
+    }
+
+    /**
+     * Game round the next dump is recorded under
+     */
+    public function setRound(?int $round): void
+    {
+        $this->round = $round;
+    }
+
+    public function DbQuery(...$args)
+    {
+        $start = hrtime(true);
+        $result = $this->game->DbQuery(...$args);
+        $this->record(__FUNCTION__, $start, (int)$this->game->DbAffectedRow());
+        return $result;
+    }
+
+    public function getObjectListFromDB(...$args)
+    {
+        $start = hrtime(true);
+        $result = $this->game->getObjectListFromDB(...$args);
+        $this->record(__FUNCTION__, $start, count($result));
+        return $result;
+    }
+
+    public function getObjectFromDB(...$args)
+    {
+        $start = hrtime(true);
+        $result = $this->game->getObjectFromDB(...$args);
+        $this->record(__FUNCTION__, $start, $result ? 1 : 0);
+        return $result;
+    }
+
+    public function getUniqueValueFromDB(...$args)
+    {
+        $start = hrtime(true);
+        $result = $this->game->getUniqueValueFromDB(...$args);
+        $this->record(__FUNCTION__, $start, $result !== null ? 1 : 0);
+        return $result;
+    }
+
+    public function getCollectionFromDb(...$args)
+    {
+        $start = hrtime(true);
+        $result = $this->game->getCollectionFromDb(...$args);
+        $this->record(__FUNCTION__, $start, count($result));
+        return $result;
+    }
+
+    public function __call(string $name, array $args)
+    {
+        return $this->game->$name(...$args);
+    }
+
+    public function __get(string $name)
+    {
+        return $this->game->$name;
+    }
+
+    /**
+     * Append the recorded stacks as one JSON line and start over
+     */
+    public function dump(): void
+    {
+        if (empty($this->stacks)) {
+            return;
+        }
+
+        $states = [];
+        $methods = [];
+        foreach ($this->stacks as $stack => $entry) {
+            $frames = explode(';', $stack);
+            // States are named by class; requests outside a state by their Game method
+            $state = strpos($frames[0], 'Game::') === 0 ? $frames[0] : explode('::', $frames[0])[0];
+            $method = count($frames) > 1 ? $frames[count($frames) - 2] : $state;
+            $this->addTo($states, $state, $entry);
+            $this->addTo($methods, $method, $entry);
+        }
+
+        $record = [
+            'zqprofile' => 1,
+            'time' => time(),
+            'round' => $this->round,
+            'wall_us' => intdiv(hrtime(true) - $this->startedAt, 1000),
+            'states' => $states,
+            'methods' => $methods,
+            'stacks' => $this->stacks,
+        ];
+        file_put_contents($this->outputFile, json_encode($record) . "\n", FILE_APPEND | LOCK_EX);
+
+        $this->stacks = [];
+        $this->startedAt = hrtime(true);
+    }
+
+    /**
+     * File one query under its folded call stack
+     */
+    private function record(string $query, int $start, int $rows): void
+    {
+        $elapsed = intdiv(hrtime(true) - $start, 1000);
+        $stack = $this->foldStack($query);
+
+        $this->addTo($this->stacks, $stack, ['queries' => 1, 'rows' => $rows, 'us' => $elapsed]);
+    }
+
+    /**
+     * Add query/rows/time counters to a keyed total
+     */
+    private function addTo(array &$totals, string $key, array $entry): void
+    {
+        if (!isset($totals[$key])) {
+            $totals[$key] = ['queries' => 0, 'rows' => 0, 'us' => 0];
+        }
+        foreach ($entry as $metric => $value) {
+            $totals[$key][$metric] += $value;
+        }
+    }
+
+    /**
+     * Game-side frames of the current call stack, outermost first, ending in the query
+     */
+    private function foldStack(string $query): string
+    {
+        $frames = [];
+        $stateAt = null;
+        foreach (array_reverse(debug_backtrace(DEBUG_BACKTRACE_IGNORE_ARGS)) as $frame) {
+            $class = $frame['class'] ?? '';
+            if ($class === self::class || strpos($class, self::NAMESPACE_PREFIX) !== 0) {
+                continue;
+            }
+            if ($stateAt === null && strpos($class, self::NAMESPACE_PREFIX . 'States\\') === 0) {
+                $stateAt = count($frames);
+            }
+            $frames[] = substr($class, strrpos($class, '\\') + 1) . '::' . $frame['function'];
+        }
+
+        // Stacks start at the state; queries outside a state are filed under the
+        // context label if there is one, else under their outermost game frame
+        if ($stateAt !== null) {
+            $frames = array_slice($frames, $stateAt);
+        } elseif ($this->context !== '' || empty($frames)) {
+            array_unshift($frames, $this->context !== '' ? $this->context : 'unknown');
+        }
+        $frames[] = $query;
+
+        return implode(';', $frames);
+    }
+}
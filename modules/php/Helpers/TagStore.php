@@ -0,0 +1,187 @@
+<?php
+
+declare(strict_types=1);
+
+namespace Bga\Games\Zoomquest\Helpers;
+
+require_once(dirname(__DIR__) . '/constants.inc.php');
+
+/**
+ * In-memory entity tags, indexed by entity and by expiry round
+ *
+ * All entity_tag rows are loaded with one query on first use. Reads never
+ * query again; writes are buffered until flush() sends one DELETE and one
+ * multi-row upsert. Timed tags are also filed under the round they expire in,
+ * so expiring a round only touches the tags that actually expire.
+ */
+class TagStore
+{
+    /** Rounds a tag lasts: applied in round R, it is gone from round R + lifetime */
+    private const LIFETIMES = [TAG_HIDDEN => 1, TAG_MARKED => 2, TAG_POISONED => 3];
+
+    private $game;
+    private bool $loaded = false;
+
+    /** @var array<int, array<string, array>> entity_id => tag_name => tag_value/round_applied */
+    private array $tags = [];
+    /** @var array<int, array<string, bool>> expiry round => "entity_id:tag_name" => true */
+    private array $expiring = [];
+    /** Expiry rounds with a bucket in $expiring, smallest first */
+    private \SplMinHeap $expiryRounds;
+    /** @var array<string, array> Pending writes (null value deletes the tag) */
+    private array $writes = [];
+
+    public function __construct($game)
+    {
+        $this->game = $game;
+        $this->expiryRounds = new \SplMinHeap();
+    }
+
+    /**
+     * Check if entity has a specific tag
+     */
+    public function has(int $entityId, string $tagName): bool
+    {
+        $this->load();
+        return isset($this->tags[$entityId][$tagName]);
+    }
+
+    /**
+     * Get tag value (0 when the tag is not set)
+     */
+    public function getValue(int $entityId, string $tagName): int
+    {
+        $this->load();
+        return $this->tags[$entityId][$tagName]['tag_value'] ?? 0;
+    }
+
+    /**
+     * Get all tags for an entity as tag_name/tag_value rows
+     */
+    public function getAll(int $entityId): array
+    {
+        $this->load();
+        $tags = [];
+        foreach ($this->tags[$entityId] ?? [] as $tagName => $tag) {
+            $tags[] = ['tag_name' => $tagName, 'tag_value' => $tag['tag_value']];
+        }
+        return $tags;
+    }
+
+    /**
+     * Set a tag on an entity
+     */
+    public function set(int $entityId, string $tagName, int $value = 1, int $round = 0): void
+    {
+        $this->load();
+        $this->put($entityId, $tagName, $value, $round);
+        $this->writes["$entityId:$tagName"] = [$entityId, $tagName, $value, $round];
+    }
+
+    /**
+     * Remove a tag
+     */
+    public function remove(int $entityId, string $tagName): void
+    {
+        $this->load();
+        // Its expiry entry goes stale and is skipped when the round comes
+        unset($this->tags[$entityId][$tagName]);
+        $this->writes["$entityId:$tagName"] = [$entityId, $tagName, null, null];
+    }
+
+    /**
+     * Remove every timed tag whose lifetime is over by $currentRound
+     */
+    public function expire(int $currentRound): void
+    {
+        $this->load();
+        while (!$this->expiryRounds->isEmpty() && $this->expiryRounds->top() <= $currentRound) {
+            $round = $this->expiryRounds->extract();
+            foreach (array_keys($this->expiring[$round] ?? []) as $key) {
+                [$entityId, $tagName] = explode(':', $key, 2);
+                $tag = $this->tags[(int)$entityId][$tagName] ?? null;
+                // Skip entries for tags removed or re-applied since they were filed
+                if ($tag !== null && $tag['round_applied'] + self::LIFETIMES[$tagName] === $round) {
+                    $this->remove((int)$entityId, $tagName);
+                }
+            }
+            unset($this->expiring[$round]);
+        }
+    }
+
+    /**
+     * Whether tag changes are waiting for flush()
+     */
+    public function hasPendingWrites(): bool
+    {
+        return !empty($this->writes);
+    }
+
+    /**
+     * Write pending tag changes: one DELETE and one multi-row upsert
+     */
+    public function flush(): void
+    {
+        if (empty($this->writes)) {
+            return;
+        }
+
+        $deletes = [];
+        $upserts = [];
+        foreach ($this->writes as [$entityId, $tagName, $value, $round]) {
+            $name = addslashes($tagName);
+            if ($value === null) {
+                $deletes[] = "(entity_id = $entityId AND tag_name = '$name')";
+            } else {
+                $upserts[] = "($entityId, '$name', $value, $round)";
+            }
+        }
+        $this->writes = [];
+
+        if (!empty($deletes)) {
+            $this->game->DbQuery("DELETE FROM entity_tag WHERE " . implode(' OR ', $deletes));
+        }
+        if (!empty($upserts)) {
+            $this->game->DbQuery(
+                "INSERT INTO entity_tag (entity_id, tag_name, tag_value, round_applied)
+                 VALUES " . implode(', ', $upserts) . "
+                 ON DUPLICATE KEY UPDATE tag_value = VALUES(tag_value), round_applied = VALUES(round_applied)"
+            );
+        }
+    }
+
+    /**
+     * Load every tag and build the expiry index
+     */
+    private function load(): void
+    {
+        if ($this->loaded) {
+            return;
+        }
+        $this->loaded = true;
+
+        $rows = $this->game->getObjectListFromDB(
+            "SELECT entity_id, tag_name, tag_value, round_applied FROM entity_tag"
+        );
+        foreach ($rows as $row) {
+            $this->put((int)$row['entity_id'], $row['tag_name'], (int)$row['tag_value'], (int)$row['round_applied']);
+        }
+    }
+
+    /**
+     * Store a tag in memory and file it under its expiry round
+     */
+    private function put(int $entityId, string $tagName, int $value, int $round): void
+    {
+        $this->tags[$entityId][$tagName] = ['tag_value' => $value, 'round_applied' => $round];
+
+        if (isset(self::LIFETIMES[$tagName])) {
+            $expiresAt = $round + self::LIFETIMES[$tagName];
+            if (!isset($this->expiring[$expiresAt])) {
+                $this->expiring[$expiresAt] = [];
+                $this->expiryRounds->insert($expiresAt);
+            }
+            $this->expiring[$expiresAt]["$entityId:$tagName"] = true;
+        }
+    }
+}
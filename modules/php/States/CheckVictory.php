@@ -57,7 +57,7 @@ class CheckVictory extends GameState
                 $baseScore = 1;
                 $bonusScore = isset($goalStatus[$playerId]) ? $goalStatus[$playerId]['points'] : 0;
                 $totalScore = $baseScore + $bonusScore;
-                $this->game->DbQuery("UPDATE player SET player_score = $totalScore WHERE player_id = $playerId");
+                $this->game->getDb()->DbQuery("UPDATE player SET player_score = $totalScore WHERE player_id = $playerId");
             }
 
             return ST_END_GAME;
@@ -73,7 +73,7 @@ class CheckVictory extends GameState
 
             $players = $this->game->loadPlayersBasicInfos();
             foreach ($players as $playerId => $player) {
-                $this->game->DbQuery("UPDATE player SET player_score = 0 WHERE player_id = $playerId");
+                $this->game->getDb()->DbQuery("UPDATE player SET player_score = 0 WHERE player_id = $playerId");
             }
 
             return ST_END_GAME;
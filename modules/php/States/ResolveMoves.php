@@ -36,7 +36,7 @@ class ResolveMoves extends GameState
         $deck = $this->game->getDeck();
 
         // Get all move choices
-        $choices = $this->game->getCollectionFromDb(
+        $choices = $this->game->getDb()->getCollectionFromDb(
             "SELECT mc.player_id, mc.target_location, e.entity_id, e.entity_name, e.location_id
              FROM move_choice mc
              JOIN entity e ON e.player_id = mc.player_id"
@@ -52,7 +52,7 @@ class ResolveMoves extends GameState
                 $stateHelper->moveEntity($entityId, $targetLocation);
 
                 // Get location name for notification
-                $locationName = $this->game->getUniqueValueFromDB(
+                $locationName = $this->game->getDb()->getUniqueValueFromDB(
                     "SELECT location_name FROM location WHERE location_id = '" . addslashes($targetLocation) . "'"
                 );
 
@@ -68,11 +68,12 @@ class ResolveMoves extends GameState
 
         // Refresh all entity decks (discard → bottom of active, maintaining order)
         $allEntities = $stateHelper->getAllEntities();
-        foreach ($allEntities as $entity) {
-            if ($entity['is_defeated'] == 0) {
-                $deck->refreshDeck((int)$entity['entity_id']);
-            }
+        $alive = array_filter($allEntities, fn($e) => $e['is_defeated'] == 0);
+        $deck->loadEntities(array_column($alive, 'entity_id'));
+        foreach ($alive as $entity) {
+            $deck->refreshDeck((int)$entity['entity_id']);
         }
+        $deck->clearCache();
 
         // Clear move choices
         $this->game->clearMoveChoices();
@@ -81,6 +82,12 @@ class ResolveMoves extends GameState
         $sequenceResolver = $this->game->getActionSequenceResolver();
         $sequenceLocations = $sequenceResolver->getSequenceLocations();
 
+        // Auto-resolve plays the round's battles in random order (rules.md);
+        // step-by-step play keeps the order they were found in
+        if ($this->game->getBattleMode() === BATTLE_MODE_AUTO) {
+            shuffle($sequenceLocations);
+        }
+
         if (!empty($sequenceLocations)) {
             $stateHelper->set(
                 STATE_SEQUENCES_TO_RESOLVE,
@@ -59,6 +59,7 @@ class RoundStart extends GameState
             // Refresh deck (move discard to active)
             $deck->refreshDeck((int)$entity['entity_id']);
         }
+        $goalTracker->flush();
 
         // Build goal progress for each player
         $goalProgressByPlayer = [];
@@ -0,0 +1,134 @@
+<?php
+
+declare(strict_types=1);
+
+namespace Bga\Games\Zoomquest\States;
+
+use Bga\GameFramework\States\GameState;
+use Bga\GameFramework\StateType;
+use Bga\Games\Zoomquest\Game;
+
+require_once(dirname(__DIR__) . '/constants.inc.php');
+
+/**
+ * State: Sequence Auto Resolve (game state, "Auto-resolve" battle option)
+ * - Plays every pending battle in memory, one after another in the
+ *   (shuffled) order of STATE_SEQUENCES_TO_RESOLVE
+ * - Writes piles, tags and participants once at the end
+ * - Sends each battle's rounds, packed as SequenceRoundEnd::encodeRound()
+ *   does, in one notification for the client to replay
+ */
+class SequenceAutoResolve extends GameState
+{
+    public function __construct(protected Game $game)
+    {
+        parent::__construct(
+            $game,
+            id: ST_SEQUENCE_AUTO_RESOLVE,
+            type: StateType::GAME,
+        );
+    }
+
+    /**
+     * Called when entering this state - resolves all pending sequences
+     */
+    function onEnteringState()
+    {
+        $stateHelper = $this->game->getGameStateHelper();
+        $sequenceResolver = $this->game->getActionSequenceResolver();
+        $deck = $this->game->getDeck();
+
+        $sequencesJson = $stateHelper->get(STATE_SEQUENCES_TO_RESOLVE);
+        $sequenceLocations = $sequencesJson ? json_decode($sequencesJson, true) : [];
+
+        // Same calls in the same order as the step-by-step states, so the outcome is identical
+        $battles = $sequenceResolver->resolveLocations($sequenceLocations, AUTO_RESOLVE_MAX_ROUNDS);
+
+        // Deck counts come from the cache, before it is flushed
+        foreach ($battles as $i => $battle) {
+            $battles[$i]['survivors'] = [];
+            $battles[$i]['defeated'] = [];
+            foreach (end($battle['rounds'])['status'] as $s) {
+                $entity = [
+                    'entity_id' => $s['entity_id'],
+                    'entity_name' => $s['entity_name'],
+                    'entity_type' => $s['entity_type'],
+                ];
+                if ($s['is_defeated']) {
+                    $battles[$i]['defeated'][] = $entity;
+                } else {
+                    $battles[$i]['survivors'][] = $entity + ['deck_counts' => $deck->getPileCounts($s['entity_id'])];
+                }
+            }
+        }
+        $sequenceResolver->flush();
+
+        $locationNames = empty($battles) ? [] : $this->game->getDb()->getCollectionFromDb(
+            "SELECT location_id, location_name FROM location
+             WHERE location_id IN ('" . implode("','", array_map('addslashes', array_column($battles, 'location_id'))) . "')",
+            true
+        );
+        $gameRound = $stateHelper->getRound();
+
+        foreach ($battles as $battle) {
+            $sequenceId = $battle['sequence_id'];
+
+            $this->notify->all('sequenceStart', clienttranslate('Action sequence begins at ${location_name}!'), [
+                'sequence_id' => $sequenceId,
+                'location_id' => $battle['location_id'],
+                'location_name' => $locationNames[$battle['location_id']] ?? $battle['location_id'],
+                'participants' => $battle['participants'],
+            ]);
+
+            $this->notify->all('sequenceAutoResolved', clienttranslate('Battle resolved in ${rounds} rounds'), [
+                'sequence_id' => $sequenceId,
+                'rounds' => count($battle['rounds']),
+                'log' => array_map(
+                    fn($r) => SequenceRoundEnd::encodeRound($r['round'], $r['drawn_cards'], $r['resolutions'], $r['status']),
+                    $battle['rounds']
+                ),
+            ]);
+
+            if (!$battle['is_over']) {
+                // Round cap reached: carry on step by step from where this battle stands,
+                // then come back here for the locations after it
+                $rest = array_slice($sequenceLocations, array_search($battle['location_id'], $sequenceLocations, true) + 1);
+                $stateHelper->set(STATE_SEQUENCES_TO_RESOLVE, json_encode($rest));
+                $stateHelper->set(STATE_CURRENT_SEQUENCE, (string)$sequenceId);
+                $stateHelper->set(STATE_SEQUENCE_ROUND, (string)$battle['last_round']);
+                return SequenceDrawCards::class;
+            }
+
+            $status = end($battle['rounds'])['status'];
+            $eliminatedFaction = $battle['eliminated_faction'];
+            $statusLog = SequenceRoundEnd::formatStatusSummary($status);
+
+            if ($eliminatedFaction !== null) {
+                $this->notify->all('sequenceEnd', clienttranslate('Turn ${game_round}: ${status_log} (${faction} eliminated)'), [
+                    'sequence_id' => $sequenceId,
+                    'game_round' => $gameRound,
+                    'faction' => $eliminatedFaction,
+                    'eliminated_faction' => $eliminatedFaction,
+                    'status_log' => $statusLog,
+                ]);
+            } else {
+                $this->notify->all('sequenceEnd', clienttranslate('Turn ${game_round}: ${status_log} (standoff)'), [
+                    'sequence_id' => $sequenceId,
+                    'game_round' => $gameRound,
+                    'eliminated_faction' => null,
+                    'status_log' => $statusLog,
+                ]);
+            }
+
+            $this->notify->all('sequenceCleanup', '', [
+                'sequence_id' => $sequenceId,
+                'survivors' => $battle['survivors'],
+                'defeated' => $battle['defeated'],
+            ]);
+        }
+
+        $stateHelper->set(STATE_SEQUENCES_TO_RESOLVE, json_encode([]));
+
+        return CheckVictory::class;
+    }
+}
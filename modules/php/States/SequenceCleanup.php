@@ -38,7 +38,7 @@ class SequenceCleanup extends GameState
         $sequenceId = (int)$stateHelper->get(STATE_CURRENT_SEQUENCE);
 
         // Get all participants to send cleanup info
-        $participants = $this->game->getObjectListFromDB(
+        $participants = $this->game->getDb()->getObjectListFromDB(
             "SELECT sp.entity_id, e.entity_name, e.entity_type, e.is_defeated
              FROM sequence_participant sp
              JOIN entity e ON sp.entity_id = e.entity_id
@@ -35,27 +35,26 @@ class SequenceDrawCards extends GameState
         $sequenceResolver = $this->game->getActionSequenceResolver();
 
         $sequenceId = (int)$stateHelper->get(STATE_CURRENT_SEQUENCE);
+        $sequenceResolver->loadSequence($sequenceId);
         
         // Increment sequence round
         $sequenceRound = (int)$stateHelper->get(STATE_SEQUENCE_ROUND) + 1;
         $stateHelper->set(STATE_SEQUENCE_ROUND, (string)$sequenceRound);
 
-        // Clear round resolutions for new round
-        $stateHelper->set(STATE_ROUND_RESOLUTIONS, json_encode([]));
-
         // Draw cards for all participants (pass sequence round for tag expiration)
         $drawnCards = $sequenceResolver->drawCardsForSequence($sequenceId, $sequenceRound);
+        $sequenceResolver->flush();
 
-        // If no one drew cards, sequence is over
+        // If no one drew cards, sequence is over; clear the round so SequenceRoundEnd
+        // does not send the previous round's cards and resolutions again
         if (empty($drawnCards)) {
+            $stateHelper->set(STATE_ROUND_DRAWN, json_encode([]));
+            $stateHelper->set(STATE_ROUND_RESOLUTIONS, json_encode([]));
             return SequenceRoundEnd::class;
         }
 
-        $this->notify->all('sequenceCardsDrawn', clienttranslate('Round ${round}: All entities draw cards'), [
-            'round' => $sequenceRound,
-            'sequence_id' => $sequenceId,
-            'drawn_cards' => $drawnCards,
-        ]);
+        // Sent with the rest of the round by SequenceRoundEnd (SequenceResolve stores the resolutions)
+        $stateHelper->set(STATE_ROUND_DRAWN, json_encode($drawnCards));
 
         return SequenceResolve::class;
     }
@@ -13,7 +13,7 @@ require_once(dirname(__DIR__) . '/constants.inc.php');
 /**
  * State: Sequence Round End (game state)
  * - Check if sequence should end
- * - Send round summary
+ * - Send the round (draws, resolutions, status) as one compact notification
  */
 class SequenceRoundEnd extends GameState
 {
@@ -35,11 +35,13 @@ class SequenceRoundEnd extends GameState
         $sequenceResolver = $this->game->getActionSequenceResolver();
 
         $sequenceId = (int)$stateHelper->get(STATE_CURRENT_SEQUENCE);
+        $sequenceResolver->loadSequence($sequenceId);
         $sequenceRound = (int)$stateHelper->get(STATE_SEQUENCE_ROUND);
 
-        // Get resolutions from this round
-        $resolutionsJson = $stateHelper->get(STATE_ROUND_RESOLUTIONS);
-        $resolutions = $resolutionsJson ? json_decode($resolutionsJson, true) : [];
+        // Get drawn cards and resolutions from this round
+        $roundState = $stateHelper->getMany([STATE_ROUND_DRAWN, STATE_ROUND_RESOLUTIONS]);
+        $drawnCards = $roundState[STATE_ROUND_DRAWN] ? json_decode($roundState[STATE_ROUND_DRAWN], true) : [];
+        $resolutions = $roundState[STATE_ROUND_RESOLUTIONS] ? json_decode($roundState[STATE_ROUND_RESOLUTIONS], true) : [];
 
         // Apply poison damage at end of round
         $poisonResults = $sequenceResolver->applyPoisonTicks($sequenceId);
@@ -50,6 +52,11 @@ class SequenceRoundEnd extends GameState
         // Get participant status (after poison damage)
         $status = $sequenceResolver->getParticipantStatus($sequenceId);
 
+        // End conditions: one faction eliminated, or everyone out of cards (standoff)
+        $eliminatedFaction = $sequenceResolver->getEliminatedFaction($sequenceId);
+        $isStandoff = $eliminatedFaction === null && $sequenceResolver->isEveryoneOutOfCards($sequenceId);
+        $sequenceResolver->flush();
+
         // Build readable log message
         $logParts = [];
         foreach ($resolutions as $r) {
@@ -57,65 +64,128 @@ class SequenceRoundEnd extends GameState
         }
         $roundLog = implode(' ', $logParts);
 
-        // Send round summary notification
-        $this->notify->all('sequenceRoundSummary', clienttranslate('Round ${round}: ${round_log}'), [
+        // One notification per round; the client expands it with expandBattleLog()
+        $this->notify->all('sequenceRound', clienttranslate('Round ${round}: ${round_log}'), [
             'round' => $sequenceRound,
             'round_log' => $roundLog,
             'sequence_id' => $sequenceId,
-            'resolutions' => $resolutions,
-            'status' => $status,
+            'log' => self::encodeRound($sequenceRound, $drawnCards, $resolutions, $status),
         ]);
 
-        // Check if one faction is eliminated
-        $eliminatedFaction = $sequenceResolver->getEliminatedFaction($sequenceId);
         $gameRound = $stateHelper->getRound();
 
         if ($eliminatedFaction !== null) {
             // Build status summary
-            $statusLog = $this->formatStatusSummary($status);
+            $statusLog = self::formatStatusSummary($status);
             
-            // Sequence ends - one side won
+            // Sequence ends - one side won (status was just sent with the round)
             $this->notify->all('sequenceEnd', clienttranslate('Turn ${game_round}: ${status_log} (${faction} eliminated)'), [
                 'sequence_id' => $sequenceId,
                 'game_round' => $gameRound,
                 'faction' => $eliminatedFaction,
                 'eliminated_faction' => $eliminatedFaction,
-                'status' => $status,
                 'status_log' => $statusLog,
             ]);
             return SequenceCleanup::class;
         }
 
         // Check if everyone is out of cards (standoff)
-        if ($sequenceResolver->isEveryoneOutOfCards($sequenceId)) {
+        if ($isStandoff) {
             // Build status summary
-            $statusLog = $this->formatStatusSummary($status);
+            $statusLog = self::formatStatusSummary($status);
             
             $this->notify->all('sequenceEnd', clienttranslate('Turn ${game_round}: ${status_log} (standoff)'), [
                 'sequence_id' => $sequenceId,
                 'game_round' => $gameRound,
                 'eliminated_faction' => null,
-                'status' => $status,
                 'status_log' => $statusLog,
             ]);
             return SequenceCleanup::class;
         }
 
-        // Sequence continues
-        $this->notify->all('sequenceContinues', '', [
-            'sequence_id' => $sequenceId,
-        ]);
-
-        // Reset for next round
+        // Sequence continues: reset for next round
         $sequenceResolver->resetSequenceRound($sequenceId);
 
         return SequenceDrawCards::class;
     }
 
+    /**
+     * Pack one round for the client, expanded again by expandBattleLog() in zoomquest.js
+     *
+     * Entities travel as ids (the client has their names), card types and
+     * effects as indexes into BATTLE_LOG_CARD_TYPES / BATTLE_LOG_EFFECTS:
+     *   [round, drawn, resolutions, status] with
+     *   drawn:       [entity_id, card_id, card_type, target_id]
+     *   resolutions: [entity_id, card_type, effect, target_id, card_id, {other fields}],
+     *                trailing nulls and an empty {} left out
+     *   status:      [entity_id, active, discard, destroyed, is_defeated 0/1, {tag_name: tag_value}],
+     *                the tags left out when there are none
+     */
+    public static function encodeRound(int $round, array $drawnCards, array $resolutions, array $status): array
+    {
+        $drawn = [];
+        foreach ($drawnCards as $c) {
+            $drawn[] = [
+                (int)$c['entity_id'], (int)$c['card_id'],
+                self::enumIndex(BATTLE_LOG_CARD_TYPES, $c['card_type']),
+                $c['target_id'] === null ? null : (int)$c['target_id'],
+            ];
+        }
+
+        $packed = [];
+        foreach ($resolutions as $r) {
+            $extra = $r;
+            unset(
+                $extra['entity_id'], $extra['entity_name'], $extra['entity_type'], $extra['card_type'],
+                $extra['effect'], $extra['target_id'], $extra['target_name'], $extra['card_id']
+            );
+            if (isset($extra['revealed'])) {
+                $extra['revealed'] = array_map(fn($e) => (int)$e['entity_id'], $extra['revealed']);
+            }
+
+            $row = [
+                (int)$r['entity_id'],
+                isset($r['card_type']) ? self::enumIndex(BATTLE_LOG_CARD_TYPES, $r['card_type']) : null,
+                isset($r['effect']) ? self::enumIndex(BATTLE_LOG_EFFECTS, $r['effect']) : null,
+                isset($r['target_id']) ? (int)$r['target_id'] : null,
+                isset($r['card_id']) ? (int)$r['card_id'] : null,
+                empty($extra) ? null : $extra,
+            ];
+            while (count($row) > 1 && end($row) === null) {
+                array_pop($row);
+            }
+            $packed[] = $row;
+        }
+
+        $statusRows = [];
+        foreach ($status as $s) {
+            $row = [(int)$s['entity_id'], (int)$s['active'], (int)$s['discard'], (int)$s['destroyed'], $s['is_defeated'] ? 1 : 0];
+            if (!empty($s['tags'])) {
+                $tags = [];
+                foreach ($s['tags'] as $tag) {
+                    $tags[$tag['tag_name']] = (int)$tag['tag_value'];
+                }
+                $row[] = $tags;
+            }
+            $statusRows[] = $row;
+        }
+
+        return [$round, $drawn, $packed, $statusRows];
+    }
+
+    /**
+     * Index of a value in a battle log enumeration, or the value itself if it is not listed
+     */
+    private static function enumIndex(array $values, string $value)
+    {
+        $index = array_search($value, $values, true);
+        return $index === false ? $value : $index;
+    }
+
     /**
      * Format status summary for log (e.g., "Bob 2/3/0 Goblin 💀")
      */
-    private function formatStatusSummary(array $status): string
+    public static function formatStatusSummary(array $status): string
     {
         $parts = [];
         foreach ($status as $s) {
@@ -42,6 +42,11 @@ class SequenceSetup extends GameState
             return CheckVictory::class;
         }
 
+        // Auto-resolve plays every remaining battle in one pass
+        if ($this->game->getBattleMode() === BATTLE_MODE_AUTO) {
+            return SequenceAutoResolve::class;
+        }
+
         // Pop the next sequence location
         $locationId = array_shift($sequenceLocations);
         $stateHelper->set(STATE_SEQUENCES_TO_RESOLVE, json_encode($sequenceLocations));
@@ -55,27 +60,14 @@ class SequenceSetup extends GameState
         $stateHelper->set(STATE_ROUND_RESOLUTIONS, json_encode([]));
 
         // Get location name and participants
-        $locationName = $this->game->getUniqueValueFromDB(
+        $locationName = $this->game->getDb()->getUniqueValueFromDB(
             "SELECT location_name FROM location WHERE location_id = '" . addslashes($locationId) . "'"
         );
 
         $participants = $sequenceResolver->getEntitiesAtLocation($locationId);
 
         // Check if there are any hostile pairs - if not, skip sequence
-        $hasHostiles = false;
-        foreach ($participants as $p1) {
-            foreach ($participants as $p2) {
-                if ($p1['entity_id'] !== $p2['entity_id']) {
-                    $rel = $sequenceResolver->getRelationship($p1['faction'], $p2['faction']);
-                    if ($rel === RELATION_HOSTILE) {
-                        $hasHostiles = true;
-                        break 2;
-                    }
-                }
-            }
-        }
-
-        if (!$hasHostiles) {
+        if (!$sequenceResolver->hasHostiles($participants)) {
             // No hostiles here, skip this location
             return SequenceSetup::class; // Try next location
         }
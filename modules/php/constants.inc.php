@@ -10,6 +10,7 @@ const ST_RESOLVE_MOVES = 30;
 const ST_SEQUENCE_SETUP = 40;
 const ST_SEQUENCE_DRAW_CARDS = 50;
 const ST_SEQUENCE_RESOLVE = 60;
+const ST_SEQUENCE_AUTO_RESOLVE = 65;
 const ST_SEQUENCE_ROUND_END = 70;
 const ST_SEQUENCE_CLEANUP = 75;
 const ST_CHECK_VICTORY = 80;
@@ -32,6 +33,22 @@ const CARD_SELL = 'sell';
 const CARD_STEAL = 'steal';
 const CARD_WEALTH = 'wealth';
 
+/*
+ * Battle log enumerations: card types and resolution effects travel as
+ * indexes into these lists (same order in zoomquest.js and tools/battle_log.py;
+ * append only)
+ */
+const BATTLE_LOG_CARD_TYPES = [
+    CARD_ATTACK, CARD_DEFEND, CARD_HEAL, CARD_SNEAK, CARD_WATCH, CARD_SHUFFLE, CARD_POISON,
+    CARD_MARK, CARD_BACKSTAB, CARD_EXECUTE, CARD_SELL, CARD_STEAL, CARD_WEALTH,
+];
+const BATTLE_LOG_EFFECTS = [
+    'destroy', 'blocked', 'block', 'heal', 'no_cards_to_heal', 'no_cards', 'target_defeated',
+    'target_hidden', 'no_target', 'watch', 'hidden', 'sneak', 'sneak_failed', 'poison', 'mark',
+    'backstab', 'not_hidden', 'execute', 'not_poisoned', 'shuffle', 'selling', 'purchased',
+    'not_selling', 'no_items', 'stolen', 'caught', 'poison_tick',
+];
+
 /*
  * Card piles
  */
@@ -77,9 +94,23 @@ const STATE_CURRENT_SEQUENCE = 'current_sequence';
 const STATE_SEQUENCES_TO_RESOLVE = 'sequences_to_resolve';
 const STATE_SEQUENCE_ROUND = 'sequence_round';
 const STATE_ROUND_RESOLUTIONS = 'round_resolutions';
+const STATE_ROUND_DRAWN = 'round_drawn';
 const STATE_FACTION_MATRIX = 'faction_matrix';
 const STATE_VICTORY_CONDITION = 'victory_condition';
 
+/*
+ * Game options (gameoptions.json)
+ */
+const OPTION_SCENARIO = 100;
+const OPTION_BATTLE_MODE = 101;
+const BATTLE_MODE_STEP = 1;
+const BATTLE_MODE_AUTO = 2;
+
+/*
+ * Auto-resolved battles hand back to step-by-step play after this many rounds
+ */
+const AUTO_RESOLVE_MAX_ROUNDS = 100;
+
 /*
  * Victory condition types
  */
@@ -104,5 +135,22 @@ const TRACK_CARD_PLAYS = 'card_plays';
  */
 const STATE_INDIVIDUAL_GOALS = 'individual_goals';
 const STATE_BACKGROUND_IMAGE = 'background_image';
+const STATE_ADJACENCY = 'adjacency';
+
+/*
+ * Static client payload (map, background, victory), built once at setup
+ */
+const STATE_STATIC_DATA = 'static_data';
+const STATE_STATIC_VERSION = 'static_version';
+
+/*
+ * Map graph index sidecar (configs/graph/*.json, see tools/graph_index.py)
+ */
+const GRAPH_INDEX_VERSION = 1;
+
+/*
+ * Query profiling (see Helpers/QueryProfiler.php and tools/profile_report.py)
+ */
+const PROFILE_QUERIES_ENV = 'ZOOMQUEST_PROFILE_QUERIES'; // file to append to, or 1 for <tmp>/zoomquest_profile.jsonl
 
 ?>
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Batch Combat - Resolve many independent battles at once with NumPy.
+
+Each battle's piles are stored as per-card-type counts, so N battles between
+the same participants advance in lockstep with vectorized draws, targeting
+(lowest health, random tie-break) and damage. Useful for "how does monster
+deck X fare against party Y at location Z" questions.
+
+A freshly shuffled pile drawn from the top is a uniform draw without
+replacement, so within one battle the count representation matches the
+card_order semantics of Deck.php exactly. Items are not modelled: sell,
+wealth and steal resolve as no-ops.
+
+Usage:
+    python batch_combat.py [scenario_file] --location LOC [--party NAME,NAME]
+                           [--battles N] [--seed N] [--check N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: batch_combat.py requires numpy (pip install numpy)")
+    sys.exit(1)
+
+import simulator as sim
+
+
+NONE_ROUND = -1000
+
+# Targeting categories (ActionSequenceResolver::determineTarget)
+TARGET_NONE = 0
+TARGET_SELF = 1
+TARGET_FRIENDLY = 2
+TARGET_HOSTILE_VISIBLE = 3
+TARGET_HOSTILE_ANY = 4
+
+TARGETING = {
+    sim.CARD_HEAL: TARGET_FRIENDLY,
+    sim.CARD_DEFEND: TARGET_FRIENDLY,
+    sim.CARD_ATTACK: TARGET_HOSTILE_VISIBLE,
+    sim.CARD_BACKSTAB: TARGET_HOSTILE_VISIBLE,
+    sim.CARD_EXECUTE: TARGET_HOSTILE_VISIBLE,
+    sim.CARD_POISON: TARGET_HOSTILE_ANY,
+    sim.CARD_MARK: TARGET_HOSTILE_ANY,
+    sim.CARD_SNEAK: TARGET_SELF,
+    sim.CARD_WATCH: TARGET_SELF,
+    sim.CARD_SHUFFLE: TARGET_SELF,
+    sim.CARD_SELL: TARGET_SELF,
+    sim.CARD_STEAL: TARGET_NONE,
+    sim.CARD_WEALTH: TARGET_NONE,
+}
+
+# Base damage of the damaging phases
+DAMAGE = {sim.CARD_BACKSTAB: 3, sim.CARD_EXECUTE: 3, sim.CARD_ATTACK: 1}
+
+
+def build_matchup(scenario, location, party=None, num_players=None):
+    """
+    Build the participant list for one location: the chosen characters plus
+    one copy of every monster placed there per player, as setupNewGame does.
+    """
+    characters = scenario['characters']
+    if party:
+        by_name = {c['name']: c for c in characters}
+        missing = [name for name in party if name not in by_name]
+        if missing:
+            raise ValueError(f"Unknown character(s): {', '.join(missing)}")
+        characters = [by_name[name] for name in party]
+    num_players = num_players or len(characters)
+
+    entities = []
+    for c in characters[:num_players]:
+        entities.append({'name': c['name'], 'type': sim.ENTITY_PLAYER, 'class': c['class'],
+                         'faction': c.get('faction', 'players'), 'deck': list(c['decks']['active'])})
+    monsters = [m for m in scenario['monsters'] if m['location'] == location]
+    for m in monsters:
+        for i in range(num_players):
+            name = f"{m['name']} {i + 1}" if num_players > 1 else m['name']
+            entities.append({'name': name, 'type': sim.ENTITY_MONSTER, 'class': m['class'],
+                             'faction': m.get('faction', 'monsters'), 'deck': list(m['decks']['active'])})
+    return entities
+
+
+class BatchCombat:
+    """Vectorized battle kernel over N independent battles of one matchup."""
+
+    def __init__(self, entities, faction_matrix, seed=0):
+        self.entities = entities
+        self.rng = np.random.default_rng(seed)
+        self.card_types = sorted({card for e in entities for card in e['deck']},
+                                 key=sim.RESOLUTION_ORDER.index)
+        self.type_index = {t: i for i, t in enumerate(self.card_types)}
+        self.num_entities = len(entities)
+
+        def relation(a, b):
+            return faction_matrix.get(a['faction'], {}).get(b['faction'], sim.RELATION_NEUTRAL)
+
+        self.friendly = np.array([[relation(a, b) == sim.RELATION_FRIENDLY for b in entities]
+                                  for a in entities])
+        self.hostile = np.array([[relation(a, b) == sim.RELATION_HOSTILE for b in entities]
+                                 for a in entities])
+        self.targeting = np.array([TARGETING[t] for t in self.card_types])
+
+        self.factions = []
+        for e in entities:
+            if e['faction'] not in self.factions:
+                self.factions.append(e['faction'])
+        self.faction_of = np.array([self.factions.index(e['faction']) for e in entities])
+
+        self.initial = np.zeros((self.num_entities, len(self.card_types)), dtype=np.int16)
+        for i, e in enumerate(entities):
+            for card in e['deck']:
+                self.initial[i, self.type_index[card]] += 1
+
+    # ------------------------------------------------------------------
+    # Vectorized helpers
+    # ------------------------------------------------------------------
+
+    def _sample(self, counts, total):
+        """Pick one card type per row, weighted by counts; -1 where empty."""
+        u = self.rng.random(total.shape, dtype=np.float32) * total
+        idx = (counts.cumsum(axis=-1) <= u[..., None]).sum(axis=-1)
+        return np.where(total > 0, idx, -1)
+
+    def _lowest_health(self, health, candidates):
+        """Index of the lowest-health candidate per battle (random tie-break), -1 if none."""
+        score = np.where(candidates, health + self.rng.random(health.shape, dtype=np.float32), np.inf)
+        return np.where(candidates.any(axis=1), score.argmin(axis=1), -1)
+
+    # ------------------------------------------------------------------
+    # Battle
+    # ------------------------------------------------------------------
+
+    def run(self, battles, max_rounds=100):
+        n, e, t = battles, self.num_entities, len(self.card_types)
+        rows = np.arange(n)
+
+        act = np.broadcast_to(self.initial, (n, e, t)).copy()
+        dis = np.zeros((n, e, t), dtype=np.int16)
+        des = np.zeros((n, e, t), dtype=np.int16)
+        # Per-entity pile sizes, kept in step with the count arrays
+        act_n = act.sum(axis=2)
+        dis_n = np.zeros((n, e), dtype=np.int16)
+        des_n = np.zeros((n, e), dtype=np.int16)
+        drawn = np.full((n, e), -1, dtype=np.int16)
+        target = np.full((n, e), -1, dtype=np.int64)
+        blocks = np.zeros((n, e), dtype=np.int16)
+        hidden = np.full((n, e), NONE_ROUND, dtype=np.int32)
+        poisoned = np.full((n, e), NONE_ROUND, dtype=np.int32)
+        marked = np.full((n, e), NONE_ROUND, dtype=np.int32)
+        defeated = np.zeros((n, e), dtype=bool)
+        live = np.ones(n, dtype=bool)
+        rounds = np.zeros(n, dtype=np.int32)
+        eliminated = np.full(n, -1, dtype=np.int32)
+
+        def health(r=slice(None), who=slice(None)):
+            return act_n[r, who] + dis_n[r, who] + (drawn[r, who] >= 0)
+
+        def destroy_one(r, who, allowed):
+            """Destroy one random card from active, else discard, for rows r."""
+            from_act = self._sample(act[r, who], act_n[r, who])
+            use_act = allowed & (from_act >= 0)
+            from_dis = self._sample(dis[r, who], dis_n[r, who])
+            use_dis = allowed & ~use_act & (from_dis >= 0)
+            ra, wa, ca = r[use_act], who[use_act], from_act[use_act]
+            act[ra, wa, ca] -= 1
+            act_n[ra, wa] -= 1
+            des[ra, wa, ca] += 1
+            des_n[ra, wa] += 1
+            rd, wd, cd = r[use_dis], who[use_dis], from_dis[use_dis]
+            dis[rd, wd, cd] -= 1
+            dis_n[rd, wd] -= 1
+            des[rd, wd, cd] += 1
+            des_n[rd, wd] += 1
+            return use_act | use_dis
+
+        def heal_one(r, who):
+            """Move one random destroyed card to discard for rows r."""
+            card = self._sample(des[r, who], des_n[r, who])
+            healed = card >= 0
+            r, who, card = r[healed], who[healed], card[healed]
+            des[r, who, card] -= 1
+            des_n[r, who] -= 1
+            dis[r, who, card] += 1
+            dis_n[r, who] += 1
+
+        for current_round in range(1, max_rounds + 1):
+            if not live.any():
+                break
+            rounds[live] = current_round
+
+            # clearExpiredTags
+            hidden[hidden < current_round] = NONE_ROUND
+            poisoned[poisoned < current_round - 2] = NONE_ROUND
+            marked[marked < current_round - 1] = NONE_ROUND
+            blocks[:] = 0
+
+            # Draw: the drawn card is held apart so it cannot be destroyed
+            alive = ~defeated & live[:, None]
+            for i in range(e):
+                card = np.where(alive[:, i], self._sample(act[:, i], act_n[:, i]), -1)
+                drawn[:, i] = card
+                has = card >= 0
+                act[rows[has], i, card[has]] -= 1
+                act_n[has, i] -= 1
+
+            # Target snapshot at draw time
+            hp = health()
+            is_hidden = hidden > NONE_ROUND
+            for i in range(e):
+                category = np.where(drawn[:, i] >= 0, self.targeting[drawn[:, i]], TARGET_NONE)
+                target[:, i] = -1
+                target[category == TARGET_SELF, i] = i
+                for code, candidates in (
+                    (TARGET_FRIENDLY, lambda r: alive[r] & self.friendly[i]),
+                    (TARGET_HOSTILE_VISIBLE, lambda r: alive[r] & self.hostile[i] & ~is_hidden[r]),
+                    (TARGET_HOSTILE_ANY, lambda r: alive[r] & self.hostile[i]),
+                ):
+                    r = rows[category == code]
+                    if len(r):
+                        target[r, i] = self._lowest_health(hp[r], candidates(r))
+
+            self._resolve(current_round, rows, live, drawn, target, blocks, hidden, poisoned,
+                          marked, defeated, health, destroy_one, heal_one)
+
+            # Poison ticks (drawn card still excluded), then discard drawn cards
+            for i in range(e):
+                ticking = live & ~defeated[:, i] & (poisoned[:, i] > NONE_ROUND)
+                if ticking.any():
+                    r = rows[ticking]
+                    destroy_one(r, np.full(len(r), i), np.ones(len(r), dtype=bool))
+            defeated |= live[:, None] & (health() == 0)
+            for i in range(e):
+                has = drawn[:, i] >= 0
+                dis[rows[has], i, drawn[has, i]] += 1
+                dis_n[has, i] += 1
+            drawn[:] = -1
+
+            # SequenceRoundEnd: eliminated faction first, then standoff
+            newly = np.full(n, -1, dtype=np.int32)
+            for f in reversed(range(len(self.factions))):
+                members = self.faction_of == f
+                gone = defeated[:, members].all(axis=1)
+                newly = np.where(gone, f, newly)
+            out_of_cards = ((act_n == 0) | defeated).all(axis=1)
+            eliminated = np.where(live & (newly >= 0), newly, eliminated)
+            live &= (newly < 0) & ~out_of_cards
+
+        return {
+            'eliminated': eliminated,
+            'rounds': rounds,
+            'defeated': defeated,
+            'health': act_n + dis_n,
+        }
+
+    def _resolve(self, current_round, rows, live, drawn, target, blocks, hidden, poisoned,
+                 marked, defeated, health, destroy_one, heal_one):
+        n, e = drawn.shape
+        ti = self.type_index
+        watched = np.zeros(n, dtype=bool)
+        if sim.CARD_WATCH in ti:
+            watched = live & (drawn == ti[sim.CARD_WATCH]).any(axis=1)
+
+        for card_type in sim.RESOLUTION_ORDER:
+            if card_type not in ti:
+                continue
+            code = ti[card_type]
+            plays = live[:, None] & (drawn == code)
+            if not plays.any():
+                continue
+
+            if card_type == sim.CARD_WATCH:
+                for i in range(e):
+                    for j in range(e):
+                        if j != i and self.hostile[i, j]:
+                            reveal = plays[:, i] & ~defeated[:, j]
+                            hidden[reveal, j] = NONE_ROUND
+
+            elif card_type == sim.CARD_SNEAK:
+                hidden[plays & ~watched[:, None]] = current_round
+
+            elif card_type in (sim.CARD_POISON, sim.CARD_MARK, sim.CARD_DEFEND, sim.CARD_HEAL):
+                for i in range(e):
+                    tgt = target[:, i]
+                    ok = plays[:, i] & (tgt >= 0)
+                    r = rows[ok]
+                    tgt = tgt[ok]
+                    ok = ~defeated[r, tgt]
+                    r, tgt = r[ok], tgt[ok]
+                    if card_type == sim.CARD_POISON:
+                        poisoned[r, tgt] = current_round
+                    elif card_type == sim.CARD_MARK:
+                        marked[r, tgt] = current_round
+                    elif card_type == sim.CARD_DEFEND:
+                        np.add.at(blocks, (r, tgt), 1)
+                    else:
+                        heal_one(r, tgt)
+
+            elif card_type in DAMAGE:
+                # Random resolution order per battle ("random order for ties")
+                order = self.rng.random((n, e)).argsort(axis=1)
+                for k in range(e):
+                    actor = order[:, k]
+                    ok = plays[rows, actor]
+                    r = rows[ok]
+                    actor = actor[ok]
+                    tgt = target[r, actor]
+                    valid = tgt >= 0
+                    r, actor, tgt = r[valid], actor[valid], tgt[valid]
+                    valid = ~defeated[r, tgt]
+                    if card_type == sim.CARD_BACKSTAB:
+                        valid &= hidden[r, actor] > NONE_ROUND
+                    elif card_type == sim.CARD_EXECUTE:
+                        valid &= poisoned[r, tgt] > NONE_ROUND
+                    else:
+                        valid &= hidden[r, tgt] <= NONE_ROUND
+                    r, tgt = r[valid], tgt[valid]
+                    if not len(r):
+                        continue
+
+                    damage = DAMAGE[card_type] + (marked[r, tgt] > NONE_ROUND)
+                    used = np.minimum(blocks[r, tgt], damage)
+                    blocks[r, tgt] -= used.astype(blocks.dtype)
+                    dealt = damage - used
+                    for step in range(int(dealt.max())):
+                        destroy_one(r, tgt, dealt > step)
+                    dead = health(r, tgt) == 0
+                    defeated[r[dead], tgt[dead]] = True
+
+
+def summarize(kernel, result):
+    """Turn raw kernel output into outcome / rounds / survival histograms."""
+    eliminated = result['eliminated']
+    n = len(eliminated)
+    outcomes = Counter()
+    for f, count in zip(*np.unique(eliminated, return_counts=True)):
+        label = 'standoff' if f < 0 else f"{kernel.factions[f]} eliminated"
+        outcomes[label] = int(count)
+    rounds = dict(zip(*(a.tolist() for a in np.unique(result['rounds'], return_counts=True))))
+    survival = {e['name']: float((~result['defeated'][:, i]).mean())
+                for i, e in enumerate(kernel.entities)}
+    mean_health = {e['name']: float(result['health'][:, i].mean())
+                   for i, e in enumerate(kernel.entities)}
+    return {
+        'battles': n,
+        'outcomes': dict(outcomes),
+        'rounds_histogram': rounds,
+        'survival': survival,
+        'mean_health': mean_health,
+    }
+
+
+def reference_outcomes(scenario, entities, location, battles, seed=0):
+    """Outcome histogram from the scalar simulator, for cross-checking the kernel."""
+    party = {e['name'] for e in entities if e['type'] == sim.ENTITY_PLAYER}
+    mini = {
+        'level_name': 'matchup',
+        'map': {'locations': [{'id': location, 'name': location}], 'connections': []},
+        'factions': scenario.get('factions', {}),
+        'characters': [dict(c, location=location) for c in scenario['characters'] if c['name'] in party],
+        'monsters': [dict(m, items=[]) for m in scenario['monsters'] if m['location'] == location],
+    }
+    outcomes = Counter()
+    for i in range(battles):
+        game = sim.Game(mini, num_players=len(party), seed=sim.game_seed(seed, i))
+        ran = game.run_sequence(location)
+        if ran is None:
+            outcomes['no battle'] += 1
+            continue
+        faction = ran[2]
+        outcomes['standoff' if faction is None else f"{faction} eliminated"] += 1
+    return dict(outcomes)
+
+
+def print_report(summary, elapsed):
+    n = summary['battles']
+    print(f"Battles: {n} in {elapsed:.2f}s ({n / elapsed if elapsed else 0:,.0f} battles/s)")
+    print("Outcomes:")
+    for label, count in sorted(summary['outcomes'].items(), key=lambda kv: -kv[1]):
+        print(f"  {label:24s} {count:9d}  ({count / n:6.1%})")
+    print("Rounds:")
+    for r, count in summary['rounds_histogram'].items():
+        print(f"  {r:4d} {count:9d}  {'#' * max(1, round(40 * count / n))}")
+    print("Survival / mean remaining health:")
+    for name, rate in summary['survival'].items():
+        print(f"  {name:20s} {rate:6.1%}  {summary['mean_health'][name]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vectorized deck-vs-deck battle simulation.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    parser.add_argument('--location', required=True, help='location whose monsters fight the party')
+    parser.add_argument('--party', default=None, help='comma-separated character names (default: all)')
+    parser.add_argument('--players', type=int, default=None, help='player count (monster copies)')
+    parser.add_argument('--battles', type=int, default=100000)
+    parser.add_argument('--chunk', type=int, default=250000, help='battles per vectorized batch')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', type=int, default=0,
+                        help='also run N battles through simulator.py and print its outcomes')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+
+    scenario = sim.load_scenario(args.scenario)
+    party = args.party.split(',') if args.party else None
+    entities = build_matchup(scenario, args.location, party, args.players)
+    if not any(e['type'] == sim.ENTITY_MONSTER for e in entities):
+        print(f"Error: No monsters at location: {args.location}")
+        sys.exit(1)
+
+    kernel = BatchCombat(entities, scenario.get('factions', {}).get('matrix', {}), args.seed)
+    start = time.perf_counter()
+    parts = []
+    for offset in range(0, args.battles, args.chunk):
+        parts.append(kernel.run(min(args.chunk, args.battles - offset)))
+    result = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    elapsed = time.perf_counter() - start
+    summary = summarize(kernel, result)
+
+    if args.check:
+        summary['reference_outcomes'] = reference_outcomes(scenario, entities, args.location,
+                                                           args.check, args.seed)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Matchup at {args.location}: " + ', '.join(e['name'] for e in entities))
+    print_report(summary, elapsed)
+    if args.check:
+        print(f"simulator.py reference ({args.check} battles):")
+        for label, count in sorted(summary['reference_outcomes'].items(), key=lambda kv: -kv[1]):
+            print(f"  {label:24s} {count:9d}  ({count / args.check:6.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Battle Log - Python mirror of the packed sequence round notification.
+
+SequenceRoundEnd sends each battle round as one sequenceRound
+notification. Its log field is a round packed by
+SequenceRoundEnd::encodeRound() and expanded by expandBattleLog() in
+zoomquest.js:
+
+    [round, drawn, resolutions, status]
+        drawn:       [entity_id, card_id, card_type, target_id]
+        resolutions: [entity_id, card_type, effect, target_id, card_id, {other fields}]
+        status:      [entity_id, active, discard, destroyed, is_defeated, {tag_name: tag_value}]
+
+Entities travel as ids, since the client already has their names. Card
+types and effects travel as indexes into CARD_TYPES / EFFECTS. Trailing
+nulls, an empty {} and empty tags are left out.
+
+The command line plays simulator games and compares, per battle round,
+what the server sent before (sequenceCardsDrawn, one cardResolved per
+card, sequenceRoundSummary, sequenceContinues or sequenceEnd with status)
+against what it sends now (sequenceRound, and a sequenceEnd without
+status when the battle ends). It reports:
+    - JSON bytes, raw and deflated (as permessage-deflate would)
+    - time to encode a round and to expand it again
+Both formats leave out the human-readable round_log and message texts,
+which only the PHP builds; round_log is in both.
+
+--check asserts that CARD_TYPES and EFFECTS match the lists in
+constants.inc.php, order included, and that expand(encode(round)) gives
+back every round's rows.
+
+Usage:
+    python battle_log.py [scenario_file] [--games N] [--players N] [--seed N]
+                         [--policy hunt|random|stay] [--max-rounds N] [--check]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import simulator as sim
+from validate_scenarios import ROOT_DIR
+
+
+# Same order as BATTLE_LOG_CARD_TYPES / BATTLE_LOG_EFFECTS in constants.inc.php
+CARD_TYPES = [
+    'attack', 'defend', 'heal', 'sneak', 'watch', 'shuffle', 'poison',
+    'mark', 'backstab', 'execute', 'sell', 'steal', 'wealth',
+]
+EFFECTS = [
+    'destroy', 'blocked', 'block', 'heal', 'no_cards_to_heal', 'no_cards', 'target_defeated',
+    'target_hidden', 'no_target', 'watch', 'hidden', 'sneak', 'sneak_failed', 'poison', 'mark',
+    'backstab', 'not_hidden', 'execute', 'not_poisoned', 'shuffle', 'selling', 'purchased',
+    'not_selling', 'no_items', 'stolen', 'caught', 'poison_tick',
+]
+
+# Resolution fields carried positionally, or rebuilt from the entity table
+NAMED_FIELDS = ('entity_id', 'entity_name', 'entity_type', 'card_type', 'effect',
+                'target_id', 'target_name', 'card_id')
+
+
+def server_enums(root=ROOT_DIR):
+    """BATTLE_LOG_CARD_TYPES and BATTLE_LOG_EFFECTS as listed in constants.inc.php."""
+    source = (root / 'modules' / 'php' / 'constants.inc.php').read_text()
+    cards = dict(re.findall(r"const\s+(CARD_\w+)\s*=\s*'([^']*)'", source))
+
+    def listed(name):
+        match = re.search(rf"const\s+{name}\s*=\s*\[([^\]]*)\]", source)
+        if not match:
+            raise ValueError(f"constants.inc.php has no {name}")
+        return match.group(1)
+
+    card_types = [cards[c] for c in re.findall(r"CARD_\w+", listed('BATTLE_LOG_CARD_TYPES'))]
+    effects = re.findall(r"'([^']*)'", listed('BATTLE_LOG_EFFECTS'))
+    return card_types, effects
+
+
+def enum_index(values, value):
+    try:
+        return values.index(value)
+    except ValueError:
+        return value
+
+
+def enum_value(values, value):
+    return values[value] if isinstance(value, int) else value
+
+
+def encode_round(sequence_round, drawn_cards, resolutions, status):
+    """SequenceRoundEnd::encodeRound()"""
+    drawn = [[c['entity_id'], c['card_id'], enum_index(CARD_TYPES, c['card_type']), c['target_id']]
+             for c in drawn_cards]
+
+    packed = []
+    for r in resolutions:
+        extra = {k: v for k, v in r.items() if k not in NAMED_FIELDS}
+        if 'revealed' in extra:
+            extra['revealed'] = [e['entity_id'] for e in extra['revealed']]
+        row = [
+            r['entity_id'],
+            enum_index(CARD_TYPES, r['card_type']) if r.get('card_type') is not None else None,
+            enum_index(EFFECTS, r['effect']) if r.get('effect') is not None else None,
+            r.get('target_id'),
+            r.get('card_id'),
+            extra or None,
+        ]
+        while len(row) > 1 and row[-1] is None:
+            row.pop()
+        packed.append(row)
+
+    rows = []
+    for s in status:
+        row = [s['entity_id'], s['active'], s['discard'], s['destroyed'], 1 if s['is_defeated'] else 0]
+        if s['tags']:
+            row.append({t['tag_name']: t['tag_value'] for t in s['tags']})
+        rows.append(row)
+
+    return [sequence_round, drawn, packed, rows]
+
+
+def expand_round(packed, entities):
+    """expandBattleLog() for one round; entities maps entity_id to entity_name/entity_type/faction."""
+    sequence_round, drawn, resolutions, status = packed
+
+    def name(entity_id):
+        return entities[entity_id]['entity_name']
+
+    drawn_cards = [{
+        'entity_id': entity_id,
+        'entity_type': entities[entity_id]['entity_type'],
+        'entity_name': name(entity_id),
+        'faction': entities[entity_id]['faction'],
+        'card_id': card_id,
+        'card_type': enum_value(CARD_TYPES, card_type),
+        'target_id': target_id,
+        'target_name': name(target_id) if target_id is not None else None,
+    } for entity_id, card_id, card_type, target_id in drawn]
+
+    expanded = []
+    for row in resolutions:
+        entity_id, card_type, effect, target_id, card_id, extra = row + [None] * (6 - len(row))
+        r = {'entity_id': entity_id, 'entity_name': name(entity_id),
+             'entity_type': entities[entity_id]['entity_type']}
+        r.update(extra or {})
+        if card_type is not None:
+            r['card_type'] = enum_value(CARD_TYPES, card_type)
+        if effect is not None:
+            r['effect'] = enum_value(EFFECTS, effect)
+        if target_id is not None:
+            r['target_id'] = target_id
+            r['target_name'] = name(target_id)
+        if card_id is not None:
+            r['card_id'] = card_id
+        if 'revealed' in r:
+            r['revealed'] = [{'entity_id': e, 'entity_name': name(e)} for e in r['revealed']]
+        expanded.append(r)
+
+    rows = [{
+        'entity_id': entity_id,
+        'entity_name': name(entity_id),
+        'entity_type': entities[entity_id]['entity_type'],
+        'faction': entities[entity_id]['faction'],
+        'is_defeated': defeated == 1,
+        'active': active,
+        'discard': discard,
+        'destroyed': destroyed,
+        'tags': [{'tag_name': k, 'tag_value': v} for k, v in (rest[0] if rest else {}).items()],
+    } for entity_id, active, discard, destroyed, defeated, *rest in status]
+
+    return {'round': sequence_round, 'drawn_cards': drawn_cards, 'resolutions': expanded, 'status': rows}
+
+
+def notification(name, log, args):
+    """Wire size of one notification, the way the server json_encodes it."""
+    return len(json.dumps({'type': name, 'log': log, 'args': args}, separators=(',', ':')))
+
+
+def old_round(sequence_id, sequence_round, drawn, resolutions, status, ended, eliminated):
+    """Notifications the server sent for one round before sequenceRound."""
+    messages = []
+    if drawn:
+        messages.append(('sequenceCardsDrawn', 'Round ${round}: All entities draw cards', {
+            'round': sequence_round, 'sequence_id': sequence_id, 'drawn_cards': drawn}))
+    for r in resolutions:
+        if 'card_type' in r:
+            messages.append(('cardResolved', '', {
+                'entity_id': r['entity_id'], 'entity_name': r['entity_name'],
+                'entity_type': r['entity_type'], 'card_type': r['card_type'],
+                'target_id': r.get('target_id'), 'target_name': r.get('target_name'),
+                'effect': r['effect']}))
+    messages.append(('sequenceRoundSummary', 'Round ${round}: ${round_log}', {
+        'round': sequence_round, 'sequence_id': sequence_id,
+        'resolutions': resolutions, 'status': status}))
+    if ended:
+        messages.append(('sequenceEnd', 'Turn ${game_round}: ${status_log} (standoff)', {
+            'sequence_id': sequence_id, 'eliminated_faction': eliminated, 'status': status}))
+    else:
+        messages.append(('sequenceContinues', '', {'sequence_id': sequence_id}))
+    return messages
+
+
+def new_round(sequence_id, packed, ended, eliminated):
+    """Notifications the server sends for one round now."""
+    messages = [('sequenceRound', 'Round ${round}: ${round_log}', {
+        'round': packed[0], 'sequence_id': sequence_id, 'log': packed})]
+    if ended:
+        messages.append(('sequenceEnd', 'Turn ${game_round}: ${status_log} (standoff)', {
+            'sequence_id': sequence_id, 'eliminated_faction': eliminated}))
+    return messages
+
+
+def strip_names(rows):
+    """Rows without the names an expanded round rebuilds from the entity table."""
+    return [{k: v for k, v in row.items() if k not in ('entity_name', 'target_name')} for row in rows]
+
+
+def run(scenario, games, num_players, seed, policy, max_rounds, check):
+    """Play the games; totals for the report, or raise AssertionError on a bad round trip."""
+    totals = {'rounds': 0, 'old_messages': 0, 'new_messages': 0, 'old_bytes': 0, 'new_bytes': 0,
+              'old_deflated': 0, 'new_deflated': 0, 'encode': 0.0, 'expand': 0.0}
+    adjacency = sim.build_adjacency(scenario)
+
+    for i in range(games):
+        game = sim.Game(scenario, num_players=num_players, seed=sim.game_seed(seed, i),
+                        policy=policy, adjacency=adjacency)
+        entities = {e.entity_id: {'entity_name': e.name, 'entity_type': e.entity_type, 'faction': e.faction}
+                    for e in game.entities}
+        sequence_id = 0
+        # Both streams are deflated as they go, like a websocket's shared window
+        old_stream = zlib.compressobj()
+        new_stream = zlib.compressobj()
+
+        def on_round(seq, sequence_round, drawn, resolutions):
+            status = game.get_participant_status(seq)
+            eliminated = game.get_eliminated_faction(seq)
+            ended = eliminated is not None or game.is_everyone_out_of_cards(seq)
+
+            start = time.perf_counter()
+            packed = encode_round(sequence_round, drawn, resolutions, status)
+            new = new_round(sequence_id, packed, ended, eliminated)
+            wire = json.dumps(new, separators=(',', ':'))
+            totals['encode'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expanded = expand_round(json.loads(wire)[0][2]['log'], entities)
+            totals['expand'] += time.perf_counter() - start
+
+            if check:
+                # JSON turns the round-tripped rows' tuples and dict keys into lists and strings
+                original = json.loads(json.dumps({'drawn_cards': drawn, 'resolutions': resolutions,
+                                                  'status': status}))
+                assert expanded['drawn_cards'] == original['drawn_cards'], \
+                    f"round {sequence_round}: drawn cards differ"
+                assert strip_names(expanded['resolutions']) == strip_names(original['resolutions']), \
+                    f"round {sequence_round}: resolutions differ"
+                assert expanded['status'] == original['status'], f"round {sequence_round}: status differs"
+
+            old = old_round(sequence_id, sequence_round, drawn, resolutions, status, ended, eliminated)
+            totals['rounds'] += 1
+            totals['old_messages'] += len(old)
+            totals['new_messages'] += len(new)
+            totals['old_bytes'] += sum(notification(*m) for m in old)
+            totals['new_bytes'] += sum(notification(*m) for m in new)
+            old_wire = json.dumps(old, separators=(',', ':')).encode()
+            totals['old_deflated'] += len(old_stream.compress(old_wire) + old_stream.flush(zlib.Z_SYNC_FLUSH))
+            totals['new_deflated'] += len(new_stream.compress(wire.encode()) + new_stream.flush(zlib.Z_SYNC_FLUSH))
+
+        outcome = None
+        while outcome is None and game.round < max_rounds:
+            game.round_start()
+            game.resolve_moves()
+            for location, battle_seed in game.battle_order():
+                sequence_id += 1
+                game.run_battle(location, battle_seed, on_round)
+            outcome = game.check_victory()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the packed sequence round notification with the old ones.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'tempe_junction.json'))
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--check', action='store_true', help='assert every round expands back to its rows')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+    scenario = sim.load_scenario(args.scenario)
+
+    if args.check and server_enums() != (CARD_TYPES, EFFECTS):
+        print("Error: CARD_TYPES / EFFECTS differ from BATTLE_LOG_CARD_TYPES / BATTLE_LOG_EFFECTS in constants.inc.php")
+        sys.exit(1)
+
+    try:
+        t = run(scenario, args.games, args.players, args.seed, args.policy, args.max_rounds, args.check)
+    except AssertionError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rounds = t['rounds']
+    if args.check:
+        print(f"OK: {rounds} battle rounds in {args.games} games expand back to their rows")
+        return
+    if not rounds:
+        print("No battles were fought")
+        return
+
+    print(f"Scenario: {scenario.get('level_name', args.scenario)}, {args.games} games, {rounds} battle rounds")
+    print(f"{'per round':24s} {'before':>10s} {'after':>10s}")
+    print(f"{'notifications':24s} {t['old_messages'] / rounds:10.2f} {t['new_messages'] / rounds:10.2f}")
+    print(f"{'JSON bytes':24s} {t['old_bytes'] / rounds:10.0f} {t['new_bytes'] / rounds:10.0f}"
+          f"  ({t['new_bytes'] / t['old_bytes']:.0%})")
+    print(f"{'deflated bytes':24s} {t['old_deflated'] / rounds:10.0f} {t['new_deflated'] / rounds:10.0f}"
+          f"  ({t['new_deflated'] / t['old_deflated']:.0%})")
+    print(f"Encode {t['encode'] / rounds * 1e6:.1f}us, expand {t['expand'] / rounds * 1e6:.1f}us per round")
+
+
+if __name__ == '__main__':
+    main()
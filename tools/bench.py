@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Time the tools on synthetic scenarios of growing size.
+
+For each size tier a scenario is generated with scenario_gen and timed
+through:
+
+    generate   scenario_gen.generate
+    validate   validate_scenarios.validate_scenario
+    viewer     scenario_viewer.render_html (from a temporary file)
+    pathfind   adjacency build plus BFS from --sources locations
+               (graph_index.bfs_distances; the all-pairs index is only
+               built up to --index-max locations)
+    combat     simulator.Game setup and --rounds rounds of play
+
+Each step keeps the best of --repeat runs. Every run appends one JSON line
+to the trend file and prints a table against the previous run:
+
+    {"time": "2026-10-17T12:00:00", "commit": "2d309a0", "python": "3.11.2",
+     "settings": {...}, "tiers": {"1000": {"locations": 1000, "connections": 1834,
+                                           "generate_ms": 21.4, ...}}}
+
+Usage:
+    python bench.py [--tiers 100,1000,10000] [--density 0.3] [--factions 3]
+                    [--deck-size 5] [--rounds 10] [--sources 32] [--index-max 2000]
+                    [--repeat 3] [--seed N] [--trend FILE] [--no-record]
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import graph_index
+import scenario_gen
+import scenario_viewer
+import simulator as sim
+import validate_scenarios
+
+
+ROOT_DIR = Path(__file__).parent.parent
+DEFAULT_TREND = ROOT_DIR / 'bench' / 'trend.jsonl'
+STEPS = ('generate', 'validate', 'viewer', 'pathfind', 'index', 'combat')
+
+# Slower than the previous run by more than this is flagged in the table
+SLOWER_RATIO = 1.25
+
+
+def best_of(repeat, fn):
+    """Best wall time of fn() in milliseconds, plus its last result."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def pathfind(scenario, sources, seed):
+    """Adjacency in index order plus BFS distances from a sample of locations."""
+    locations = scenario['map']['locations']
+    position = {loc['id']: i for i, loc in enumerate(locations)}
+    adjacency = sim.build_adjacency(scenario)
+    neighbours = [[position[other] for other in adjacency[loc['id']]] for loc in locations]
+    starts = random.Random(seed).sample(range(len(locations)), min(sources, len(locations)))
+    return [graph_index.bfs_distances(neighbours, start) for start in starts]
+
+
+def combat(scenario, rounds, seed):
+    game = sim.Game(scenario, seed=seed)
+    for _ in range(rounds):
+        if game.play_round() is not None:
+            break
+    return game.round
+
+
+def bench_tier(nodes, args, schema, workdir):
+    """Time every step on one generated scenario."""
+    settings = dict(density=args.density, factions=args.factions, deck_size=args.deck_size,
+                    seed=args.seed, schema=schema)
+    timings = {}
+    timings['generate'], scenario = best_of(args.repeat, lambda: scenario_gen.generate(nodes, **settings))
+
+    timings['validate'], errors = best_of(args.repeat, lambda: validate_scenarios.validate_scenario(scenario, schema))
+    if errors:
+        raise ValueError(f"generated {nodes}-location scenario is invalid: {errors[0]}")
+
+    scenario_path = Path(workdir) / f'synthetic_{nodes}.json'
+    scenario_path.write_text(json.dumps(scenario))
+    output_path = scenario_path.with_suffix('.html')
+    timings['viewer'], _ = best_of(args.repeat, lambda: scenario_viewer.render_html(scenario_path, output_path))
+
+    timings['pathfind'], _ = best_of(args.repeat, lambda: pathfind(scenario, args.sources, args.seed))
+    if nodes <= args.index_max:
+        timings['index'], _ = best_of(args.repeat, lambda: graph_index.build_index(scenario))
+
+    timings['combat'], played = best_of(args.repeat, lambda: combat(scenario, args.rounds, args.seed))
+
+    result = {
+        'locations': nodes,
+        'connections': len(scenario['map']['connections']),
+        'monsters': len(scenario['monsters']),
+        'rounds_played': played,
+    }
+    for step in STEPS:
+        if step in timings:
+            result[f'{step}_ms'] = round(timings[step], 2)
+    return result
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def previous_run(trend_path, settings):
+    """Last recorded run with the same settings, or None."""
+    if not trend_path.exists():
+        return None
+    last = None
+    with open(trend_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if record.get('settings') == settings:
+                    last = record
+    return last
+
+
+def print_table(tiers, previous):
+    header = f"{'locations':>9}" + ''.join(f" {step + ' ms':>14}" for step in STEPS)
+    print(header)
+    for key, result in tiers.items():
+        before = (previous or {}).get('tiers', {}).get(key, {})
+        row = f"{result['locations']:>9}"
+        for step in STEPS:
+            now = result.get(f'{step}_ms')
+            if now is None:
+                row += f" {'-':>14}"
+                continue
+            cell = f"{now:.1f}"
+            old = before.get(f'{step}_ms')
+            if old:
+                cell += f" {now / old:.2f}x" + ('!' if now > old * SLOWER_RATIO else ' ')
+            row += f" {cell:>14}"
+        print(row)
+    if previous:
+        print(f"\nRatios against the run of {previous['time']} ({previous.get('commit') or 'unknown commit'}); "
+              f"! marks steps more than {SLOWER_RATIO:.2f}x slower")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ZoomQuest tools on synthetic scenarios.')
+    parser.add_argument('--tiers', default='100,1000,10000', help='comma-separated location counts')
+    parser.add_argument('--density', type=float, default=0.3)
+    parser.add_argument('--factions', type=int, default=3)
+    parser.add_argument('--deck-size', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=10, help='game rounds simulated per tier')
+    parser.add_argument('--sources', type=int, default=32, help='BFS sources for the pathfinding step')
+    parser.add_argument('--index-max', type=int, default=2000,
+                        help='largest tier the all-pairs graph index is built for')
+    parser.add_argument('--repeat', type=int, default=3, help='keep the best of N runs per step')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trend', default=str(DEFAULT_TREND), help='JSONL file runs are appended to')
+    parser.add_argument('--no-record', action='store_true', help='do not append this run to the trend file')
+    args = parser.parse_args()
+
+    try:
+        tiers = [int(t) for t in args.tiers.split(',') if t.strip()]
+    except ValueError:
+        print(f"Error: Invalid --tiers: {args.tiers}")
+        sys.exit(1)
+    if not tiers or min(tiers) < scenario_gen.MIN_NODES or args.repeat < 1:
+        print(f"Error: Tiers must be at least {scenario_gen.MIN_NODES} locations and --repeat at least 1")
+        sys.exit(1)
+
+    schema = validate_scenarios.load_schema()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for nodes in tiers:
+            print(f"Benchmarking {nodes} locations...", file=sys.stderr)
+            try:
+                results[str(nodes)] = bench_tier(nodes, args, schema, workdir)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+
+    settings = {'density': args.density, 'factions': args.factions, 'deck_size': args.deck_size,
+                'rounds': args.rounds, 'sources': args.sources, 'seed': args.seed}
+    trend_path = Path(args.trend)
+    print_table(results, previous_run(trend_path, settings))
+
+    if not args.no_record:
+        record = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'settings': settings,
+            'tiers': results,
+        }
+        trend_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(trend_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"Recorded run in {trend_path}")
+
+
+if __name__ == '__main__':
+    main()
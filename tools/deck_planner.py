@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Deck Planner - Search for the best card order before committing a move.
+
+Takes one character's current piles and the entities at the target location
+and searches the cardOrder that MoveSelection::actSelectLocation would pass to
+Deck::reorderActive. Draw order in the battle follows the server: the planned
+cards go to the bottom of the discard pile, ResolveMoves refreshes the deck,
+so the old discard pile (in order) is drawn first and the plan after it.
+
+Each candidate order is played against the same N sampled battles (common
+random numbers, seeded like simulator.game_seed) using the simulator's
+ActionSequenceResolver rules. The search extends plan prefixes one card type
+at a time; a prefix keeps its sampled battles paused at the point where the
+next planned card would be drawn, so children only simulate the rounds their
+new card adds. Evaluations are memoized by battle state, prefixes whose
+battles have all ended are not expanded further, and a beam keeps the best
+prefixes per depth until the time budget runs out.
+
+Expected values are reported per ordering:
+    dealt     cards destroyed on hostile entities during the battle
+    received  cards destroyed from the planning character
+    win       share of battles where the hostile side is eliminated
+    survive   share of battles the planning character survives
+
+Only the first cards of an ordering are searched when the budget runs out;
+the rest follow in input order and are scored as a random draw.
+
+Usage:
+    python deck_planner.py [scenario_file] --location ID --player NAME
+                           [--party A,B] [--active a,b,...] [--discard a,b,...]
+                           [--destroyed a,b,...] [--samples N] [--beam N]
+                           [--budget SECONDS] [--top N] [--seed N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import simulator as sim
+
+
+# Unplanned cards are ordered after everything planned and the old discard pile
+BAG_ORDER = 1_000_000
+
+
+class Branch:
+    """One sampled battle, paused whenever the planning character's next draw is unplanned."""
+
+    __slots__ = ('game', 'seq', 'me', 'hostiles', 'bag', 'round', 'done', 'eliminated')
+
+    def __init__(self, game, seq, me, bag):
+        self.game = game
+        self.seq = seq
+        self.me = me
+        self.hostiles = [e for e in seq.participants
+                         if game.get_relationship(me.faction, e.faction) == sim.RELATION_HOSTILE]
+        self.bag = bag  # ids of cards not yet placed by the plan
+        self.round = 0
+        self.done = False
+        self.eliminated = None
+
+    def clone(self):
+        game = self.game.fork()
+        by_id = {e.entity_id: e for e in game.entities}
+        other = Branch.__new__(Branch)
+        other.game = game
+        other.seq = sim.Sequence(self.seq.location, [by_id[e.entity_id] for e in self.seq.participants])
+        other.me = by_id[self.me.entity_id]
+        other.hostiles = [by_id[e.entity_id] for e in self.hostiles]
+        other.bag = set(self.bag)
+        other.round = self.round
+        other.done = self.done
+        other.eliminated = self.eliminated
+        return other
+
+    def waiting(self):
+        """True when the next card the planning character draws is still in the bag."""
+        if self.me.is_defeated:
+            return False
+        card = self.game.deck.draw_top(self.me)
+        return card is not None and card.card_id in self.bag
+
+    def advance(self):
+        while not self.done and not self.waiting():
+            self.round += 1
+            self.done, self.eliminated = self.game.play_sequence_round(self.seq, self.round)
+
+    def place(self, card_type):
+        """Put an unplanned card of this type on top of the active pile and play on."""
+        if self.done:
+            return
+        candidates = [c for c in self.me.piles[sim.PILE_ACTIVE]
+                      if c.card_id in self.bag and c.card_type == card_type]
+        if candidates:
+            card = min(candidates, key=lambda c: c.card_id)
+            self.bag.discard(card.card_id)
+            card.order = min(c.order for c in self.me.piles[sim.PILE_ACTIVE]) - 1
+        # else: every copy still in the bag was destroyed, so this plan slot is never drawn
+        self.advance()
+
+    def finish(self):
+        """Play to the end with the remaining bag in its sampled order."""
+        self.bag.clear()
+        self.advance()
+
+    def signature(self):
+        """Hashable battle state; equal signatures play out identically."""
+        entities = []
+        for e in self.seq.participants:
+            entities.append((
+                e.is_defeated,
+                tuple(c.card_type for c in sorted(e.piles[sim.PILE_ACTIVE], key=lambda c: c.order)),
+                tuple(c.card_type for c in sorted(e.piles[sim.PILE_DISCARD], key=lambda c: c.order)),
+                tuple(sorted(c.card_type for c in e.piles[sim.PILE_DESTROYED])),
+                tuple(sorted((name, tuple(value)) for name, value in e.tags.items())),
+            ))
+        bag = tuple(c.card_id in self.bag for c in sorted(self.me.piles[sim.PILE_ACTIVE], key=lambda c: c.order))
+        return self.done, self.round, tuple(entities), bag, hash(self.game.rng.getstate())
+
+
+def build_battle(scenario, location, party):
+    """Scenario holding only the party, moved to the location, and the monsters there."""
+    return {
+        'level_name': 'plan',
+        'map': {'locations': [{'id': location, 'name': location}], 'connections': []},
+        'factions': scenario.get('factions', {}),
+        'characters': [dict(c, location=location) for c in scenario['characters'] if c['name'] in party],
+        'monsters': [dict(m, items=[]) for m in scenario['monsters'] if m['location'] == location],
+    }
+
+
+def make_branches(battle, num_players, player, plan, discard, destroyed, samples, seed):
+    """Sampled battles with the planning character's piles replaced by the given ones."""
+    branches = []
+    for i in range(samples):
+        game = sim.Game(battle, num_players=num_players, seed=sim.game_seed(seed, i))
+        me = next(e for e in game.players() if e.name == player)
+        me.piles = {pile: [] for pile in sim.PILES}
+        deck = game.deck
+        for order, card_type in enumerate(discard):
+            me.piles[sim.PILE_ACTIVE].append(sim.Card(deck.next_card_id, card_type, sim.PILE_ACTIVE, order))
+            deck.next_card_id += 1
+        bag = set()
+        bag_orders = list(range(len(plan)))
+        game.rng.shuffle(bag_orders)
+        for order, card_type in zip(bag_orders, plan):
+            card = sim.Card(deck.next_card_id, card_type, sim.PILE_ACTIVE, BAG_ORDER + order)
+            me.piles[sim.PILE_ACTIVE].append(card)
+            bag.add(card.card_id)
+            deck.next_card_id += 1
+        for card_type in destroyed:
+            me.piles[sim.PILE_DESTROYED].append(sim.Card(deck.next_card_id, card_type, sim.PILE_DESTROYED, 0))
+            deck.next_card_id += 1
+
+        seq = game.create_sequence(location_of(battle))
+        if not game.has_hostiles(seq):
+            return []
+        branch = Branch(game, seq, me, bag)
+        branch.advance()
+        branches.append(branch)
+    return branches
+
+
+def location_of(battle):
+    return battle['map']['locations'][0]['id']
+
+
+class Planner:
+    """Beam search over plan prefixes with a memoized rollout evaluation."""
+
+    def __init__(self, plan, branches, beam, budget):
+        self.plan = list(plan)
+        self.root = branches
+        self.beam = beam
+        self.deadline = time.perf_counter() + budget
+        self.start = [self.destroyed_counts(b) for b in branches]
+        self.cache = {}
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.nodes = 0
+        self.depth = 0
+
+    @staticmethod
+    def destroyed_counts(branch):
+        dealt = sum(len(e.piles[sim.PILE_DESTROYED]) for e in branch.hostiles)
+        return dealt, len(branch.me.piles[sim.PILE_DESTROYED])
+
+    def rollout(self, branch):
+        """Outcome of one sampled battle played to the end, memoized by battle state."""
+        if branch.done:
+            return self.outcome(branch)
+        key = branch.signature()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        finished = branch.clone()
+        finished.finish()
+        self.cache[key] = result = self.outcome(finished)
+        self.evaluations += 1
+        return result
+
+    def outcome(self, branch):
+        dealt, received = self.destroyed_counts(branch)
+        won = branch.eliminated is not None and branch.eliminated != branch.me.faction
+        return dealt, received, won, not branch.me.is_defeated
+
+    def evaluate(self, branches):
+        """Expected outcome of playing the rest of the bag in sampled order."""
+        dealt = received = wins = survived = 0
+        for start, branch in zip(self.start, branches):
+            end = self.rollout(branch)
+            dealt += end[0] - start[0]
+            received += end[1] - start[1]
+            wins += end[2]
+            survived += end[3]
+        n = len(branches)
+        stats = {'dealt': dealt / n, 'received': received / n, 'win': wins / n, 'survive': survived / n}
+        stats['score'] = stats['dealt'] - stats['received']
+        return stats
+
+    def expand(self, prefix, branches, remaining):
+        children = []
+        for card_type in sorted(remaining):
+            if time.perf_counter() > self.deadline:
+                break
+            child = [b.clone() for b in branches]
+            for b in child:
+                b.place(card_type)
+            left = remaining.copy()
+            left[card_type] -= 1
+            if not left[card_type]:
+                del left[card_type]
+            self.nodes += 1
+            children.append((prefix + (card_type,), child, left, self.evaluate(child)))
+        return children
+
+    def search(self):
+        """Return (ordering, stats) pairs for every prefix evaluated, best first."""
+        results = {}
+        frontier = [((), self.root, Counter(self.plan), self.evaluate(self.root))]
+        while frontier and time.perf_counter() <= self.deadline:
+            children = []
+            for prefix, branches, remaining, stats in frontier:
+                results[prefix] = (remaining, stats)
+                if not remaining or all(b.done for b in branches):
+                    continue
+                children.extend(self.expand(prefix, branches, remaining))
+            children.sort(key=lambda node: -node[3]['score'])
+            for prefix, _, remaining, stats in children:
+                results.setdefault(prefix, (remaining, stats))
+            frontier = children[:self.beam]
+            if frontier:
+                self.depth = len(frontier[0][0])
+
+        ranked = []
+        for prefix, (remaining, stats) in results.items():
+            ranked.append((self.complete(prefix, remaining), len(prefix), stats))
+        # Among equal scores prefer the longer (more specific) plan
+        ranked.sort(key=lambda r: (-r[2]['score'], -r[2]['win'], -r[1]))
+        seen = set()
+        unique = []
+        for ordering, planned, stats in ranked:
+            if ordering not in seen:
+                seen.add(ordering)
+                unique.append((list(ordering), dict(stats, planned=planned)))
+        return unique
+
+    def complete(self, prefix, remaining):
+        """Prefix followed by the unplanned cards in input order."""
+        left = remaining.copy()
+        tail = []
+        for card_type in self.plan:
+            if left[card_type]:
+                tail.append(card_type)
+                left[card_type] -= 1
+        return tuple(prefix) + tuple(tail)
+
+
+def parse_cards(value):
+    return [c.strip() for c in value.split(',') if c.strip()] if value else []
+
+
+def print_report(orderings, planner, elapsed, args):
+    print(f"Plan for {args.player} at {args.location}: {len(planner.plan)} cards, "
+          f"{len(planner.root)} sampled battles")
+    print(f"Searched {planner.nodes} prefixes to depth {planner.depth} in {elapsed:.2f}s "
+          f"({planner.evaluations} evaluations, {planner.cache_hits} cache hits)")
+    for rank, (ordering, stats) in enumerate(orderings[:args.top], 1):
+        print(f"  #{rank} score {stats['score']:+6.2f}  dealt {stats['dealt']:5.2f}  "
+              f"received {stats['received']:5.2f}  win {stats['win']:6.1%}  "
+              f"survive {stats['survive']:6.1%}  (first {stats['planned']} searched)")
+        print(f"     {', '.join(ordering)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search card orders for an upcoming battle.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    parser.add_argument('--location', required=True, help='location being moved to')
+    parser.add_argument('--player', required=True, help='character whose cards are planned')
+    parser.add_argument('--party', default=None,
+                        help='comma-separated characters at the location (default: the player only)')
+    parser.add_argument('--active', default=None,
+                        help='comma-separated active cards to order (default: the scenario deck)')
+    parser.add_argument('--discard', default=None, help='discard pile in order, drawn before the plan')
+    parser.add_argument('--destroyed', default=None, help='destroyed cards (heal targets)')
+    parser.add_argument('--samples', type=int, default=32, help='sampled battles per ordering')
+    parser.add_argument('--beam', type=int, default=6, help='prefixes kept per depth')
+    parser.add_argument('--budget', type=float, default=2.0, help='search time in seconds')
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print orderings as JSON')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+    scenario = sim.load_scenario(args.scenario)
+
+    characters = {c['name']: c for c in scenario['characters']}
+    party = parse_cards(args.party) or [args.player]
+    if args.player not in party:
+        party.append(args.player)
+    for name in party:
+        if name not in characters:
+            print(f"Error: Unknown character: {name}")
+            sys.exit(1)
+
+    plan = parse_cards(args.active) or list(characters[args.player]['decks']['active'])
+    discard = parse_cards(args.discard)
+    destroyed = parse_cards(args.destroyed)
+    unknown = set(plan + discard + destroyed) - set(sim.RESOLUTION_ORDER)
+    if unknown:
+        print(f"Error: Unknown card type(s): {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    battle = build_battle(scenario, args.location, party)
+    if not battle['monsters']:
+        print(f"Error: No monsters at {args.location}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    branches = make_branches(battle, len(party), args.player, plan, discard, destroyed,
+                             args.samples, args.seed)
+    if not branches:
+        print(f"Error: No hostile entities at {args.location}")
+        sys.exit(1)
+    planner = Planner(plan, branches, args.beam, max(0.0, args.budget - (time.perf_counter() - start)))
+    orderings = planner.search()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps([dict(stats, order=ordering) for ordering, stats in orderings[:args.top]], indent=2))
+    else:
+        print_report(orderings, planner, elapsed, args)
+
+
+if __name__ == '__main__':
+    main()
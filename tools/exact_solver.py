@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Exact Solver - Exact outcome distribution of a small battle.
+
+Within one action sequence the active pile is never refreshed, and every way
+a card leaves it (draw, random destroy, shuffle) keeps the remaining order
+uniformly random. So a battle state is fully described by each entity's card
+counts per type in active/discard/destroyed, its tags (with their age) and
+whether it is defeated. The solver enumerates every random choice of one
+round (draws, tie-broken targets, shuffled attack order, destroyed and healed
+cards) by replaying the simulator's own resolution code with a scripted
+random source, merges the outcomes by state and recurses. Solved states are
+kept in a transposition cache with LRU eviction.
+
+Probabilities are exact fractions. --check N plays N sampled battles with
+simulator.Game and fails if any outcome frequency or the mean round count
+is further than 4 standard errors from the exact value, which makes this the
+regression reference for the sampled simulators.
+
+Steal and wealth need items and faction changes and are not supported.
+
+Usage:
+    python exact_solver.py [scenario_file] --location ID --party A,B
+                           [--players N] [--cache N] [--check N] [--seed N] [--json]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import OrderedDict, defaultdict
+from fractions import Fraction
+from pathlib import Path
+
+import simulator as sim
+from deck_planner import build_battle
+
+
+UNSUPPORTED_CARDS = (sim.CARD_STEAL, sim.CARD_WEALTH)
+
+# Round number the state is loaded at; tag ages are stored relative to it
+BASE_ROUND = 1
+
+CHECK_SIGMAS = 4.0
+
+
+class ScriptedRandom:
+    """Stands in for random.Random and walks every outcome of the choices made.
+
+    Each run follows a script of option indexes; choices past the end of the
+    script take option 0 and extend it. next_script() advances the script
+    like an odometer, so repeated runs visit every path exactly once.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.limits = []
+        self.pos = 0
+        self.numerator = 1
+        self.denominator = 1
+
+    def start(self):
+        self.pos = 0
+        self.numerator = 1
+        self.denominator = 1
+
+    @property
+    def probability(self):
+        return Fraction(self.numerator, self.denominator)
+
+    def next_script(self):
+        """Advance to the next unvisited path. Returns False once all are done."""
+        del self.script[self.pos:]
+        del self.limits[self.pos:]
+        while self.script:
+            if self.script[-1] + 1 < self.limits[-1]:
+                self.script[-1] += 1
+                return True
+            self.script.pop()
+            self.limits.pop()
+        return False
+
+    def _pick(self, weights, total):
+        if self.pos == len(self.script):
+            self.script.append(0)
+            self.limits.append(len(weights))
+        index = self.script[self.pos]
+        self.pos += 1
+        self.numerator *= weights[index]
+        self.denominator *= total
+        return index
+
+    def choice(self, seq):
+        if len(seq) == 1:
+            return seq[0]
+        if isinstance(seq[0], sim.Card):
+            # Cards of one type in one pile are interchangeable
+            types = [c.card_type for c in seq]
+            options = list(dict.fromkeys(types))
+            if len(options) == 1:
+                return seq[0]
+            picked = options[self._pick([types.count(t) for t in options], len(seq))]
+            return seq[types.index(picked)]
+        return seq[self._pick([1] * len(seq), len(seq))]
+
+    def shuffle(self, x):
+        if x and isinstance(x[0], sim.Card):
+            # Pile order is not part of the state; the next draw is uniform anyway
+            return
+        # Fisher-Yates with scripted picks: every permutation once, uniformly
+        for i in reversed(range(1, len(x))):
+            j = self._pick([1] * (i + 1), i + 1)
+            x[i], x[j] = x[j], x[i]
+
+
+class TranspositionCache:
+    """Solved states, evicting the least recently used beyond capacity."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+class ExactSolver:
+    """Solves a battle to a distribution over (outcome, rounds)."""
+
+    def __init__(self, battle, num_players, cache_size=200_000):
+        self.game = sim.Game(battle, num_players=num_players, seed=0)
+        self.rng = ScriptedRandom()
+        self.game.rng = self.rng
+        self.game.deck.rng = self.rng
+        self.seq = self.game.create_sequence(battle['map']['locations'][0]['id'])
+        self.types = sorted({c.card_type for e in self.seq.participants
+                             for cards in e.piles.values() for c in cards})
+        # Copies of one monster (or character) are interchangeable: their states
+        # are stored sorted, which folds mirrored states into one
+        groups = defaultdict(list)
+        for index, e in enumerate(self.seq.participants):
+            deck = tuple(sorted(c.card_type for c in e.piles[sim.PILE_ACTIVE]))
+            groups[(e.entity_type, e.entity_class, e.faction, deck)].append(index)
+        self.groups = [g for g in groups.values() if len(g) > 1]
+        unsupported = set(self.types) & set(UNSUPPORTED_CARDS)
+        if unsupported:
+            raise ValueError(f"Unsupported card type(s): {', '.join(sorted(unsupported))}")
+        self.cache = TranspositionCache(cache_size)
+        self.expanded = 0
+        self.paths = 0
+
+    def has_battle(self):
+        return self.game.has_hostiles(self.seq)
+
+    def initial_state(self):
+        return self.state_key(BASE_ROUND - 1)
+
+    def state_key(self, completed_round):
+        """Canonical state after completed_round: counts, tags by age, defeat flags."""
+        key = []
+        for e in self.seq.participants:
+            counts = []
+            for pile in (sim.PILE_ACTIVE, sim.PILE_DISCARD, sim.PILE_DESTROYED):
+                by_type = dict.fromkeys(self.types, 0)
+                for card in e.piles[pile]:
+                    by_type[card.card_type] += 1
+                counts.append(tuple(by_type.values()))
+            tags = tuple(sorted((name, value, completed_round - applied)
+                                for name, (value, applied) in e.tags.items()))
+            key.append((e.is_defeated, tuple(counts), tags))
+        for group in self.groups:
+            for index, state in zip(group, sorted(key[i] for i in group)):
+                key[index] = state
+        return tuple(key)
+
+    def load_state(self, key):
+        card_id = 1
+        for e, (defeated, counts, tags) in zip(self.seq.participants, key):
+            e.is_defeated = defeated
+            e.piles = {sim.PILE_INACTIVE: []}
+            for pile, by_type in zip((sim.PILE_ACTIVE, sim.PILE_DISCARD, sim.PILE_DESTROYED), counts):
+                cards = []
+                for card_type, count in zip(self.types, by_type):
+                    for i in range(card_id, card_id + count):
+                        cards.append(sim.Card(i, card_type, pile, i))
+                    card_id += count
+                e.piles[pile] = cards
+            e.tags = {name: [value, BASE_ROUND - 1 - age] for name, value, age in tags}
+        self.game.deck.next_card_id = card_id
+
+    def transitions(self, key):
+        """Every outcome of one round from this state: {next_key or (None, label): probability}."""
+        result = defaultdict(Fraction)
+        rng = self.rng
+        while True:
+            self.load_state(key)
+            rng.start()
+            # The top card of a uniformly ordered active pile is a uniform draw
+            for e in self.seq.alive():
+                if e.piles[sim.PILE_ACTIVE]:
+                    rng.choice(e.piles[sim.PILE_ACTIVE]).order = 0
+            finished, eliminated = self.game.play_sequence_round(self.seq, BASE_ROUND)
+            if finished:
+                outcome = (None, 'standoff' if eliminated is None else f"{eliminated} eliminated")
+            else:
+                outcome = self.state_key(BASE_ROUND)
+            result[outcome] += rng.probability
+            self.paths += 1
+            if not rng.next_script():
+                return result
+
+    def solve(self, key):
+        """Distribution over (outcome label, rounds played) from this state."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        self.expanded += 1
+        dist = defaultdict(Fraction)
+        # Every round draws at least one active card, so the recursion terminates
+        for outcome, p in self.transitions(key).items():
+            if outcome[0] is None:
+                dist[(outcome[1], 1)] += p
+                continue
+            for (label, rounds), q in self.solve(outcome).items():
+                dist[(label, rounds + 1)] += p * q
+        dist = dict(dist)
+        self.cache.put(key, dist)
+        return dist
+
+
+def summarize(dist):
+    """Outcome probabilities, rounds histogram and expected rounds from a solved distribution."""
+    outcomes = defaultdict(Fraction)
+    rounds = defaultdict(Fraction)
+    for (label, r), p in dist.items():
+        outcomes[label] += p
+        rounds[r] += p
+    expected = sum(r * p for r, p in rounds.items())
+    variance = sum(r * r * p for r, p in rounds.items()) - expected * expected
+    return {
+        'outcomes': dict(sorted(outcomes.items(), key=lambda kv: -kv[1])),
+        'rounds_histogram': dict(sorted(rounds.items())),
+        'expected_rounds': expected,
+        'rounds_variance': variance,
+    }
+
+
+def sample_battles(battle, num_players, battles, seed):
+    """Outcome and round-count histograms from the scalar simulator."""
+    location = battle['map']['locations'][0]['id']
+    outcomes = defaultdict(int)
+    rounds = defaultdict(int)
+    for i in range(battles):
+        game = sim.Game(battle, num_players=num_players, seed=sim.game_seed(seed, i))
+        _, played, eliminated = game.run_sequence(location)
+        outcomes['standoff' if eliminated is None else f"{eliminated} eliminated"] += 1
+        rounds[played] += 1
+    return outcomes, rounds
+
+
+def within(exact, observed, se):
+    return abs(observed - exact) <= CHECK_SIGMAS * se if se else observed == exact
+
+
+def check_against_samples(summary, battle, num_players, battles, seed):
+    """Compare sampled frequencies with the exact values. Returns a list of failures."""
+    outcomes, rounds = sample_battles(battle, num_players, battles, seed)
+    failures = []
+    print(f"Check against {battles} sampled battles (tolerance {CHECK_SIGMAS:.0f} standard errors):")
+    rows = [(label, summary['outcomes'], outcomes) for label in sorted(set(outcomes) | set(summary['outcomes']))]
+    rows += [(r, summary['rounds_histogram'], rounds) for r in sorted(set(rounds) | set(summary['rounds_histogram']))]
+    for label, exact_dist, counts in rows:
+        p = float(exact_dist.get(label, 0))
+        observed = counts.get(label, 0) / battles
+        ok = within(p, observed, math.sqrt(p * (1 - p) / battles))
+        name = label if isinstance(label, str) else f"{label} rounds"
+        print(f"  {name:24s} exact {p:8.4f}  sampled {observed:8.4f}  {'ok' if ok else 'FAIL'}")
+        if not ok:
+            failures.append(name)
+
+    expected = float(summary['expected_rounds'])
+    mean_rounds = sum(r * n for r, n in rounds.items()) / battles
+    ok = within(expected, mean_rounds, math.sqrt(float(summary['rounds_variance']) / battles))
+    print(f"  {'mean rounds':24s} exact {expected:8.4f}  sampled {mean_rounds:8.4f}  {'ok' if ok else 'FAIL'}")
+    if not ok:
+        failures.append('mean rounds')
+    return failures
+
+
+def print_report(summary, solver, elapsed):
+    print(f"Solved in {elapsed:.2f}s: {solver.expanded} states, {solver.paths} round paths, "
+          f"cache {solver.cache.hits} hits / {solver.cache.misses} misses / {solver.cache.evictions} evictions")
+    print("Outcomes:")
+    for label, p in summary['outcomes'].items():
+        print(f"  {label:24s} {float(p):8.4f}  ({p})")
+    print(f"Expected rounds: {float(summary['expected_rounds']):.4f}")
+    print("Rounds:")
+    for r, p in summary['rounds_histogram'].items():
+        print(f"  {r:4d} {float(p):8.4f}  {'#' * max(1, round(40 * float(p)))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exact outcome distribution of a small battle.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    parser.add_argument('--location', required=True, help='location whose monsters fight the party')
+    parser.add_argument('--party', required=True, help='comma-separated character names')
+    parser.add_argument('--players', type=int, default=None, help='player count (monster copies)')
+    parser.add_argument('--cache', type=int, default=200_000, help='transposition cache entries')
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help='compare against N sampled simulator battles')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the result as JSON')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+    scenario = sim.load_scenario(args.scenario)
+
+    names = {c['name'] for c in scenario['characters']}
+    party = [n.strip() for n in args.party.split(',') if n.strip()]
+    for name in party:
+        if name not in names:
+            print(f"Error: Unknown character: {name}")
+            sys.exit(1)
+    battle = build_battle(scenario, args.location, party)
+    if not battle['monsters']:
+        print(f"Error: No monsters at {args.location}")
+        sys.exit(1)
+    num_players = args.players or len(party)
+
+    try:
+        solver = ExactSolver(battle, num_players, args.cache)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not solver.has_battle():
+        print(f"Error: No hostile entities at {args.location}")
+        sys.exit(1)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+    start = time.perf_counter()
+    summary = summarize(solver.solve(solver.initial_state()))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({
+            'outcomes': {label: str(p) for label, p in summary['outcomes'].items()},
+            'rounds_histogram': {r: str(p) for r, p in summary['rounds_histogram'].items()},
+            'expected_rounds': str(summary['expected_rounds']),
+            'states': solver.expanded,
+        }, indent=2))
+    else:
+        print_report(summary, solver, elapsed)
+
+    if args.check:
+        failures = check_against_samples(summary, battle, num_players, args.check, args.seed)
+        if failures:
+            print(f"FAILED: {', '.join(failures)}")
+            sys.exit(1)
+        print("All within tolerance")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Goal Fairness - Estimate how attainable each individual goal is per scenario.
+
+GoalTracker::assignGoals deals individual_goals out at random, so every goal
+should be about as attainable as the others on a given map. This plays many
+simulated games (goal_model.TrackedGame, fanned out over a process pool),
+scores every player against every goal and reports per goal:
+
+    P(met)     share of player-games that end with the goal complete
+    E[points]  P(met) x the goal's points
+    progress   mean final progress toward the threshold
+    round      mean round a "gte" goal is first met
+
+Goals met almost always are flagged TRIVIAL and goals almost never met are
+flagged UNREACHABLE. For "gte" goals a threshold is suggested that would be
+met in about --target of player-games, read off the distribution of final
+progress.
+
+Raw playout totals are cached under <scenario dir>/.goal_fairness/, keyed on
+the scenario file's SHA-256, the playout settings and the simulator sources,
+so re-running with other flag levels does not replay games.
+
+Usage:
+    python goal_fairness.py [scenario_file ...] [--games N] [--players N] [--seed N]
+                            [--policy hunt|random|stay] [--max-rounds N]
+                            [--workers N] [--chunk N] [--trivial 0.9]
+                            [--unreachable 0.05] [--target 0.5] [--no-cache] [--json]
+
+With no files, every configs/*.json with individual_goals is analyzed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+from pathlib import Path
+
+import goal_model
+import simulator as sim
+
+
+CONFIGS_DIR = Path(__file__).parent.parent / 'configs'
+CACHE_DIR = '.goal_fairness'
+CACHE_VERSION = 1
+# Sources whose behaviour the cached totals depend on
+MODEL_SOURCES = ('simulator.py', 'goal_model.py')
+
+# Per-worker state set by the pool initializer
+_scenario = None
+_settings = None
+
+
+def cache_key(scenario_path, settings):
+    """Hash of the scenario, the playout settings and the model sources."""
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}".encode('ascii'))
+    h.update(Path(scenario_path).read_bytes())
+    h.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for name in MODEL_SOURCES:
+        h.update((Path(__file__).parent / name).read_bytes())
+    return h.hexdigest()
+
+
+def load_cached(path):
+    """Cached totals with progress histograms restored to Counters, or None."""
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        totals = json.load(f)
+    for entry in totals.values():
+        entry['progress'] = Counter({int(value): n for value, n in entry['progress'].items()})
+    return totals
+
+
+def save_cached(path, totals):
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(totals, f, separators=(',', ':'))
+
+
+def _init_worker(scenario, settings):
+    global _scenario, _settings
+    _scenario = scenario
+    _settings = settings
+
+
+def run_chunk(task):
+    """Worker entry point: play one chunk of games."""
+    first, count = task
+    return goal_model.play(_scenario, count, _settings['players'], _settings['seed'],
+                           _settings['policy'], _settings['max_rounds'], first=first)
+
+
+def playouts(scenario, settings, workers=None, chunk=250):
+    """Accumulate every player against every goal over settings['games'] games."""
+    games = settings['games']
+    tasks = [(first, min(chunk, games - first)) for first in range(0, games, chunk)]
+    totals = goal_model.new_totals(scenario.get('individual_goals', []))
+    with Pool(workers, initializer=_init_worker, initargs=(scenario, settings)) as pool:
+        for chunk_totals in pool.imap_unordered(run_chunk, tasks):
+            goal_model.merge(totals, chunk_totals)
+    return totals
+
+
+def suggest_threshold(histogram, samples, target):
+    """Threshold >= 1 met by the share of player-games nearest target, as (threshold, share)."""
+    best = None
+    at_least = samples
+    for value in range(0, max(histogram, default=0) + 1):
+        if value >= 1:
+            share = at_least / samples
+            if best is None or abs(share - target) < abs(best[1] - target):
+                best = (value, share)
+        at_least -= histogram.get(value, 0)
+    return best
+
+
+def fairness_report(scenario, totals, trivial, unreachable, target):
+    """Per-goal rows with probability, expected points, flags and suggestions."""
+    stats = goal_model.summarize(totals)
+    rows = []
+    for goal in scenario.get('individual_goals', []):
+        goal_id = goal['id']
+        entry = stats[goal_id]
+        points = int(goal.get('points', 1))
+        row = {
+            'goal': goal_id,
+            'track': goal.get('track', ''),
+            'filter': goal.get('filter'),
+            'compare': goal.get('compare', 'gte'),
+            'threshold': int(goal.get('threshold', 1)),
+            'points': points,
+            'probability': entry['completion'],
+            'expected_points': entry['completion'] * points,
+            'mean_progress': entry['mean_progress'],
+            'mean_round_met': entry['mean_round_met'],
+            'flag': None,
+            'suggested_threshold': None,
+        }
+        if entry['completion'] >= trivial:
+            row['flag'] = 'trivial'
+        elif entry['completion'] <= unreachable:
+            row['flag'] = 'unreachable'
+        if row['flag'] and row['compare'] == 'gte' and totals[goal_id]['samples']:
+            suggestion = suggest_threshold(totals[goal_id]['progress'], totals[goal_id]['samples'], target)
+            if suggestion and suggestion[0] != row['threshold']:
+                row['suggested_threshold'] = {'threshold': suggestion[0], 'probability': suggestion[1]}
+        rows.append(row)
+    return rows
+
+
+def print_report(name, rows, games):
+    print(f"{name}: {games} games")
+    print(f"  {'goal':16s} {'threshold':>9s} {'P(met)':>7s} {'E[pts]':>7s} {'progress':>9s} {'round':>6s}")
+    for row in rows:
+        met_round = f"{row['mean_round_met']:.1f}" if row['mean_round_met'] is not None else '-'
+        compare = '=' if row['compare'] == 'equal' else '>='
+        line = (f"  {row['goal']:16s} {compare + str(row['threshold']):>9s} {row['probability']:7.1%} "
+                f"{row['expected_points']:7.2f} {row['mean_progress']:9.2f} {met_round:>6s}")
+        if row['flag']:
+            line += f"  {row['flag'].upper()}"
+            suggestion = row['suggested_threshold']
+            if suggestion:
+                line += f" (try >={suggestion['threshold']}: {suggestion['probability']:.1%})"
+        print(line)
+    expected = [row['expected_points'] for row in rows]
+    if expected:
+        print(f"  Expected points range {min(expected):.2f} - {max(expected):.2f} "
+              f"(spread {max(expected) - min(expected):.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate individual goal fairness from simulated playouts.')
+    parser.add_argument('scenarios', nargs='*', help='scenario files (default: configs/*.json)')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=250, help='games per task')
+    parser.add_argument('--trivial', type=float, default=0.9, help='flag goals met at least this often')
+    parser.add_argument('--unreachable', type=float, default=0.05, help='flag goals met at most this often')
+    parser.add_argument('--target', type=float, default=0.5, help='completion rate suggested thresholds aim for')
+    parser.add_argument('--no-cache', action='store_true', help='always replay games')
+    parser.add_argument('--json', action='store_true', help='print {file: rows} as JSON')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.scenarios] or sorted(CONFIGS_DIR.glob('*.json'))
+    settings = {'games': args.games, 'players': args.players, 'seed': args.seed,
+                'policy': args.policy, 'max_rounds': args.max_rounds}
+    workers = args.workers or os.cpu_count()
+
+    results = {}
+    for path in paths:
+        if not path.exists():
+            print(f"Error: Scenario file not found: {path}")
+            sys.exit(1)
+        scenario = sim.load_scenario(path)
+        if not scenario.get('individual_goals'):
+            if args.scenarios:
+                print(f"Error: Scenario has no individual_goals: {path}")
+                sys.exit(1)
+            continue
+
+        cache_path = path.parent / CACHE_DIR / f"{cache_key(path, settings)}.json"
+        totals = None if args.no_cache else load_cached(cache_path)
+        if totals is None:
+            start = time.perf_counter()
+            totals = playouts(scenario, settings, workers, args.chunk)
+            save_cached(cache_path, totals)
+            if not args.json:
+                print(f"Played {args.games} games of {path.name} on {workers} workers "
+                      f"in {time.perf_counter() - start:.2f}s")
+        elif not args.json:
+            print(f"Using cached playouts for {path.name}")
+
+        rows = fairness_report(scenario, totals, args.trivial, args.unreachable, args.target)
+        results[str(path)] = rows
+        if not args.json:
+            print_report(scenario.get('level_name', path.name), rows, args.games)
+            print()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Goal Model - Offline model of individual goal tracking and completion rates.
+
+GoalEngine mirrors GoalTracker (modules/php/Helpers/GoalTracker.php): the
+scenario's individual_goals are indexed by the (track, filter) event that
+advances them, every tracking event updates the progress of every goal for
+that player, and each location counts once toward locations_visited.
+
+The CLI plays simulator games with an engine attached, so every player is
+scored against every goal rather than only the one assigned, and reports per
+goal how often it is met by the end of a game, the mean final progress and
+the mean round a "gte" goal is first met.
+
+Usage:
+    python goal_model.py [scenario_file] [--games N] [--players N] [--seed N]
+                         [--policy hunt|random|stay] [--max-rounds N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import simulator as sim
+
+
+def is_met(goal, progress):
+    """Same comparison as GoalTracker::isGoalComplete."""
+    threshold = int(goal.get('threshold', 1))
+    if goal.get('compare', 'gte') == 'equal':
+        return progress == threshold
+    return progress >= threshold
+
+
+class GoalEngine:
+    """Incremental progress of every goal for every player."""
+
+    def __init__(self, goals):
+        self.goals = {goal['id']: goal for goal in goals}
+        self.index = {}
+        for goal in goals:
+            track = goal.get('track', '')
+            key = (track, '' if track == sim.TRACK_LOCATIONS_VISITED else goal.get('filter') or '')
+            self.index.setdefault(key, []).append(goal['id'])
+        self.round = 0
+        self.progress = {}
+        self.visited = {}
+        # player_id -> goal_id -> round a gte goal was first met
+        self.met_round = {}
+
+    def player_progress(self, player_id):
+        if player_id not in self.progress:
+            self.progress[player_id] = dict.fromkeys(self.goals, 0)
+            self.visited[player_id] = set()
+            self.met_round[player_id] = {}
+        return self.progress[player_id]
+
+    def track(self, player_id, track_type, track_filter='', amount=1):
+        goal_ids = self.index.get((track_type, track_filter or ''))
+        if goal_ids:
+            self._advance(player_id, goal_ids, amount)
+
+    def visit(self, player_id, location):
+        """Record a location visit; True if it is the player's first."""
+        self.player_progress(player_id)
+        if location in self.visited[player_id]:
+            return False
+        self.visited[player_id].add(location)
+        self._advance(player_id, self.index.get((sim.TRACK_LOCATIONS_VISITED, ''), []), 1)
+        return True
+
+    def _advance(self, player_id, goal_ids, amount):
+        progress = self.player_progress(player_id)
+        met = self.met_round[player_id]
+        for goal_id in goal_ids:
+            progress[goal_id] += amount
+            goal = self.goals[goal_id]
+            if goal_id not in met and goal.get('compare', 'gte') == 'gte' and is_met(goal, progress[goal_id]):
+                met[goal_id] = self.round
+
+    def status(self, player_id):
+        """goal_id -> (progress, met) for one player."""
+        progress = self.player_progress(player_id)
+        return {goal_id: (value, is_met(self.goals[goal_id], value)) for goal_id, value in progress.items()}
+
+
+class TrackedGame(sim.Game):
+    """Simulator game that feeds every tracking event to a GoalEngine."""
+
+    def __init__(self, scenario, **kwargs):
+        self.engine = GoalEngine(scenario.get('individual_goals', []))
+        super().__init__(scenario, **kwargs)
+
+    def track(self, entity, track_type, track_filter=''):
+        super().track(entity, track_type, track_filter)
+        if entity.player_id is not None:
+            self.engine.track(entity.player_id, track_type, track_filter)
+
+    def round_start(self):
+        # Round is incremented at the top of Game.round_start
+        self.engine.round = self.round + 1
+        super().round_start()
+        for entity in self.players():
+            if not entity.is_defeated:
+                self.engine.visit(entity.player_id, entity.location)
+
+
+def new_totals(goals):
+    """Empty per-goal accumulators; progress is a histogram of final values."""
+    return {goal['id']: {'samples': 0, 'met': 0, 'progress': Counter(), 'met_rounds': 0, 'met_early': 0}
+            for goal in goals}
+
+
+def play(scenario, games, num_players=None, seed=0, policy='hunt', max_rounds=200, first=0):
+    """Play games first..first+games-1 and accumulate every player against every goal."""
+    totals = new_totals(scenario.get('individual_goals', []))
+    adjacency = sim.build_adjacency(scenario)
+    for i in range(first, first + games):
+        game = TrackedGame(scenario, num_players=num_players, seed=sim.game_seed(seed, i),
+                           policy=policy, adjacency=adjacency)
+        game.run(max_rounds)
+        for player in game.players():
+            met_round = game.engine.met_round.get(player.player_id, {})
+            for goal_id, (progress, met) in game.engine.status(player.player_id).items():
+                entry = totals[goal_id]
+                entry['samples'] += 1
+                entry['met'] += met
+                entry['progress'][progress] += 1
+                if goal_id in met_round:
+                    entry['met_early'] += 1
+                    entry['met_rounds'] += met_round[goal_id]
+    return totals
+
+
+def merge(totals, other):
+    """Add the accumulators of other into totals."""
+    for goal_id, entry in other.items():
+        target = totals[goal_id]
+        for key in ('samples', 'met', 'met_rounds', 'met_early'):
+            target[key] += entry[key]
+        target['progress'].update(entry['progress'])
+    return totals
+
+
+def summarize(totals):
+    """Per-goal completion rate, mean final progress and mean round met."""
+    stats = {}
+    for goal_id, t in totals.items():
+        samples = t['samples']
+        stats[goal_id] = {
+            'completion': t['met'] / samples if samples else 0.0,
+            'mean_progress': sum(v * n for v, n in t['progress'].items()) / samples if samples else 0.0,
+            'mean_round_met': t['met_rounds'] / t['met_early'] if t['met_early'] else None,
+        }
+    return stats
+
+
+def analyze(scenario, games, num_players=None, seed=0, policy='hunt', max_rounds=200):
+    """Per-goal completion rate, mean progress and mean round met over many games."""
+    return summarize(play(scenario, games, num_players, seed, policy, max_rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Model individual goal completion rates.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='print per-goal stats as JSON')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+
+    scenario = sim.load_scenario(args.scenario)
+    if not scenario.get('individual_goals'):
+        print("Error: Scenario has no individual_goals")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = analyze(scenario, args.games, args.players, args.seed, args.policy, args.max_rounds)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(f"Scenario: {scenario.get('level_name', args.scenario)}")
+    print(f"Games: {args.games} in {elapsed:.2f}s, every player scored against every goal")
+    print(f"  {'goal':16s} {'met':>7s} {'progress':>9s} {'round met':>10s}")
+    for goal_id, entry in stats.items():
+        met_round = f"{entry['mean_round_met']:.1f}" if entry['mean_round_met'] is not None else '-'
+        print(f"  {goal_id:16s} {entry['completion']:7.1%} {entry['mean_progress']:9.2f} {met_round:>10s}")
+
+
+if __name__ == '__main__':
+    main()
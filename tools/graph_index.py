@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Graph Index - Precompute map lookups for scenario files.
+
+Compiles each scenario map into a sidecar index at configs/graph/<name>.json
+holding adjacency lists (respecting "bidirectional"), incident connections,
+all-pairs shortest-path distances, weakly connected components and
+per-terrain / per-direction node sets. The scenario viewer loads it instead
+of recomputing these. The PHP side reads it once, in setupNewGame, and keeps
+only the adjacency in game_state for GameStateHelper::getAdjacentLocations.
+
+The index records the SHA-256 of the scenario it was built from; loaders
+ignore an index whose hash no longer matches.
+
+Usage:
+    python graph_index.py [scenario_file ...] [--check]
+
+With no files, every configs/*.json is indexed. --check only reports stale
+or missing indexes and exits non-zero if there are any.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import deque
+from pathlib import Path
+
+
+INDEX_VERSION = 1
+CONFIGS_DIR = Path(__file__).parent.parent / 'configs'
+
+# Defaults applied by Game::setupNewGame
+DEFAULT_TERRAIN = 'wilderness'
+DEFAULT_DIRECTION = 'center'
+UNREACHABLE = -1
+
+
+def index_path(scenario_path):
+    """Sidecar location for a scenario file."""
+    scenario_path = Path(scenario_path)
+    return scenario_path.parent / 'graph' / scenario_path.name
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_index(scenario, source='', source_hash=''):
+    """Compile a scenario's map into the sidecar index structure."""
+    locations = scenario['map']['locations']
+    connections = scenario['map']['connections']
+    nodes = [loc['id'] for loc in locations]
+    position = {loc_id: i for i, loc_id in enumerate(nodes)}
+    names = {loc['id']: loc['name'] for loc in locations}
+
+    # Same rows and ordering as GameStateHelper::getAdjacentLocations: outgoing
+    # connections, then bidirectional incoming ones, deduplicated by location
+    # with the later row winning.
+    outgoing = {loc_id: [] for loc_id in nodes}
+    incoming = {loc_id: [] for loc_id in nodes}
+    incident = {loc_id: [] for loc_id in nodes}
+    for i, conn in enumerate(connections):
+        src, dst = conn['from'], conn['to']
+        for end in (src, dst):
+            if end not in position:
+                raise ValueError(f"Connection {i} references unknown location: {end}")
+        outgoing[src].append((dst, conn.get('name', '')))
+        if conn.get('bidirectional', True):
+            incoming[dst].append((src, conn.get('name', '')))
+        incident[src].append(i)
+        if dst != src:
+            incident[dst].append(i)
+
+    adjacency = {}
+    for loc_id in nodes:
+        rows = {}
+        for other, name in outgoing[loc_id] + incoming[loc_id]:
+            rows[other] = {'location_id': other, 'connection_name': name,
+                           'location_name': names[other]}
+        adjacency[loc_id] = list(rows.values())
+
+    neighbours = [[position[row['location_id']] for row in adjacency[loc_id]] for loc_id in nodes]
+    distances = [bfs_distances(neighbours, start) for start in range(len(nodes))]
+
+    terrain = {}
+    direction = {}
+    for loc in locations:
+        terrain.setdefault(loc.get('terrain') or DEFAULT_TERRAIN, []).append(loc['id'])
+        direction.setdefault(loc.get('direction') or DEFAULT_DIRECTION, []).append(loc['id'])
+
+    return {
+        'version': INDEX_VERSION,
+        'source': source,
+        'source_sha256': source_hash,
+        'nodes': nodes,
+        'position': position,
+        'adjacency': adjacency,
+        'incident': incident,
+        'distances': distances,
+        'components': weak_components(nodes, connections),
+        'terrain': terrain,
+        'direction': direction,
+    }
+
+
+def bfs_distances(neighbours, start):
+    """Hop counts from start to every node, UNREACHABLE where there is no path."""
+    dist = [UNREACHABLE] * len(neighbours)
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for nxt in neighbours[node]:
+            if dist[nxt] == UNREACHABLE:
+                dist[nxt] = dist[node] + 1
+                queue.append(nxt)
+    return dist
+
+
+def weak_components(nodes, connections):
+    """Connected components ignoring connection direction, largest first."""
+    parent = {loc_id: loc_id for loc_id in nodes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for conn in connections:
+        a, b = find(conn['from']), find(conn['to'])
+        if a != b:
+            parent[b] = a
+
+    groups = {}
+    for loc_id in nodes:
+        groups.setdefault(find(loc_id), []).append(loc_id)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def load_index(scenario_path):
+    """Return the sidecar index for a scenario, or None if missing or stale."""
+    path = index_path(scenario_path)
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        index = json.load(f)
+    if index.get('version') != INDEX_VERSION or index.get('source_sha256') != file_hash(scenario_path):
+        return None
+    return index
+
+
+def compile_scenario(scenario_path):
+    """Build the index for a scenario file from scratch."""
+    with open(scenario_path, 'r') as f:
+        scenario = json.load(f)
+    return build_index(scenario, Path(scenario_path).name, file_hash(scenario_path))
+
+
+def write_index(scenario_path):
+    """Build and write the sidecar for one scenario. Returns (sidecar path, index)."""
+    index = compile_scenario(scenario_path)
+    path = index_path(scenario_path)
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return path, index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute scenario map indexes.')
+    parser.add_argument('scenarios', nargs='*', help='scenario files (default: configs/*.json)')
+    parser.add_argument('--check', action='store_true', help='report stale indexes without writing')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.scenarios] or sorted(CONFIGS_DIR.glob('*.json'))
+    stale = 0
+    for path in paths:
+        if not path.exists():
+            print(f"Error: Scenario file not found: {path}")
+            sys.exit(1)
+        if args.check:
+            if load_index(path) is None:
+                print(f"Stale: {index_path(path)}")
+                stale += 1
+            continue
+        try:
+            out, index = write_index(path)
+        except (ValueError, KeyError) as e:
+            print(f"Error: {path}: {e}")
+            sys.exit(1)
+        print(f"Indexed {path.name}: {len(index['nodes'])} locations, "
+              f"{len(index['components'])} component(s) -> {out}")
+
+    if args.check:
+        print(f"{len(paths) - stale}/{len(paths)} indexes up to date")
+        sys.exit(1 if stale else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Parallel Battles - Resolve a round's independent battles on a worker pool.
+
+Battles at different locations share no entities, but they interact in
+two ways:
+    - a Steal caught by a Watch turns two factions hostile, which changes
+      targeting and has_hostiles in any later battle with either faction
+    - every sequence round expires timed tags on all entities (as
+      TagStore::expire does), so a battle whose participants still carry
+      a hidden/marked/poisoned tag depends on how long earlier battles ran
+battle_groups() joins battles that could interact either way. Every group
+is then independent of the others; the tag expiry a battle causes outside
+its group is applied when the results are merged.
+
+ParallelGame plays like simulator.Game but hands each group to a worker,
+where its battles run in order. It merges the results back in the
+randomized battle order. Every battle runs on an RNG stream of its own
+(Game.battle_order / Game.run_battle), so the outcome is identical to
+playing the battles one after another; new card ids are renumbered in
+battle order to match.
+
+--check plays the same games both ways and fails on the first round whose
+state differs. Without it both are timed and the number of battles and
+independent groups per round is reported.
+
+Usage:
+    python parallel_battles.py [scenario_file] [--games N] [--players N] [--seed N]
+                               [--policy hunt|random|stay] [--max-rounds N]
+                               [--workers N] [--min-groups 2] [--check]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+from pathlib import Path
+
+import simulator as sim
+
+
+TIMED_TAGS = (sim.TAG_HIDDEN, sim.TAG_MARKED, sim.TAG_POISONED)
+
+
+def can_steal(entity):
+    """Whether the entity holds, or could loot, a Steal card."""
+    if any(c.card_type == sim.CARD_STEAL for cards in entity.piles.values() for c in cards):
+        return True
+    return any(item.get('item_data', {}).get('card_type') == sim.CARD_STEAL for item in entity.items)
+
+
+def battle_groups(game, order):
+    """
+    Indices into order (battle_order() pairs) grouped so that no battle can
+    affect a battle of another group. Groups and their members keep the
+    battle order.
+    """
+    factions = []
+    steals = []
+    tagged = []
+    for location, _ in order:
+        participants = game.entities_at(location)
+        factions.append({e.faction for e in participants})
+        steals.append(any(can_steal(e) for e in participants))
+        tagged.append(any(name in TIMED_TAGS for e in participants for name in e.tags))
+
+    parent = list(range(len(order)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for j in range(len(order)):
+        for i in range(j):
+            if tagged[j] or ((steals[i] or steals[j]) and factions[i] & factions[j]):
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i in range(len(order)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values())
+
+
+def subgame(game, locations):
+    """A copy of the game holding only what the battles at the given locations touch."""
+    sub = copy.copy(game)
+    sub.scenario = None
+    sub.locations = {}
+    sub.adjacency = {}
+    sub.pool = None
+    sub.entities = [e for e in game.entities if e.location in locations and not e.is_defeated]
+    sub.progress = {e.player_id: Counter() for e in sub.entities if e.player_id is not None}
+    sub.visited = {}
+    sub.goals = {}
+    sub.faction_matrix = {f: dict(rels) for f, rels in game.faction_matrix.items()}
+    sub.deck = sim.Deck(None)
+    sub.deck.next_card_id = game.deck.next_card_id
+    return sub
+
+
+def run_group(task):
+    """
+    Worker entry point: play one group's battles in order. Returns the
+    group's entities, progress and faction matrix, and per battle the range
+    of card ids it created and the number of sequence rounds it ran.
+    """
+    sub, battles = task
+    played = []
+    for location, seed in battles:
+        first = sub.deck.next_card_id
+        result = sub.run_battle(location, seed)
+        played.append((first, sub.deck.next_card_id, result[1] if result else 0))
+    return sub.entities, sub.progress, sub.faction_matrix, played
+
+
+class ParallelGame(sim.Game):
+    """Simulator game that resolves independent battles on a process pool."""
+
+    def __init__(self, scenario, pool=None, min_groups=2, **kwargs):
+        self.pool = pool
+        self.min_groups = min_groups
+        # Battles and independent groups per round, for the report
+        self.battle_stats = []
+        super().__init__(scenario, **kwargs)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['pool'] = None
+        return state
+
+    def play_round(self):
+        self.round_start()
+        self.resolve_moves()
+        order = self.battle_order()
+        groups = battle_groups(self, order)
+        self.battle_stats.append((len(order), len(groups)))
+
+        if self.pool is None or len(groups) < self.min_groups:
+            for location, seed in order:
+                self.run_battle(location, seed)
+        else:
+            tasks = [(subgame(self, {order[i][0] for i in group}), [order[i] for i in group])
+                     for group in groups]
+            self.merge(order, groups, self.pool.map(run_group, tasks))
+        return self.check_victory()
+
+    def merge(self, order, groups, results):
+        """
+        Fold the groups' results back in: new cards are numbered in battle
+        order, and each entity gets the tag expiry of the battles played
+        after its own in other groups (of every battle, if it fought none).
+        """
+        renumber = [{} for _ in groups]
+        position = {i: (g, k) for g, group in enumerate(groups) for k, i in enumerate(group)}
+        rounds = []
+        for i in range(len(order)):
+            g, k = position[i]
+            first, end, played = results[g][3][k]
+            rounds.append((g, played))
+            for card_id in range(first, end):
+                renumber[g][card_id] = self.deck.next_card_id
+                self.deck.next_card_id += 1
+        battle_at = {location: i for i, (location, _) in enumerate(order)}
+
+        index = {e.entity_id: n for n, e in enumerate(self.entities)}
+        merged = set()
+        before = {f: dict(rels) for f, rels in self.faction_matrix.items()}
+        for g, (entities, progress, matrix, _) in enumerate(results):
+            for entity in entities:
+                for cards in entity.piles.values():
+                    for card in cards:
+                        card.card_id = renumber[g].get(card.card_id, card.card_id)
+                later = max((n for other, n in rounds[battle_at[entity.location] + 1:] if other != g), default=0)
+                if later:
+                    self.clear_expired_tags(later, [entity])
+                self.entities[index[entity.entity_id]] = entity
+                merged.add(entity.entity_id)
+            for player_id, counts in progress.items():
+                self.progress[player_id].update(counts)
+            # Groups never change the same faction pair
+            for faction, rels in matrix.items():
+                for other, relationship in rels.items():
+                    if before.get(faction, {}).get(other) != relationship:
+                        self.faction_matrix[faction][other] = relationship
+
+        longest = max(n for _, n in rounds)
+        if longest:
+            self.clear_expired_tags(longest, [e for e in self.entities if e.entity_id not in merged])
+
+
+def game_state(game):
+    """Everything a round can change, for comparing two games."""
+    entities = []
+    for e in game.entities:
+        entities.append((
+            e.entity_id, e.location, e.is_defeated,
+            tuple((c.card_id, c.card_type, c.pile, c.order)
+                  for pile in sim.PILES for c in sorted(e.piles[pile], key=lambda c: (c.order, c.card_id))),
+            repr(e.items), tuple(sorted((name, tuple(value)) for name, value in e.tags.items())),
+        ))
+    return (
+        game.round, tuple(entities), repr(sorted(game.faction_matrix.items())),
+        tuple(sorted((pid, tuple(sorted(counts.items()))) for pid, counts in game.progress.items())),
+        game.deck.next_card_id, game.rng.getstate(),
+    )
+
+
+def check(scenario, games, num_players, seed, policy, max_rounds, pool, min_groups):
+    """Play each game serially and in parallel in lockstep; the first difference or None."""
+    adjacency = sim.build_adjacency(scenario)
+    for i in range(games):
+        game_seed = sim.game_seed(seed, i)
+        serial = sim.Game(scenario, num_players=num_players, seed=game_seed, policy=policy, adjacency=adjacency)
+        parallel = ParallelGame(scenario, pool=pool, min_groups=min_groups, num_players=num_players,
+                                seed=game_seed, policy=policy, adjacency=adjacency)
+        outcome = None
+        while outcome is None and serial.round < max_rounds:
+            outcome = serial.play_round()
+            if parallel.play_round() != outcome or game_state(parallel) != game_state(serial):
+                return f"game {i} (seed {game_seed}) differs after round {serial.round}"
+    return None
+
+
+def timed(scenario, games, num_players, seed, policy, max_rounds, pool, min_groups):
+    """Seconds to play the games, and the per-round battle stats when parallel."""
+    adjacency = sim.build_adjacency(scenario)
+    stats = []
+    start = time.perf_counter()
+    for i in range(games):
+        kwargs = dict(num_players=num_players, seed=sim.game_seed(seed, i), policy=policy, adjacency=adjacency)
+        if pool is None:
+            sim.Game(scenario, **kwargs).run(max_rounds)
+        else:
+            game = ParallelGame(scenario, pool=pool, min_groups=min_groups, **kwargs)
+            game.run(max_rounds)
+            stats.extend(game.battle_stats)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve independent battles on a worker pool.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'outland_valley.json'))
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--min-groups', type=int, default=2,
+                        help='independent groups needed before a round uses the pool')
+    parser.add_argument('--check', action='store_true', help='compare against serial play instead of timing')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+    scenario = sim.load_scenario(args.scenario)
+    settings = (scenario, args.games, args.players, args.seed, args.policy, args.max_rounds)
+    workers = args.workers or os.cpu_count()
+
+    with Pool(workers) as pool:
+        if args.check:
+            error = check(*settings, pool, args.min_groups)
+            if error:
+                print(f"Error: {error}")
+                sys.exit(1)
+            print(f"OK: {args.games} games identical serially and on {workers} workers")
+            return
+
+        serial, _ = timed(*settings, None, args.min_groups)
+        parallel, stats = timed(*settings, pool, args.min_groups)
+
+    rounds = [s for s in stats if s[0]]
+    print(f"Scenario: {scenario.get('level_name', args.scenario)}, {args.games} games")
+    if rounds:
+        print(f"Rounds with battles: {len(rounds)}, "
+              f"mean {sum(b for b, _ in rounds) / len(rounds):.2f} battles "
+              f"in {sum(g for _, g in rounds) / len(rounds):.2f} independent groups, "
+              f"max {max(b for b, _ in rounds)} battles")
+    print(f"Serial:   {serial:.2f}s")
+    print(f"Parallel: {parallel:.2f}s on {workers} workers ({serial / parallel:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Profile Report - Aggregate QueryProfiler dumps and flag regressions.
+
+With the ZOOMQUEST_PROFILE_QUERIES environment variable set to a file (or
+to 1 for <tmp>/zoomquest_profile.jsonl; see PROFILE_QUERIES_ENV in
+modules/php/constants.inc.php), or with
+`php tools/query_harness.php --profile FILE`, every request (harness: every
+sequence round) appends one JSON line to a profile file:
+
+    {"zqprofile": 1, "round": 3, "wall_us": 18211,
+     "states": {"SequenceResolve": {"queries": 41, "rows": 60, "us": 5120}, ...},
+     "methods": {"Deck::destroyOneCard": {...}, ...},
+     "stacks": {"SequenceResolve::onEnteringState;ActionSequenceResolver::resolveRound;
+                Deck::discard;DbQuery": {...}, ...}}
+
+Each file given on the command line is one run. Totals are averaged per
+round (distinct "round" values of a run; records without one count once
+each) so runs of different lengths compare.
+
+Usage:
+    python profile_report.py summary PROFILE [...] [--by state|method|stack] [--top N] [--json]
+    python profile_report.py fold PROFILE [...] [--metric us|queries|rows] > profile.folded
+    python profile_report.py baseline PROFILE [...] --output baseline.json
+    python profile_report.py compare PROFILE [...] [--baseline baseline.json]
+                             [--threshold 0.10] [--time-threshold 0.25]
+
+`fold` writes folded stacks ("frame;frame;query value" per line) for
+flamegraph.pl, speedscope or inferno. `compare` exits with status 1 when a
+state or method issues more queries per round than the baseline (beyond
+--threshold) or takes longer (beyond --time-threshold).
+
+profiles/outland_valley_3p.jsonl is a sample: a full 3-player Outland
+Valley game (14 rounds, 3 battles, step by step) recorded with the variable
+set. profiles/baseline.json, the default for `compare`, was saved from it.
+Its times come from a development machine, so only compare query times
+from similar setups.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+DEFAULT_BASELINE = Path(__file__).parent / 'profiles' / 'baseline.json'
+
+METRICS = ('queries', 'rows', 'us')
+GROUPS = {'state': 'states', 'method': 'methods', 'stack': 'stacks'}
+
+# Differences smaller than this are noise whatever the ratio
+MIN_QUERY_DELTA = 0.5
+MIN_TIME_DELTA_US = 200
+
+
+def read_profile(path):
+    """Records of one profile file, skipping anything that is not a profile line."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('zqprofile') == 1:
+                records.append(record)
+    return records
+
+
+def aggregate(paths):
+    """Sum every group over all runs; returns (totals, rounds, wall_us)."""
+    totals = {group: {} for group in GROUPS.values()}
+    rounds = 0
+    wall_us = 0
+    for path in paths:
+        records = read_profile(path)
+        rounds += len({r['round'] for r in records if r.get('round') is not None})
+        rounds += sum(1 for r in records if r.get('round') is None)
+        for record in records:
+            wall_us += record.get('wall_us', 0)
+            for group in GROUPS.values():
+                for key, entry in record.get(group, {}).items():
+                    target = totals[group].setdefault(key, dict.fromkeys(METRICS, 0))
+                    for metric in METRICS:
+                        target[metric] += entry.get(metric, 0)
+    return totals, rounds, wall_us
+
+
+def per_round(totals, rounds):
+    """Totals divided by the number of rounds."""
+    rounds = max(1, rounds)
+    return {group: {key: {m: entry[m] / rounds for m in METRICS} for key, entry in entries.items()}
+            for group, entries in totals.items()}
+
+
+def print_summary(totals, rounds, wall_us, group, top):
+    means = per_round(totals, rounds)[GROUPS[group]]
+    entries = sorted(means.items(), key=lambda kv: kv[1]['us'], reverse=True)
+    all_queries = sum(e['queries'] for e in means.values())
+    all_us = sum(e['us'] for e in means.values()) or 1
+
+    print(f"{rounds} rounds, {all_queries:.1f} queries/round, "
+          f"{all_us / 1000:.2f}ms query time/round, {wall_us / max(1, rounds) / 1000:.2f}ms wall/round")
+    print()
+    width = min(90, max([len(group)] + [len(k) for k, _ in entries[:top]]))
+    print(f"{group:<{width}} {'queries':>9} {'rows':>9} {'ms':>8} {'time%':>6}")
+    for key, entry in entries[:top]:
+        name = key if len(key) <= width else '...' + key[-(width - 3):]
+        print(f"{name:<{width}} {entry['queries']:>9.1f} {entry['rows']:>9.1f} "
+              f"{entry['us'] / 1000:>8.2f} {entry['us'] / all_us * 100:>5.1f}%")
+    if len(entries) > top:
+        print(f"... {len(entries) - top} more")
+
+
+def compare(current, baseline, threshold, time_threshold):
+    """Regressions of per-round means against a baseline, as printable lines."""
+    problems = []
+    for group in ('states', 'methods'):
+        for key, now in current[group].items():
+            base = baseline[group].get(key)
+            if base is None:
+                if now['queries'] >= MIN_QUERY_DELTA:
+                    problems.append(f"{group[:-1]} {key}: new, {now['queries']:.1f} queries/round")
+                continue
+            delta = now['queries'] - base['queries']
+            if delta >= MIN_QUERY_DELTA and delta > base['queries'] * threshold:
+                problems.append(f"{group[:-1]} {key}: queries/round "
+                                f"{base['queries']:.1f} -> {now['queries']:.1f}")
+            delta = now['us'] - base['us']
+            if delta >= MIN_TIME_DELTA_US and delta > base['us'] * time_threshold:
+                problems.append(f"{group[:-1]} {key}: ms/round "
+                                f"{base['us'] / 1000:.2f} -> {now['us'] / 1000:.2f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate ZoomQuest query profiles.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary = commands.add_parser('summary', help='per-round means by state, method or stack')
+    summary.add_argument('profiles', nargs='+')
+    summary.add_argument('--by', choices=list(GROUPS), default='state')
+    summary.add_argument('--top', type=int, default=20)
+    summary.add_argument('--json', action='store_true', help='print the per-round means as JSON')
+
+    fold = commands.add_parser('fold', help='write folded stacks for flame graph tools')
+    fold.add_argument('profiles', nargs='+')
+    fold.add_argument('--metric', choices=METRICS, default='us')
+
+    baseline = commands.add_parser('baseline', help='save per-round means as a baseline')
+    baseline.add_argument('profiles', nargs='+')
+    baseline.add_argument('--output', required=True)
+
+    check = commands.add_parser('compare', help='flag regressions against a baseline')
+    check.add_argument('profiles', nargs='+')
+    check.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    check.add_argument('--threshold', type=float, default=0.10,
+                       help='allowed relative increase in queries per round')
+    check.add_argument('--time-threshold', type=float, default=0.25,
+                       help='allowed relative increase in query time per round')
+
+    args = parser.parse_args()
+
+    for path in args.profiles:
+        if not Path(path).exists():
+            print(f"Error: Profile not found: {path}")
+            sys.exit(1)
+
+    totals, rounds, wall_us = aggregate(args.profiles)
+    if rounds == 0:
+        print("Error: No profile records found")
+        sys.exit(1)
+
+    if args.command == 'summary':
+        if args.json:
+            print(json.dumps({'rounds': rounds, **per_round(totals, rounds)}, indent=2))
+        else:
+            print_summary(totals, rounds, wall_us, args.by, args.top)
+    elif args.command == 'fold':
+        for stack, entry in sorted(totals['stacks'].items()):
+            if entry[args.metric]:
+                print(f"{stack} {entry[args.metric]}")
+    elif args.command == 'baseline':
+        means = per_round(totals, rounds)
+        data = {'rounds': rounds, 'states': means['states'], 'methods': means['methods']}
+        Path(args.output).write_text(json.dumps(data, indent=2) + '\n')
+        print(f"Saved baseline of {rounds} rounds to {args.output}")
+    else:
+        if not Path(args.baseline).exists():
+            print(f"Error: Baseline not found: {args.baseline}")
+            sys.exit(1)
+        base = json.loads(Path(args.baseline).read_text())
+        problems = compare(per_round(totals, rounds), base, args.threshold, args.time_threshold)
+        for problem in problems:
+            print(f"  REGRESSION {problem}")
+        print('OK' if not problems else f"{len(problems)} regression(s)")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,692 @@
+#!/usr/bin/env php
+<?php
+/**
+ * Query Harness - Count SQL queries per action sequence round.
+ *
+ * Runs the real Deck / TagStore / ActionSequenceResolver / GoalTracker helpers
+ * against a local database (SQLite by default, MySQL with --dsn) and drives one
+ * action sequence the way the Sequence* states do, counting the queries each
+ * state issues per round. The framework is replaced by a small PDO-backed game
+ * object; the SQLite connection rewrites the few MySQL-only constructs the
+ * helpers use (ON DUPLICATE KEY UPDATE, RAND(), LAST_INSERT_ID(), addslashes()
+ * escapes in string literals).
+ *
+ * Usage:
+ *     php tools/query_harness.php [--scenario configs/outland_valley.json]
+ *         [--location goblin_warren[,marsh_ruins...]] [--players 3] [--seed 1] [--rounds 50]
+ *         [--src modules/php] [--dsn sqlite::memory:] [--user U] [--password P]
+ *         [--profile FILE] [--auto | --verify] [--dump FILE] [--no-random] [--json]
+ *
+ * To compare against an older revision, check it out next to the tree and
+ * point --src at it:
+ *     git worktree add /tmp/zq-base <rev>
+ *     php tools/query_harness.php --src /tmp/zq-base/modules/php
+ *     php tools/query_harness.php
+ *
+ * Helpers without loadSequence()/flush() run uncached, as they did before the
+ * in-request cache existed. SQLite upserts need SQLite 3.35 or later.
+ *
+ * --dump writes the rows the sequence changed (cards, tags, defeats, items,
+ * participants, goal progress) to FILE as JSON once it is over, and in step
+ * mode the entity_tag rows after every round, so two trees can be compared
+ * with diff (a tree from before the tag store expires tags with SQL DELETEs):
+ *     php tools/query_harness.php --src /tmp/zq-base/modules/php --dump base.json
+ *     php tools/query_harness.php --dump new.json
+ *     diff base.json new.json
+ * Older trees pick cards with ORDER BY RAND(), newer ones with shuffle() and
+ * array_rand() on cached rows, so the same seed still plays differently; add
+ * --no-random to both runs to replace every random choice with the lowest id
+ * (see query_harness_no_random.php) and the dumps must then be identical.
+ * A run also fails if a state leaves unflushed card, tag, participant or goal
+ * changes behind in the cached helpers.
+ *
+ * --profile wraps the helpers in Helpers/QueryProfiler and appends one record
+ * per round to FILE (read it with tools/profile_report.py).
+ *
+ * --auto resolves the sequence the way SequenceAutoResolve does (one load, every
+ * round in memory, one flush) and counts its queries. --verify plays the same
+ * battle from the same seed (default 1) both ways on two fresh in-memory
+ * databases and fails unless cards, tags, defeats, items and goal progress
+ * end up identical.
+ *
+ * With --auto or --verify, --location also takes a comma-separated list. The
+ * players are dealt out over those locations in turn, and the battles are
+ * resolved in list order, as in one game round. Step by step, they are played
+ * one after the other and each finished sequence is closed (SequenceCleanup).
+ * Auto-resolve makes one resolveLocations() call (SequenceAutoResolve). Tags
+ * are shared by all entities, so the order of the battles matters.
+ */
+
+declare(strict_types=1);
+
+// Harness phase => the state class that runs it
+const STATES = [
+    'draw' => 'SequenceDrawCards',
+    'resolve' => 'SequenceResolve',
+    'round_end' => 'SequenceRoundEnd',
+];
+
+/**
+ * Minimal stand-in for the BGA Table: runs queries through PDO and counts them
+ */
+class HarnessGame
+{
+    public string $phase = 'setup';
+    public array $counts = [];
+    /** What helpers created here query through (the game, or a QueryProfiler around it) */
+    public $queryTarget = null;
+    /** --no-random: ORDER BY RAND() becomes ORDER BY card_id */
+    public bool $noRandom = false;
+
+    private PDO $pdo;
+    private bool $sqlite;
+    private int $affectedRows = 0;
+    private $goalTracker = null;
+    private $gameStateHelper = null;
+
+    public function __construct(PDO $pdo)
+    {
+        $this->pdo = $pdo;
+        $this->sqlite = $pdo->getAttribute(PDO::ATTR_DRIVER_NAME) === 'sqlite';
+    }
+
+    public function DbQuery(string $sql): void
+    {
+        $this->count('writes');
+        $this->affectedRows = (int)$this->pdo->exec($this->translate($sql));
+    }
+
+    public function DbAffectedRow(): int
+    {
+        return $this->affectedRows;
+    }
+
+    public function DbGetLastId(): int
+    {
+        return (int)$this->pdo->lastInsertId();
+    }
+
+    public function getObjectListFromDB(string $sql, bool $bUniqueValue = false): array
+    {
+        $this->count('reads');
+        $rows = $this->pdo->query($this->translate($sql))->fetchAll(PDO::FETCH_ASSOC);
+        return $bUniqueValue ? array_map(fn($r) => reset($r), $rows) : $rows;
+    }
+
+    public function getObjectFromDB(string $sql): ?array
+    {
+        $this->count('reads');
+        $row = $this->pdo->query($this->translate($sql))->fetch(PDO::FETCH_ASSOC);
+        return $row ?: null;
+    }
+
+    public function getUniqueValueFromDB(string $sql)
+    {
+        $this->count('reads');
+        $value = $this->pdo->query($this->translate($sql))->fetchColumn();
+        return $value === false ? null : $value;
+    }
+
+    public function getCollectionFromDb(string $sql, bool $bSingleValue = false): array
+    {
+        $this->count('reads');
+        $result = [];
+        foreach ($this->pdo->query($this->translate($sql))->fetchAll(PDO::FETCH_ASSOC) as $row) {
+            $key = reset($row);
+            $result[$key] = $bSingleValue ? next($row) : $row;
+        }
+        return $result;
+    }
+
+    public function loadPlayersBasicInfos(): array
+    {
+        return [];
+    }
+
+    public function getGoalTracker()
+    {
+        if ($this->goalTracker === null) {
+            $this->goalTracker = new \Bga\Games\Zoomquest\Helpers\GoalTracker($this->queryTarget ?? $this);
+        }
+        return $this->goalTracker;
+    }
+
+    public function getGameStateHelper()
+    {
+        if ($this->gameStateHelper === null) {
+            $this->gameStateHelper = new \Bga\Games\Zoomquest\Helpers\GameStateHelper($this->queryTarget ?? $this);
+        }
+        return $this->gameStateHelper;
+    }
+
+    /**
+     * Run schema statements without counting them
+     */
+    public function createSchema(string $dbmodel): void
+    {
+        foreach (explode(';', $dbmodel) as $statement) {
+            $statement = trim(preg_replace('/^--.*$/m', '', $statement));
+            if (stripos($statement, 'CREATE TABLE') !== 0) {
+                continue;
+            }
+            if ($this->sqlite) {
+                $statement = preg_replace('/,\s*(UNIQUE\s+)?KEY\s*(`\w+`\s*)?\([^)]*\)/i', '', $statement);
+                $statement = preg_replace('/\)\s*ENGINE=.*$/is', ')', $statement);
+                $statement = preg_replace('/\b(tiny)?int\(\d+\)(\s+unsigned)?/i', 'INTEGER', $statement);
+                $statement = preg_replace('/\benum\([^)]*\)/i', 'TEXT', $statement);
+                $statement = preg_replace('/\s+AUTO_INCREMENT\b/i', '', $statement);
+            }
+            $this->pdo->exec($statement);
+        }
+    }
+
+    private function count(string $kind): void
+    {
+        $this->counts[$this->phase][$kind] = ($this->counts[$this->phase][$kind] ?? 0) + 1;
+    }
+
+    private function translate(string $sql): string
+    {
+        if (!$this->sqlite) {
+            return $sql;
+        }
+
+        // MySQL backslash escapes (addslashes) become SQLite's doubled quotes
+        $sql = preg_replace_callback("/'((?:[^'\\\\]|\\\\.)*)'/s", function ($m) {
+            return "'" . str_replace("'", "''", stripslashes($m[1])) . "'";
+        }, $sql);
+        $sql = str_ireplace(['RAND()', 'LAST_INSERT_ID()'], [$this->noRandom ? 'card_id' : 'RANDOM()', 'last_insert_rowid()'], $sql);
+        $parts = preg_split('/ON DUPLICATE KEY UPDATE/i', $sql, 2);
+        if (count($parts) === 2) {
+            $sql = $parts[0] . 'ON CONFLICT DO UPDATE SET'
+                . preg_replace('/\bVALUES\((\w+)\)/i', 'excluded.$1', $parts[1]);
+        }
+        return $sql;
+    }
+}
+
+function fail(string $message): void
+{
+    fwrite(STDERR, "Error: $message\n");
+    exit(1);
+}
+
+/**
+ * Insert the map, the chosen characters dealt out over the locations, and the
+ * monsters at those locations
+ */
+function setupBattle(HarnessGame $game, $deck, array $config, array $locations, int $players): void
+{
+    $game->DbQuery(
+        "INSERT INTO game_state (state_key, state_value)
+         VALUES ('faction_matrix', '" . addslashes(json_encode($config['factions']['matrix'] ?? [])) . "')"
+    );
+
+    foreach ($config['map']['locations'] as $loc) {
+        $id = addslashes($loc['id']);
+        $name = addslashes($loc['name']);
+        $game->DbQuery("INSERT INTO location (location_id, location_name) VALUES ('$id', '$name')");
+    }
+
+    foreach (array_slice($config['characters'], 0, $players) as $index => $character) {
+        $loc = addslashes($locations[$index % count($locations)]);
+        $name = addslashes($character['name']);
+        $class = addslashes($character['class']);
+        $faction = addslashes($character['faction'] ?? 'players');
+        $playerId = 1000 + $index;
+        $game->DbQuery(
+            "INSERT INTO entity (entity_type, player_id, entity_name, entity_class, faction, location_id, is_defeated)
+             VALUES ('player', $playerId, '$name', '$class', '$faction', '$loc', 0)"
+        );
+        $entityId = $game->DbGetLastId();
+        $deck->createDeck($entityId, $character['decks']['active']);
+        $deck->shuffleActive($entityId);
+    }
+
+    // One monster copy per player, as in setupNewGame
+    foreach ($config['monsters'] as $monster) {
+        if (!in_array($monster['location'], $locations, true)) {
+            continue;
+        }
+        $loc = addslashes($monster['location']);
+        for ($i = 0; $i < $players; $i++) {
+            $name = addslashes($players > 1 ? $monster['name'] . ' ' . ($i + 1) : $monster['name']);
+            $class = addslashes($monster['class']);
+            $faction = addslashes($monster['faction'] ?? 'monsters');
+            $game->DbQuery(
+                "INSERT INTO entity (entity_type, player_id, entity_name, entity_class, faction, location_id, is_defeated)
+                 VALUES ('monster', NULL, '$name', '$class', '$faction', '$loc', 0)"
+            );
+            $entityId = $game->DbGetLastId();
+            $deck->createDeck($entityId, $monster['decks']['active']);
+            $deck->shuffleActive($entityId);
+            foreach ($monster['items'] ?? [] as $item) {
+                $itemName = addslashes($item['name']);
+                $itemType = addslashes($item['type']);
+                $itemData = addslashes(json_encode($item['data'] ?? []));
+                $game->DbQuery(
+                    "INSERT INTO item (entity_id, item_name, item_type, item_data)
+                     VALUES ($entityId, '$itemName', '$itemType', '$itemData')"
+                );
+            }
+        }
+    }
+}
+
+/**
+ * Fail if a state returned with changes still held by the cached helpers
+ */
+function assertFlushed(HarnessGame $game, $resolver, string $state): void
+{
+    $pending = [];
+    if (method_exists($resolver, 'hasPendingWrites') && $resolver->hasPendingWrites()) {
+        $pending[] = 'cards, tags or participants';
+    }
+    $goalTracker = $game->getGoalTracker();
+    if (method_exists($goalTracker, 'hasPendingWrites') && $goalTracker->hasPendingWrites()) {
+        $pending[] = 'goal progress';
+    }
+    if ($pending) {
+        fail("$state returned without flushing its " . implode(' and ', $pending));
+    }
+}
+
+/**
+ * Drive one sequence through SequenceDrawCards / SequenceResolve / SequenceRoundEnd
+ * @return array Per-round query counts, plus the entity_tag rows left after each
+ *               round when $withTags is set
+ */
+function runSequence(HarnessGame $game, $resolver, $profiler, int $sequenceId, int $maxRounds, bool $withTags = false): array
+{
+    $enter = function (string $phase) use ($game, $profiler) {
+        $game->phase = $phase;
+        if ($profiler) {
+            $profiler->setContext(STATES[$phase]);
+        }
+    };
+
+    $cached = method_exists($resolver, 'loadSequence');
+
+    $rounds = [];
+    for ($round = 1; $round <= $maxRounds; $round++) {
+        $game->counts = [];
+
+        $enter('draw');
+        if ($cached) {
+            $resolver->loadSequence($sequenceId);
+        }
+        $drawn = $resolver->drawCardsForSequence($sequenceId, $round);
+        if ($cached) {
+            $resolver->flush();
+        }
+        assertFlushed($game, $resolver, STATES['draw']);
+
+        if (!empty($drawn)) {
+            $enter('resolve');
+            if ($cached) {
+                $resolver->loadSequence($sequenceId);
+            }
+            $resolver->resolveRound($sequenceId, $round);
+            if ($cached) {
+                $resolver->flush();
+            }
+            assertFlushed($game, $resolver, STATES['resolve']);
+        }
+
+        $enter('round_end');
+        if ($cached) {
+            $resolver->loadSequence($sequenceId);
+        }
+        $resolver->applyPoisonTicks($sequenceId);
+        $resolver->getParticipantStatus($sequenceId);
+        $over = $resolver->getEliminatedFaction($sequenceId) !== null
+            || $resolver->isEveryoneOutOfCards($sequenceId);
+        if ($cached) {
+            $resolver->flush();
+        }
+        assertFlushed($game, $resolver, STATES['round_end']);
+        if (!$over) {
+            $resolver->resetSequenceRound($sequenceId);
+        }
+
+        if ($profiler) {
+            $profiler->setRound($round);
+            $profiler->dump();
+        }
+
+        $row = ['round' => $round];
+        foreach (array_keys(STATES) as $state) {
+            $row[$state] = [
+                'reads' => $game->counts[$state]['reads'] ?? 0,
+                'writes' => $game->counts[$state]['writes'] ?? 0,
+            ];
+        }
+        if ($withTags) {
+            $game->phase = 'snapshot';
+            $row['entity_tag'] = $game->getObjectListFromDB(
+                "SELECT entity_id, tag_name, tag_value, round_applied FROM entity_tag ORDER BY entity_id, tag_name"
+            );
+        }
+        $rounds[] = $row;
+
+        if ($over) {
+            break;
+        }
+    }
+
+    return $rounds;
+}
+
+$opts = getopt('h', [
+    'scenario:', 'location:', 'players:', 'seed:', 'rounds:',
+    'src:', 'dsn:', 'user:', 'password:', 'profile:', 'auto', 'verify', 'dump:', 'no-random', 'json', 'help',
+]);
+if (isset($opts['h']) || isset($opts['help'])) {
+    echo "Usage: php tools/query_harness.php [--scenario FILE] [--location ID[,ID...]] [--players N]\n"
+        . "           [--seed N] [--rounds N] [--src DIR] [--dsn DSN] [--user U] [--password P]\n"
+        . "           [--profile FILE] [--auto | --verify] [--dump FILE] [--no-random] [--json]\n";
+    exit(0);
+}
+
+$root = dirname(__DIR__);
+$scenarioFile = $opts['scenario'] ?? "$root/configs/outland_valley.json";
+$src = rtrim($opts['src'] ?? "$root/modules/php", '/');
+$players = (int)($opts['players'] ?? 3);
+$maxRounds = (int)($opts['rounds'] ?? 50);
+
+$config = json_decode((string)@file_get_contents($scenarioFile), true);
+if (!is_array($config)) {
+    fail("Cannot read scenario $scenarioFile");
+}
+$location = $opts['location'] ?? ($config['monsters'][0]['location'] ?? '');
+$locations = explode(',', $location);
+foreach ($locations as $id) {
+    if (!in_array($id, array_column($config['map']['locations'], 'id'), true)) {
+        fail("Unknown location: $id");
+    }
+}
+if (count($locations) > 1 && !isset($opts['auto']) && !isset($opts['verify'])) {
+    fail("Several locations need --auto or --verify");
+}
+if (count($locations) > $players) {
+    fail("Every location needs a player: " . count($locations) . " locations, $players players");
+}
+if (isset($opts['no-random'])) {
+    require_once(__DIR__ . '/query_harness_no_random.php');
+}
+foreach (['Helpers/Deck.php', 'Helpers/GameStateHelper.php', 'Helpers/GoalTracker.php', 'Helpers/ActionSequenceResolver.php'] as $file) {
+    if (!is_file("$src/$file")) {
+        fail("$src/$file not found");
+    }
+    require_once("$src/$file");
+}
+// Trees from before the tag store keep tags inside the resolver
+$hasTagStore = is_file("$src/Helpers/TagStore.php");
+if ($hasTagStore) {
+    require_once("$src/Helpers/TagStore.php");
+}
+// The profiler always comes from this tree so older checkouts can be profiled too
+require_once("$root/modules/php/Helpers/QueryProfiler.php");
+
+$dbmodel = file_get_contents(is_file(dirname($src, 2) . '/dbmodel.sql') ? dirname($src, 2) . '/dbmodel.sql' : "$root/dbmodel.sql");
+$auto = isset($opts['auto']) || isset($opts['verify']);
+if ($auto && !method_exists(\Bga\Games\Zoomquest\Helpers\ActionSequenceResolver::class, 'resolveSequence')) {
+    fail("$src has no auto-resolve (ActionSequenceResolver::resolveSequence)");
+}
+if (count($locations) > 1 && !method_exists(\Bga\Games\Zoomquest\Helpers\ActionSequenceResolver::class, 'resolveLocations')) {
+    fail("$src cannot resolve several locations (ActionSequenceResolver::resolveLocations)");
+}
+
+/**
+ * A fresh database with the battle set up, and the helpers that resolve it
+ * @return array [HarnessGame, resolver, QueryProfiler or null, setup query counts]
+ */
+function newBattle(array $opts, array $config, array $locations, int $players, bool $hasTagStore, string $dbmodel): array
+{
+    if (isset($opts['seed'])) {
+        mt_srand((int)$opts['seed']);
+    }
+
+    $pdo = new PDO($opts['dsn'] ?? 'sqlite::memory:', $opts['user'] ?? null, $opts['password'] ?? null, [
+        PDO::ATTR_ERRMODE => PDO::ERRMODE_EXCEPTION,
+        PDO::ATTR_STRINGIFY_FETCHES => true,
+    ]);
+    $game = new HarnessGame($pdo);
+    $game->noRandom = isset($opts['no-random']);
+    $game->createSchema($dbmodel);
+
+    setupBattle($game, new \Bga\Games\Zoomquest\Helpers\Deck($game), $config, $locations, $players);
+
+    // Helpers see the profiler in place of the game when profiling
+    $profiler = null;
+    if (isset($opts['profile'])) {
+        $profiler = new \Bga\Games\Zoomquest\Helpers\QueryProfiler($game, $opts['profile']);
+        $profiler->setContext('setup');
+        $game->queryTarget = $profiler;
+    }
+    $db = $profiler ?? $game;
+    $deck = new \Bga\Games\Zoomquest\Helpers\Deck($db);
+    $resolver = $hasTagStore
+        ? new \Bga\Games\Zoomquest\Helpers\ActionSequenceResolver($db, $deck, new \Bga\Games\Zoomquest\Helpers\TagStore($db))
+        : new \Bga\Games\Zoomquest\Helpers\ActionSequenceResolver($db, $deck);
+    if ($profiler) {
+        $profiler->setRound(0);
+        $profiler->dump();
+    }
+
+    return [$game, $resolver, $profiler, $game->counts['setup']];
+}
+
+/**
+ * Resolve one sequence the way SequenceAutoResolve does: one load, every round, one flush
+ * @return array Rounds played and the query counts of the whole battle
+ */
+function runAutoSequence(HarnessGame $game, $resolver, $profiler, string $location, int $maxRounds): array
+{
+    $sequenceId = $resolver->createSequence($location);
+
+    $game->counts = [];
+    $game->phase = 'auto';
+    if ($profiler) {
+        $profiler->setContext('SequenceAutoResolve');
+    }
+    $resolver->loadSequence($sequenceId);
+    $result = $resolver->resolveSequence($sequenceId, 0, $maxRounds);
+    $resolver->flush();
+    assertFlushed($game, $resolver, 'SequenceAutoResolve');
+
+    if ($profiler) {
+        $profiler->setRound(count($result['rounds']));
+        $profiler->dump();
+    }
+
+    return [
+        'rounds' => count($result['rounds']),
+        'reads' => $game->counts['auto']['reads'] ?? 0,
+        'writes' => $game->counts['auto']['writes'] ?? 0,
+    ];
+}
+
+/**
+ * Play the battles at several locations step by step, in order, closing each
+ * finished sequence as SequenceCleanup does; stops after one that is not over
+ * @return int Rounds played
+ */
+function runBattles(HarnessGame $game, $resolver, $profiler, array $locations, int $maxRounds): int
+{
+    $rounds = 0;
+    foreach ($locations as $location) {
+        $sequenceId = $resolver->createSequence($location);
+        $rounds += count(runSequence($game, $resolver, $profiler, $sequenceId, $maxRounds));
+
+        $game->phase = 'cleanup';
+        $resolver->loadSequence($sequenceId);
+        $over = $resolver->getEliminatedFaction($sequenceId) !== null || $resolver->isEveryoneOutOfCards($sequenceId);
+        $resolver->flush();
+        if (!$over) {
+            break;
+        }
+        $resolver->endSequence($sequenceId);
+    }
+    return $rounds;
+}
+
+/**
+ * Resolve the battles at several locations the way SequenceAutoResolve does:
+ * one resolveLocations() call, one flush
+ * @return array Battles and rounds played, and the query counts of all of them
+ */
+function runAutoLocations(HarnessGame $game, $resolver, $profiler, array $locations, int $maxRounds): array
+{
+    $game->counts = [];
+    $game->phase = 'auto';
+    if ($profiler) {
+        $profiler->setContext('SequenceAutoResolve');
+    }
+    $battles = $resolver->resolveLocations($locations, $maxRounds);
+    $resolver->flush();
+    assertFlushed($game, $resolver, 'SequenceAutoResolve');
+
+    $rounds = array_sum(array_map(fn($battle) => count($battle['rounds']), $battles));
+    if ($profiler) {
+        $profiler->setRound($rounds);
+        $profiler->dump();
+    }
+
+    return [
+        'battles' => count($battles),
+        'rounds' => $rounds,
+        'reads' => $game->counts['auto']['reads'] ?? 0,
+        'writes' => $game->counts['auto']['writes'] ?? 0,
+    ];
+}
+
+/**
+ * The rows a sequence can change, for comparing two runs
+ */
+function snapshot(HarnessGame $game): array
+{
+    $game->phase = 'snapshot';
+    return [
+        'card' => $game->getObjectListFromDB("SELECT card_id, entity_id, card_type, card_pile, card_order FROM card ORDER BY card_id"),
+        'entity' => $game->getObjectListFromDB("SELECT entity_id, is_defeated FROM entity ORDER BY entity_id"),
+        'entity_tag' => $game->getObjectListFromDB("SELECT entity_id, tag_name, tag_value, round_applied FROM entity_tag ORDER BY entity_id, tag_name"),
+        'item' => $game->getObjectListFromDB("SELECT item_id, entity_id, item_name FROM item ORDER BY item_id"),
+        'sequence_participant' => $game->getObjectListFromDB(
+            "SELECT entity_id, drawn_card_id, target_entity_id, block_count, is_resolved FROM sequence_participant ORDER BY entity_id"
+        ),
+        'goal_progress' => $game->getObjectListFromDB("SELECT player_id, track_type, track_filter, progress FROM goal_progress ORDER BY player_id, track_type, track_filter"),
+    ];
+}
+
+/**
+ * Write --dump if asked for (with the tags after every round of a step-by-step run)
+ */
+function finish(HarnessGame $game, $resolver, array $opts, array $rounds = []): void
+{
+    if (isset($opts['dump'])) {
+        $counts = $game->counts;
+        $dump = snapshot($game);
+        foreach ($rounds as $row) {
+            $dump['entity_tag_by_round'][$row['round']] = $row['entity_tag'];
+        }
+        file_put_contents($opts['dump'], json_encode($dump, JSON_PRETTY_PRINT) . "\n");
+        $game->counts = $counts;
+    }
+}
+
+if (isset($opts['verify'])) {
+    // Reference: the step-by-step states; both runs start from the same seed
+    $opts['seed'] = $opts['seed'] ?? 1;
+    [$game, $resolver, $profiler] = newBattle($opts, $config, $locations, $players, $hasTagStore, $dbmodel);
+    $stepRounds = count($locations) > 1
+        ? runBattles($game, $resolver, $profiler, $locations, $maxRounds)
+        : count(runSequence($game, $resolver, $profiler, $resolver->createSequence($location), $maxRounds));
+    $reference = snapshot($game);
+
+    [$game, $resolver, $profiler] = newBattle($opts, $config, $locations, $players, $hasTagStore, $dbmodel);
+    $autoRun = count($locations) > 1
+        ? runAutoLocations($game, $resolver, $profiler, $locations, $maxRounds)
+        : runAutoSequence($game, $resolver, $profiler, $location, $maxRounds);
+    $result = snapshot($game);
+
+    if ($autoRun['rounds'] !== $stepRounds) {
+        fail("auto-resolve played {$autoRun['rounds']} rounds, step by step played $stepRounds (seed {$opts['seed']})");
+    }
+    foreach ($reference as $table => $rows) {
+        if ($result[$table] !== $rows) {
+            fail("$table differs between step-by-step and auto-resolve (seed {$opts['seed']})");
+        }
+    }
+    printf("OK: step-by-step and auto-resolve agree after %d rounds (seed %d)\n", $stepRounds, $opts['seed']);
+    exit(0);
+}
+
+[$game, $resolver, $profiler, $setup] = newBattle($opts, $config, $locations, $players, $hasTagStore, $dbmodel);
+
+if ($auto) {
+    $autoRun = count($locations) > 1
+        ? runAutoLocations($game, $resolver, $profiler, $locations, $maxRounds)
+        : runAutoSequence($game, $resolver, $profiler, $location, $maxRounds);
+    finish($game, $resolver, $opts);
+    $total = $autoRun['reads'] + $autoRun['writes'];
+    if (isset($opts['json'])) {
+        echo json_encode([
+            'scenario' => basename($scenarioFile),
+            'location' => $location,
+            'players' => $players,
+            'src' => $src,
+            'auto' => true,
+            'setup' => $setup,
+            'auto_resolve' => $autoRun,
+            'per_round' => round($total / max(1, $autoRun['rounds']), 2),
+        ], JSON_PRETTY_PRINT) . "\n";
+        exit(0);
+    }
+    printf("%s @ %s, %d players, helpers from %s (auto-resolve)\n", basename($scenarioFile), $location, $players, $src);
+    printf("setup: %d reads, %d writes\n\n", $setup['reads'] ?? 0, $setup['writes'] ?? 0);
+    printf("%d queries (%d reads, %d writes) over %d rounds (%.1f per round)\n",
+        $total, $autoRun['reads'], $autoRun['writes'], $autoRun['rounds'], $total / max(1, $autoRun['rounds']));
+    exit(0);
+}
+
+$rounds = runSequence($game, $resolver, $profiler, $resolver->createSequence($location), $maxRounds, isset($opts['dump']));
+finish($game, $resolver, $opts, $rounds);
+
+$totals = array_fill_keys(array_keys(STATES), 0);
+foreach ($rounds as $row) {
+    foreach (array_keys(STATES) as $state) {
+        $totals[$state] += $row[$state]['reads'] + $row[$state]['writes'];
+    }
+}
+$total = array_sum($totals);
+
+if (isset($opts['json'])) {
+    echo json_encode([
+        'scenario' => basename($scenarioFile),
+        'location' => $location,
+        'players' => $players,
+        'src' => $src,
+        'cached' => method_exists($resolver, 'loadSequence'),
+        'setup' => $setup,
+        'rounds' => array_map(fn($row) => array_diff_key($row, ['entity_tag' => true]), $rounds),
+        'totals' => $totals,
+        'per_round' => round($total / max(1, count($rounds)), 2),
+    ], JSON_PRETTY_PRINT) . "\n";
+    exit(0);
+}
+
+printf("%s @ %s, %d players, helpers from %s (%s)\n", basename($scenarioFile), $location, $players, $src,
+    method_exists($resolver, 'loadSequence') ? 'cached' : 'uncached');
+printf("setup: %d reads, %d writes\n\n", $setup['reads'] ?? 0, $setup['writes'] ?? 0);
+printf("%-6s %12s %12s %12s %7s\n", 'round', 'draw r/w', 'resolve r/w', 'end r/w', 'total');
+foreach ($rounds as $row) {
+    $cells = [];
+    $sum = 0;
+    foreach (array_keys(STATES) as $state) {
+        $cells[] = $row[$state]['reads'] . '/' . $row[$state]['writes'];
+        $sum += $row[$state]['reads'] + $row[$state]['writes'];
+    }
+    printf("%-6d %12s %12s %12s %7d\n", $row['round'], $cells[0], $cells[1], $cells[2], $sum);
+}
+printf("\n%d queries over %d rounds (%.1f per round)\n", $total, count($rounds), $total / max(1, count($rounds)));
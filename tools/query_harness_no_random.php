@@ -0,0 +1,36 @@
+<?php
+/**
+ * query_harness.php --no-random: deterministic stand-ins for the random
+ * functions the helpers call.
+ *
+ * Unqualified calls inside the helpers' namespace resolve to these before the
+ * built-ins, so this file must be loaded before the helpers run. Shuffles sort
+ * by card_id (else entity_id, else value) and random picks take the lowest of
+ * those, so two trees that draw their randomness in different ways (SQL
+ * ORDER BY RAND() against shuffle()/array_rand() on cached rows) still make
+ * the same choices and their databases can be diffed.
+ */
+
+namespace Bga\Games\Zoomquest\Helpers;
+
+function noRandomKey($value)
+{
+    if (is_array($value)) {
+        return (int)($value['card_id'] ?? $value['entity_id'] ?? 0);
+    }
+    return is_numeric($value) ? (int)$value : $value;
+}
+
+function shuffle(array &$array): bool
+{
+    $array = array_values($array);
+    usort($array, fn($a, $b) => noRandomKey($a) <=> noRandomKey($b));
+    return true;
+}
+
+function array_rand(array $array, int $num = 1)
+{
+    uasort($array, fn($a, $b) => noRandomKey($a) <=> noRandomKey($b));
+    $keys = array_slice(array_keys($array), 0, $num);
+    return $num === 1 ? $keys[0] : $keys;
+}
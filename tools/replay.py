@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Replay - Record and inspect ZoomQuest notification streams.
+
+A replay is an append-only line-delimited JSON file (gzip-compressed when the
+name ends in .gz). The first line is a header with the seed, player count,
+policy and the SHA-256 of the scenario file. Every other line is either a
+notification, exactly as the server sends it to zoomquest.js:
+
+    [game_round, "sequenceRound", {"round": 2, "log": [2, [...], [...], [...]], ...}]
+
+or a snapshot of the client-visible state (entity locations, pile counts,
+tags, defeat flags) taken before the first notification of a round:
+
+    {"snapshot": 25, "state": {...}}
+
+Snapshots are written every --snapshot-every rounds, so seeking to round R
+folds only the notifications after the nearest snapshot instead of the
+whole game. Between rounds every living entity's discard pile is refreshed
+into its active pile (ResolveMoves); the fold applies that rule since the
+server does not notify it.
+
+Usage:
+    python replay.py record [scenario_file] --output FILE [--seed N] [--players N]
+                            [--policy hunt|random|stay] [--max-rounds N]
+                            [--snapshot-every N]
+    python replay.py show FILE [--round N] [--events]
+    python replay.py verify FILE [--scenario scenario_file]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import battle_log
+import simulator as sim
+
+
+# Version 2 records sequenceRound where version 1 had sequenceCardsDrawn,
+# cardResolved and sequenceRoundSummary; both still fold
+REPLAY_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+SNAPSHOT_PREFIX = b'{"snapshot":'
+
+
+def open_replay(path, mode):
+    """Open a replay for binary reading or appending, gzip for .gz names."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def encode(record):
+    return json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class ReplayState:
+    """Client-visible game state, folded from notifications like zoomquest.js does."""
+
+    def __init__(self, state=None):
+        state = state or {'round': 0, 'entities': {}, 'outcome': None}
+        self.round = state['round']
+        self.entities = {int(k): dict(v) for k, v in state['entities'].items()}
+        self.outcome = state['outcome']
+
+    @classmethod
+    def from_game(cls, game):
+        state = cls()
+        state.round = game.round
+        for e in game.entities:
+            counts = e.pile_counts()
+            state.entities[e.entity_id] = {
+                'entity_name': e.name,
+                'entity_type': e.entity_type,
+                'faction': e.faction,
+                'location': e.location,
+                'is_defeated': e.is_defeated,
+                'active': counts[sim.PILE_ACTIVE],
+                'discard': counts[sim.PILE_DISCARD],
+                'destroyed': counts[sim.PILE_DESTROYED],
+                'tags': [{'tag_name': name, 'tag_value': value[0]} for name, value in e.tags.items()],
+            }
+        return state
+
+    def to_dict(self):
+        return {'round': self.round, 'entities': {str(k): v for k, v in self.entities.items()},
+                'outcome': self.outcome}
+
+    def start_round(self, game_round):
+        # ResolveMoves: discard goes back under the active pile for everyone alive
+        for entity in self.entities.values():
+            if not entity['is_defeated']:
+                entity['active'] += entity['discard']
+                entity['discard'] = 0
+        self.round = game_round
+
+    def apply(self, game_round, name, args):
+        if game_round != self.round:
+            self.start_round(game_round)
+        handler = getattr(self, '_on_' + name, None)
+        if handler is not None:
+            handler(args)
+
+    def _on_entityMoved(self, args):
+        self.entities[int(args['entity_id'])]['location'] = args['to_location']
+
+    def _on_sequenceRound(self, args):
+        self._on_sequenceRoundSummary(battle_log.expand_round(args['log'], self.entities))
+
+    def _on_sequenceRoundSummary(self, args):
+        for status in args['status']:
+            entity = self.entities[int(status['entity_id'])]
+            for key in ('is_defeated', 'active', 'discard', 'destroyed', 'tags'):
+                entity[key] = status[key]
+
+    def _on_sequenceCleanup(self, args):
+        for survivor in args['survivors']:
+            entity = self.entities[int(survivor['entity_id'])]
+            for pile in (sim.PILE_ACTIVE, sim.PILE_DISCARD, sim.PILE_DESTROYED):
+                entity[pile] = survivor['deck_counts'][pile]
+        for defeated in args['defeated']:
+            self.entities[int(defeated['entity_id'])]['is_defeated'] = True
+
+    def _on_gameVictory(self, args):
+        self.outcome = sim.OUTCOME_VICTORY
+
+    def _on_gameDefeat(self, args):
+        self.outcome = sim.OUTCOME_DEFEAT
+
+
+class ReplayWriter:
+    """Appends notifications to a replay file and snapshots every N rounds."""
+
+    def __init__(self, path, header, initial_state, snapshot_every=10):
+        self.file = open_replay(path, 'wb')
+        self.snapshot_every = snapshot_every
+        self.state = initial_state
+        self.records = 0
+        self.file.write(encode(dict(header, zqreplay=REPLAY_VERSION)))
+        self.snapshot(initial_state.round + 1)
+
+    def snapshot(self, game_round):
+        self.file.write(encode({'snapshot': game_round, 'state': self.state.to_dict()}))
+
+    def notify(self, game_round, name, args):
+        if game_round != self.state.round and game_round % self.snapshot_every == 0:
+            self.state.start_round(game_round)
+            self.snapshot(game_round)
+        self.state.apply(game_round, name, args)
+        self.file.write(encode([game_round, name, args]))
+        self.records += 1
+
+    def close(self):
+        self.file.close()
+
+
+def record_game(game, writer, max_rounds=200):
+    """Play one simulator game, sending the server's notifications to the writer."""
+    sequence_id = 0
+
+    def on_round(seq, sequence_round, drawn, resolutions):
+        if sequence_round == 1:
+            writer.notify(game.round, 'sequenceStart', {
+                'sequence_id': sequence_id,
+                'location_id': seq.location,
+                'location_name': game.locations.get(seq.location, {}).get('name', seq.location),
+                'participants': [{'entity_id': e.entity_id, 'entity_name': e.name,
+                                  'entity_type': e.entity_type, 'faction': e.faction}
+                                 for e in seq.participants],
+            })
+        status = game.get_participant_status(seq)
+        writer.notify(game.round, 'sequenceRound', {
+            'round': sequence_round, 'sequence_id': sequence_id,
+            'log': battle_log.encode_round(sequence_round, drawn, resolutions, status),
+        })
+        eliminated = game.get_eliminated_faction(seq)
+        if eliminated is not None or game.is_everyone_out_of_cards(seq):
+            writer.notify(game.round, 'sequenceEnd', {
+                'sequence_id': sequence_id, 'game_round': game.round,
+                'eliminated_faction': eliminated,
+            })
+
+    outcome = None
+    while outcome is None and game.round < max_rounds:
+        game.round_start()
+        before = {e.entity_id: e.location for e in game.players()}
+        for entity, target in game.resolve_moves():
+            writer.notify(game.round, 'moveSelected', {
+                'player_id': entity.player_id, 'player_name': entity.name,
+                'target_location': target, 'is_staying': False, 'is_plan': False,
+            })
+            writer.notify(game.round, 'entityMoved', {
+                'entity_id': entity.entity_id, 'entity_name': entity.name,
+                'from_location': before[entity.entity_id], 'to_location': target,
+                'location_name': game.locations.get(target, {}).get('name', target),
+            })
+        for location, seed in game.battle_order():
+            sequence_id += 1
+            ran = game.run_battle(location, seed, on_round)
+            if ran is None:
+                continue
+            seq = ran[0]
+            writer.notify(game.round, 'sequenceCleanup', {
+                'sequence_id': sequence_id,
+                'survivors': [{'entity_id': e.entity_id, 'entity_name': e.name,
+                               'entity_type': e.entity_type, 'deck_counts': e.pile_counts()}
+                              for e in seq.participants if not e.is_defeated],
+                'defeated': [{'entity_id': e.entity_id, 'entity_name': e.name,
+                              'entity_type': e.entity_type}
+                             for e in seq.participants if e.is_defeated],
+            })
+        outcome = game.check_victory()
+
+    goal_status = {p.player_id: {'goal': game.goals.get(p.player_id, {}).get('id'),
+                                 'progress': game.goal_progress(p.player_id),
+                                 'complete': game.is_goal_complete(p.player_id)}
+                   for p in game.players()}
+    if outcome == sim.OUTCOME_VICTORY:
+        writer.notify(game.round, 'gameVictory', {'victory_type': game.victory.get('type'),
+                                                  'victory_target': game.victory.get('target'),
+                                                  'goal_status': goal_status})
+    elif outcome == sim.OUTCOME_DEFEAT:
+        writer.notify(game.round, 'gameDefeat', {'goal_status': goal_status})
+    return game.summary(outcome or sim.OUTCOME_TIMEOUT)
+
+
+def read_lines(path):
+    with open_replay(path, 'rb') as f:
+        lines = f.read().split(b'\n')
+    if not lines or not lines[0]:
+        raise ValueError(f"{path}: empty replay")
+    header = json.loads(lines[0])
+    if header.get('zqreplay') not in READABLE_VERSIONS:
+        raise ValueError(f"{path}: not a version {' or '.join(map(str, READABLE_VERSIONS))} replay")
+    return header, [line for line in lines[1:] if line]
+
+
+def record_round(line):
+    """Game round of a notification line, read without decoding the payload."""
+    return int(line[1:line.index(b',')])
+
+
+def seek(path, game_round=None):
+    """State at the end of game_round (default: the last round) and that round's notifications.
+
+    Starts from the latest snapshot at or before the round, so only the
+    notifications after it are decoded.
+    """
+    header, lines = read_lines(path)
+    start = None
+    for index, line in enumerate(lines):
+        if line.startswith(SNAPSHOT_PREFIX):
+            snap_round = int(line[len(SNAPSHOT_PREFIX):line.index(b',')])
+            if game_round is not None and snap_round > game_round:
+                break
+            start = index
+    if start is None:
+        raise ValueError(f"{path}: no snapshot")
+
+    state = ReplayState(json.loads(lines[start])['state'])
+    events = []
+    for line in lines[start + 1:]:
+        if line.startswith(SNAPSHOT_PREFIX):
+            continue
+        r = record_round(line)
+        if game_round is not None and r > game_round:
+            break
+        if r != state.round:
+            events = []
+        _, name, args = json.loads(line)
+        state.apply(r, name, args)
+        events.append((name, args))
+    if game_round is not None and game_round > state.round and state.outcome is None:
+        # A round without notifications still refreshes the decks
+        state.start_round(game_round)
+        events = []
+    return header, state, events
+
+
+def verify(path, scenario_path=None):
+    """Fold the whole replay and compare against every snapshot. Returns a list of problems."""
+    header, lines = read_lines(path)
+    problems = []
+    if scenario_path is not None and header.get('scenario_sha256') != file_hash(scenario_path):
+        problems.append(f"scenario hash mismatch: replay was recorded from a different {Path(scenario_path).name}")
+    state = None
+    for line in lines:
+        if line.startswith(SNAPSHOT_PREFIX):
+            snapshot = json.loads(line)
+            if state is None:
+                state = ReplayState(snapshot['state'])
+                continue
+            if state.round != snapshot['snapshot']:
+                state.start_round(snapshot['snapshot'])
+            if state.to_dict() != snapshot['state']:
+                problems.append(f"snapshot {snapshot['snapshot']} differs from the folded state")
+            continue
+        if state is None:
+            problems.append("notification before the first snapshot")
+            break
+        r, name, args = json.loads(line)
+        state.apply(r, name, args)
+    return problems
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def print_state(header, state, events, show_events):
+    print(f"Replay: {header.get('scenario')} seed {header.get('seed')}, "
+          f"{header.get('players')} players, policy {header.get('policy')}")
+    print(f"After round {state.round}" + (f" ({state.outcome})" if state.outcome else ''))
+    by_location = {}
+    for entity_id, entity in sorted(state.entities.items()):
+        by_location.setdefault(entity['location'], []).append(entity)
+    for location, entities in sorted(by_location.items()):
+        print(f"  {location}")
+        for e in entities:
+            tags = ','.join(t['tag_name'] for t in e['tags'])
+            status = 'defeated' if e['is_defeated'] else f"{e['active']}/{e['discard']}/{e['destroyed']}"
+            print(f"    {e['entity_name']:24s} {e['entity_type']:8s} {status:10s} {tags}")
+    if show_events:
+        print(f"Notifications in round {state.round}:")
+        for name, args in events:
+            detail = args.get('effect') or args.get('to_location') or args.get('location_id') or ''
+            print(f"  {name:22s} {args.get('entity_name', '')} {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and inspect ZoomQuest replays.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='play one simulator game into a replay file')
+    record.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    record.add_argument('--output', required=True, help='replay file (.gz to compress)')
+    record.add_argument('--seed', type=int, default=0)
+    record.add_argument('--players', type=int, default=None)
+    record.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    record.add_argument('--max-rounds', type=int, default=200)
+    record.add_argument('--snapshot-every', type=int, default=10, help='rounds between snapshots')
+
+    show = commands.add_parser('show', help='print the state at the end of a round')
+    show.add_argument('replay')
+    show.add_argument('--round', type=int, default=None, help='game round (default: last)')
+    show.add_argument('--events', action='store_true', help="list the round's notifications")
+
+    check = commands.add_parser('verify', help='check snapshots against the folded notifications')
+    check.add_argument('replay')
+    check.add_argument('--scenario', default=None, help='scenario file to check the hash against')
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if not Path(args.scenario).exists():
+            print(f"Error: Scenario file not found: {args.scenario}")
+            sys.exit(1)
+        scenario = sim.load_scenario(args.scenario)
+        game = sim.Game(scenario, args.players, args.seed, args.policy)
+        header = {'scenario': Path(args.scenario).name, 'scenario_sha256': file_hash(args.scenario),
+                  'seed': args.seed, 'players': game.num_players, 'policy': args.policy}
+        start = time.perf_counter()
+        writer = ReplayWriter(args.output, header, ReplayState.from_game(game),
+                              max(1, args.snapshot_every))
+        try:
+            summary = record_game(game, writer, args.max_rounds)
+        finally:
+            writer.close()
+        elapsed = time.perf_counter() - start
+        size = Path(args.output).stat().st_size
+        print(f"Recorded {summary['outcome']} after {summary['rounds']} rounds: "
+              f"{writer.records} notifications, {size:,} bytes in {elapsed:.2f}s -> {args.output}")
+        return
+
+    if not Path(args.replay).exists():
+        print(f"Error: Replay file not found: {args.replay}")
+        sys.exit(1)
+    try:
+        if args.command == 'show':
+            start = time.perf_counter()
+            header, state, events = seek(args.replay, args.round)
+            elapsed = time.perf_counter() - start
+            print_state(header, state, events, args.events)
+            print(f"Seek: {elapsed * 1000:.1f}ms")
+        else:
+            problems = verify(args.replay, args.scenario)
+            for problem in problems:
+                print(f"  {problem}")
+            print('OK' if not problems else f"{len(problems)} problem(s)")
+            sys.exit(1 if problems else 0)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
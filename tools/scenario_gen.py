@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Scenario Generator - Build large synthetic scenarios for benchmarking.
+
+Generates scenario JSON that ConfigLoader accepts, at sizes the shipped maps
+never reach. Locations sit on a jittered square grid; a random spanning tree
+over grid neighbours keeps every location reachable, and --density adds that
+fraction of the remaining neighbour links (0 = a tree, 1 = every location
+linked to its eight neighbours). Terrain and direction follow the layout so
+goals filtering on them have something to track.
+
+Card and item types are drawn from the enums in dbmodel.sql (via
+validate_scenarios.load_schema), so generated scenarios follow the schema.
+
+Usage:
+    python scenario_gen.py NODES [--density 0.3] [--factions 3] [--deck-size 5]
+                           [--items N] [--monsters N] [--characters 4]
+                           [--one-way 0.0] [--seed N] [--output FILE] [--check]
+
+Node counts from 100 to 10,000 are what tools/bench.py exercises. --check
+runs the generated scenario through validate_scenarios and exits non-zero on
+any error.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from pathlib import Path
+
+import validate_scenarios
+
+
+MIN_NODES = 2
+SETTLED_SHARE = 0.2
+# Core cards every deck leans on; the rest of the card enum fills in
+CORE_CARDS = ('attack', 'attack', 'defend', 'heal')
+MONSTER_CLASSES = ('goblin', 'skeleton', 'bandit', 'orc', 'demon', 'wolf')
+CHARACTER_CLASSES = ('warrior', 'rogue', 'cleric', 'ranger', 'mage')
+
+
+def grid_edges(cols, count):
+    """Neighbour pairs (right, down and both diagonals) of a cols-wide grid."""
+    edges = []
+    for i in range(count):
+        x, y = i % cols, i // cols
+        for dx, dy in ((1, 0), (0, 1), (1, 1), (-1, 1)):
+            nx, ny = x + dx, y + dy
+            j = ny * cols + nx
+            if 0 <= nx < cols and j < count:
+                edges.append((i, j))
+    return edges
+
+
+def link_locations(count, cols, density, rng):
+    """Random spanning tree over grid neighbours plus a density share of the rest."""
+    parent = list(range(count))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    edges = grid_edges(cols, count)
+    rng.shuffle(edges)
+    tree = []
+    extra = []
+    for a, b in edges:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+            tree.append((a, b))
+        elif rng.random() < density:
+            extra.append((a, b))
+    return tree, extra
+
+
+def direction_of(x, y):
+    """Compass region of a point in the unit square."""
+    dx, dy = x - 0.5, y - 0.5
+    if max(abs(dx), abs(dy)) < 1 / 6:
+        return 'center'
+    if abs(dx) > abs(dy):
+        return 'east' if dx > 0 else 'west'
+    return 'south' if dy > 0 else 'north'
+
+
+def faction_matrix(monster_factions, rng):
+    """Players against every monster faction; monster factions friendly or neutral to each other."""
+    matrix = {'players': {'players': 'friendly'}}
+    for faction in monster_factions:
+        matrix['players'][faction] = 'hostile'
+        matrix[faction] = {'players': 'hostile', faction: 'friendly'}
+    for i, a in enumerate(monster_factions):
+        for b in monster_factions[i + 1:]:
+            relation = rng.choice(('friendly', 'neutral'))
+            matrix[a][b] = relation
+            matrix[b][a] = relation
+    return matrix
+
+
+def make_deck(size, card_types, rng):
+    """A deck of mostly core cards with a few drawn from the whole enum."""
+    extras = sorted(card_types)
+    return [CORE_CARDS[i] if i < len(CORE_CARDS) and rng.random() < 0.75 else rng.choice(extras)
+            for i in range(size)]
+
+
+def make_item(index, item_types, card_types, monster_factions, rng):
+    item_type = rng.choice(sorted(item_types))
+    if item_type == 'new_action':
+        data = {'card_type': rng.choice(sorted(card_types))}
+    elif item_type == 'faction':
+        data = {'faction': rng.choice(monster_factions), 'relationship': 'friendly'}
+    else:
+        data = {}
+    return {'name': f'Item {index}', 'type': item_type, 'data': data}
+
+
+def generate(nodes, density=0.3, factions=3, deck_size=5, items=None, monsters=None,
+             characters=4, one_way=0.0, seed=0, schema=None):
+    """Build a synthetic scenario dict; every location is reachable from the start."""
+    if nodes < MIN_NODES:
+        raise ValueError(f"need at least {MIN_NODES} locations, got {nodes}")
+    schema = schema or validate_scenarios.load_schema()
+    rng = random.Random(seed)
+    monsters = nodes // 5 if monsters is None else monsters
+    items = monsters // 2 if items is None else items
+
+    cols = math.ceil(math.sqrt(nodes))
+    rows = math.ceil(nodes / cols)
+    locations = []
+    for i in range(nodes):
+        x = (i % cols + 0.5 + rng.uniform(-0.3, 0.3)) / cols
+        y = (i // cols + 0.5 + rng.uniform(-0.3, 0.3)) / rows
+        locations.append({
+            'id': f'loc_{i}',
+            'name': f'Location {i}',
+            'description': '',
+            'terrain': 'settled' if rng.random() < SETTLED_SHARE else 'wilderness',
+            'direction': direction_of(x, y),
+            'x': round(x, 4),
+            'y': round(y, 4),
+        })
+
+    tree, extra = link_locations(nodes, cols, density, rng)
+    connections = [{'name': f'Road {i}', 'from': f'loc_{a}', 'to': f'loc_{b}'}
+                   for i, (a, b) in enumerate(tree)]
+    for i, (a, b) in enumerate(extra):
+        if rng.random() < 0.5:
+            a, b = b, a
+        connections.append({'name': f'Path {i}', 'from': f'loc_{a}', 'to': f'loc_{b}',
+                            'bidirectional': rng.random() >= one_way})
+
+    # Everyone starts in the settled middle of the map
+    start = min(range(nodes), key=lambda i: (locations[i]['x'] - 0.5) ** 2 + (locations[i]['y'] - 0.5) ** 2)
+    locations[start]['terrain'] = 'settled'
+    start_id = locations[start]['id']
+
+    monster_factions = [f'faction_{i}' for i in range(max(1, factions))]
+    card_types = schema['card_types']
+    monster_list = []
+    for i in range(monsters):
+        location = rng.randrange(nodes - 1)
+        monster_list.append({
+            'name': f'Monster {i}',
+            'class': rng.choice(MONSTER_CLASSES),
+            'faction': monster_factions[i % len(monster_factions)],
+            'location': f'loc_{location if location < start else location + 1}',
+            'decks': {'active': make_deck(deck_size, card_types, rng)},
+            'items': [],
+        })
+    for i in range(items if monster_list else 0):
+        owner = rng.choice(monster_list)
+        owner['items'].append(make_item(i, schema['item_types'], card_types, monster_factions, rng))
+
+    character_list = [{'name': f'Hero {i}', 'class': CHARACTER_CLASSES[i % len(CHARACTER_CLASSES)],
+                       'faction': 'players', 'location': start_id,
+                       'decks': {'active': make_deck(deck_size, card_types, rng)}}
+                      for i in range(characters)]
+
+    return {
+        'level_name': f'Synthetic {nodes}',
+        'victory': {'type': 'defeat_all', 'description': 'Defeat every monster'},
+        'individual_goals': [
+            {'id': 'explorer', 'name': 'The Explorer', 'description': 'Visit 12+ unique locations',
+             'track': 'locations_visited', 'threshold': 12, 'points': 4},
+            {'id': 'settler', 'name': 'The Settler', 'description': 'Spend 6+ turns in settled areas',
+             'track': 'turns_in_terrain', 'filter': 'settled', 'threshold': 6, 'points': 3},
+            {'id': 'northerner', 'name': 'The Northerner', 'description': 'Spend 5+ turns in the north',
+             'track': 'turns_in_direction', 'filter': 'north', 'threshold': 5, 'points': 3},
+            {'id': 'slayer', 'name': 'The Slayer', 'description': 'Land 3+ killing blows',
+             'track': 'killing_blows', 'threshold': 3, 'points': 3},
+        ],
+        'factions': {'matrix': faction_matrix(monster_factions, rng)},
+        'map': {'locations': locations, 'connections': connections},
+        'characters': character_list,
+        'monsters': monster_list,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic ZoomQuest scenario.')
+    parser.add_argument('nodes', type=int, help='number of locations')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='share of non-tree grid links to add (0-1)')
+    parser.add_argument('--factions', type=int, default=3, help='number of monster factions')
+    parser.add_argument('--deck-size', type=int, default=5, help='cards per starting deck')
+    parser.add_argument('--items', type=int, help='items spread over the monsters (default: monsters / 2)')
+    parser.add_argument('--monsters', type=int, help='number of monsters (default: nodes / 5)')
+    parser.add_argument('--characters', type=int, default=4)
+    parser.add_argument('--one-way', type=float, default=0.0,
+                        help='share of extra links that are one-way')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='output file (default: stdout)')
+    parser.add_argument('--check', action='store_true', help='validate the generated scenario')
+    args = parser.parse_args()
+
+    if not 0 <= args.density <= 1 or not 0 <= args.one_way <= 1:
+        print("Error: --density and --one-way must be between 0 and 1")
+        sys.exit(1)
+
+    schema = validate_scenarios.load_schema()
+    try:
+        scenario = generate(args.nodes, args.density, args.factions, args.deck_size, args.items,
+                            args.monsters, args.characters, args.one_way, args.seed, schema)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    text = json.dumps(scenario, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+        print(f"Wrote {args.output}: {args.nodes} locations, {len(scenario['map']['connections'])} connections, "
+              f"{len(scenario['monsters'])} monsters", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.check:
+        errors = validate_scenarios.validate_scenario(scenario, schema)
+        for error in errors:
+            print(f"  - {error}", file=sys.stderr)
+        sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
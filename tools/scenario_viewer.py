@@ -3,23 +3,61 @@
 Scenario Viewer - Generate an HTML visualization of ZoomQuest game scenarios.
 
 Usage:
-    python scenario_viewer.py [scenario_file] [--open]
+    python scenario_viewer.py [scenario_file] [--open] [--force]
+    python scenario_viewer.py --all | 'configs/*.json' ... [--force]
     
 Generates an HTML file and optionally opens it in the default browser.
+
+Batch mode (--all, a glob or several files) renders scenarios in parallel
+worker processes and writes configs/index.html linking them all. Outputs are
+skipped when their scenario JSON, background image and template are unchanged
+(the hash is stored in the page's head); --force regenerates anyway.
+
+Pages always link the original background image. If Pillow is installed, it
+is also downscaled into a resolution pyramid plus a tiny blurred placeholder,
+cached by image hash under configs/.tiles/<hash>/ with a levels.js manifest.
+The page loads that manifest if it is there, shows the placeholder and then
+the smallest level that covers the map; otherwise (no Pillow, or a checkout
+without the uncommitted .tiles/) it shows the original. The generated HTML is
+the same either way.
 """
 
+import base64
+import glob
+import hashlib
+import html as html_lib
+import io
 import json
 import sys
 import os
+import re
 import webbrowser
+from multiprocessing import Pool
 from pathlib import Path
 
+try:
+    from PIL import Image, ImageFilter
+except ImportError:
+    Image = None
+
+import graph_index
+
+
+TILE_CACHE_DIR = '.tiles'
+TILE_MANIFEST = 'levels.js'
+MIN_LEVEL_WIDTH = 256
+PLACEHOLDER_WIDTH = 24
+CONFIGS_DIR = Path(__file__).parent.parent / 'configs'
+BACKGROUND_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+CACHE_META_RE = re.compile(r'<meta name="scenario-viewer-key" content="([0-9a-f]+)">')
+
 
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="scenario-viewer-key" content="{cache_key}">
     <title>ZoomQuest: {level_name}</title>
     <style>
         * {{
@@ -45,7 +83,6 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         .map-container {{
             flex: 1;
             background: #0d1117;
-            background-image: url('{background_image}');
             background-size: cover;
             background-position: center;
             border-radius: 12px;
@@ -334,9 +371,23 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         </div>
     </div>
     
+    {background_tiles_script}
     <script>
-        const scenario = {scenario_json};
-        const originalScenario = JSON.parse(JSON.stringify(scenario)); // Deep copy for reset
+        // Compact payload: decks are [cardTypeIndex, runLength] pairs into cardTypes
+        const payload = {scenario_json};
+        const cardTypes = payload.cardTypes;
+        const scenario = payload.scenario;
+        // Precomputed by graph_index.py: location id -> indices of connections touching it
+        const graphIndex = {graph_index_json};
+        // Original background image ('' for none), and the levels.js written
+        // next to its resolution levels when they were built (see TILE_MANIFEST)
+        const backgroundImage = {background_image_json};
+        const backgroundTiles = window.backgroundTiles || null;
+        const backgroundLevels = backgroundTiles ? backgroundTiles.levels.map(l => ({{
+            width: l.width, height: l.height, url: {background_tiles_dir_json} + '/' + l.file,
+        }})) : [];
+        let backgroundWidth = 0;
+        let originalCoords = null; // x/y snapshot for reset, taken on the first edit
         let hasChanges = false;
         let isDragging = false;
         let dragTarget = null;
@@ -362,13 +413,42 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             return cardIcons[cardType] || '🃏';
         }}
         
-        function initMap() {{
+        const SVG_NS = 'http://www.w3.org/2000/svg';
+        const MAP_PADDING = 60;
+        const NODE_RADIUS = 35;
+        
+        // Retained SVG nodes, created once by buildMap() and repositioned in place
+        const mapView = {{
+            width: 0,
+            height: 0,
+            nodes: {{}},   // locId -> {{ group, circle, label, entities }}
+            edges: [],    // connection index -> {{ line, label }} (null if an endpoint is unknown)
+        }};
+        
+        function svgEl(tag, attrs, parent) {{
+            const el = document.createElementNS(SVG_NS, tag);
+            Object.entries(attrs).forEach(([key, value]) => el.setAttribute(key, value));
+            if (parent) parent.appendChild(el);
+            return el;
+        }}
+        
+        function getScreenCoords(x, y) {{
+            return {{
+                x: MAP_PADDING + x * (mapView.width - 2 * MAP_PADDING),
+                y: MAP_PADDING + y * (mapView.height - 2 * MAP_PADDING)
+            }};
+        }}
+        
+        function locationCoords(locId) {{
+            const loc = window.locById[locId];
+            return getScreenCoords(loc.x || 0.5, loc.y || 0.5);
+        }}
+        
+        // Create the SVG nodes for the current scenario (also used to rebuild after a live update)
+        function buildMap() {{
             const svg = document.getElementById('map-svg');
-            const rect = svg.getBoundingClientRect();
-            const width = rect.width;
-            const height = rect.height;
-            const padding = 60;
-            
+            svg.replaceChildren();
+            mapView.nodes = {{}};
             const locations = scenario.map.locations;
             const connections = scenario.map.connections;
             
@@ -387,66 +467,125 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 entitiesByLocation[monster.location].push({{ type: 'monster', data: monster }});
             }});
             
-            function getScreenCoords(x, y) {{
-                return {{
-                    x: padding + x * (width - 2 * padding),
-                    y: padding + y * (height - 2 * padding)
-                }};
-            }}
-            
-            let svgContent = '';
+            // Store for click handlers
+            window.locById = locById;
+            window.entitiesByLocation = entitiesByLocation;
             
-            // Draw connections
-            connections.forEach(conn => {{
-                const from = locById[conn.from];
-                const to = locById[conn.to];
-                if (from && to) {{
-                    const p1 = getScreenCoords(from.x || 0.5, from.y || 0.5);
-                    const p2 = getScreenCoords(to.x || 0.5, to.y || 0.5);
-                    const mid = {{ x: (p1.x + p2.x) / 2, y: (p1.y + p2.y) / 2 }};
-                    
-                    svgContent += `<line class="connection" x1="${{p1.x}}" y1="${{p1.y}}" x2="${{p2.x}}" y2="${{p2.y}}"/>`;
-                    svgContent += `<text class="connection-label" x="${{mid.x}}" y="${{mid.y - 5}}">${{conn.name || ''}}</text>`;
-                }}
+            // Connections first so locations are drawn on top
+            const edgeLayer = svgEl('g', {{ class: 'connections' }}, svg);
+            mapView.edges = connections.map((conn, i) => {{
+                if (!locById[conn.from] || !locById[conn.to]) return null;
+                const line = svgEl('line', {{ class: 'connection', 'data-conn-id': i }}, edgeLayer);
+                const label = svgEl('text', {{ class: 'connection-label', 'data-conn-id': i }}, edgeLayer);
+                label.textContent = conn.name || '';
+                return {{ line, label }};
             }});
             
-            // Draw locations
-            const nodeRadius = 35;
+            const nodeLayer = svgEl('g', {{ class: 'locations' }}, svg);
             locations.forEach(loc => {{
-                const pos = getScreenCoords(loc.x || 0.5, loc.y || 0.5);
                 const terrain = loc.terrain || 'wilderness';
-                const entities = entitiesByLocation[loc.id] || [];
-                
-                // Location group (will be updated during drag)
-                svgContent += `
-                    <g class="location location-${{terrain}}" data-loc-id="${{loc.id}}" id="loc-group-${{loc.id}}">
-                        <circle class="location-circle" cx="${{pos.x}}" cy="${{pos.y}}" r="${{nodeRadius}}"/>
-                        <text class="location-name" x="${{pos.x}}" y="${{pos.y}}" dy="0.35em">${{loc.name}}</text>
-                `;
+                const group = svgEl('g', {{
+                    class: `location location-${{terrain}}`,
+                    'data-loc-id': loc.id,
+                    id: `loc-group-${{loc.id}}`
+                }}, nodeLayer);
+                const circle = svgEl('circle', {{ class: 'location-circle', r: NODE_RADIUS }}, group);
+                const label = svgEl('text', {{ class: 'location-name', dy: '0.35em' }}, group);
+                label.textContent = loc.name;
                 
-                // Draw entities below node (inside same group so they move together)
-                entities.forEach((ent, i) => {{
-                    const icon = ent.type === 'character' ? '⚔️' : '🧟';
-                    const y = pos.y + nodeRadius + 18 + i * 16;
-                    svgContent += `
-                        <text class="entity entity-${{ent.type}}" x="${{pos.x}}" y="${{y}}" 
-                              text-anchor="middle" data-entity-idx="${{i}}">
-                            ${{icon}} ${{ent.data.name}}
-                        </text>
-                    `;
+                // Entities below node (inside same group so they move together)
+                const entities = (entitiesByLocation[loc.id] || []).map((ent, i) => {{
+                    const text = svgEl('text', {{
+                        class: `entity entity-${{ent.type}}`,
+                        'text-anchor': 'middle',
+                        'data-entity-idx': i
+                    }}, group);
+                    text.textContent = `${{ent.type === 'character' ? '⚔️' : '🧟'}} ${{ent.data.name}}`;
+                    return text;
                 }});
                 
-                svgContent += `</g>`;
+                group.addEventListener('mousedown', startDrag);
+                group.addEventListener('click', handleLocationClick);
+                mapView.nodes[loc.id] = {{ group, circle, label, entities }};
             }});
             
-            svg.innerHTML = svgContent;
-            
-            // Add drag handlers to locations
-            setupDragHandlers();
-            
-            // Store for click handlers
-            window.locById = locById;
-            window.entitiesByLocation = entitiesByLocation;
+            layoutMap();
+        }}
+        
+        function setupMapHandlers() {{
+            const svg = document.getElementById('map-svg');
+            svg.addEventListener('mousemove', drag);
+            svg.addEventListener('mouseup', endDrag);
+            svg.addEventListener('mouseleave', endDrag);
+        }}
+        
+        function placeLocation(locId) {{
+            const node = mapView.nodes[locId];
+            const pos = locationCoords(locId);
+            node.circle.setAttribute('cx', pos.x);
+            node.circle.setAttribute('cy', pos.y);
+            node.label.setAttribute('x', pos.x);
+            node.label.setAttribute('y', pos.y);
+            node.entities.forEach((text, i) => {{
+                text.setAttribute('x', pos.x);
+                text.setAttribute('y', pos.y + NODE_RADIUS + 18 + i * 16);
+            }});
+        }}
+        
+        function placeConnection(i) {{
+            const edge = mapView.edges[i];
+            if (!edge) return;
+            const conn = scenario.map.connections[i];
+            const p1 = locationCoords(conn.from);
+            const p2 = locationCoords(conn.to);
+            edge.line.setAttribute('x1', p1.x);
+            edge.line.setAttribute('y1', p1.y);
+            edge.line.setAttribute('x2', p2.x);
+            edge.line.setAttribute('y2', p2.y);
+            edge.label.setAttribute('x', (p1.x + p2.x) / 2);
+            edge.label.setAttribute('y', (p1.y + p2.y) / 2 - 5);
+        }}
+        
+        // Swap in the smallest background level that covers the map at this size;
+        // the original image when there are no levels or one fails to load
+        function loadBackgroundLevel() {{
+            if (!backgroundImage || backgroundWidth === Infinity) return;
+            const container = document.getElementById('map-container');
+            const showOriginal = () => {{
+                backgroundWidth = Infinity;
+                container.style.backgroundImage = `url('${{backgroundImage}}')`;
+            }};
+            if (!backgroundLevels.length) {{
+                showOriginal();
+                return;
+            }}
+            if (!backgroundWidth) {{
+                container.style.backgroundImage = `url('${{backgroundTiles.placeholder}}')`;
+            }}
+            const rect = container.getBoundingClientRect();
+            const largest = backgroundLevels[backgroundLevels.length - 1];
+            const aspect = largest.width / largest.height;
+            const needed = Math.max(rect.width, rect.height * aspect) * (window.devicePixelRatio || 1);
+            const level = backgroundLevels.find(l => l.width >= needed) || largest;
+            if (level.width <= backgroundWidth) return;
+            backgroundWidth = level.width;
+            const img = new Image();
+            img.onload = () => {{
+                if (backgroundWidth === level.width) {{
+                    container.style.backgroundImage = `url('${{level.url}}')`;
+                }}
+            }};
+            img.onerror = showOriginal;
+            img.src = level.url;
+        }}
+        
+        // Reposition every node, e.g. after a resize or reset (no DOM is rebuilt)
+        function layoutMap() {{
+            const rect = document.getElementById('map-svg').getBoundingClientRect();
+            mapView.width = rect.width;
+            mapView.height = rect.height;
+            Object.keys(mapView.nodes).forEach(placeLocation);
+            mapView.edges.forEach((edge, i) => placeConnection(i));
         }}
         
         function showLocationInfo(locId) {{
@@ -493,13 +632,18 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             </table>`;
             
             // Show deck
-            const active = (data.decks && data.decks.active) || [];
-            if (active.length > 0) {{
+            const runs = (data.decks && data.decks.active) || [];
+            if (runs.length > 0) {{
                 const cardCounts = {{}};
-                active.forEach(card => cardCounts[card] = (cardCounts[card] || 0) + 1);
+                let total = 0;
+                runs.forEach(([type, count]) => {{
+                    const card = cardTypes[type];
+                    cardCounts[card] = (cardCounts[card] || 0) + count;
+                    total += count;
+                }});
                 
                 html += `<div class="info-section">
-                    <div class="info-section-title">Active Deck (${{active.length}} cards)</div>
+                    <div class="info-section-title">Active Deck (${{total}} cards)</div>
                     <ul class="card-list">`;
                 Object.entries(cardCounts).sort().forEach(([card, count]) => {{
                     html += `<li><span class="card-icon">${{getCardIcon(card)}}</span>${{card}} x${{count}}</li>`;
@@ -522,80 +666,61 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             document.getElementById('info-content').innerHTML = html;
         }}
         
-        function setupDragHandlers() {{
-            const svg = document.getElementById('map-svg');
-            const rect = svg.getBoundingClientRect();
-            
-            document.querySelectorAll('.location').forEach(group => {{
-                group.addEventListener('mousedown', startDrag);
-                group.addEventListener('click', handleLocationClick);
-            }});
-            
-            svg.addEventListener('mousemove', drag);
-            svg.addEventListener('mouseup', endDrag);
-            svg.addEventListener('mouseleave', endDrag);
-        }}
+        let pendingPointer = null;
         
         function startDrag(e) {{
             if (e.target.classList.contains('entity')) return; // Don't drag when clicking entity
             
             const group = e.currentTarget;
             const locId = group.dataset.locId;
-            const circle = group.querySelector('.location-circle');
+            const pos = locationCoords(locId);
             
             isDragging = true;
             dragTarget = {{ group, locId }};
             group.classList.add('dragging');
             
-            const svg = document.getElementById('map-svg');
-            const pt = svg.createSVGPoint();
-            pt.x = e.clientX;
-            pt.y = e.clientY;
-            const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());
-            
-            const cx = parseFloat(circle.getAttribute('cx'));
-            const cy = parseFloat(circle.getAttribute('cy'));
-            dragOffset = {{ x: svgP.x - cx, y: svgP.y - cy }};
+            const svgP = toSvgPoint(e);
+            dragOffset = {{ x: svgP.x - pos.x, y: svgP.y - pos.y }};
             
             e.preventDefault();
         }}
         
-        function drag(e) {{
-            if (!isDragging || !dragTarget) return;
-            
+        function toSvgPoint(e) {{
             const svg = document.getElementById('map-svg');
-            const rect = svg.getBoundingClientRect();
-            const padding = 60;
-            
             const pt = svg.createSVGPoint();
             pt.x = e.clientX;
             pt.y = e.clientY;
-            const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());
-            
-            const newX = svgP.x - dragOffset.x;
-            const newY = svgP.y - dragOffset.y;
-            
-            // Update visual position
-            updateLocationPosition(dragTarget.locId, newX, newY);
+            return pt.matrixTransform(svg.getScreenCTM().inverse());
+        }}
+        
+        // Coalesce mousemove events to one update per animation frame
+        function drag(e) {{
+            if (!isDragging || !dragTarget) return;
+            const scheduled = pendingPointer !== null;
+            pendingPointer = toSvgPoint(e);
+            if (!scheduled) requestAnimationFrame(applyDrag);
+        }}
+        
+        function applyDrag() {{
+            const svgP = pendingPointer;
+            pendingPointer = null;
+            if (!isDragging || !dragTarget || !svgP) return;
             
-            // Update normalized coordinates in scenario
-            const normX = (newX - padding) / (rect.width - 2 * padding);
-            const normY = (newY - padding) / (rect.height - 2 * padding);
+            snapshotCoords();
             
-            // Clamp to 0-1 range
-            const clampedX = Math.max(0, Math.min(1, normX));
-            const clampedY = Math.max(0, Math.min(1, normY));
+            // Normalized coordinates, clamped to the 0-1 range
+            const normX = (svgP.x - dragOffset.x - MAP_PADDING) / (mapView.width - 2 * MAP_PADDING);
+            const normY = (svgP.y - dragOffset.y - MAP_PADDING) / (mapView.height - 2 * MAP_PADDING);
+            const loc = window.locById[dragTarget.locId];
+            loc.x = Math.max(0, Math.min(1, normX));
+            loc.y = Math.max(0, Math.min(1, normY));
             
-            // Update scenario data
-            const loc = scenario.map.locations.find(l => l.id === dragTarget.locId);
-            if (loc) {{
-                loc.x = clampedX;
-                loc.y = clampedY;
-            }}
+            // Only the dragged node and the connections touching it move
+            updateLocationPosition(dragTarget.locId);
             
             // Update coords display
             document.getElementById('coords-display').textContent = 
-                `${{dragTarget.locId}}: (${{clampedX.toFixed(3)}}, ${{clampedY.toFixed(3)}})`;
+                `${{dragTarget.locId}}: (${{loc.x.toFixed(3)}}, ${{loc.y.toFixed(3)}})`;
             
             markAsChanged();
         }}
@@ -603,92 +728,14 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         function endDrag(e) {{
             if (dragTarget) {{
                 dragTarget.group.classList.remove('dragging');
-                // Redraw connections after drag ends
-                redrawConnections();
             }}
             isDragging = false;
             dragTarget = null;
         }}
         
-        function updateLocationPosition(locId, x, y) {{
-            const group = document.getElementById(`loc-group-${{locId}}`);
-            if (!group) return;
-            
-            const circle = group.querySelector('.location-circle');
-            const nameText = group.querySelector('.location-name');
-            const entities = group.querySelectorAll('.entity');
-            
-            circle.setAttribute('cx', x);
-            circle.setAttribute('cy', y);
-            nameText.setAttribute('x', x);
-            nameText.setAttribute('y', y);
-            
-            const nodeRadius = 35;
-            entities.forEach((ent, i) => {{
-                ent.setAttribute('x', x);
-                ent.setAttribute('y', y + nodeRadius + 18 + i * 16);
-            }});
-        }}
-        
-        function redrawConnections() {{
-            const svg = document.getElementById('map-svg');
-            const rect = svg.getBoundingClientRect();
-            const padding = 60;
-            
-            function getScreenCoords(x, y) {{
-                return {{
-                    x: padding + x * (rect.width - 2 * padding),
-                    y: padding + y * (rect.height - 2 * padding)
-                }};
-            }}
-            
-            // Update each connection line
-            scenario.map.connections.forEach(conn => {{
-                const from = scenario.map.locations.find(l => l.id === conn.from);
-                const to = scenario.map.locations.find(l => l.id === conn.to);
-                if (!from || !to) return;
-                
-                const p1 = getScreenCoords(from.x || 0.5, from.y || 0.5);
-                const p2 = getScreenCoords(to.x || 0.5, to.y || 0.5);
-                
-                // Find the connection line (we'll use data attributes)
-                const lines = svg.querySelectorAll('.connection');
-                lines.forEach(line => {{
-                    // Check by comparing coordinates (rough match)
-                    const lx1 = parseFloat(line.getAttribute('x1'));
-                    const ly1 = parseFloat(line.getAttribute('y1'));
-                    const lx2 = parseFloat(line.getAttribute('x2'));
-                    const ly2 = parseFloat(line.getAttribute('y2'));
-                    
-                    // Find matching line by checking if either endpoint matches from or to
-                    const fromGroup = document.getElementById(`loc-group-${{conn.from}}`);
-                    const toGroup = document.getElementById(`loc-group-${{conn.to}}`);
-                    if (!fromGroup || !toGroup) return;
-                    
-                    const fromCircle = fromGroup.querySelector('.location-circle');
-                    const toCircle = toGroup.querySelector('.location-circle');
-                    const fcx = parseFloat(fromCircle.getAttribute('cx'));
-                    const fcy = parseFloat(fromCircle.getAttribute('cy'));
-                    const tcx = parseFloat(toCircle.getAttribute('cx'));
-                    const tcy = parseFloat(toCircle.getAttribute('cy'));
-                    
-                    if ((Math.abs(lx1 - fcx) < 1 && Math.abs(ly1 - fcy) < 1) ||
-                        (Math.abs(lx1 - tcx) < 1 && Math.abs(ly1 - tcy) < 1)) {{
-                        line.setAttribute('x1', fcx);
-                        line.setAttribute('y1', fcy);
-                        line.setAttribute('x2', tcx);
-                        line.setAttribute('y2', tcy);
-                        
-                        // Update label too
-                        const mid = {{ x: (fcx + tcx) / 2, y: (fcy + tcy) / 2 }};
-                        const nextSibling = line.nextElementSibling;
-                        if (nextSibling && nextSibling.classList.contains('connection-label')) {{
-                            nextSibling.setAttribute('x', mid.x);
-                            nextSibling.setAttribute('y', mid.y - 5);
-                        }}
-                    }}
-                }});
-            }});
+        function updateLocationPosition(locId) {{
+            placeLocation(locId);
+            (graphIndex.incident[locId] || []).forEach(placeConnection);
         }}
         
         function handleLocationClick(e) {{
@@ -713,22 +760,38 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             }}
         }}
         
+        function snapshotCoords() {{
+            if (!originalCoords) {{
+                originalCoords = scenario.map.locations.map(loc => [loc.x, loc.y]);
+            }}
+        }}
+        
         function resetPositions() {{
             // Restore original coordinates
-            scenario.map.locations.forEach((loc, i) => {{
-                const orig = originalScenario.map.locations[i];
-                loc.x = orig.x;
-                loc.y = orig.y;
-            }});
+            if (originalCoords) {{
+                scenario.map.locations.forEach((loc, i) => {{
+                    [loc.x, loc.y] = originalCoords[i];
+                }});
+            }}
             hasChanges = false;
             document.getElementById('save-btn').disabled = true;
             document.getElementById('edit-indicator').classList.remove('visible');
             document.getElementById('coords-display').textContent = 'Drag locations to reposition';
-            initMap();
+            layoutMap();
         }}
         
         function downloadUpdatedJson() {{
-            const jsonStr = JSON.stringify(scenario, null, 2);
+            // Expand compact decks back to card name lists
+            const jsonStr = JSON.stringify(scenario, (key, value) => {{
+                if (key === 'decks' && value && value.active) {{
+                    const active = [];
+                    value.active.forEach(([type, count]) => {{
+                        for (let i = 0; i < count; i++) active.push(cardTypes[type]);
+                    }});
+                    return {{ ...value, active }};
+                }}
+                return value;
+            }}, 2);
             const blob = new Blob([jsonStr], {{ type: 'application/json' }});
             const url = URL.createObjectURL(blob);
             
@@ -756,16 +819,159 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         }});
         
         // Initialize on load
-        window.addEventListener('load', initMap);
-        window.addEventListener('resize', () => {{ initMap(); redrawConnections(); }});
+        window.addEventListener('load', () => {{ buildMap(); setupMapHandlers(); loadBackgroundLevel(); }});
+        window.addEventListener('resize', () => {{ layoutMap(); loadBackgroundLevel(); }});
     </script>
 </body>
 </html>
 '''
 
 
+def load_graph_index(scenario_path, scenario):
+    """Viewer subset of the map index: the current sidecar, or computed here."""
+    index = graph_index.load_index(scenario_path)
+    if index is not None:
+        return {'incident': index['incident']}
+    game_map = scenario.get('map', {})
+    incident = {loc['id']: [] for loc in game_map.get('locations', [])}
+    for i, conn in enumerate(game_map.get('connections', [])):
+        for end in {conn.get('from'), conn.get('to')} & incident.keys():
+            incident[end].append(i)
+    return {'incident': incident}
+
+
+def background_tiles_dir(image_path):
+    """Where the levels of a background image go: <image dir>/.tiles/<image hash>/."""
+    image_path = Path(image_path)
+    digest = hashlib.sha256(image_path.read_bytes()).hexdigest()[:16]
+    return image_path.parent / TILE_CACHE_DIR / digest
+
+
+def build_background_levels(image_path):
+    """Downscaled copies of a background image plus a blurred placeholder.
+
+    Results are cached in background_tiles_dir(), with a TILE_MANIFEST script
+    the page loads, so repeated runs only hash the image. Returns the manifest
+    dict, or None without Pillow.
+    """
+    if Image is None:
+        return None
+    image_path = Path(image_path)
+    cache_dir = background_tiles_dir(image_path)
+    manifest_path = cache_dir / 'manifest.json'
+    if manifest_path.exists() and (cache_dir / TILE_MANIFEST).exists():
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(image_path) as source:
+        has_alpha = source.mode in ('RGBA', 'LA', 'P')
+        image = source.convert('RGBA' if has_alpha else 'RGB')
+    ext, fmt, options = ('.png', 'PNG', {'optimize': True}) if has_alpha else ('.jpg', 'JPEG', {'quality': 85})
+
+    levels = []
+    width, height = image.size
+    while True:
+        level = image if (width, height) == image.size else image.resize((width, height), Image.LANCZOS)
+        name = f"level_{width}{ext}"
+        level.save(cache_dir / name, fmt, **options)
+        levels.append({'width': width, 'height': height, 'file': name})
+        if width // 2 < MIN_LEVEL_WIDTH:
+            break
+        width, height = width // 2, max(1, height // 2)
+
+    thumb_height = max(1, round(image.size[1] * PLACEHOLDER_WIDTH / image.size[0]))
+    thumb = image.resize((PLACEHOLDER_WIDTH, thumb_height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'PNG')
+    manifest = {
+        'source_sha256': cache_dir.name,
+        'levels': sorted(levels, key=lambda l: l['width']),
+        'placeholder': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'),
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    with open(cache_dir / TILE_MANIFEST, 'w') as f:
+        f.write(f"window.backgroundTiles = {json.dumps(manifest)};\n")
+    return manifest
+
+
+def compact_payload(scenario):
+    """Minified page payload with each entity's deck run-length encoded.
+
+    decks.active becomes [[card_type_index, run_length], ...] into a shared
+    cardTypes table, preserving card order so saved JSON keeps the original
+    decks.
+    """
+    card_types = []
+    type_index = {}
+    compact = dict(scenario)
+    for group in ('characters', 'monsters'):
+        entities = []
+        for entity in scenario.get(group, []):
+            active = (entity.get('decks') or {}).get('active')
+            if isinstance(active, list):
+                runs = []
+                for card in active:
+                    if card not in type_index:
+                        type_index[card] = len(card_types)
+                        card_types.append(card)
+                    if runs and runs[-1][0] == type_index[card]:
+                        runs[-1][1] += 1
+                    else:
+                        runs.append([type_index[card], 1])
+                entity = dict(entity, decks=dict(entity['decks'], active=runs))
+            entities.append(entity)
+        compact[group] = entities
+    payload = json.dumps({'cardTypes': card_types, 'scenario': compact},
+                         separators=(',', ':'), ensure_ascii=False)
+    # Keep the payload from closing the surrounding <script> element
+    return payload.replace('</', '<\\/')
+
+
+def find_background(scenario_path):
+    """Background image next to the scenario with the same name, or None."""
+    scenario_path = Path(scenario_path)
+    for ext in BACKGROUND_EXTENSIONS:
+        bg_path = scenario_path.with_suffix(ext)
+        if bg_path.exists():
+            return bg_path
+    return None
+
+
+def cache_key(scenario_path):
+    """Hash of everything a generated page depends on."""
+    h = hashlib.sha256()
+    h.update(HTML_TEMPLATE.encode('utf-8'))
+    h.update(Path(scenario_path).read_bytes())
+    bg_path = find_background(scenario_path)
+    if bg_path:
+        h.update(bg_path.read_bytes())
+    return h.hexdigest()
+
+
+def is_current(scenario_path, output_path=None):
+    """True if the existing output was generated from identical inputs."""
+    output_path = Path(output_path or Path(scenario_path).with_suffix('.html'))
+    if not output_path.exists():
+        return False
+    with open(output_path, 'r', encoding='utf-8') as f:
+        match = CACHE_META_RE.search(f.read(2048))
+    return bool(match) and match.group(1) == cache_key(scenario_path)
+
+
 def generate_html(scenario_path, output_path=None):
     """Generate HTML visualization for a scenario."""
+    if output_path is None:
+        output_path = Path(scenario_path).with_suffix('.html')
+    html = render_html(scenario_path, output_path)
+    with open(output_path, 'w') as f:
+        f.write(html)
+    return output_path
+
+
+def render_html(scenario_path, output_path):
+    """Render the viewer page for a scenario; URLs are relative to output_path."""
     with open(scenario_path, 'r') as f:
         scenario = json.load(f)
     
@@ -779,66 +985,175 @@ def generate_html(scenario_path, output_path=None):
     monsters = scenario.get('monsters', [])
     
     # Check for background image (same name as scenario, .png or .jpg)
-    scenario_base = Path(scenario_path).stem
-    scenario_dir = Path(scenario_path).parent
+    bg_path = find_background(scenario_path)
     background_image = ''
-    for ext in ['.png', '.jpg', '.jpeg', '.webp']:
-        bg_path = scenario_dir / f"{scenario_base}{ext}"
-        if bg_path.exists():
-            background_image = bg_path.name
-            print(f"Found background image: {bg_path}")
-            break
+    tiles_dir = ''
+    tiles_script = ''
+    if bg_path:
+        print(f"Found background image: {bg_path}")
+        # The page always links the original; its levels (if Pillow built them) are
+        # picked up from levels.js, so the HTML does not depend on Pillow
+        page_dir = Path(output_path).parent
+        build_background_levels(bg_path)
+        background_image = Path(os.path.relpath(bg_path, page_dir)).as_posix()
+        tiles_dir = Path(os.path.relpath(background_tiles_dir(bg_path), page_dir)).as_posix()
+        tiles_script = f'<script src="{html_lib.escape(tiles_dir)}/{TILE_MANIFEST}"></script>'
     
     # Generate HTML
     scenario_filename = Path(scenario_path).name
-    html = HTML_TEMPLATE.format(
+    return HTML_TEMPLATE.format(
         level_name=level_name,
         victory_desc=victory_desc,
         location_count=len(locations),
         connection_count=len(connections),
         character_count=len(characters),
         monster_count=len(monsters),
-        scenario_json=json.dumps(scenario, indent=2),
-        background_image=background_image,
-        scenario_filename=scenario_filename
+        scenario_json=compact_payload(scenario),
+        graph_index_json=json.dumps(load_graph_index(scenario_path, scenario)),
+        background_image_json=json.dumps(background_image),
+        background_tiles_dir_json=json.dumps(tiles_dir),
+        background_tiles_script=tiles_script,
+        scenario_filename=scenario_filename,
+        cache_key=cache_key(scenario_path)
     )
-    
-    # Determine output path
-    if output_path is None:
-        output_path = Path(scenario_path).with_suffix('.html')
-    
-    with open(output_path, 'w') as f:
-        f.write(html)
-    
-    return output_path
+
+
+INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>ZoomQuest Scenarios</title>
+    <style>
+        body {{
+            font-family: 'Segoe UI', system-ui, sans-serif;
+            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+            color: #e6edf3;
+            padding: 40px;
+        }}
+        h1 {{ margin-bottom: 20px; }}
+        table {{ border-collapse: collapse; }}
+        th, td {{ text-align: left; padding: 8px 16px; border-bottom: 1px solid #30363d; }}
+        th {{ color: #8b949e; font-weight: normal; }}
+        a {{ color: #58a6ff; text-decoration: none; }}
+        a:hover {{ text-decoration: underline; }}
+    </style>
+</head>
+<body>
+    <h1>📜 ZoomQuest Scenarios</h1>
+    <table>
+        <tr><th>Scenario</th><th>File</th><th>📍 Locations</th><th>🔗 Paths</th><th>⚔️ Heroes</th><th>🧟 Monsters</th></tr>
+{rows}
+    </table>
+</body>
+</html>
+'''
+
+
+def index_page_html(scenario_paths, index_dir):
+    """Render the index page; links are relative to index_dir."""
+    rows = []
+    for path in sorted(scenario_paths, key=lambda p: Path(p).name):
+        with open(path, 'r') as f:
+            scenario = json.load(f)
+        game_map = scenario.get('map', {})
+        href = os.path.relpath(Path(path).with_suffix('.html'), index_dir)
+        rows.append(
+            f'        <tr><td><a href="{html_lib.escape(Path(href).as_posix())}">'
+            f'{html_lib.escape(scenario.get("level_name", "Unknown"))}</a></td>'
+            f'<td>{html_lib.escape(Path(path).name)}</td>'
+            f'<td>{len(game_map.get("locations", []))}</td><td>{len(game_map.get("connections", []))}</td>'
+            f'<td>{len(scenario.get("characters", []))}</td><td>{len(scenario.get("monsters", []))}</td></tr>'
+        )
+    return INDEX_TEMPLATE.format(rows='\n'.join(rows))
+
+
+def write_index_page(scenario_paths, index_path):
+    """Write an index page linking every generated scenario page."""
+    index_path = Path(index_path)
+    content = index_page_html(scenario_paths, index_path.parent)
+    if not index_path.exists() or index_path.read_text(encoding='utf-8') != content:
+        index_path.write_text(content, encoding='utf-8')
+    return index_path
+
+
+def ensure_background_levels(scenario_path):
+    """Build the background levels of an up-to-date page (e.g. in a fresh checkout)."""
+    bg_path = find_background(scenario_path)
+    if bg_path:
+        build_background_levels(bg_path)
+
+
+def render_batch(scenario_paths, force=False):
+    """Render every stale scenario in parallel. Returns the paths regenerated."""
+    stale = [p for p in scenario_paths if force or not is_current(p)]
+    for path in set(scenario_paths) - set(stale):
+        ensure_background_levels(path)
+    if len(stale) > 1:
+        with Pool(min(len(stale), os.cpu_count() or 1)) as pool:
+            pool.map(generate_html, stale)
+    elif stale:
+        generate_html(stale[0])
+    return stale
+
+
+def batch_main(patterns, render_all, force):
+    paths = set()
+    if render_all:
+        paths.update(str(p) for p in CONFIGS_DIR.glob('*.json'))
+    for pattern in patterns:
+        matches = glob.glob(pattern)
+        if not matches:
+            print(f"Warning: no scenario files match {pattern}")
+        paths.update(matches)
+    paths = sorted(paths)
+    if not paths:
+        print("Error: no scenario files to render")
+        sys.exit(1)
+
+    stale = render_batch(paths, force)
+    index_path = write_index_page(paths, CONFIGS_DIR / 'index.html')
+    print(f"Rendered {len(stale)}/{len(paths)} scenarios ({len(paths) - len(stale)} unchanged)")
+    for path in stale:
+        print(f"  {Path(path).with_suffix('.html')}")
+    print(f"Index: file://{os.path.abspath(index_path)}")
 
 
 def main():
     # Parse arguments
     open_browser = '--open' in sys.argv
+    force = '--force' in sys.argv
     args = [a for a in sys.argv[1:] if not a.startswith('--')]
     
+    # Batch mode: --all, glob patterns or several files
+    if '--all' in sys.argv or len(args) > 1 or any(glob.has_magic(a) for a in args):
+        batch_main(args, '--all' in sys.argv, force)
+        return
+    
     # Determine scenario file path
     if args:
         scenario_path = args[0]
     else:
         # Default to test_0.json relative to this script
-        script_dir = Path(__file__).parent.parent
-        scenario_path = script_dir / 'configs' / 'test_0.json'
+        scenario_path = CONFIGS_DIR / 'test_0.json'
     
     if not os.path.exists(scenario_path):
         print(f"Error: Scenario file not found: {scenario_path}")
-        print("\nUsage: python scenario_viewer.py [scenario_file] [--open]")
+        print("\nUsage: python scenario_viewer.py [scenario_file] [--open] [--force]")
+        print("       python scenario_viewer.py --all [--force]")
         print("\nAvailable scenarios:")
-        configs_dir = Path(__file__).parent.parent / 'configs'
-        if configs_dir.exists():
-            for f in configs_dir.glob('*.json'):
+        if CONFIGS_DIR.exists():
+            for f in CONFIGS_DIR.glob('*.json'):
                 print(f"  {f}")
         sys.exit(1)
     
     print(f"Loading scenario: {scenario_path}")
-    output_path = generate_html(scenario_path)
-    print(f"Generated: {output_path}")
+    output_path = Path(scenario_path).with_suffix('.html')
+    if not force and is_current(scenario_path):
+        ensure_background_levels(scenario_path)
+        print(f"Unchanged: {output_path}")
+    else:
+        output_path = generate_html(scenario_path)
+        print(f"Generated: {output_path}")
     
     if open_browser:
         webbrowser.open(f'file://{os.path.abspath(output_path)}')
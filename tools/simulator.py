@@ -0,0 +1,1130 @@
+#!/usr/bin/env python3
+"""
+Headless Simulator - Play ZoomQuest scenarios in memory for balance testing.
+
+Mirrors the server-side rules (ActionSequenceResolver, Deck, GameStateHelper)
+without a database, so thousands of full games can be run per minute to
+collect win rates, game lengths and per-class survival.
+
+Usage:
+    python simulator.py [scenario_file] [--games N] [--players N] [--seed N]
+                        [--policy hunt|random|stay] [--max-rounds N] [--json]
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+
+# Card types (constants.inc.php)
+CARD_ATTACK = 'attack'
+CARD_DEFEND = 'defend'
+CARD_HEAL = 'heal'
+CARD_SNEAK = 'sneak'
+CARD_WATCH = 'watch'
+CARD_SHUFFLE = 'shuffle'
+CARD_POISON = 'poison'
+CARD_MARK = 'mark'
+CARD_BACKSTAB = 'backstab'
+CARD_EXECUTE = 'execute'
+CARD_SELL = 'sell'
+CARD_STEAL = 'steal'
+CARD_WEALTH = 'wealth'
+
+# Card piles
+PILE_ACTIVE = 'active'
+PILE_DISCARD = 'discard'
+PILE_DESTROYED = 'destroyed'
+PILE_INACTIVE = 'inactive'
+PILES = (PILE_ACTIVE, PILE_DISCARD, PILE_DESTROYED, PILE_INACTIVE)
+
+# Item types
+ITEM_NEW_ACTION = 'new_action'
+ITEM_INFORMATION = 'information'
+ITEM_FACTION = 'faction'
+
+# Entity types
+ENTITY_PLAYER = 'player'
+ENTITY_MONSTER = 'monster'
+
+# Faction relationships
+RELATION_HOSTILE = 'hostile'
+RELATION_NEUTRAL = 'neutral'
+RELATION_FRIENDLY = 'friendly'
+
+# Entity tags
+TAG_HIDDEN = 'hidden'
+TAG_POISONED = 'poisoned'
+TAG_MARKED = 'marked'
+
+# Victory condition types
+VICTORY_DEFEAT_ALL = 'defeat_all'
+VICTORY_REACH_LOCATION = 'reach_location'
+VICTORY_DEFEAT_TARGET = 'defeat_target'
+VICTORY_COLLECT_ITEM = 'collect_item'
+
+# Individual goal tracking types
+TRACK_LOCATIONS_VISITED = 'locations_visited'
+TRACK_TURNS_IN_TERRAIN = 'turns_in_terrain'
+TRACK_TURNS_IN_DIRECTION = 'turns_in_direction'
+TRACK_KILLING_BLOWS = 'killing_blows'
+TRACK_KILLING_BLOWS_FACTION = 'killing_blows_faction'
+TRACK_BLOCKS_FOR_ALLIES = 'blocks_for_allies'
+TRACK_CARD_PLAYS = 'card_plays'
+
+# Resolution order of ActionSequenceResolver::resolveRound
+RESOLUTION_ORDER = (
+    CARD_WATCH, CARD_SNEAK, CARD_POISON, CARD_MARK, CARD_DEFEND,
+    CARD_BACKSTAB, CARD_EXECUTE, CARD_ATTACK, CARD_HEAL, CARD_SHUFFLE,
+    CARD_SELL, CARD_WEALTH, CARD_STEAL,
+)
+
+# Phases that are shuffled before resolving ("random order for ties")
+SHUFFLED_PHASES = (CARD_BACKSTAB, CARD_EXECUTE, CARD_ATTACK)
+
+OUTCOME_VICTORY = 'victory'
+OUTCOME_DEFEAT = 'defeat'
+OUTCOME_TIMEOUT = 'timeout'
+
+POLICIES = ('hunt', 'random', 'stay')
+
+
+class Card:
+    """A single card; mirrors a row of the `card` table."""
+
+    __slots__ = ('card_id', 'card_type', 'pile', 'order')
+
+    def __init__(self, card_id, card_type, pile, order):
+        self.card_id = card_id
+        self.card_type = card_type
+        self.pile = pile
+        self.order = order
+
+
+class Entity:
+    """A player or monster with its card piles, items and tags."""
+
+    __slots__ = ('entity_id', 'entity_type', 'player_id', 'name', 'entity_class',
+                 'faction', 'location', 'is_defeated', 'piles', 'items', 'tags')
+
+    def __init__(self, entity_id, entity_type, player_id, name, entity_class, faction, location):
+        self.entity_id = entity_id
+        self.entity_type = entity_type
+        self.player_id = player_id
+        self.name = name
+        self.entity_class = entity_class
+        self.faction = faction
+        self.location = location
+        self.is_defeated = False
+        self.piles = {pile: [] for pile in PILES}
+        self.items = []
+        # tag_name -> [tag_value, round_applied]
+        self.tags = {}
+
+    def pile_counts(self):
+        return {pile: len(cards) for pile, cards in self.piles.items()}
+
+    def copy(self):
+        other = Entity(self.entity_id, self.entity_type, self.player_id, self.name,
+                       self.entity_class, self.faction, self.location)
+        other.is_defeated = self.is_defeated
+        other.piles = {pile: [Card(c.card_id, c.card_type, c.pile, c.order) for c in cards]
+                       for pile, cards in self.piles.items()}
+        other.items = list(self.items)
+        other.tags = {name: list(value) for name, value in self.tags.items()}
+        return other
+
+    def health(self):
+        return len(self.piles[PILE_ACTIVE]) + len(self.piles[PILE_DISCARD])
+
+
+class Deck:
+    """In-memory equivalent of Helpers/Deck.php."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.next_card_id = 1
+
+    def _max_order(self, entity, pile):
+        cards = entity.piles[pile]
+        return max(c.order for c in cards) if cards else -1
+
+    def _move(self, entity, card, pile):
+        entity.piles[card.pile].remove(card)
+        card.pile = pile
+        entity.piles[pile].append(card)
+
+    def create_deck(self, entity, card_types):
+        for order, card_type in enumerate(card_types):
+            entity.piles[PILE_ACTIVE].append(Card(self.next_card_id, card_type, PILE_ACTIVE, order))
+            self.next_card_id += 1
+
+    def shuffle_active(self, entity):
+        cards = list(entity.piles[PILE_ACTIVE])
+        self.rng.shuffle(cards)
+        for order, card in enumerate(cards):
+            card.order = order
+
+    def draw_top(self, entity):
+        """Top card of the active pile; it stays in the pile until discarded."""
+        active = entity.piles[PILE_ACTIVE]
+        if not active:
+            return None
+        return min(active, key=lambda c: c.order)
+
+    def has_active_cards(self, entity):
+        return bool(entity.piles[PILE_ACTIVE])
+
+    def get_active_cards(self, entity):
+        return sorted(entity.piles[PILE_ACTIVE], key=lambda c: c.order)
+
+    def reorder_active(self, entity, card_ids):
+        by_id = {c.card_id: c for c in entity.piles[PILE_ACTIVE]}
+        for order, card_id in enumerate(card_ids):
+            card = by_id.get(card_id)
+            if card is not None:
+                card.order = order
+
+    def move_active_to_discard(self, entity):
+        base = self._max_order(entity, PILE_DISCARD) + 1
+        for index, card in enumerate(self.get_active_cards(entity)):
+            card.order = base + index
+            self._move(entity, card, PILE_DISCARD)
+
+    def discard(self, entity, card):
+        # Deck::discard keeps the card's current card_order
+        if card.pile != PILE_DISCARD:
+            self._move(entity, card, PILE_DISCARD)
+
+    def destroy(self, entity, card):
+        if card.pile != PILE_DESTROYED:
+            self._move(entity, card, PILE_DESTROYED)
+
+    def heal_one(self, entity):
+        destroyed = entity.piles[PILE_DESTROYED]
+        if not destroyed:
+            return None
+        card = self.rng.choice(destroyed)
+        card.order = self._max_order(entity, PILE_DISCARD) + 1
+        self._move(entity, card, PILE_DISCARD)
+        return card
+
+    def destroy_one_card(self, entity, exclude_ids=()):
+        """Destroy a random card, active pile first, then discard."""
+        for pile in (PILE_ACTIVE, PILE_DISCARD):
+            cards = [c for c in entity.piles[pile] if c.card_id not in exclude_ids]
+            if cards:
+                card = self.rng.choice(cards)
+                self._move(entity, card, PILE_DESTROYED)
+                return card, pile
+        return None, None
+
+    def is_defeated(self, entity):
+        return entity.health() == 0
+
+    def refresh_deck(self, entity):
+        """Move discard to the bottom of active, maintaining order."""
+        discard = sorted(entity.piles[PILE_DISCARD], key=lambda c: c.order)
+        if not discard:
+            return
+        base = self._max_order(entity, PILE_ACTIVE) + 1
+        for index, card in enumerate(discard):
+            card.order = base + index
+            card.pile = PILE_ACTIVE
+        entity.piles[PILE_ACTIVE].extend(discard)
+        entity.piles[PILE_DISCARD] = []
+
+    def add_card_to_inactive(self, entity, card_type):
+        order = self._max_order(entity, PILE_INACTIVE) + 1
+        card = Card(self.next_card_id, card_type, PILE_INACTIVE, order)
+        self.next_card_id += 1
+        entity.piles[PILE_INACTIVE].append(card)
+        return card
+
+
+class Sequence:
+    """An action sequence at one location (action_sequence + sequence_participant)."""
+
+    __slots__ = ('location', 'participants', 'drawn', 'targets', 'blocks')
+
+    def __init__(self, location, participants):
+        self.location = location
+        self.participants = participants
+        self.drawn = {}
+        self.targets = {}
+        self.blocks = {}
+
+    def alive(self):
+        return [e for e in self.participants if not e.is_defeated]
+
+
+def load_scenario(path):
+    """Load a scenario JSON file."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def build_adjacency(scenario):
+    """Adjacency lists mirroring GameStateHelper::getAdjacentLocations."""
+    adjacency = {loc['id']: [] for loc in scenario['map']['locations']}
+    for conn in scenario['map']['connections']:
+        src, dst = conn['from'], conn['to']
+        if dst not in adjacency[src]:
+            adjacency[src].append(dst)
+        if conn.get('bidirectional', True) and src not in adjacency[dst]:
+            adjacency[dst].append(src)
+    return adjacency
+
+
+class Game:
+    """One game of ZoomQuest played entirely in memory."""
+
+    def __init__(self, scenario, num_players=None, seed=None, policy='hunt', adjacency=None):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self.deck = Deck(self.rng)
+        self.policy = policy
+        self.num_players = num_players or len(scenario['characters'])
+        self.adjacency = adjacency if adjacency is not None else build_adjacency(scenario)
+        self.locations = {loc['id']: loc for loc in scenario['map']['locations']}
+        matrix = scenario.get('factions', {}).get('matrix', {})
+        self.faction_matrix = {f: dict(rels) for f, rels in matrix.items()}
+        self.victory = scenario.get('victory') or {'type': VICTORY_DEFEAT_ALL}
+        self.round = 0
+        self.entities = []
+        # player_id -> Counter of (track_type, filter) and set of visited locations
+        self.progress = {}
+        self.visited = {}
+        self.goals = {}
+        self.setup()
+
+    def fork(self):
+        """Independent copy of the game state; the scenario and map are shared."""
+        other = copy.copy(self)
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        other.deck = Deck(other.rng)
+        other.deck.next_card_id = self.deck.next_card_id
+        other.faction_matrix = {f: dict(rels) for f, rels in self.faction_matrix.items()}
+        other.entities = [e.copy() for e in self.entities]
+        other.progress = {pid: Counter(counts) for pid, counts in self.progress.items()}
+        other.visited = {pid: set(locs) for pid, locs in self.visited.items()}
+        other.goals = dict(self.goals)
+        return other
+
+    # ------------------------------------------------------------------
+    # Setup (Game::setupNewGame)
+    # ------------------------------------------------------------------
+
+    def setup(self):
+        characters = list(self.scenario['characters'])
+        self.rng.shuffle(characters)
+        entity_id = 1
+
+        for index in range(self.num_players):
+            config = characters[index % len(characters)]
+            player_id = index + 1
+            entity = Entity(entity_id, ENTITY_PLAYER, player_id, config['name'], config['class'],
+                            config.get('faction', 'players'), config['location'])
+            self.deck.create_deck(entity, config['decks']['active'])
+            self.deck.shuffle_active(entity)
+            self.entities.append(entity)
+            self.progress[player_id] = Counter()
+            self.visited[player_id] = set()
+            entity_id += 1
+
+        for config in self.scenario['monsters']:
+            for i in range(self.num_players):
+                name = f"{config['name']} {i + 1}" if self.num_players > 1 else config['name']
+                entity = Entity(entity_id, ENTITY_MONSTER, None, name, config['class'],
+                                config.get('faction', 'monsters'), config['location'])
+                self.deck.create_deck(entity, config['decks']['active'])
+                self.deck.shuffle_active(entity)
+                for item in config.get('items', []):
+                    entity.items.append({'item_name': item['name'], 'item_type': item['type'],
+                                         'item_data': item.get('data', {})})
+                self.entities.append(entity)
+                entity_id += 1
+
+        self.assign_goals()
+
+    def assign_goals(self):
+        """Shuffle the scenario goals and cycle them over players (GoalTracker::assignGoals)."""
+        goals = list(self.scenario.get('individual_goals', []))
+        if not goals:
+            return
+        self.rng.shuffle(goals)
+        for index, player in enumerate(self.players()):
+            self.goals[player.player_id] = goals[index % len(goals)]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_relationship(self, faction1, faction2):
+        return self.faction_matrix.get(faction1, {}).get(faction2, RELATION_NEUTRAL)
+
+    def players(self):
+        return [e for e in self.entities if e.entity_type == ENTITY_PLAYER]
+
+    def monsters(self):
+        return [e for e in self.entities if e.entity_type == ENTITY_MONSTER]
+
+    def entities_at(self, location):
+        return [e for e in self.entities if e.location == location and not e.is_defeated]
+
+    def track(self, entity, track_type, track_filter=''):
+        if entity.player_id is not None:
+            self.progress[entity.player_id][(track_type, track_filter or '')] += 1
+
+    def track_killing_blow(self, killer, victim):
+        if killer.player_id is not None:
+            self.track(killer, TRACK_KILLING_BLOWS)
+            self.track(killer, TRACK_KILLING_BLOWS_FACTION, victim.faction)
+
+    def goal_progress(self, player_id):
+        goal = self.goals.get(player_id)
+        if goal is None:
+            return 0
+        if goal.get('track') == TRACK_LOCATIONS_VISITED:
+            return len(self.visited[player_id])
+        return self.progress[player_id][(goal.get('track', ''), goal.get('filter') or '')]
+
+    def is_goal_complete(self, player_id):
+        goal = self.goals.get(player_id)
+        if goal is None:
+            return False
+        progress = self.goal_progress(player_id)
+        threshold = int(goal.get('threshold', 1))
+        if goal.get('compare', 'gte') == 'equal':
+            return progress == threshold
+        return progress >= threshold
+
+    # ------------------------------------------------------------------
+    # Tags
+    # ------------------------------------------------------------------
+
+    def has_tag(self, entity, tag_name):
+        return tag_name in entity.tags
+
+    def set_tag(self, entity, tag_name, value=1, round_applied=0):
+        entity.tags[tag_name] = [value, round_applied]
+
+    def clear_expired_tags(self, current_round, entities=None):
+        for entity in self.entities if entities is None else entities:
+            tags = entity.tags
+            if not tags:
+                continue
+            hidden = tags.get(TAG_HIDDEN)
+            if hidden is not None and hidden[1] < current_round:
+                del tags[TAG_HIDDEN]
+            poisoned = tags.get(TAG_POISONED)
+            if poisoned is not None and poisoned[1] < current_round - 2:
+                del tags[TAG_POISONED]
+            marked = tags.get(TAG_MARKED)
+            if marked is not None and marked[1] < current_round - 1:
+                del tags[TAG_MARKED]
+
+    # ------------------------------------------------------------------
+    # Targeting
+    # ------------------------------------------------------------------
+
+    def get_lowest_health_target(self, seq, actor, relationship, include_hidden=True):
+        candidates = []
+        lowest = None
+        for p in seq.alive():
+            if self.get_relationship(actor.faction, p.faction) != relationship:
+                continue
+            if not include_hidden and TAG_HIDDEN in p.tags:
+                continue
+            health = p.health()
+            if lowest is None or health < lowest:
+                lowest = health
+                candidates = [p]
+            elif health == lowest:
+                candidates.append(p)
+        if not candidates:
+            return None
+        return candidates[0] if len(candidates) == 1 else self.rng.choice(candidates)
+
+    def get_neutral_with_items(self, seq, actor):
+        candidates = [p for p in seq.alive()
+                      if self.get_relationship(actor.faction, p.faction) == RELATION_NEUTRAL and p.items]
+        return self.rng.choice(candidates) if candidates else None
+
+    def determine_target(self, seq, entity, card_type):
+        if card_type in (CARD_HEAL, CARD_DEFEND):
+            return self.get_lowest_health_target(seq, entity, RELATION_FRIENDLY, True)
+        if card_type in (CARD_ATTACK, CARD_BACKSTAB, CARD_EXECUTE):
+            return self.get_lowest_health_target(seq, entity, RELATION_HOSTILE, False)
+        if card_type in (CARD_POISON, CARD_MARK):
+            return self.get_lowest_health_target(seq, entity, RELATION_HOSTILE, True)
+        if card_type in (CARD_STEAL, CARD_WEALTH):
+            return self.get_neutral_with_items(seq, entity)
+        if card_type in (CARD_SELL, CARD_SNEAK, CARD_WATCH, CARD_SHUFFLE):
+            return entity
+        return None
+
+    # ------------------------------------------------------------------
+    # Sequence resolution (ActionSequenceResolver)
+    # ------------------------------------------------------------------
+
+    def create_sequence(self, location):
+        return Sequence(location, self.entities_at(location))
+
+    def has_hostiles(self, seq):
+        for p1 in seq.participants:
+            for p2 in seq.participants:
+                if p1 is not p2 and self.get_relationship(p1.faction, p2.faction) == RELATION_HOSTILE:
+                    return True
+        return False
+
+    def draw_cards_for_sequence(self, seq, current_round):
+        self.clear_expired_tags(current_round)
+        seq.blocks = {}
+        drawn_cards = []
+        for p in seq.alive():
+            card = self.deck.draw_top(p)
+            if card is None:
+                continue
+            target = self.determine_target(seq, p, card.card_type)
+            seq.drawn[p.entity_id] = card
+            seq.targets[p.entity_id] = target
+            self.track(p, TRACK_CARD_PLAYS, card.card_type)
+            drawn_cards.append({
+                'entity_id': p.entity_id,
+                'entity_type': p.entity_type,
+                'entity_name': p.name,
+                'faction': p.faction,
+                'card_id': card.card_id,
+                'card_type': card.card_type,
+                'target_id': target.entity_id if target else None,
+                'target_name': target.name if target else None,
+            })
+        return drawn_cards
+
+    def resolve_round(self, seq, current_round):
+        by_type = defaultdict(list)
+        for p in seq.participants:
+            card = seq.drawn.get(p.entity_id)
+            if card is not None:
+                by_type[card.card_type].append(p)
+
+        results = []
+        watched = bool(by_type.get(CARD_WATCH))
+        sellers = {p.entity_id for p in by_type.get(CARD_SELL, ())}
+
+        for card_type in RESOLUTION_ORDER:
+            actors = by_type.get(card_type)
+            if not actors:
+                continue
+            if card_type in SHUFFLED_PHASES:
+                self.rng.shuffle(actors)
+            resolve = self._resolvers[card_type]
+            for actor in actors:
+                results.append(resolve(self, seq, actor, current_round, watched, sellers))
+
+        for p in seq.participants:
+            card = seq.drawn.get(p.entity_id)
+            if card is not None:
+                self.deck.discard(p, card)
+
+        return results
+
+    def _result(self, seq, actor, card_type, effect, with_target=True):
+        result = {
+            'entity_id': actor.entity_id,
+            'entity_name': actor.name,
+            'entity_type': actor.entity_type,
+            'card_id': seq.drawn[actor.entity_id].card_id,
+            'card_type': card_type,
+            'effect': effect,
+        }
+        if with_target:
+            target = seq.targets.get(actor.entity_id)
+            result['target_id'] = target.entity_id if target else None
+        return result
+
+    def _resolve_watch(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_WATCH, 'watch', with_target=False)
+        result['revealed'] = []
+        for e in self.entities_at(actor.location):
+            if e is actor or self.get_relationship(actor.faction, e.faction) != RELATION_HOSTILE:
+                continue
+            if TAG_HIDDEN in e.tags:
+                del e.tags[TAG_HIDDEN]
+                result['revealed'].append({'entity_id': e.entity_id, 'entity_name': e.name})
+        return result
+
+    def _resolve_sneak(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_SNEAK, 'sneak', with_target=False)
+        if watched:
+            result['effect'] = 'sneak_failed'
+            result['reason'] = 'watched'
+        else:
+            self.set_tag(actor, TAG_HIDDEN, 1, current_round)
+            result['effect'] = 'hidden'
+        return result
+
+    def _resolve_debuff(self, seq, actor, current_round, card_type, tag_name, duration):
+        result = self._result(seq, actor, card_type, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        self.set_tag(target, tag_name, duration, current_round)
+        result['target_name'] = target.name
+        result['effect'] = card_type
+        result['duration'] = duration
+        return result
+
+    def _resolve_poison(self, seq, actor, current_round, watched, sellers):
+        return self._resolve_debuff(seq, actor, current_round, CARD_POISON, TAG_POISONED, 3)
+
+    def _resolve_mark(self, seq, actor, current_round, watched, sellers):
+        return self._resolve_debuff(seq, actor, current_round, CARD_MARK, TAG_MARKED, 2)
+
+    def _resolve_defend(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_DEFEND, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        seq.blocks[target.entity_id] = seq.blocks.get(target.entity_id, 0) + 1
+        result['target_name'] = target.name
+        result['effect'] = 'block'
+        if target is not actor:
+            self.track(actor, TRACK_BLOCKS_FOR_ALLIES)
+        result['block_count'] = seq.blocks[target.entity_id]
+        return result
+
+    def _deal_damage(self, seq, actor, target, result, base_damage, effect):
+        """Shared block/mark/destroy/defeat logic of backstab, execute and attack."""
+        block_count = seq.blocks.get(target.entity_id, 0)
+        damage = base_damage
+        if TAG_MARKED in target.tags:
+            damage += 1
+            result['marked_bonus'] = True
+
+        blocks_used = min(block_count, damage)
+        damage_dealt = damage - blocks_used
+        if blocks_used > 0:
+            seq.blocks[target.entity_id] = block_count - blocks_used
+            result['blocks_used'] = blocks_used
+            result['blocks_remaining'] = block_count - blocks_used
+
+        if damage_dealt == 0:
+            result['effect'] = 'blocked'
+            return result
+
+        target_card = seq.drawn.get(target.entity_id)
+        exclude = {target_card.card_id} if target_card is not None else set()
+        result['effect'] = effect
+        result['damage'] = damage_dealt
+        result['destroyed_cards'] = []
+        for _ in range(damage_dealt):
+            card, pile = self.deck.destroy_one_card(target, exclude)
+            if card is None:
+                break
+            result['destroyed_cards'].append({'card_id': card.card_id, 'card_type': card.card_type,
+                                              'from_pile': pile})
+            exclude.add(card.card_id)
+
+        if self.deck.is_defeated(target):
+            self.defeat(actor, target, result)
+        return result
+
+    def defeat(self, killer, victim, result):
+        victim.is_defeated = True
+        result['target_defeated'] = True
+        self.track_killing_blow(killer, victim)
+        looted = self.transfer_items_on_kill(killer, victim)
+        if looted:
+            result['items_looted'] = looted
+
+    def _resolve_backstab(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_BACKSTAB, 'no_target')
+        if TAG_HIDDEN not in actor.tags:
+            result['effect'] = 'not_hidden'
+            result['reason'] = 'must be hidden to backstab'
+            return result
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        result['target_name'] = target.name
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        return self._deal_damage(seq, actor, target, result, 3, 'backstab')
+
+    def _resolve_execute(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_EXECUTE, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        result['target_name'] = target.name
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        if TAG_POISONED not in target.tags:
+            result['effect'] = 'not_poisoned'
+            result['reason'] = 'target must be poisoned'
+            return result
+        return self._deal_damage(seq, actor, target, result, 3, 'execute')
+
+    def _resolve_attack(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_ATTACK, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        result['target_name'] = target.name
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        if TAG_HIDDEN in target.tags:
+            result['effect'] = 'target_hidden'
+            return result
+        self._deal_damage(seq, actor, target, result, 1, 'destroy')
+        if result.get('destroyed_cards'):
+            result['destroyed_card'] = result['destroyed_cards'][0]
+            result['from_pile'] = result['destroyed_cards'][0]['from_pile']
+        return result
+
+    def _resolve_heal(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_HEAL, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        if target.is_defeated:
+            result['effect'] = 'target_defeated'
+            return result
+        card = self.deck.heal_one(target)
+        result['target_name'] = target.name
+        result['effect'] = 'heal' if card else 'no_cards_to_heal'
+        result['healed_card'] = {'card_id': card.card_id, 'card_type': card.card_type} if card else None
+        return result
+
+    def _resolve_shuffle(self, seq, actor, current_round, watched, sellers):
+        self.deck.shuffle_active(actor)
+        return self._result(seq, actor, CARD_SHUFFLE, 'shuffle', with_target=False)
+
+    def _resolve_sell(self, seq, actor, current_round, watched, sellers):
+        return self._result(seq, actor, CARD_SELL, 'selling', with_target=False)
+
+    def _resolve_wealth(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_WEALTH, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        result['target_name'] = target.name
+        if target.entity_id not in sellers:
+            result['effect'] = 'not_selling'
+            result['reason'] = 'target is not selling'
+            return result
+        if not target.items:
+            result['effect'] = 'no_items'
+            return result
+        item = target.items.pop(0)
+        self.consume_item(actor, item)
+        # The wealth card is destroyed here, then moved back to discard
+        # with the other drawn cards, exactly as on the server.
+        self.deck.destroy(actor, seq.drawn[actor.entity_id])
+        result['effect'] = 'purchased'
+        result['item'] = item
+        return result
+
+    def _resolve_steal(self, seq, actor, current_round, watched, sellers):
+        result = self._result(seq, actor, CARD_STEAL, 'no_target')
+        target = seq.targets.get(actor.entity_id)
+        if target is None:
+            return result
+        result['target_name'] = target.name
+        if watched:
+            self.set_faction_relationship(actor.faction, target.faction, RELATION_HOSTILE)
+            result['effect'] = 'caught'
+            result['reason'] = 'watched'
+            result['faction_now_hostile'] = target.faction
+            return result
+        if not target.items:
+            result['effect'] = 'no_items'
+            return result
+        item = target.items.pop(0)
+        self.consume_item(actor, item)
+        result['effect'] = 'stolen'
+        result['item'] = item
+        return result
+
+    _resolvers = {
+        CARD_WATCH: _resolve_watch,
+        CARD_SNEAK: _resolve_sneak,
+        CARD_POISON: _resolve_poison,
+        CARD_MARK: _resolve_mark,
+        CARD_DEFEND: _resolve_defend,
+        CARD_BACKSTAB: _resolve_backstab,
+        CARD_EXECUTE: _resolve_execute,
+        CARD_ATTACK: _resolve_attack,
+        CARD_HEAL: _resolve_heal,
+        CARD_SHUFFLE: _resolve_shuffle,
+        CARD_SELL: _resolve_sell,
+        CARD_WEALTH: _resolve_wealth,
+        CARD_STEAL: _resolve_steal,
+    }
+
+    def consume_item(self, entity, item):
+        if item['item_type'] == ITEM_NEW_ACTION:
+            self.deck.add_card_to_inactive(entity, item['item_data'].get('card_type', CARD_ATTACK))
+
+    def set_faction_relationship(self, faction1, faction2, relationship):
+        if faction1 in self.faction_matrix:
+            self.faction_matrix[faction1][faction2] = relationship
+        if faction2 in self.faction_matrix:
+            self.faction_matrix[faction2][faction1] = relationship
+
+    def transfer_items_on_kill(self, killer, victim):
+        transferred = victim.items
+        victim.items = []
+        for item in transferred:
+            self.consume_item(killer, item)
+        return transferred
+
+    def apply_poison_ticks(self, seq):
+        results = []
+        for p in seq.alive():
+            poisoned = p.tags.get(TAG_POISONED)
+            if poisoned is None:
+                continue
+            result = {
+                'entity_id': p.entity_id,
+                'entity_name': p.name,
+                'entity_type': p.entity_type,
+                'effect': 'poison_tick',
+                'rounds_remaining': poisoned[0],
+            }
+            drawn = seq.drawn.get(p.entity_id)
+            exclude = {drawn.card_id} if drawn is not None else set()
+            card, pile = self.deck.destroy_one_card(p, exclude)
+            if card is not None:
+                result['destroyed_card'] = {'card_id': card.card_id, 'card_type': card.card_type}
+                result['from_pile'] = pile
+                if self.deck.is_defeated(p):
+                    p.is_defeated = True
+                    result['defeated'] = True
+            else:
+                result['no_cards'] = True
+            results.append(result)
+        return results
+
+    def get_eliminated_faction(self, seq):
+        alive = {}
+        for p in seq.participants:
+            alive[p.faction] = alive.get(p.faction, 0) + (0 if p.is_defeated else 1)
+        for faction, count in alive.items():
+            if count == 0:
+                return faction
+        return None
+
+    def is_everyone_out_of_cards(self, seq):
+        return not any(p.piles[PILE_ACTIVE] for p in seq.alive())
+
+    def get_participant_status(self, seq):
+        status = []
+        for p in seq.participants:
+            status.append({
+                'entity_id': p.entity_id,
+                'entity_name': p.name,
+                'entity_type': p.entity_type,
+                'faction': p.faction,
+                'is_defeated': p.is_defeated,
+                'active': len(p.piles[PILE_ACTIVE]),
+                'discard': len(p.piles[PILE_DISCARD]),
+                'destroyed': len(p.piles[PILE_DESTROYED]),
+                'tags': [{'tag_name': name, 'tag_value': value[0]} for name, value in p.tags.items()],
+            })
+        return status
+
+    def run_sequence(self, location, on_round=None):
+        """
+        Run SequenceSetup -> (DrawCards -> Resolve -> RoundEnd)* -> Cleanup
+        at one location. Returns (sequence, rounds, eliminated_faction) or
+        None when there is nobody hostile to fight.
+        """
+        seq = self.create_sequence(location)
+        if not self.has_hostiles(seq):
+            return None
+
+        sequence_round = 0
+        while True:
+            sequence_round += 1
+            finished, eliminated = self.play_sequence_round(seq, sequence_round, on_round)
+            if finished:
+                return seq, sequence_round, eliminated
+
+    def run_battle(self, location, seed, on_round=None):
+        """run_sequence on an RNG stream of its own, so battles replay the same apart or together."""
+        rng = self.rng
+        self.rng = self.deck.rng = random.Random(seed)
+        try:
+            return self.run_sequence(location, on_round)
+        finally:
+            self.rng = self.deck.rng = rng
+
+    def play_sequence_round(self, seq, sequence_round, on_round=None):
+        """One DrawCards -> Resolve -> RoundEnd pass. Returns (finished, eliminated_faction)."""
+        drawn = self.draw_cards_for_sequence(seq, sequence_round)
+        resolutions = self.resolve_round(seq, sequence_round) if drawn else []
+        resolutions.extend(self.apply_poison_ticks(seq))
+        if on_round is not None:
+            on_round(seq, sequence_round, drawn, resolutions)
+
+        eliminated = self.get_eliminated_faction(seq)
+        seq.drawn = {}
+        seq.targets = {}
+        seq.blocks = {}
+        return eliminated is not None or self.is_everyone_out_of_cards(seq), eliminated
+
+    # ------------------------------------------------------------------
+    # Round flow (RoundStart -> MoveSelection -> ResolveMoves -> ...)
+    # ------------------------------------------------------------------
+
+    def choose_move(self, entity):
+        """Return a target location for a player, or None to stay."""
+        if self.policy == 'stay':
+            return None
+        neighbours = self.adjacency.get(entity.location, [])
+        if self.policy == 'random':
+            options = [None] + neighbours
+            return self.rng.choice(options)
+        return self._hunt_step(entity)
+
+    def _hunt_step(self, entity):
+        """Step along a shortest path toward the nearest living hostile."""
+        hostile_at = set()
+        for e in self.entities:
+            if not e.is_defeated and self.get_relationship(entity.faction, e.faction) == RELATION_HOSTILE:
+                hostile_at.add(e.location)
+        if not hostile_at and self.victory.get('type') == VICTORY_REACH_LOCATION:
+            hostile_at.add(self.victory.get('target'))
+        if not hostile_at or entity.location in hostile_at:
+            return None
+
+        parent = {entity.location: None}
+        queue = deque([entity.location])
+        while queue:
+            node = queue.popleft()
+            if node in hostile_at:
+                while parent[node] != entity.location:
+                    node = parent[node]
+                return node
+            for nxt in self.adjacency.get(node, []):
+                if nxt not in parent:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        return None
+
+    def round_start(self):
+        self.round += 1
+        for entity in self.players():
+            if entity.is_defeated:
+                continue
+            location = self.locations.get(entity.location, {})
+            terrain = location.get('terrain', 'wilderness')
+            direction = location.get('direction', 'center')
+            if terrain:
+                self.track(entity, TRACK_TURNS_IN_TERRAIN, terrain)
+            if direction:
+                self.track(entity, TRACK_TURNS_IN_DIRECTION, direction)
+            self.visited[entity.player_id].add(entity.location)
+            self.deck.refresh_deck(entity)
+
+    def resolve_moves(self):
+        moves = []
+        for entity in self.players():
+            if entity.is_defeated:
+                continue
+            target = self.choose_move(entity)
+            if target is not None:
+                moves.append((entity, target))
+        for entity, target in moves:
+            entity.location = target
+        for entity in self.entities:
+            if not entity.is_defeated:
+                self.deck.refresh_deck(entity)
+        return moves
+
+    def sequence_locations(self):
+        seen = []
+        for entity in self.players():
+            if not entity.is_defeated and entity.location not in seen:
+                seen.append(entity.location)
+        return seen
+
+    def battle_order(self):
+        """
+        Sequence locations in the random order battles are resolved in
+        (rules.md), each with the seed of its RNG stream for run_battle.
+        """
+        locations = self.sequence_locations()
+        self.rng.shuffle(locations)
+        return [(location, self.rng.getrandbits(64)) for location in locations]
+
+    def check_victory(self):
+        """Return OUTCOME_VICTORY / OUTCOME_DEFEAT, or None to keep playing."""
+        condition = self.victory.get('type', VICTORY_DEFEAT_ALL)
+        target = self.victory.get('target')
+        if condition == VICTORY_DEFEAT_ALL:
+            if all(m.is_defeated for m in self.monsters()):
+                return OUTCOME_VICTORY
+        elif condition == VICTORY_REACH_LOCATION:
+            if any(not p.is_defeated and p.location == target for p in self.players()):
+                return OUTCOME_VICTORY
+        elif condition == VICTORY_DEFEAT_TARGET:
+            # Server looks the monster up by exact entity_name
+            named = [m for m in self.monsters() if m.name == target]
+            if named and named[0].is_defeated:
+                return OUTCOME_VICTORY
+        if all(p.is_defeated for p in self.players()):
+            return OUTCOME_DEFEAT
+        return None
+
+    def play_round(self):
+        self.round_start()
+        self.resolve_moves()
+        for location, seed in self.battle_order():
+            self.run_battle(location, seed)
+        return self.check_victory()
+
+    def run(self, max_rounds=200):
+        outcome = None
+        while outcome is None and self.round < max_rounds:
+            outcome = self.play_round()
+        return self.summary(outcome or OUTCOME_TIMEOUT)
+
+    def summary(self, outcome):
+        return {
+            'outcome': outcome,
+            'rounds': self.round,
+            'players': [{'name': p.name, 'class': p.entity_class, 'survived': not p.is_defeated,
+                         'goal': self.goals.get(p.player_id, {}).get('id'),
+                         'goal_complete': self.is_goal_complete(p.player_id)}
+                        for p in self.players()],
+            'monsters_defeated': sum(1 for m in self.monsters() if m.is_defeated),
+            'monsters_total': len(self.monsters()),
+        }
+
+
+def simulate(scenario, games, num_players=None, seed=0, policy='hunt', max_rounds=200, first=0):
+    """Run many independent games and yield each game's summary.
+
+    Games are numbered from ``first`` so a run can be split into chunks
+    without changing any game's seed.
+    """
+    adjacency = build_adjacency(scenario)
+    for i in range(first, first + games):
+        game = Game(scenario, num_players=num_players, seed=game_seed(seed, i),
+                    policy=policy, adjacency=adjacency)
+        yield game.run(max_rounds)
+
+
+def game_seed(seed, index):
+    """Deterministic per-game seed so any single game can be replayed."""
+    return seed * 1000003 + index
+
+
+def aggregate(summaries):
+    """Aggregate game summaries into win rate, round distribution and class survival."""
+    outcomes = Counter()
+    rounds = Counter()
+    class_total = Counter()
+    class_survived = Counter()
+    goal_total = Counter()
+    goal_complete = Counter()
+    games = 0
+    for s in summaries:
+        games += 1
+        outcomes[s['outcome']] += 1
+        rounds[s['rounds']] += 1
+        for p in s['players']:
+            class_total[p['class']] += 1
+            class_survived[p['class']] += p['survived']
+            if p.get('goal'):
+                goal_total[p['goal']] += 1
+                goal_complete[p['goal']] += p['goal_complete']
+
+    total_rounds = sum(r * n for r, n in rounds.items())
+    return {
+        'games': games,
+        'outcomes': dict(outcomes),
+        'win_rate': outcomes[OUTCOME_VICTORY] / games if games else 0.0,
+        'mean_rounds': total_rounds / games if games else 0.0,
+        'rounds_histogram': dict(sorted(rounds.items())),
+        'class_survival': {c: class_survived[c] / class_total[c] for c in sorted(class_total)},
+        'goal_completion': {g: goal_complete[g] / goal_total[g] for g in sorted(goal_total)},
+    }
+
+
+def print_report(stats, elapsed):
+    games = stats['games']
+    print(f"Games: {games} in {elapsed:.2f}s ({games / elapsed if elapsed else 0:.0f} games/s)")
+    for outcome in (OUTCOME_VICTORY, OUTCOME_DEFEAT, OUTCOME_TIMEOUT):
+        count = stats['outcomes'].get(outcome, 0)
+        print(f"  {outcome:8s} {count:7d}  ({count / games:6.1%})")
+    print(f"Mean rounds: {stats['mean_rounds']:.2f}")
+    print("Rounds to finish:")
+    for r, n in stats['rounds_histogram'].items():
+        print(f"  {r:4d} {n:7d}  {'#' * max(1, round(40 * n / games)) if n else ''}")
+    print("Survival by class:")
+    for cls, rate in stats['class_survival'].items():
+        print(f"  {cls:12s} {rate:6.1%}")
+    if stats['goal_completion']:
+        print("Goal completion:")
+        for goal, rate in stats['goal_completion'].items():
+            print(f"  {goal:16s} {rate:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate ZoomQuest scenarios headlessly.')
+    parser.add_argument('scenario', nargs='?',
+                        default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='print aggregate stats as JSON')
+    args = parser.parse_args()
+
+    if not Path(args.scenario).exists():
+        print(f"Error: Scenario file not found: {args.scenario}")
+        sys.exit(1)
+
+    scenario = load_scenario(args.scenario)
+    start = time.perf_counter()
+    stats = aggregate(simulate(scenario, args.games, args.players, args.seed, args.policy, args.max_rounds))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"Scenario: {scenario.get('level_name', args.scenario)}")
+        print_report(stats, elapsed)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except BrokenPipeError:
+        # Output piped into head or similar that stopped reading; keep the
+        # interpreter's final flush from failing on the closed pipe too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Snapshots - Per-round game state files as base snapshots plus deltas.
+
+rules.md stores the full game state at the end of every round as
+{game_name}_{round}.json. Here a full file in that format is only written
+every --base-every rounds (and for round 0); every round also appends a
+small delta to {game_name}.deltas holding just what changed since the
+previous round:
+
+    {"round": 7, "moved": {"p0": "forest"},
+     "decks": {"m2": {"active": [1, 2, ["attack"]], "discarded": [0, 0, []]}},
+     "tags": {"p0": {"hidden": [1, 1]}}}
+
+Entities are keyed by list position ("p0" is players[0], "m2" is
+monsters[2]). A deck change [keep_start, keep_end, middle] keeps that many
+cards from each end of the old pile and puts middle in between, so a draw or
+a refresh costs a few bytes instead of the whole deck.
+{game_name}.index holds the byte offset and length of each round's delta as
+fixed-width records, so the loader maps both files with mmap and jumps
+straight to the deltas it needs.
+
+compact folds history before a round into a base snapshot there and drops
+the older bases and deltas.
+
+Usage:
+    python snapshots.py record [scenario_file] --output DIR [--seed N] [--players N]
+                               [--policy hunt|random|stay] [--max-rounds N]
+                               [--base-every N] [--check]
+    python snapshots.py load DIR --round N [--game NAME] [--json]
+    python snapshots.py compact DIR --before N [--game NAME]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import simulator as sim
+
+
+INDEX_MAGIC = b'ZQSI'
+INDEX_HEADER = struct.Struct('<4sI')  # magic, first round
+INDEX_ENTRY = struct.Struct('<QI')    # offset, length
+
+DECK_KEYS = ('active', 'discarded', 'destroyed')
+PILE_FOR_DECK = {'active': sim.PILE_ACTIVE, 'discarded': sim.PILE_DISCARD,
+                 'destroyed': sim.PILE_DESTROYED}
+
+
+def game_state(game, game_name):
+    """Full state in the rules.md format, with tags added per entity."""
+    def entity_state(e):
+        decks = {}
+        for key, pile in PILE_FOR_DECK.items():
+            decks[key] = [c.card_type for c in sorted(e.piles[pile], key=lambda c: c.order)]
+        return {
+            'name': e.name,
+            'class': e.entity_class,
+            'location': e.location,
+            'decks': decks,
+            'tags': {name: list(value) for name, value in e.tags.items()},
+        }
+
+    return {
+        'level_name': game.scenario.get('level_name', game_name),
+        'round': game.round,
+        'map': game.scenario['map'],
+        'players': [entity_state(e) for e in game.players()],
+        'monsters': [entity_state(e) for e in game.monsters()],
+    }
+
+
+def entity_keys(state):
+    for prefix, kind in (('p', 'players'), ('m', 'monsters')):
+        for index, entity in enumerate(state[kind]):
+            yield prefix + str(index), entity
+
+
+def entity_by_key(state, key):
+    return state['players' if key[0] == 'p' else 'monsters'][int(key[1:])]
+
+
+def list_delta(old, new):
+    """[keep_start, keep_end, middle] turning old into new."""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[len(old) - 1 - end] == new[len(new) - 1 - end]:
+        end += 1
+    return [start, end, new[start:len(new) - end]]
+
+
+def apply_list_delta(old, delta):
+    start, end, middle = delta
+    return old[:start] + middle + old[len(old) - end:]
+
+
+def diff_states(old, new):
+    """Delta record taking old to new (same entities, same map)."""
+    delta = {'round': new['round']}
+    moved, decks, tags = {}, {}, {}
+    for (key, before), (_, after) in zip(entity_keys(old), entity_keys(new)):
+        if before['location'] != after['location']:
+            moved[key] = after['location']
+        changed = {pile: list_delta(before['decks'][pile], after['decks'][pile])
+                   for pile in DECK_KEYS if before['decks'][pile] != after['decks'][pile]}
+        if changed:
+            decks[key] = changed
+        if before['tags'] != after['tags']:
+            tags[key] = after['tags']
+    for name, value in (('moved', moved), ('decks', decks), ('tags', tags)):
+        if value:
+            delta[name] = value
+    return delta
+
+
+def apply_delta(state, delta):
+    state['round'] = delta['round']
+    for key, location in delta.get('moved', {}).items():
+        entity_by_key(state, key)['location'] = location
+    for key, changed in delta.get('decks', {}).items():
+        decks = entity_by_key(state, key)['decks']
+        for pile, d in changed.items():
+            decks[pile] = apply_list_delta(decks[pile], d)
+    for key, tags in delta.get('tags', {}).items():
+        entity_by_key(state, key)['tags'] = tags
+    return state
+
+
+def encode(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_mapped(path):
+    """Whole file contents through mmap (empty files cannot be mapped)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+
+class SnapshotStore:
+    """Base snapshots and the delta log of one game in a directory."""
+
+    def __init__(self, directory, game_name):
+        self.directory = Path(directory)
+        self.game_name = game_name
+        self.delta_path = self.directory / f"{game_name}.deltas"
+        self.index_path = self.directory / f"{game_name}.index"
+
+    def base_path(self, game_round):
+        return self.directory / f"{self.game_name}_{game_round}.json"
+
+    def base_rounds(self):
+        prefix = self.game_name + '_'
+        rounds = []
+        for path in self.directory.glob(f"{self.game_name}_*.json"):
+            suffix = path.stem[len(prefix):]
+            if suffix.isdigit():
+                rounds.append(int(suffix))
+        return sorted(rounds)
+
+    def first_delta_round(self):
+        with open(self.index_path, 'rb') as f:
+            magic, first = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{self.index_path}: not a snapshot index")
+        return first
+
+    def last_round(self):
+        count = (self.index_path.stat().st_size - INDEX_HEADER.size) // INDEX_ENTRY.size
+        return self.first_delta_round() + count - 1
+
+    def load(self, game_round):
+        """Reconstruct the state at the end of game_round."""
+        bases = [r for r in self.base_rounds() if r <= game_round]
+        if not bases:
+            raise ValueError(f"No base snapshot at or before round {game_round}")
+        state = json.loads(read_mapped(self.base_path(bases[-1])))
+        if bases[-1] == game_round:
+            return state
+        if game_round > self.last_round():
+            raise ValueError(f"Round {game_round} not recorded (last is {self.last_round()})")
+
+        first = self.first_delta_round()
+        with open(self.index_path, 'rb') as fi, open(self.delta_path, 'rb') as fd:
+            with mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ) as index, \
+                    mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as deltas:
+                for r in range(bases[-1] + 1, game_round + 1):
+                    offset, length = INDEX_ENTRY.unpack_from(
+                        index, INDEX_HEADER.size + (r - first) * INDEX_ENTRY.size)
+                    apply_delta(state, json.loads(deltas[offset:offset + length]))
+        return state
+
+    def compact(self, before):
+        """Make round `before` a base and drop all earlier bases and deltas."""
+        state = self.load(before)
+        if before not in self.base_rounds():
+            write_atomic(self.base_path(before), encode(state))
+
+        first = self.first_delta_round()
+        last = self.last_round()
+        data = read_mapped(self.delta_path)
+        index = read_mapped(self.index_path)
+        kept = bytearray()
+        entries = [INDEX_HEADER.pack(INDEX_MAGIC, before + 1)]
+        for r in range(before + 1, last + 1):
+            offset, length = INDEX_ENTRY.unpack_from(index, INDEX_HEADER.size + (r - first) * INDEX_ENTRY.size)
+            entries.append(INDEX_ENTRY.pack(len(kept), length))
+            kept += data[offset:offset + length] + b'\n'
+        write_atomic(self.delta_path, bytes(kept))
+        write_atomic(self.index_path, b''.join(entries))
+        removed = [r for r in self.base_rounds() if r < before]
+        for r in removed:
+            self.base_path(r).unlink()
+        return len(removed), before + 1 - first
+
+
+class SnapshotWriter:
+    """Writes a base every N rounds and a delta every round."""
+
+    def __init__(self, store, base_every=20):
+        self.store = store
+        self.base_every = base_every
+        self.previous = None
+        self.bytes_written = 0
+        store.directory.mkdir(parents=True, exist_ok=True)
+        self.deltas = open(store.delta_path, 'wb')
+        self.index = open(store.index_path, 'wb')
+        self.offset = 0
+
+    def write(self, state):
+        game_round = state['round']
+        if self.previous is None:
+            self.index.write(INDEX_HEADER.pack(INDEX_MAGIC, game_round + 1))
+            self.write_base(state)
+        else:
+            line = encode(diff_states(self.previous, state))
+            self.deltas.write(line + b'\n')
+            self.index.write(INDEX_ENTRY.pack(self.offset, len(line)))
+            self.deltas.flush()
+            self.index.flush()
+            self.offset += len(line) + 1
+            self.bytes_written += len(line) + 1 + INDEX_ENTRY.size
+            if game_round % self.base_every == 0:
+                self.write_base(state)
+        # game_state builds fresh lists every round, so no copy is needed
+        self.previous = state
+
+    def write_base(self, state):
+        data = encode(state)
+        write_atomic(self.store.base_path(state['round']), data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        self.deltas.close()
+        self.index.close()
+
+
+def record(scenario, game_name, directory, seed, players, policy, max_rounds, base_every, check):
+    """Play one simulator game writing snapshots. Returns (summary, writer, states or None)."""
+    game = sim.Game(scenario, players, seed, policy)
+    writer = SnapshotWriter(SnapshotStore(directory, game_name), base_every)
+    states = [] if check else None
+    try:
+        outcome = None
+        while True:
+            state = game_state(game, game_name)
+            writer.write(state)
+            if states is not None:
+                states.append(state)
+            if outcome is not None or game.round >= max_rounds:
+                break
+            outcome = game.play_round()
+    finally:
+        writer.close()
+    return game.summary(outcome or sim.OUTCOME_TIMEOUT), writer, states
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Base + delta game state snapshots.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help='play one simulator game writing snapshots')
+    rec.add_argument('scenario', nargs='?',
+                     default=str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    rec.add_argument('--output', required=True, help='snapshot directory')
+    rec.add_argument('--seed', type=int, default=0)
+    rec.add_argument('--players', type=int, default=None)
+    rec.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    rec.add_argument('--max-rounds', type=int, default=200)
+    rec.add_argument('--base-every', type=int, default=20, help='rounds between full snapshots')
+    rec.add_argument('--check', action='store_true', help='reload every round and compare')
+
+    load = commands.add_parser('load', help='reconstruct the state at a round')
+    load.add_argument('directory')
+    load.add_argument('--round', type=int, required=True)
+    load.add_argument('--game', default=None, help='game name (default: the only one in the directory)')
+    load.add_argument('--json', action='store_true', help='print the full state')
+
+    compact = commands.add_parser('compact', help='drop bases and deltas before a round')
+    compact.add_argument('directory')
+    compact.add_argument('--before', type=int, required=True)
+    compact.add_argument('--game', default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if not Path(args.scenario).exists():
+            print(f"Error: Scenario file not found: {args.scenario}")
+            sys.exit(1)
+        scenario = sim.load_scenario(args.scenario)
+        game_name = Path(args.scenario).stem
+        start = time.perf_counter()
+        summary, writer, states = record(scenario, game_name, args.output, args.seed, args.players,
+                                         args.policy, args.max_rounds, max(1, args.base_every), args.check)
+        elapsed = time.perf_counter() - start
+        full = sum(len(encode(s)) for s in states) if states else None
+        print(f"Recorded {summary['outcome']} after {summary['rounds']} rounds: "
+              f"{writer.bytes_written:,} bytes in {elapsed:.2f}s -> {args.output}")
+        if states:
+            print(f"Full snapshot every round would be {full:,} bytes")
+            store = writer.store
+            bad = [s['round'] for s in states if store.load(s['round']) != s]
+            if bad:
+                print(f"FAILED: rounds {bad} do not reload identically")
+                sys.exit(1)
+            print(f"All {len(states)} rounds reload identically")
+        return
+
+    directory = Path(args.directory)
+    game_name = args.game
+    if game_name is None:
+        names = sorted(p.stem for p in directory.glob('*.deltas'))
+        if len(names) != 1:
+            print(f"Error: Expected one game in {directory}, found {len(names)}; pass --game")
+            sys.exit(1)
+        game_name = names[0]
+    store = SnapshotStore(directory, game_name)
+    if not store.index_path.exists():
+        print(f"Error: No snapshots for {game_name} in {directory}")
+        sys.exit(1)
+
+    try:
+        if args.command == 'load':
+            start = time.perf_counter()
+            state = store.load(args.round)
+            elapsed = time.perf_counter() - start
+            if args.json:
+                print(json.dumps(state, indent=2))
+                return
+            print(f"{state['level_name']} round {state['round']} (loaded in {elapsed * 1000:.1f}ms)")
+            for kind in ('players', 'monsters'):
+                for e in state[kind]:
+                    decks = '/'.join(str(len(e['decks'][k])) for k in DECK_KEYS)
+                    print(f"  {e['name']:24s} {e['location']:20s} {decks:8s} {','.join(e['tags'])}")
+        else:
+            removed, dropped = store.compact(args.before)
+            print(f"Compacted {game_name}: base at round {args.before}, "
+                  f"removed {removed} older base(s) and {dropped} delta(s)")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Scenario Sweep - Run the headless simulator over a grid of scenario overrides.
+
+Every combination of override values is a sweep point. Each point's games are
+split into chunks and fanned out over a process pool; rows stream into one
+CSV (or JSONL) file with one row per game as chunks complete, in a stable
+order regardless of the worker count.
+
+Game i of every point uses the same seed (simulator.game_seed(seed, i)), so
+points are compared on common random numbers and any row can be replayed
+with simulator.Game alone.
+
+Override keys are dotted paths into the scenario. Inside lists, a segment
+matches the element whose "id" or "name" equals it, or a numeric index:
+
+    monsters.Goblin Scout.decks.active   ["attack", "attack", "poison"]
+    factions.matrix.players.merchants    "hostile"
+    characters.Aldric.location           "goblin_warren"
+    individual_goals.explorer.threshold  8
+
+Grid file format:
+    {
+        "scenario": "configs/outland_valley.json",
+        "games": 2000,
+        "grid": {
+            "individual_goals.explorer.threshold": [6, 8, 10, 12],
+            "factions.matrix.players.merchants": ["neutral", "hostile"]
+        }
+    }
+
+Usage:
+    python sweep.py [scenario_file] [--grid grid.json] [--set KEY=JSON_LIST ...]
+                    [--games N] [--players N] [--seed N] [--policy hunt|random|stay]
+                    [--max-rounds N] [--workers N] [--chunk N] [--output FILE]
+"""
+
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import simulator as sim
+
+
+FIXED_COLUMNS = ('point', 'game', 'seed', 'outcome', 'rounds', 'monsters_defeated',
+                 'monsters_total', 'players_survived', 'goals_complete')
+
+# Per-worker state set by the pool initializer
+_scenario = None
+_settings = None
+
+
+def resolve_path(scenario, key):
+    """Return (container, last_segment) for a dotted override key."""
+    segments = key.split('.')
+    node = scenario
+    for segment in segments[:-1]:
+        node = _step(node, segment, key)
+    last = segments[-1]
+    if isinstance(node, list):
+        return node, _list_index(node, last, key)
+    if not isinstance(node, dict):
+        raise ValueError(f"Override '{key}': cannot set '{last}' on a {type(node).__name__}")
+    return node, last
+
+
+def _step(node, segment, key):
+    if isinstance(node, list):
+        return node[_list_index(node, segment, key)]
+    if isinstance(node, dict):
+        if segment not in node:
+            raise ValueError(f"Override '{key}': no '{segment}' in scenario")
+        return node[segment]
+    raise ValueError(f"Override '{key}': cannot descend into '{segment}'")
+
+
+def _list_index(items, segment, key):
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and segment in (item.get('id'), item.get('name')):
+            return index
+    if segment.isdigit() and int(segment) < len(items):
+        return int(segment)
+    raise ValueError(f"Override '{key}': no element '{segment}' in list")
+
+
+def apply_overrides(scenario, overrides):
+    """Return a copy of the scenario with each dotted-path override applied."""
+    scenario = copy.deepcopy(scenario)
+    for key, value in overrides.items():
+        container, slot = resolve_path(scenario, key)
+        container[slot] = copy.deepcopy(value)
+    return scenario
+
+
+def expand_grid(grid):
+    """Cartesian product of the grid, as a list of {key: value} dicts."""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def make_tasks(points, games, chunk):
+    """Split each point's games into (point_index, overrides, first, count) chunks."""
+    tasks = []
+    for index, overrides in enumerate(points):
+        for first in range(0, games, chunk):
+            tasks.append((index, overrides, first, min(chunk, games - first)))
+    return tasks
+
+
+def _init_worker(scenario, settings):
+    global _scenario, _settings
+    _scenario = scenario
+    _settings = settings
+
+
+def run_chunk(task):
+    """Worker entry point: play one chunk of games for one sweep point."""
+    index, overrides, first, count = task
+    scenario = apply_overrides(_scenario, overrides)
+    seed = _settings['seed']
+    rows = []
+    summaries = sim.simulate(scenario, count, _settings['players'], seed, _settings['policy'],
+                             _settings['max_rounds'], first=first)
+    for game, summary in enumerate(summaries, first):
+        rows.append({
+            'point': index,
+            'game': game,
+            'seed': sim.game_seed(seed, game),
+            'outcome': summary['outcome'],
+            'rounds': summary['rounds'],
+            'monsters_defeated': summary['monsters_defeated'],
+            'monsters_total': summary['monsters_total'],
+            'players_survived': sum(p['survived'] for p in summary['players']),
+            'goals_complete': sum(p['goal_complete'] for p in summary['players']),
+        })
+    return index, rows
+
+
+def encode_value(value):
+    """Grid values are written as compact JSON so lists and strings round-trip."""
+    return json.dumps(value, separators=(',', ':'))
+
+
+class RowWriter:
+    """Streams result rows to a CSV or JSONL file, chosen by extension."""
+
+    def __init__(self, path, override_keys):
+        self.file = open(path, 'w', newline='')
+        self.override_keys = override_keys
+        self.jsonl = str(path).endswith('.jsonl')
+        if not self.jsonl:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(list(FIXED_COLUMNS[:1]) + override_keys + list(FIXED_COLUMNS[1:]))
+
+    def write(self, overrides, rows):
+        for row in rows:
+            if self.jsonl:
+                record = dict(row, overrides=overrides)
+                self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            else:
+                self.writer.writerow([row['point']]
+                                     + [encode_value(overrides[k]) for k in self.override_keys]
+                                     + [row[c] for c in FIXED_COLUMNS[1:]])
+
+    def close(self):
+        self.file.close()
+
+
+def sweep(scenario, points, settings, output, workers=None, chunk=250):
+    """Run every point and stream rows to output. Returns per-point totals."""
+    override_keys = list(points[0]) if points else []
+    totals = [{'games': 0, 'victories': 0, 'rounds': 0, 'goals': 0, 'players': 0} for _ in points]
+    tasks = make_tasks(points, settings['games'], chunk)
+    writer = RowWriter(output, override_keys)
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(scenario, settings)) as pool:
+            for index, rows in pool.imap(run_chunk, tasks):
+                writer.write(points[index], rows)
+                t = totals[index]
+                for row in rows:
+                    t['games'] += 1
+                    t['victories'] += row['outcome'] == sim.OUTCOME_VICTORY
+                    t['rounds'] += row['rounds']
+                    t['goals'] += row['goals_complete']
+                    t['players'] += settings['num_players']
+    finally:
+        writer.close()
+    return totals
+
+
+def load_grid(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def parse_set(option):
+    """Parse a --set KEY=JSON_LIST option; a bare scalar becomes a one-value axis."""
+    key, sep, raw = option.partition('=')
+    if not sep:
+        raise ValueError(f"--set expects KEY=VALUES, got '{option}'")
+    try:
+        values = json.loads(raw)
+    except json.JSONDecodeError:
+        values = [raw]
+    if not isinstance(values, list):
+        values = [values]
+    return key, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep ZoomQuest scenario overrides in parallel.')
+    parser.add_argument('scenario', nargs='?', default=None,
+                        help='scenario file (default: from --grid, else configs/test_0.json)')
+    parser.add_argument('--grid', help='JSON file with scenario, games and grid')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=JSON_LIST',
+                        help='add a grid axis, e.g. --set \'factions.matrix.players.merchants=["neutral","hostile"]\'')
+    parser.add_argument('--games', type=int, default=None, help='games per point (default 1000)')
+    parser.add_argument('--players', type=int, default=None,
+                        help='number of players (default: one per character)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sim.POLICIES, default='hunt')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=250, help='games per task')
+    parser.add_argument('--output', default='sweep.csv', help='.csv or .jsonl output file')
+    args = parser.parse_args()
+
+    spec = load_grid(args.grid) if args.grid else {}
+    grid = dict(spec.get('grid', {}))
+    try:
+        for option in args.set:
+            key, values = parse_set(option)
+            grid[key] = values
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    scenario_path = (args.scenario or spec.get('scenario')
+                     or str(Path(__file__).parent.parent / 'configs' / 'test_0.json'))
+    if not Path(scenario_path).exists():
+        print(f"Error: Scenario file not found: {scenario_path}")
+        sys.exit(1)
+    scenario = sim.load_scenario(scenario_path)
+
+    points = expand_grid(grid)
+    try:
+        for overrides in points:
+            apply_overrides(scenario, overrides)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    games = args.games or spec.get('games', 1000)
+    settings = {
+        'games': games,
+        'players': args.players,
+        'num_players': args.players or len(scenario['characters']),
+        'seed': args.seed,
+        'policy': args.policy,
+        'max_rounds': args.max_rounds,
+    }
+    workers = args.workers or os.cpu_count()
+    print(f"Scenario: {scenario.get('level_name', scenario_path)}")
+    print(f"Points: {len(points)} x {games} games on {workers} workers -> {args.output}")
+
+    start = time.perf_counter()
+    totals = sweep(scenario, points, settings, args.output, workers, args.chunk)
+    elapsed = time.perf_counter() - start
+
+    total_games = sum(t['games'] for t in totals)
+    print(f"Games: {total_games} in {elapsed:.2f}s ({total_games / elapsed if elapsed else 0:.0f} games/s)")
+    for index, (overrides, t) in enumerate(zip(points, totals)):
+        label = ', '.join(f"{k}={encode_value(v)}" for k, v in overrides.items()) or '(base)'
+        print(f"  [{index:3d}] win {t['victories'] / t['games']:6.1%}  "
+              f"rounds {t['rounds'] / t['games']:6.2f}  "
+              f"goals {t['goals'] / t['players']:6.1%}  {label}")
+
+
+if __name__ == '__main__':
+    main()
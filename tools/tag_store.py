@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tag Store - Python mirror of Helpers/TagStore.php with property checks.
+
+TagStore keeps entity tags in memory indexed by entity and by expiry round:
+a tag with a lifetime (hidden 1, marked 2, poisoned 3) applied in round R is
+filed under round R + lifetime, and expire(current) only visits the buckets
+that are due. Removed or re-applied tags leave stale index entries that are
+skipped when their round comes. Writes are buffered until flush().
+
+--check plays random operation sequences against a reference that follows
+the SQL the server used before the store existed:
+
+    DELETE FROM entity_tag WHERE (tag_name = 'hidden' AND round_applied < R) OR ...
+
+and asserts after every operation that:
+    - has / get_value / get_all match the reference
+    - flushed writes applied to a table leave exactly the reference rows
+    - expire() visits no more index entries than were filed since the
+      last expiry of those rounds (no full scans)
+
+Usage:
+    python tag_store.py --check [--runs 500] [--ops 200] [--seed N]
+"""
+
+import argparse
+import heapq
+import random
+import sys
+
+from simulator import TAG_HIDDEN, TAG_MARKED, TAG_POISONED
+
+
+TAG_BLOCKED = 'blocked'
+
+# Same table as TagStore::LIFETIMES
+LIFETIMES = {TAG_HIDDEN: 1, TAG_MARKED: 2, TAG_POISONED: 3}
+
+
+class TagStore:
+    """In-memory tags with an expiry index, as Helpers/TagStore.php."""
+
+    def __init__(self, rows=()):
+        self.tags = {}
+        self.expiring = {}
+        self.expiry_rounds = []
+        self.writes = {}
+        # Index entries visited by expire(), for the cost property
+        self.visited = 0
+        for entity_id, tag_name, value, round_applied in rows:
+            self._put(entity_id, tag_name, value, round_applied)
+
+    def has(self, entity_id, tag_name):
+        return tag_name in self.tags.get(entity_id, {})
+
+    def get_value(self, entity_id, tag_name):
+        tag = self.tags.get(entity_id, {}).get(tag_name)
+        return tag[0] if tag else 0
+
+    def get_all(self, entity_id):
+        return [{'tag_name': name, 'tag_value': tag[0]} for name, tag in self.tags.get(entity_id, {}).items()]
+
+    def set(self, entity_id, tag_name, value=1, round_applied=0):
+        self._put(entity_id, tag_name, value, round_applied)
+        self.writes[(entity_id, tag_name)] = (value, round_applied)
+
+    def remove(self, entity_id, tag_name):
+        self.tags.get(entity_id, {}).pop(tag_name, None)
+        self.writes[(entity_id, tag_name)] = None
+
+    def expire(self, current_round):
+        while self.expiry_rounds and self.expiry_rounds[0] <= current_round:
+            due = heapq.heappop(self.expiry_rounds)
+            for entity_id, tag_name in self.expiring.pop(due, {}):
+                self.visited += 1
+                tag = self.tags.get(entity_id, {}).get(tag_name)
+                if tag is not None and tag[1] + LIFETIMES[tag_name] == due:
+                    self.remove(entity_id, tag_name)
+
+    def flush(self):
+        """Pending writes as (deletes, upserts) and clear them."""
+        deletes = [key for key, write in self.writes.items() if write is None]
+        upserts = [key + write for key, write in self.writes.items() if write is not None]
+        self.writes = {}
+        return deletes, upserts
+
+    def _put(self, entity_id, tag_name, value, round_applied):
+        self.tags.setdefault(entity_id, {})[tag_name] = (value, round_applied)
+        lifetime = LIFETIMES.get(tag_name)
+        if lifetime is not None:
+            due = round_applied + lifetime
+            if due not in self.expiring:
+                self.expiring[due] = {}
+                heapq.heappush(self.expiry_rounds, due)
+            self.expiring[due][(entity_id, tag_name)] = True
+
+
+class ReferenceTags:
+    """entity_tag as a table, expired with the old full-table DELETE."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def set(self, entity_id, tag_name, value, round_applied):
+        self.rows[(entity_id, tag_name)] = (value, round_applied)
+
+    def remove(self, entity_id, tag_name):
+        self.rows.pop((entity_id, tag_name), None)
+
+    def expire(self, current_round):
+        for key, (value, round_applied) in list(self.rows.items()):
+            lifetime = LIFETIMES.get(key[1])
+            if lifetime is not None and round_applied < current_round - lifetime + 1:
+                del self.rows[key]
+
+
+def apply_flush(table, deletes, upserts):
+    for key in deletes:
+        table.pop(key, None)
+    for entity_id, tag_name, value, round_applied in upserts:
+        table[(entity_id, tag_name)] = (value, round_applied)
+
+
+def check_run(rng, ops):
+    """One random operation sequence; raises AssertionError on a mismatch."""
+    entities = list(range(1, rng.randint(2, 6)))
+    names = list(LIFETIMES) + [TAG_BLOCKED]
+    reference = ReferenceTags()
+    table = {}
+    current = 1
+
+    # Start from rows already in the table, as TagStore::load() does
+    for _ in range(rng.randint(0, 5)):
+        key = (rng.choice(entities), rng.choice(names))
+        reference.rows[key] = (rng.randint(1, 3), rng.randint(0, current))
+    table.update(reference.rows)
+    store = TagStore((e, n, v, r) for (e, n), (v, r) in table.items())
+
+    for _ in range(ops):
+        op = rng.random()
+        entity_id, tag_name = rng.choice(entities), rng.choice(names)
+        if op < 0.45:
+            # Tags are applied in the current round, or occasionally a past one
+            round_applied = current if rng.random() < 0.9 else rng.randint(0, current)
+            value = rng.randint(1, 3)
+            store.set(entity_id, tag_name, value, round_applied)
+            reference.set(entity_id, tag_name, value, round_applied)
+        elif op < 0.6:
+            store.remove(entity_id, tag_name)
+            reference.remove(entity_id, tag_name)
+        elif op < 0.85:
+            current += rng.choice((0, 1, 1, 1, 2))
+            filed = sum(len(bucket) for due, bucket in store.expiring.items() if due <= current)
+            before = store.visited
+            store.expire(current)
+            reference.expire(current)
+            assert store.visited - before == filed, "expire visited entries outside the due buckets"
+        else:
+            apply_flush(table, *store.flush())
+            assert table == reference.rows, f"flushed table {table} != reference {reference.rows}"
+
+        for e in entities:
+            expected = {n: v for (re, n), (v, _) in reference.rows.items() if re == e}
+            actual = {t['tag_name']: t['tag_value'] for t in store.get_all(e)}
+            assert actual == expected, f"round {current}: entity {e} has {actual}, reference {expected}"
+            for n in names:
+                assert store.has(e, n) == (n in expected), f"round {current}: has({e}, {n}) disagrees"
+                assert store.get_value(e, n) == expected.get(n, 0), f"round {current}: get_value({e}, {n}) disagrees"
+
+    apply_flush(table, *store.flush())
+    assert table == reference.rows, f"flushed table {table} != reference {reference.rows}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Python mirror of the PHP tag store.')
+    parser.add_argument('--check', action='store_true', help='run randomized property checks')
+    parser.add_argument('--runs', type=int, default=500)
+    parser.add_argument('--ops', type=int, default=200, help='operations per run')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.check:
+        parser.print_help()
+        return
+
+    for run in range(args.runs):
+        try:
+            check_run(random.Random(args.seed * 1000003 + run), args.ops)
+        except AssertionError as e:
+            print(f"Error: run {run} (seed {args.seed}) failed: {e}")
+            sys.exit(1)
+    print(f"OK: {args.runs} runs x {args.ops} operations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Tests for the packed battle log enums (run with pytest from tools/).
+
+Card types and effects travel as indexes into BATTLE_LOG_CARD_TYPES /
+BATTLE_LOG_EFFECTS (constants.inc.php), and zoomquest.js and battle_log.py
+keep their own copies. One entry out of step garbles every log after it, so
+the copies are compared here, order included.
+"""
+
+import re
+
+import battle_log
+from validate_scenarios import ROOT_DIR
+
+
+def client_enums():
+    """BATTLE_LOG_CARD_TYPES and BATTLE_LOG_EFFECTS as listed in zoomquest.js."""
+    source = (ROOT_DIR / 'zoomquest.js').read_text()
+
+    def listed(name):
+        match = re.search(rf"const\s+{name}\s*=\s*\[([^\]]*)\]", source)
+        assert match, f"zoomquest.js has no {name}"
+        return re.findall(r"'([^']*)'", match.group(1))
+
+    return listed('BATTLE_LOG_CARD_TYPES'), listed('BATTLE_LOG_EFFECTS')
+
+
+def test_python_tables_match_server():
+    assert (battle_log.CARD_TYPES, battle_log.EFFECTS) == battle_log.server_enums()
+
+
+def test_client_tables_match_server():
+    assert client_enums() == battle_log.server_enums()
+
+
+def test_server_effects_are_listed():
+    # An effect missing from the table would go out as a plain string
+    source = (ROOT_DIR / 'modules' / 'php' / 'Helpers' / 'ActionSequenceResolver.php').read_text()
+    effects = set(re.findall(r"'effect'\s*=>\s*'(\w+)'", source))
+    assert effects
+    assert effects <= set(battle_log.EFFECTS)
+
+
+def test_server_card_types_are_listed():
+    card_types, _ = battle_log.server_enums()
+    source = (ROOT_DIR / 'modules' / 'php' / 'constants.inc.php').read_text()
+    assert set(re.findall(r"const\s+CARD_\w+\s*=\s*'([^']*)'", source)) == set(card_types)
@@ -0,0 +1,44 @@
+"""
+Tests for profile_report.py against the sample profile (run with pytest from tools/).
+
+profiles/baseline.json is what `compare` checks against by default; it has to
+stay the baseline of profiles/outland_valley_3p.jsonl, and a profile with more
+queries than the sample has to be flagged.
+"""
+
+import json
+
+import profile_report as report
+
+
+SAMPLE = report.DEFAULT_BASELINE.parent / 'outland_valley_3p.jsonl'
+
+
+def test_baseline_is_saved_from_the_sample():
+    totals, rounds, _ = report.aggregate([SAMPLE])
+    means = report.per_round(totals, rounds)
+    baseline = json.loads(report.DEFAULT_BASELINE.read_text())
+    assert baseline == json.loads(json.dumps(
+        {'rounds': rounds, 'states': means['states'], 'methods': means['methods']}))
+
+
+def test_sample_passes_its_baseline():
+    totals, rounds, _ = report.aggregate([SAMPLE])
+    baseline = json.loads(report.DEFAULT_BASELINE.read_text())
+    assert report.compare(report.per_round(totals, rounds), baseline, 0.10, 0.25) == []
+
+
+def test_extra_queries_are_flagged(tmp_path):
+    records = report.read_profile(SAMPLE)
+    for record in records:
+        entry = record['states'].get('SequenceResolve')
+        if entry:
+            entry['queries'] *= 2
+    profile = tmp_path / 'profile.jsonl'
+    profile.write_text(''.join(json.dumps(r) + '\n' for r in records))
+
+    totals, rounds, _ = report.aggregate([profile])
+    baseline = json.loads(report.DEFAULT_BASELINE.read_text())
+    problems = report.compare(report.per_round(totals, rounds), baseline, 0.10, 0.25)
+    assert len(problems) == 1
+    assert problems[0].startswith('state SequenceResolve:')
@@ -0,0 +1,91 @@
+"""
+Tests for scenario_viewer.py background levels (run with pytest from tools/).
+
+The level pyramid is only built when Pillow is installed; these tests need it
+and are skipped without it. They check that generated pages keep working
+links whether or not the levels exist, and that the HTML does not depend on
+Pillow being installed.
+"""
+
+import json
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+import scenario_viewer as viewer
+
+
+CONFIGS_DIR = Path(__file__).parent.parent / 'configs'
+
+
+@pytest.fixture
+def scenario(tmp_path):
+    """A copy of test_0.json with a 1200x800 background next to it."""
+    path = tmp_path / 'configs' / 'map.json'
+    path.parent.mkdir()
+    shutil.copy(CONFIGS_DIR / 'test_0.json', path)
+    Image.new('RGB', (1200, 800), (40, 90, 60)).save(path.with_suffix('.png'))
+    return path
+
+
+def page_links(html):
+    """Original background, level directory and levels.js src of a page."""
+    image = json.loads(re.search(r'const backgroundImage = (".*?");', html).group(1))
+    tiles = re.search(r"url: (\".*?\") \+ '/' \+ l\.file", html).group(1)
+    script = re.search(r'<script src="([^"]+)"></script>', html).group(1)
+    return image, json.loads(tiles), script
+
+
+def test_page_links_original_and_levels(scenario):
+    output = viewer.generate_html(scenario)
+    image, tiles, script = page_links(output.read_text())
+
+    # The original is always the fallback, and it resolves from the page
+    assert image == 'map.png'
+    assert (output.parent / image).is_file()
+
+    tiles_dir = output.parent / tiles
+    assert tiles_dir.parent.name == viewer.TILE_CACHE_DIR
+    assert (output.parent / script) == tiles_dir / viewer.TILE_MANIFEST
+
+    manifest = (tiles_dir / viewer.TILE_MANIFEST).read_text()
+    levels = json.loads(manifest[manifest.index('=') + 1:].strip().rstrip(';'))
+    assert [l['width'] for l in levels['levels']] == [300, 600, 1200]
+    assert levels['placeholder'].startswith('data:image/png;base64,')
+    for level in levels['levels']:
+        with Image.open(tiles_dir / level['file']) as img:
+            assert img.size == (level['width'], level['height'])
+
+
+def test_html_does_not_depend_on_pillow(scenario, monkeypatch):
+    with_pillow = viewer.render_html(scenario, scenario.with_suffix('.html'))
+    key = viewer.cache_key(scenario)
+
+    monkeypatch.setattr(viewer, 'Image', None)
+    without_pillow = viewer.render_html(scenario, scenario.with_suffix('.html'))
+
+    assert without_pillow == with_pillow
+    assert viewer.cache_key(scenario) == key
+
+
+def test_missing_levels_keep_original(scenario, monkeypatch):
+    # A checkout without the uncommitted .tiles/ directory, or without Pillow
+    monkeypatch.setattr(viewer, 'Image', None)
+    output = viewer.generate_html(scenario)
+    image, tiles, _ = page_links(output.read_text())
+
+    assert not (output.parent / tiles).exists()
+    assert (output.parent / image).is_file()
+
+
+def test_unchanged_page_still_builds_levels(scenario):
+    viewer.generate_html(scenario)
+    tiles_dir = viewer.background_tiles_dir(scenario.with_suffix('.png'))
+    shutil.rmtree(tiles_dir)
+
+    assert viewer.render_batch([str(scenario)]) == []
+    assert (tiles_dir / viewer.TILE_MANIFEST).is_file()
@@ -0,0 +1,120 @@
+"""
+Tests for tag_store.py, the Python mirror of Helpers/TagStore.php (run with
+pytest from tools/).
+
+They cover what the server relies on: expire() drops exactly what the old
+SQL DELETE did, stale index entries left by remove() or a re-applied tag are
+skipped, and flush() sends each changed tag once and then nothing.
+"""
+
+import random
+import re
+
+import pytest
+
+import tag_store
+from simulator import TAG_HIDDEN, TAG_MARKED, TAG_POISONED
+from tag_store import TagStore, ReferenceTags, apply_flush
+from validate_scenarios import ROOT_DIR
+
+
+def test_lifetimes_match_server():
+    source = (ROOT_DIR / 'modules' / 'php' / 'Helpers' / 'TagStore.php').read_text()
+    table = re.search(r'LIFETIMES\s*=\s*\[([^\]]*)\]', source).group(1)
+    constants = (ROOT_DIR / 'modules' / 'php' / 'constants.inc.php').read_text()
+    names = dict(re.findall(r"const\s+(TAG_\w+)\s*=\s*'([^']*)'", constants))
+    lifetimes = {names[name]: int(value) for name, value in re.findall(r'(TAG_\w+)\s*=>\s*(\d+)', table)}
+    assert lifetimes == tag_store.LIFETIMES
+
+
+@pytest.mark.parametrize('tag_name, lifetime', sorted(tag_store.LIFETIMES.items()))
+def test_tag_expires_after_its_lifetime(tag_name, lifetime):
+    store = TagStore()
+    store.set(1, tag_name, 3, 2)
+    store.expire(2 + lifetime - 1)
+    assert store.has(1, tag_name)
+    store.expire(2 + lifetime)
+    assert not store.has(1, tag_name)
+    assert store.get_value(1, tag_name) == 0
+
+
+def test_untimed_tag_never_expires():
+    store = TagStore()
+    store.set(1, tag_store.TAG_BLOCKED, 1, 1)
+    store.expire(100)
+    assert store.get_all(1) == [{'tag_name': tag_store.TAG_BLOCKED, 'tag_value': 1}]
+
+
+def test_reapplied_tag_keeps_its_new_expiry():
+    store = TagStore()
+    store.set(1, TAG_POISONED, 3, 1)
+    store.set(1, TAG_POISONED, 3, 3)
+    # The entry filed for round 4 is stale now
+    store.expire(4)
+    assert store.get_value(1, TAG_POISONED) == 3
+    store.expire(6)
+    assert not store.has(1, TAG_POISONED)
+
+
+def test_removed_tag_is_not_removed_again():
+    store = TagStore([(1, TAG_MARKED, 1, 1)])
+    store.remove(1, TAG_MARKED)
+    assert store.flush() == ([(1, TAG_MARKED)], [])
+    store.expire(3)
+    assert store.flush() == ([], [])
+
+
+def test_expire_visits_only_due_buckets():
+    store = TagStore()
+    store.set(1, TAG_HIDDEN, 1, 1)
+    store.set(2, TAG_POISONED, 1, 1)
+    store.set(3, TAG_POISONED, 1, 5)
+    store.expire(2)
+    assert store.visited == 1
+    store.expire(4)
+    assert store.visited == 2
+    assert store.has(3, TAG_POISONED)
+
+
+def test_expire_rounds_can_go_back():
+    # Sequence rounds start again at 1 in the next battle
+    store = TagStore()
+    store.set(1, TAG_POISONED, 3, 4)
+    store.expire(6)
+    store.set(2, TAG_HIDDEN, 1, 1)
+    store.expire(2)
+    assert not store.has(2, TAG_HIDDEN)
+    assert store.has(1, TAG_POISONED)
+
+
+def test_flush_writes_each_tag_once():
+    store = TagStore([(1, TAG_HIDDEN, 1, 1)])
+    store.set(2, TAG_MARKED, 1, 1)
+    store.set(2, TAG_MARKED, 2, 2)
+    store.set(3, TAG_POISONED, 3, 2)
+    store.remove(3, TAG_POISONED)
+    store.expire(2)
+    deletes, upserts = store.flush()
+    assert sorted(deletes) == [(1, TAG_HIDDEN), (3, TAG_POISONED)]
+    assert upserts == [(2, TAG_MARKED, 2, 2)]
+    assert store.flush() == ([], [])
+
+
+def test_flushed_table_matches_sql_expiry():
+    rows = [(1, TAG_HIDDEN, 1, 1), (1, TAG_POISONED, 3, 1), (2, TAG_MARKED, 1, 2)]
+    store = TagStore(rows)
+    reference = ReferenceTags()
+    table = {}
+    for entity_id, tag_name, value, round_applied in rows:
+        reference.set(entity_id, tag_name, value, round_applied)
+        table[(entity_id, tag_name)] = (value, round_applied)
+    for current in range(1, 6):
+        store.expire(current)
+        reference.expire(current)
+        apply_flush(table, *store.flush())
+        assert table == reference.rows
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_operations_match_reference(seed):
+    tag_store.check_run(random.Random(seed), 200)
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Scenario Validator - Check scenario files against the rules the server enforces.
+
+Mirrors ConfigLoader::validateConfig, but reports every problem in every file
+in one pass instead of stopping at the first. On top of the server checks it
+also flags unreachable locations, monsters on isolated locations, individual
+goals with unknown track/filter values and asymmetric faction matrices.
+
+Card and item types are read from the enums in dbmodel.sql, and goal tracks,
+victory types and relationships from modules/php/constants.inc.php, so the
+validator follows the schema without being edited.
+
+Usage:
+    python validate_scenarios.py [scenario_file ...] [--json] [--bench N]
+
+With no files, every configs/*.json is checked. Exits non-zero on any error.
+--bench N times validation of an N-location synthetic map.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent
+CONFIGS_DIR = ROOT_DIR / 'configs'
+
+REQUIRED_KEYS = ('level_name', 'map', 'characters', 'monsters', 'victory')
+ENTITY_KEYS = ('name', 'class', 'location', 'decks')
+GOAL_COMPARES = ('gte', 'equal')
+
+# Tracks whose filter names a terrain / direction / faction / card type
+FILTER_KINDS = {
+    'turns_in_terrain': 'terrain',
+    'turns_in_direction': 'direction',
+    'killing_blows_faction': 'faction',
+    'card_plays': 'card',
+}
+
+# Defaults applied by Game::setupNewGame
+DEFAULT_TERRAIN = 'wilderness'
+DEFAULT_DIRECTION = 'center'
+
+
+def load_schema(root=ROOT_DIR):
+    """Read enums and constants from the server sources."""
+    sql = (root / 'dbmodel.sql').read_text()
+    constants = (root / 'modules' / 'php' / 'constants.inc.php').read_text()
+    return {
+        'card_types': _sql_enum(sql, 'card_type'),
+        'item_types': _sql_enum(sql, 'item_type'),
+        'tracks': _php_constants(constants, 'TRACK_'),
+        'victory_types': _php_constants(constants, 'VICTORY_'),
+        'relations': _php_constants(constants, 'RELATION_'),
+    }
+
+
+def _sql_enum(sql, column):
+    match = re.search(rf"`{column}`\s+enum\(([^)]*)\)", sql)
+    if not match:
+        raise ValueError(f"dbmodel.sql has no enum column '{column}'")
+    return frozenset(re.findall(r"'([^']*)'", match.group(1)))
+
+
+def _php_constants(source, prefix):
+    return frozenset(re.findall(rf"const\s+{prefix}\w+\s*=\s*'([^']*)'", source))
+
+
+def validate_scenario(scenario, schema):
+    """Return a list of error strings for one parsed scenario (empty if valid)."""
+    errors = []
+    if not isinstance(scenario, dict):
+        return ["scenario must be a JSON object"]
+    for key in REQUIRED_KEYS:
+        if key not in scenario:
+            errors.append(f"missing required config key: {key}")
+
+    game_map = scenario.get('map') or {}
+    locations = game_map.get('locations')
+    connections = game_map.get('connections')
+    if not isinstance(locations, list):
+        errors.append("map must have 'locations' array")
+        locations = []
+    if not isinstance(connections, list):
+        errors.append("map must have 'connections' array")
+        connections = []
+
+    location_ids = {}
+    for i, loc in enumerate(locations):
+        if 'id' not in loc or 'name' not in loc:
+            errors.append(f"map.locations[{i}]: each location must have 'id' and 'name'")
+            continue
+        if loc['id'] in location_ids:
+            errors.append(f"map.locations[{i}]: duplicate location id: {loc['id']}")
+        location_ids[loc['id']] = loc
+
+    adjacency = {loc_id: [] for loc_id in location_ids}
+    degree = dict.fromkeys(location_ids, 0)
+    for i, conn in enumerate(connections):
+        if 'from' not in conn or 'to' not in conn:
+            errors.append(f"map.connections[{i}]: each connection must have 'from' and 'to'")
+            continue
+        known = True
+        for end in ('from', 'to'):
+            if conn[end] not in location_ids:
+                errors.append(f"map.connections[{i}]: '{end}' references unknown location: {conn[end]}")
+                known = False
+        if not known:
+            continue
+        adjacency[conn['from']].append(conn['to'])
+        if conn.get('bidirectional', True):
+            adjacency[conn['to']].append(conn['from'])
+        degree[conn['from']] += 1
+        degree[conn['to']] += 1
+
+    characters = scenario.get('characters') or []
+    monsters = scenario.get('monsters') or []
+    for i, character in enumerate(characters):
+        errors.extend(_validate_entity(character, f"characters[{i}]", 'character', location_ids, schema))
+    for i, monster in enumerate(monsters):
+        errors.extend(_validate_entity(monster, f"monsters[{i}]", 'monster', location_ids, schema))
+        if monster.get('location') in degree and degree[monster['location']] == 0:
+            errors.append(f"monsters[{i}]: {monster.get('name')} is on isolated location: {monster['location']}")
+
+    starts = [c['location'] for c in characters if c.get('location') in location_ids]
+    if starts:
+        reachable = _reachable(adjacency, starts)
+        for loc_id in location_ids:
+            if loc_id not in reachable:
+                errors.append(f"map: location unreachable from any character start: {loc_id}")
+
+    if 'victory' in scenario:
+        errors.extend(_validate_victory(scenario['victory'], location_ids, monsters, schema))
+
+    matrix = (scenario.get('factions') or {}).get('matrix', {})
+    errors.extend(_validate_factions(matrix, characters, monsters, schema))
+
+    vocab = {
+        'terrain': {loc.get('terrain') or DEFAULT_TERRAIN for loc in location_ids.values()},
+        'direction': {loc.get('direction') or DEFAULT_DIRECTION for loc in location_ids.values()},
+        'faction': {m.get('faction', 'monsters') for m in monsters} | {c.get('faction', 'players') for c in characters},
+        'card': schema['card_types'],
+    }
+    for i, goal in enumerate(scenario.get('individual_goals') or []):
+        errors.extend(_validate_goal(goal, f"individual_goals[{i}]", vocab, schema))
+
+    return errors
+
+
+def _validate_entity(entity, where, kind, location_ids, schema):
+    errors = []
+    for key in ENTITY_KEYS:
+        if key not in entity:
+            errors.append(f"{where}: {kind} must have '{key}'")
+    if 'location' in entity and entity['location'] not in location_ids:
+        errors.append(f"{where}: {kind} references unknown location: {entity['location']}")
+    deck = (entity.get('decks') or {}).get('active')
+    if 'decks' in entity and not isinstance(deck, list):
+        errors.append(f"{where}: {kind} must have 'decks.active' array")
+    for card in deck if isinstance(deck, list) else []:
+        if card not in schema['card_types']:
+            errors.append(f"{where}: invalid card type: {card}")
+    for j, item in enumerate(entity.get('items') or []):
+        if 'name' not in item or 'type' not in item:
+            errors.append(f"{where}.items[{j}]: {kind} items must have 'name' and 'type'")
+        elif item['type'] not in schema['item_types']:
+            errors.append(f"{where}.items[{j}]: invalid item type: {item['type']}")
+        elif item['type'] == 'new_action':
+            card = (item.get('data') or {}).get('card_type')
+            if card not in schema['card_types']:
+                errors.append(f"{where}.items[{j}]: new_action item has invalid card type: {card}")
+    return errors
+
+
+def _validate_victory(victory, location_ids, monsters, schema):
+    if not isinstance(victory, dict) or 'type' not in victory:
+        return ["victory: condition must have 'type'"]
+    errors = []
+    vtype = victory['type']
+    if vtype not in schema['victory_types']:
+        errors.append(f"victory: invalid victory type: {vtype}")
+    elif vtype != 'defeat_all' and 'target' not in victory:
+        errors.append(f"victory: type '{vtype}' requires 'target'")
+    elif vtype == 'reach_location' and victory['target'] not in location_ids:
+        errors.append(f"victory: target location not found: {victory['target']}")
+    elif vtype == 'defeat_target' and victory['target'] not in {m.get('name') for m in monsters}:
+        errors.append(f"victory: target monster not found: {victory['target']}")
+    if 'description' not in victory:
+        errors.append("victory: condition must have 'description'")
+    return errors
+
+
+def _validate_factions(matrix, characters, monsters, schema):
+    errors = []
+    for faction, relations in matrix.items():
+        for other, relation in relations.items():
+            if relation not in schema['relations']:
+                errors.append(f"factions.matrix.{faction}.{other}: invalid relationship: {relation}")
+            reverse = matrix.get(other, {}).get(faction)
+            # Report each asymmetric pair once
+            if reverse != relation and (reverse is None or faction < other):
+                errors.append(f"factions.matrix: {faction}->{other} is {relation} "
+                              f"but {other}->{faction} is {reverse or 'unset'}")
+    if matrix:
+        used = {c.get('faction', 'players') for c in characters} | {m.get('faction', 'monsters') for m in monsters}
+        for faction in sorted(used - set(matrix)):
+            errors.append(f"factions.matrix: no row for faction used by an entity: {faction}")
+    return errors
+
+
+def _validate_goal(goal, where, vocab, schema):
+    errors = []
+    for key in ('id', 'name', 'description', 'track'):
+        if key not in goal:
+            errors.append(f"{where}: goal must have '{key}'")
+    track = goal.get('track')
+    if track is not None and track not in schema['tracks']:
+        errors.append(f"{where}: unknown track: {track}")
+    kind = FILTER_KINDS.get(track)
+    flt = goal.get('filter')
+    if kind and flt is None:
+        errors.append(f"{where}: track '{track}' requires a {kind} filter")
+    elif kind and flt not in vocab[kind]:
+        errors.append(f"{where}: {kind} filter matches nothing in this scenario: {flt}")
+    elif not kind and flt is not None and track in schema['tracks']:
+        errors.append(f"{where}: track '{track}' does not take a filter")
+    if goal.get('compare', 'gte') not in GOAL_COMPARES:
+        errors.append(f"{where}: invalid compare: {goal['compare']}")
+    if not isinstance(goal.get('threshold', 1), int) or goal.get('threshold', 1) < 0:
+        errors.append(f"{where}: threshold must be a non-negative integer")
+    return errors
+
+
+def _reachable(adjacency, starts):
+    seen = set(starts)
+    queue = deque(starts)
+    while queue:
+        for nxt in adjacency[queue.popleft()]:
+            if nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    return seen
+
+
+def validate_file(path, schema):
+    """Validate one scenario file, including JSON syntax."""
+    try:
+        with open(path, 'r') as f:
+            scenario = json.load(f)
+    except json.JSONDecodeError as e:
+        return [f"invalid JSON: {e}"]
+    return validate_scenario(scenario, schema)
+
+
+def synthetic_scenario(num_locations, seed=0):
+    """A connected random map with entities, goals and factions for benchmarking."""
+    rng = random.Random(seed)
+    terrains = ('settled', 'wilderness')
+    directions = ('north', 'south', 'east', 'west', 'center')
+    locations = [{'id': f'loc_{i}', 'name': f'Location {i}', 'terrain': rng.choice(terrains),
+                  'direction': rng.choice(directions), 'x': rng.random(), 'y': rng.random()}
+                 for i in range(num_locations)]
+    connections = [{'name': f'Road {i}', 'from': f'loc_{rng.randrange(i)}', 'to': f'loc_{i}'}
+                   for i in range(1, num_locations)]
+    for i in range(2 * num_locations):
+        a, b = rng.sample(range(num_locations), 2)
+        connections.append({'name': f'Path {i}', 'from': f'loc_{a}', 'to': f'loc_{b}',
+                            'bidirectional': rng.random() < 0.8})
+    deck = ['attack', 'attack', 'defend', 'heal', 'sneak']
+    return {
+        'level_name': 'synthetic',
+        'victory': {'type': 'defeat_all', 'description': 'Defeat everything'},
+        'individual_goals': [
+            {'id': 'explorer', 'name': 'Explorer', 'description': '', 'track': 'locations_visited', 'threshold': 10},
+            {'id': 'northerner', 'name': 'Northerner', 'description': '', 'track': 'turns_in_direction',
+             'filter': 'north', 'threshold': 5},
+        ],
+        'factions': {'matrix': {'players': {'players': 'friendly', 'monsters': 'hostile'},
+                                'monsters': {'players': 'hostile', 'monsters': 'friendly'}}},
+        'map': {'locations': locations, 'connections': connections},
+        'characters': [{'name': f'Hero {i}', 'class': 'warrior', 'faction': 'players', 'location': 'loc_0',
+                        'decks': {'active': deck}} for i in range(4)],
+        'monsters': [{'name': f'Monster {i}', 'class': 'goblin', 'faction': 'monsters',
+                      'location': f'loc_{rng.randrange(num_locations)}', 'decks': {'active': deck},
+                      'items': [{'name': 'Knife', 'type': 'new_action', 'data': {'card_type': 'attack'}}]}
+                     for i in range(num_locations // 5)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate ZoomQuest scenario files.')
+    parser.add_argument('scenarios', nargs='*', help='scenario files (default: configs/*.json)')
+    parser.add_argument('--json', action='store_true', help='print {file: [errors]} as JSON')
+    parser.add_argument('--bench', type=int, metavar='N', help='time an N-location synthetic map')
+    args = parser.parse_args()
+
+    schema = load_schema()
+
+    if args.bench:
+        scenario = synthetic_scenario(args.bench)
+        start = time.perf_counter()
+        errors = validate_scenario(scenario, schema)
+        elapsed = time.perf_counter() - start
+        print(f"Synthetic map: {args.bench} locations, {len(scenario['map']['connections'])} connections, "
+              f"{len(errors)} error(s) in {elapsed * 1000:.2f}ms")
+        return
+
+    paths = [Path(p) for p in args.scenarios] or sorted(CONFIGS_DIR.glob('*.json'))
+    results = {}
+    for path in paths:
+        if not path.exists():
+            results[str(path)] = ["file not found"]
+            continue
+        results[str(path)] = validate_file(path, schema)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for path, errors in results.items():
+            print(f"{path}: {'OK' if not errors else f'{len(errors)} error(s)'}")
+            for error in errors:
+                print(f"  - {error}")
+
+    sys.exit(1 if any(results.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Viewer Server - Live-reloading dev server for the scenario viewer.
+
+Serves the scenario viewer pages straight from configs/ without writing any
+HTML. A watcher thread polls the scenario files (stat only) and pushes each
+changed scenario to open pages over server-sent events, so edits made in an
+editor show up in the browser without a reload. Dragged positions are POSTed
+back and written into the scenario JSON atomically, then checked with
+validate_scenarios.py.
+
+Usage:
+    python viewer_server.py [--port N] [--configs DIR] [--interval SECONDS]
+
+Then open http://localhost:8000/ for the scenario index.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import scenario_viewer as viewer
+import validate_scenarios
+
+
+KEEPALIVE_SECONDS = 15
+
+STATIC_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.json': 'application/json',
+    '.js': 'text/javascript',
+}
+
+# Appended to each served page: applies pushed scenario updates in place and
+# saves dragged positions back to the server instead of downloading JSON.
+LIVE_SCRIPT = '''
+    <script>
+        const liveScenarioFile = %(scenario_file)s;
+
+        function replaceContents(target, source) {
+            Object.keys(target).forEach(key => delete target[key]);
+            Object.assign(target, source);
+        }
+
+        function applyLiveUpdate(update) {
+            if (isDragging || hasChanges) return; // Local edits win until saved
+            cardTypes.splice(0, cardTypes.length, ...update.payload.cardTypes);
+            replaceContents(scenario, update.payload.scenario);
+            graphIndex.incident = update.graphIndex.incident;
+            originalCoords = null;
+            buildMap();
+            document.getElementById('coords-display').textContent = 'Reloaded from disk';
+        }
+
+        async function downloadUpdatedJson() {
+            const positions = {};
+            scenario.map.locations.forEach(loc => positions[loc.id] = [loc.x, loc.y]);
+            const response = await fetch('/save/' + encodeURIComponent(liveScenarioFile), {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ positions }),
+            });
+            const result = await response.json();
+            const display = document.getElementById('coords-display');
+            if (!response.ok) {
+                display.textContent = 'Save failed: ' + result.error;
+                return;
+            }
+            hasChanges = false;
+            originalCoords = null;
+            document.getElementById('save-btn').disabled = true;
+            document.getElementById('edit-indicator').classList.remove('visible');
+            display.textContent = result.errors.length
+                ? `Saved with ${result.errors.length} validation error(s): ${result.errors[0]}`
+                : 'Saved! Drag locations to reposition';
+        }
+
+        // Save as soon as a drag finishes
+        document.addEventListener('mouseup', () => {
+            if (hasChanges) downloadUpdatedJson();
+        });
+
+        const events = new EventSource('/events/' + encodeURIComponent(liveScenarioFile));
+        events.addEventListener('scenario', e => applyLiveUpdate(JSON.parse(e.data)));
+        events.addEventListener('reload', () => window.location.reload());
+    </script>
+'''
+
+
+class ScenarioWatcher(threading.Thread):
+    """Polls the configs directory and notifies subscribers of changed files."""
+
+    def __init__(self, configs_dir, interval):
+        super().__init__(daemon=True)
+        self.configs_dir = configs_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.subscribers = {}  # scenario file name -> set of queues
+        self.signatures = self.scan()
+
+    def scan(self):
+        signatures = {}
+        with os.scandir(self.configs_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and Path(entry.name).suffix in STATIC_TYPES:
+                    st = entry.stat()
+                    signatures[entry.name] = (st.st_mtime_ns, st.st_size)
+        return signatures
+
+    def subscribe(self, name):
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.setdefault(name, set()).add(q)
+        return q
+
+    def unsubscribe(self, name, q):
+        with self.lock:
+            self.subscribers.get(name, set()).discard(q)
+
+    def publish(self, name, event, data):
+        with self.lock:
+            targets = list(self.subscribers.get(name, ()))
+        for q in targets:
+            q.put((event, data))
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            current = self.scan()
+            changed = [n for n, sig in current.items() if self.signatures.get(n) != sig]
+            self.signatures = current
+            for name in changed:
+                self.on_change(name)
+
+    def on_change(self, name):
+        path = self.configs_dir / name
+        if path.suffix == '.json':
+            try:
+                update = live_update(path)
+            except (ValueError, KeyError) as e:
+                print(f"Skipping update for {name}: {e}")
+                return
+            print(f"Changed: {name}")
+            self.publish(name, 'scenario', update)
+        else:
+            # A background image changed: pages of the same-named scenario reload
+            self.publish(path.stem + '.json', 'reload', '{}')
+
+
+def live_update(scenario_path):
+    """Event payload for a changed scenario: compact payload plus edge index."""
+    with open(scenario_path, 'r') as f:
+        scenario = json.load(f)
+    return ('{"payload":' + viewer.compact_payload(scenario)
+            + ',"graphIndex":' + json.dumps(viewer.load_graph_index(scenario_path, scenario)) + '}')
+
+
+def save_positions(scenario_path, positions):
+    """Write new x/y values into a scenario file atomically. Returns validation errors."""
+    with open(scenario_path, 'r') as f:
+        raw = f.read()
+    scenario = json.loads(raw)
+    for loc in scenario['map']['locations']:
+        if loc['id'] in positions:
+            x, y = positions[loc['id']]
+            loc['x'] = round(max(0.0, min(1.0, float(x))), 4)
+            loc['y'] = round(max(0.0, min(1.0, float(y))), 4)
+
+    content = json.dumps(scenario, indent=2, ensure_ascii=False)
+    if raw.endswith('\n'):
+        content += '\n'
+    fd, tmp_path = tempfile.mkstemp(dir=scenario_path.parent, prefix='.' + scenario_path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, scenario_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return validate_scenarios.validate_scenario(scenario, validate_scenarios.load_schema())
+
+
+class ViewerHandler(BaseHTTPRequestHandler):
+    configs_dir = None
+    watcher = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def scenario_path(self, name):
+        """Resolve a scenario file name inside configs/, or None."""
+        path = (self.configs_dir / unquote(name)).resolve()
+        if path.parent != self.configs_dir or path.suffix != '.json' or not path.exists():
+            return None
+        return path
+
+    def send_body(self, status, body, content_type):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, obj):
+        self.send_body(status, json.dumps(obj), 'application/json')
+
+    def do_GET(self):
+        path = urlparse(self.path).path.lstrip('/')
+        if path in ('', 'index.html'):
+            scenarios = sorted(self.configs_dir.glob('*.json'))
+            self.send_body(200, viewer.index_page_html(scenarios, self.configs_dir), 'text/html; charset=utf-8')
+        elif path.startswith('events/'):
+            self.stream_events(path[len('events/'):])
+        elif path.endswith('.html'):
+            scenario = self.scenario_path(path[:-len('.html')] + '.json')
+            if scenario is None:
+                self.send_error(404)
+                return
+            html = viewer.render_html(scenario, scenario.with_suffix('.html'))
+            script = LIVE_SCRIPT % {'scenario_file': json.dumps(scenario.name)}
+            self.send_body(200, html.replace('</body>', script + '</body>'), 'text/html; charset=utf-8')
+        else:
+            self.serve_static(path)
+
+    def serve_static(self, path):
+        file_path = (self.configs_dir / unquote(path)).resolve()
+        content_type = STATIC_TYPES.get(file_path.suffix)
+        if (content_type is None or self.configs_dir not in file_path.parents
+                or not file_path.is_file()):
+            self.send_error(404)
+            return
+        self.send_body(200, file_path.read_bytes(), content_type)
+
+    def stream_events(self, name):
+        if self.scenario_path(name) is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        q = self.watcher.subscribe(unquote(name))
+        try:
+            while True:
+                try:
+                    event, data = q.get(timeout=KEEPALIVE_SECONDS)
+                    self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode('utf-8'))
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.watcher.unsubscribe(unquote(name), q)
+
+    def do_POST(self):
+        path = urlparse(self.path).path.lstrip('/')
+        scenario = self.scenario_path(path[len('save/'):]) if path.startswith('save/') else None
+        if scenario is None:
+            self.send_error(404)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            positions = json.loads(self.rfile.read(length))['positions']
+            errors = save_positions(scenario, positions)
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        print(f"Saved positions: {scenario.name}")
+        self.send_json(200, {'saved': True, 'errors': errors})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live-reloading scenario viewer server.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--configs', default=str(viewer.CONFIGS_DIR), help='scenario directory')
+    parser.add_argument('--interval', type=float, default=0.5, help='file polling interval in seconds')
+    args = parser.parse_args()
+
+    configs_dir = Path(args.configs).resolve()
+    if not configs_dir.is_dir():
+        print(f"Error: Configs directory not found: {configs_dir}")
+        sys.exit(1)
+
+    watcher = ScenarioWatcher(configs_dir, args.interval)
+    watcher.start()
+    ViewerHandler.configs_dir = configs_dir
+    ViewerHandler.watcher = watcher
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), ViewerHandler)
+    server.daemon_threads = True
+    print(f"Serving {configs_dir} at http://localhost:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == '__main__':
+    main()
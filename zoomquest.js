@@ -18,6 +18,18 @@ define([
     "ebg/counter"
 ],
 function (dojo, declare, gamegui, counter) {
+    // Same order as BATTLE_LOG_CARD_TYPES / BATTLE_LOG_EFFECTS in constants.inc.php
+    const BATTLE_LOG_CARD_TYPES = [
+        'attack', 'defend', 'heal', 'sneak', 'watch', 'shuffle', 'poison',
+        'mark', 'backstab', 'execute', 'sell', 'steal', 'wealth',
+    ];
+    const BATTLE_LOG_EFFECTS = [
+        'destroy', 'blocked', 'block', 'heal', 'no_cards_to_heal', 'no_cards', 'target_defeated',
+        'target_hidden', 'no_target', 'watch', 'hidden', 'sneak', 'sneak_failed', 'poison', 'mark',
+        'backstab', 'not_hidden', 'execute', 'not_poisoned', 'shuffle', 'selling', 'purchased',
+        'not_selling', 'no_items', 'stolen', 'caught', 'poison_tick',
+    ];
+
     return declare("bgagame.zoomquest", ebg.core.gamegui, {
 
         constructor: function() {
@@ -42,6 +54,9 @@ function (dojo, declare, gamegui, counter) {
 
             this.gamedatas = gamedatas;
 
+            // Map, background and victory condition (static for the whole game)
+            this.loadStaticData(gamedatas.static_version, gamedatas.static);
+
             // Build the game area
             this.buildGameArea();
 
@@ -72,8 +87,8 @@ function (dojo, declare, gamegui, counter) {
                 return;
             }
             
-            const victoryDesc = this.gamedatas.victory?.description || 'Defeat all monsters';
-            const victoryIcon = this.getVictoryIcon(this.gamedatas.victory?.type);
+            const victoryDesc = this.staticData.victory?.description || 'Defeat all monsters';
+            const victoryIcon = this.getVictoryIcon(this.staticData.victory?.type);
             
             // Get personal goal for current player
             const myGoal = this.gamedatas.player_goals?.[this.player_id];
@@ -124,21 +139,32 @@ function (dojo, declare, gamegui, counter) {
             `);
         },
 
+        loadStaticData: function(version, data) {
+            // Everything derived from the static payload is keyed by its content hash
+            if (this.staticVersion === version) return;
+            this.staticVersion = version;
+            this.staticData = data;
+
+            this.locationsById = {};
+            data.map.locations.forEach(loc => this.locationsById[loc.location_id] = loc);
+            this.nodePositions = this.calculateNodePositions(data.map);
+        },
+
         renderMap: function() {
-            const map = this.gamedatas.map;
+            const map = this.staticData.map;
             const svg = document.getElementById('zq-map-svg');
             const nodesContainer = document.getElementById('zq-nodes-container');
             const mapContainer = document.getElementById('zq-map-container');
 
             // Apply scenario background image if provided
-            if (this.gamedatas.background_image) {
-                mapContainer.style.backgroundImage = `url('${this.gamedatas.background_image}')`;
+            if (this.staticData.background_image) {
+                mapContainer.style.backgroundImage = `url('${this.staticData.background_image}')`;
                 mapContainer.style.backgroundSize = 'cover';
                 mapContainer.style.backgroundPosition = 'center';
             }
 
-            // Calculate node positions (simple force-directed layout placeholder)
-            const positions = this.calculateNodePositions(map);
+            // Node positions are computed once per static version
+            const positions = this.nodePositions;
 
             // Draw connections first (so they appear behind nodes)
             let connectionsHtml = '';
@@ -223,42 +249,39 @@ function (dojo, declare, gamegui, counter) {
         },
 
         renderEntities: function() {
-            // Clear existing entity markers from nodes
+            // Full render at setup; notifications patch through applyEntityDelta()
+            this.entitiesById = {};
+            this.gamedatas.entities.forEach(entity => this.entitiesById[entity.entity_id] = entity);
+            this.dirtyEntities = new Set();
+            this.dirtyLocations = new Set();
+            this.renderFrame = null;
+
             document.querySelectorAll('.zq-node-entities').forEach(el => el.innerHTML = '');
+            const locations = new Set(this.gamedatas.entities.map(e => e.location_id));
+            locations.forEach(locationId => this.renderLocationMarkers(locationId));
+
+            this.updateEntityPanel();
+        },
+
+        renderLocationMarkers: function(locationId) {
+            const container = document.getElementById(`zq-node-entities-${locationId}`);
+            if (!container) return;
 
-            // Group entities by location
-            const entitiesByLocation = {};
+            let html = '';
             this.gamedatas.entities.forEach(entity => {
-                if (!entitiesByLocation[entity.location_id]) {
-                    entitiesByLocation[entity.location_id] = [];
-                }
-                entitiesByLocation[entity.location_id].push(entity);
-            });
+                if (entity.location_id !== locationId || entity.is_defeated == 1) return;
 
-            // Render entity markers on nodes
-            Object.keys(entitiesByLocation).forEach(locationId => {
-                const container = document.getElementById(`zq-node-entities-${locationId}`);
-                if (container) {
-                    let html = '';
-                    entitiesByLocation[locationId].forEach(entity => {
-                        if (entity.is_defeated == 1) return;
-                        
-                        const icon = entity.entity_type === 'player' ? '⚔️' : '🧟';
-                        const className = entity.entity_type === 'player' ? 'zq-entity-player' : 'zq-entity-monster';
-                        html += `
-                            <div class="zq-entity-marker ${className}" 
-                                 data-entity-id="${entity.entity_id}"
-                                 title="${entity.entity_name} (${entity.entity_class})">
-                                ${icon}
-                            </div>
-                        `;
-                    });
-                    container.innerHTML = html;
-                }
+                const icon = entity.entity_type === 'player' ? '⚔️' : '🧟';
+                const className = entity.entity_type === 'player' ? 'zq-entity-player' : 'zq-entity-monster';
+                html += `
+                    <div class="zq-entity-marker ${className}" 
+                         data-entity-id="${entity.entity_id}"
+                         title="${entity.entity_name} (${entity.entity_class})">
+                        ${icon}
+                    </div>
+                `;
             });
-
-            // Update entity panel
-            this.updateEntityPanel();
+            container.innerHTML = html;
         },
 
         updateEntityPanel: function() {
@@ -269,25 +292,39 @@ function (dojo, declare, gamegui, counter) {
             const players = this.gamedatas.entities.filter(e => e.entity_type === 'player');
             const monsters = this.gamedatas.entities.filter(e => e.entity_type === 'monster' && e.is_defeated == 0);
 
-            html += '<div class="zq-entity-section"><h4>Heroes</h4>';
-            players.forEach(entity => {
-                const counts = entity.deck_counts || { active: 0, discard: 0, destroyed: 0, inactive: 0 };
-                const health = counts.active + counts.discard;
+            html += '<div class="zq-entity-section" id="zq-entity-section-player"><h4>Heroes</h4>';
+            players.forEach(entity => html += this.entityInfoHtml(entity));
+            html += '</div>';
+
+            html += '<div class="zq-entity-section" id="zq-entity-section-monster"><h4>Monsters</h4>';
+            html += `<div class="zq-no-monsters" ${monsters.length > 0 ? 'style="display: none;"' : ''}>All defeated!</div>`;
+            monsters.forEach(entity => html += this.entityInfoHtml(entity));
+            html += '</div>';
+
+            container.innerHTML = html;
+        },
+
+        entityInfoHtml: function(entity) {
+            const isPlayer = entity.entity_type === 'player';
+            const counts = entity.deck_counts || { active: 0, discard: 0, destroyed: 0, inactive: 0 };
+            const health = counts.active + counts.discard;
+            // Build tags display
+            const tags = entity.tags || [];
+            const tagHtml = tags.map(t => this.getTagIcon(t.tag_name)).join(' ');
+            // Build items display
+            const items = entity.items || [];
+            const itemsHtml = items.length > 0 
+                ? `<div class="zq-entity-items">📦 ${isPlayer ? 'Items: ' : ''}${items.map(i => i.item_name).join(', ')}</div>`
+                : '';
+
+            if (isPlayer) {
                 const statusClass = entity.is_defeated == 1 ? 'zq-defeated' : '';
                 // Get player name if available
                 const playerName = entity.player_id && this.gamedatas.players[entity.player_id] 
                     ? ` (${this.gamedatas.players[entity.player_id].name || 'Player'})` 
                     : '';
-                // Build tags display
-                const tags = entity.tags || [];
-                const tagHtml = tags.map(t => this.getTagIcon(t.tag_name)).join(' ');
-                // Build items display
-                const items = entity.items || [];
-                const itemsHtml = items.length > 0 
-                    ? `<div class="zq-entity-items">📦 Items: ${items.map(i => i.item_name).join(', ')}</div>`
-                    : '';
-                html += `
-                    <div class="zq-entity-info ${statusClass}" data-faction="${entity.faction || 'players'}">
+                return `
+                    <div class="zq-entity-info ${statusClass}" id="zq-entity-info-${entity.entity_id}" data-faction="${entity.faction || 'players'}">
                         <div class="zq-entity-name">⚔️ ${entity.entity_name}${playerName} ${tagHtml}</div>
                         <div class="zq-entity-class">${entity.entity_class}</div>
                         <div class="zq-entity-location">📍 ${entity.location_name}</div>
@@ -301,42 +338,114 @@ function (dojo, declare, gamegui, counter) {
                         ${itemsHtml}
                     </div>
                 `;
-            });
-            html += '</div>';
-
-            html += '<div class="zq-entity-section"><h4>Monsters</h4>';
-            if (monsters.length === 0) {
-                html += '<div class="zq-no-monsters">All defeated!</div>';
             }
-            monsters.forEach(entity => {
-                const counts = entity.deck_counts || { active: 0, discard: 0, destroyed: 0, inactive: 0 };
-                const health = counts.active + counts.discard;
-                // Build tags display
-                const tags = entity.tags || [];
-                const tagHtml = tags.map(t => this.getTagIcon(t.tag_name)).join(' ');
-                // Build items display
-                const items = entity.items || [];
-                const itemsHtml = items.length > 0 
-                    ? `<div class="zq-entity-items">📦 ${items.map(i => i.item_name).join(', ')}</div>`
-                    : '';
-                html += `
-                    <div class="zq-entity-info zq-monster" data-faction="${entity.faction || 'monsters'}">
-                        <div class="zq-entity-name">🧟 ${entity.entity_name} ${tagHtml}</div>
-                        <div class="zq-entity-class">${entity.entity_class} <span class="zq-faction-badge">${entity.faction || 'unknown'}</span></div>
-                        <div class="zq-entity-location">📍 ${entity.location_name}</div>
-                        <div class="zq-entity-health">❤️ Health: ${health}</div>
-                        <div class="zq-deck-status">
-                            <span class="zq-pile-active" title="Active">🃏 ${counts.active}</span>
-                            <span class="zq-pile-discard" title="Discard">📥 ${counts.discard}</span>
-                            <span class="zq-pile-destroyed" title="Destroyed">💀 ${counts.destroyed}</span>
-                        </div>
-                        ${itemsHtml}
+
+            return `
+                <div class="zq-entity-info zq-monster" id="zq-entity-info-${entity.entity_id}" data-faction="${entity.faction || 'monsters'}">
+                    <div class="zq-entity-name">🧟 ${entity.entity_name} ${tagHtml}</div>
+                    <div class="zq-entity-class">${entity.entity_class} <span class="zq-faction-badge">${entity.faction || 'unknown'}</span></div>
+                    <div class="zq-entity-location">📍 ${entity.location_name}</div>
+                    <div class="zq-entity-health">❤️ Health: ${health}</div>
+                    <div class="zq-deck-status">
+                        <span class="zq-pile-active" title="Active">🃏 ${counts.active}</span>
+                        <span class="zq-pile-discard" title="Discard">📥 ${counts.discard}</span>
+                        <span class="zq-pile-destroyed" title="Destroyed">💀 ${counts.destroyed}</span>
                     </div>
-                `;
+                    ${itemsHtml}
+                </div>
+            `;
+        },
+
+        //
+        // ──────────────────────────────────────────────────────────────────────
+        //   ENTITY STORE
+        // ──────────────────────────────────────────────────────────────────────
+        //
+
+        /**
+         * Merge changed fields (location_id, location_name, deck_counts,
+         * is_defeated, items, tags) into the stored entity and queue a patch
+         * of its marker and panel entry for the next frame
+         */
+        applyEntityDelta: function(entityId, delta) {
+            const entity = this.entitiesById[entityId];
+            if (!entity) return;
+
+            if (delta.location_id !== undefined && delta.location_id !== entity.location_id) {
+                this.dirtyLocations.add(entity.location_id);
+                this.dirtyLocations.add(delta.location_id);
+            }
+            if (delta.is_defeated !== undefined && delta.is_defeated != entity.is_defeated) {
+                this.dirtyLocations.add(entity.location_id);
+            }
+            if (delta.deck_counts) {
+                // Summaries carry no inactive count; keep the last one known
+                delta = Object.assign({}, delta, {
+                    deck_counts: Object.assign({}, entity.deck_counts, delta.deck_counts),
+                });
+            }
+
+            Object.assign(entity, delta);
+            this.dirtyEntities.add(entity.entity_id);
+            this.scheduleEntityRender();
+        },
+
+        /**
+         * Apply the end-of-round status rows of a battle
+         */
+        applyStatusDeltas: function(status) {
+            (status || []).forEach(s => this.applyEntityDelta(s.entity_id, {
+                deck_counts: { active: s.active, discard: s.discard, destroyed: s.destroyed },
+                is_defeated: s.is_defeated ? 1 : 0,
+                tags: s.tags,
+            }));
+        },
+
+        removeEntityItem: function(entityId, item) {
+            const entity = this.entitiesById[entityId];
+            if (!entity || !item) return;
+            const items = entity.items || [];
+            const index = items.findIndex(i => item.item_id !== undefined
+                ? i.item_id == item.item_id
+                : i.item_name === item.item_name);
+            if (index >= 0) {
+                this.applyEntityDelta(entityId, { items: items.filter((_, i) => i !== index) });
+            }
+        },
+
+        scheduleEntityRender: function() {
+            // However many notifications land in a frame, the DOM is patched once
+            if (this.renderFrame !== null) return;
+            this.renderFrame = window.requestAnimationFrame(() => this.flushEntityRender());
+        },
+
+        flushEntityRender: function() {
+            this.renderFrame = null;
+
+            this.dirtyLocations.forEach(locationId => this.renderLocationMarkers(locationId));
+            this.dirtyLocations.clear();
+
+            this.dirtyEntities.forEach(entityId => {
+                const entity = this.entitiesById[entityId];
+                const node = document.getElementById(`zq-entity-info-${entityId}`);
+                // Defeated monsters leave the panel; heroes stay, greyed out
+                const shown = entity.entity_type === 'player' || entity.is_defeated == 0;
+                if (!shown) {
+                    if (node) node.remove();
+                } else if (node) {
+                    node.outerHTML = this.entityInfoHtml(entity);
+                } else {
+                    const section = document.getElementById(`zq-entity-section-${entity.entity_type}`);
+                    if (section) section.insertAdjacentHTML('beforeend', this.entityInfoHtml(entity));
+                }
             });
-            html += '</div>';
+            this.dirtyEntities.clear();
 
-            container.innerHTML = html;
+            const noMonsters = document.querySelector('#zq-entity-section-monster .zq-no-monsters');
+            if (noMonsters) {
+                const anyLeft = this.gamedatas.entities.some(e => e.entity_type === 'monster' && e.is_defeated == 0);
+                noMonsters.style.display = anyLeft ? 'none' : '';
+            }
         },
 
         //
@@ -827,7 +936,7 @@ function (dojo, declare, gamegui, counter) {
             this.hideLocationPopup();
 
             // Find location info
-            const location = this.gamedatas.map.locations.find(l => l.location_id === locationId);
+            const location = this.locationsById[locationId];
             if (!location) return;
 
             // Determine entities at this location
@@ -946,9 +1055,7 @@ function (dojo, declare, gamegui, counter) {
             if (args.goal_progress !== undefined) {
                 this.updateGoalProgress(args.goal_progress, args.goal_complete);
             }
-            
-            // Re-render entities to show updated positions
-            this.renderEntities();
+            // Positions are already patched by entityMoved
         },
 
         updateGoalProgress: function(progress, complete) {
@@ -975,14 +1082,10 @@ function (dojo, declare, gamegui, counter) {
         notif_entityMoved: async function(args) {
             console.log('Entity moved:', args);
 
-            // Update local data
-            const entity = this.gamedatas.entities.find(e => e.entity_id == args.entity_id);
-            if (entity) {
-                entity.location_id = args.to_location;
-            }
-
-            // Re-render entities
-            this.renderEntities();
+            this.applyEntityDelta(args.entity_id, {
+                location_id: args.to_location,
+                location_name: args.location_name,
+            });
 
             await this.wait(this.getAnimationDelay());
         },
@@ -990,13 +1093,7 @@ function (dojo, declare, gamegui, counter) {
         notif_entityRested: async function(args) {
             console.log('Entity rested:', args);
 
-            // Update deck counts
-            const entity = this.gamedatas.entities.find(e => e.entity_id == args.entity_id);
-            if (entity) {
-                entity.deck_counts = args.deck_counts;
-            }
-
-            this.updateEntityPanel();
+            this.applyEntityDelta(args.entity_id, { deck_counts: args.deck_counts });
             await this.wait(this.getAnimationDelay());
         },
 
@@ -1029,9 +1126,7 @@ function (dojo, declare, gamegui, counter) {
             await this.wait(this.getAnimationDelay());
         },
 
-        notif_sequenceCardsDrawn: async function(args) {
-            console.log('Sequence cards drawn:', args);
-
+        showCardsDrawn: async function(args) {
             const log = document.getElementById('zq-battle-log');
             if (log && args.drawn_cards) {
                 let html = '<div class="zq-cards-drawn"><strong>Cards drawn:</strong>';
@@ -1043,7 +1138,7 @@ function (dojo, declare, gamegui, counter) {
                     </div>`;
                 });
                 html += '</div>';
-                log.innerHTML += html;
+                log.insertAdjacentHTML('beforeend', html);
             }
 
             // Highlight the current player's drawn card in the deck panel
@@ -1058,102 +1153,14 @@ function (dojo, declare, gamegui, counter) {
             await this.wait(this.getAnimationDelay());
         },
 
-        notif_cardResolved: async function(args) {
-            console.log('Card resolved:', args);
-
-            const log = document.getElementById('zq-battle-log');
-            if (log) {
-                const icon = this.getCardIcon(args.card_type);
-                let effectText = '';
-                let effectClass = '';
-
-                switch (args.effect) {
-                    case 'destroy':
-                        const pileNote = args.from_pile === 'discard' ? ' (from discard!)' : '';
-                        effectText = `💥 ${args.target_name} loses a card${pileNote}`;
-                        effectClass = 'zq-effect-damage';
-                        break;
-                    case 'blocked':
-                        effectText = `🛡️ BLOCKED! (${args.blocks_remaining} blocks remain)`;
-                        effectClass = 'zq-effect-blocked';
-                        break;
-                    case 'block':
-                        const blockText = args.block_count > 1 ? `${args.block_count} blocks` : '1 block';
-                        effectText = `🛡️ ${args.target_name} gains a block (${blockText} total)`;
-                        effectClass = 'zq-effect-defend';
-                        break;
-                    case 'heal':
-                        effectText = `💚 ${args.target_name} recovers a card`;
-                        effectClass = 'zq-effect-heal';
-                        break;
-                    case 'no_cards_to_heal':
-                        effectText = `💔 No cards to recover for ${args.target_name}`;
-                        effectClass = 'zq-effect-none';
-                        break;
-                    case 'no_cards':
-                        effectText = `💀 ${args.target_name} has no cards left!`;
-                        effectClass = 'zq-effect-none';
-                        break;
-                    case 'target_defeated':
-                        effectText = `💀 Target ${args.target_name || 'unknown'} already defeated`;
-                        effectClass = 'zq-effect-none';
-                        break;
-                    case 'no_target':
-                        effectText = `❌ No valid target`;
-                        effectClass = 'zq-effect-none';
-                        break;
-                    case 'selling':
-                        effectText = `🏷️ Offering items for sale`;
-                        effectClass = 'zq-effect-neutral';
-                        break;
-                    case 'purchased':
-                        const boughtItem = args.item?.item_name || 'an item';
-                        effectText = `💰 Bought ${boughtItem} from ${args.target_name}`;
-                        effectClass = 'zq-effect-success';
-                        break;
-                    case 'not_selling':
-                        effectText = `❌ ${args.target_name} is not selling`;
-                        effectClass = 'zq-effect-none';
-                        break;
-                    case 'stolen':
-                        const stolenItem = args.item?.item_name || 'an item';
-                        effectText = `🤏 Stole ${stolenItem} from ${args.target_name}`;
-                        effectClass = 'zq-effect-success';
-                        break;
-                    case 'caught':
-                        effectText = `😠 CAUGHT stealing! ${args.faction_now_hostile} is now hostile!`;
-                        effectClass = 'zq-effect-danger';
-                        break;
-                    default:
-                        effectText = `→ ${args.effect || 'No effect'}`;
-                }
-
-                log.innerHTML += `
-                    <div class="zq-card-resolved ${effectClass}">
-                        ${icon} <strong>${args.entity_name}</strong> plays ${args.card_type} ${effectText}
-                    </div>
-                `;
-            }
-
-            // Update deck counts
-            if (args.target_id && args.target_deck_counts) {
-                const target = this.gamedatas.entities.find(e => e.entity_id == args.target_id);
-                if (target) {
-                    target.deck_counts = args.target_deck_counts;
-                }
-            }
-
-            this.updateEntityPanel();
-            await this.wait(this.getAnimationDelay());
-        },
-
         notif_entityDefeated: async function(args) {
             console.log('Entity defeated:', args);
 
-            const entity = this.gamedatas.entities.find(e => e.entity_id == args.entity_id);
-            if (entity) {
-                entity.is_defeated = 1;
+            const delta = { is_defeated: 1 };
+            if (args.items_looted && args.items_looted.length > 0) {
+                delta.items = [];
             }
+            this.applyEntityDelta(args.entity_id, delta);
 
             const log = document.getElementById('zq-battle-log');
             if (log) {
@@ -1162,10 +1169,9 @@ function (dojo, declare, gamegui, counter) {
                     const itemNames = args.items_looted.map(i => i.item_name).join(', ');
                     lootText = ` ${args.killer_name || 'You'} looted: ${itemNames}`;
                 }
-                log.innerHTML += `<div class="zq-entity-defeated">💀 ${args.entity_name} has been defeated!${lootText}</div>`;
+                log.insertAdjacentHTML('beforeend', `<div class="zq-entity-defeated">💀 ${args.entity_name} has been defeated!${lootText}</div>`);
             }
 
-            this.renderEntities();
             await this.wait(this.getAnimationDelay());
         },
 
@@ -1180,7 +1186,7 @@ function (dojo, declare, gamegui, counter) {
                 } else {
                     message = '⚖️ <strong>Standoff.</strong> All combatants are exhausted.';
                 }
-                log.innerHTML += `<div class="zq-battle-result">${message}</div>`;
+                log.insertAdjacentHTML('beforeend', `<div class="zq-battle-result">${message}</div>`);
                 log.scrollTop = log.scrollHeight;
             }
 
@@ -1190,14 +1196,99 @@ function (dojo, declare, gamegui, counter) {
             this.battleEnded = true;
         },
 
-        notif_sequenceContinues: async function(args) {
-            // Internal notification - panel already shows this via round summary
-            console.log('Sequence continues:', args);
+        notif_sequenceRound: async function(args) {
+            console.log('Sequence round:', args);
+            const [round] = this.expandBattleLog([args.log]);
+            await this.playBattleRound(round);
         },
 
-        notif_sequenceRoundSummary: async function(args) {
-            console.log('Sequence round summary:', args);
+        notif_sequenceAutoResolved: async function(args) {
+            console.log('Sequence auto-resolved:', args);
+
+            // Play the battle back round by round, as if it had been sent step by step
+            for (const round of this.expandBattleLog(args.log)) {
+                await this.playBattleRound(round);
+            }
+        },
+
+        playBattleRound: async function(round) {
+            if (round.drawn_cards.length > 0) {
+                await this.showCardsDrawn(round);
+            }
+            // Items changing hands, then piles, tags and defeats as of the end of the round
+            this.applyResolutionDeltas(round.resolutions);
+            this.applyStatusDeltas(round.status);
+            await this.showRoundSummary(round);
+        },
+
+        /**
+         * Items bought, stolen or looted during a round leave their owner
+         */
+        applyResolutionDeltas: function(resolutions) {
+            resolutions.forEach(r => {
+                if (r.effect === 'purchased' || r.effect === 'stolen') {
+                    this.removeEntityItem(r.target_id, r.item);
+                }
+                if (r.items_looted && r.items_looted.length > 0 && r.target_id) {
+                    this.applyEntityDelta(r.target_id, { items: [] });
+                }
+            });
+        },
 
+        /**
+         * Expand rounds packed by SequenceRoundEnd::encodeRound() into the
+         * drawn_cards / resolutions / status rows the battle panel shows.
+         * Names, types and factions come from the entity store.
+         */
+        expandBattleLog: function(rounds) {
+            const entity = id => this.entitiesById[id] || {};
+            const enumValue = (values, value) => typeof value === 'number' ? values[value] : value;
+
+            return rounds.map(([round, drawn, resolutions, status]) => ({
+                round: round,
+                drawn_cards: drawn.map(([entityId, cardId, cardType, targetId]) => ({
+                    entity_id: entityId,
+                    entity_type: entity(entityId).entity_type,
+                    entity_name: entity(entityId).entity_name,
+                    faction: entity(entityId).faction,
+                    card_id: cardId,
+                    card_type: enumValue(BATTLE_LOG_CARD_TYPES, cardType),
+                    target_id: targetId,
+                    target_name: targetId !== null ? entity(targetId).entity_name : null,
+                })),
+                resolutions: resolutions.map(([entityId, cardType, effect, targetId, cardId, extra]) => {
+                    const row = Object.assign({
+                        entity_id: entityId,
+                        entity_name: entity(entityId).entity_name,
+                        entity_type: entity(entityId).entity_type,
+                    }, extra || {});
+                    if (cardType !== undefined && cardType !== null) row.card_type = enumValue(BATTLE_LOG_CARD_TYPES, cardType);
+                    if (effect !== undefined && effect !== null) row.effect = enumValue(BATTLE_LOG_EFFECTS, effect);
+                    if (targetId !== undefined && targetId !== null) {
+                        row.target_id = targetId;
+                        row.target_name = entity(targetId).entity_name;
+                    }
+                    if (cardId !== undefined && cardId !== null) row.card_id = cardId;
+                    if (row.revealed) {
+                        row.revealed = row.revealed.map(id => ({ entity_id: id, entity_name: entity(id).entity_name }));
+                    }
+                    return row;
+                }),
+                status: status.map(([entityId, active, discard, destroyed, defeated, tags]) => ({
+                    entity_id: entityId,
+                    entity_name: entity(entityId).entity_name,
+                    entity_type: entity(entityId).entity_type,
+                    faction: entity(entityId).faction,
+                    is_defeated: defeated === 1,
+                    active: active,
+                    discard: discard,
+                    destroyed: destroyed,
+                    tags: Object.entries(tags || {}).map(([tagName, tagValue]) => ({ tag_name: tagName, tag_value: tagValue })),
+                })),
+            }));
+        },
+
+        showRoundSummary: async function(args) {
             const log = document.getElementById('zq-battle-log');
             if (!log) return;
 
@@ -1254,7 +1345,7 @@ function (dojo, declare, gamegui, counter) {
             html += `</div>`; // Close .zq-battle-round
 
             // Append to log (keep previous rounds)
-            log.innerHTML += html;
+            log.insertAdjacentHTML('beforeend', html);
 
             // Auto-scroll to latest round
             log.scrollTop = log.scrollHeight;
@@ -1405,29 +1496,10 @@ function (dojo, declare, gamegui, counter) {
         notif_sequenceCleanup: async function(args) {
             console.log('Sequence cleanup:', args);
 
-            // Update deck counts for survivors
-            if (args.survivors) {
-            args.survivors.forEach(s => {
-                const entity = this.gamedatas.entities.find(e => e.entity_id == s.entity_id);
-                if (entity) {
-                    entity.deck_counts = s.deck_counts;
-                }
-            });
-            }
+            // Deck counts for survivors, defeated entities leave the map
+            (args.survivors || []).forEach(s => this.applyEntityDelta(s.entity_id, { deck_counts: s.deck_counts }));
+            (args.defeated || []).forEach(d => this.applyEntityDelta(d.entity_id, { is_defeated: 1 }));
 
-            // Mark defeated entities
-            if (args.defeated) {
-                args.defeated.forEach(d => {
-                    const entity = this.gamedatas.entities.find(e => e.entity_id == d.entity_id);
-                    if (entity) {
-                        entity.is_defeated = 1;
-                    }
-                });
-            }
-
-            // Re-render entities to remove defeated from map
-            this.renderEntities();
-            this.updateEntityPanel();
             await this.wait(this.getAnimationDelay());
         },
 
@@ -1539,6 +1611,8 @@ function (dojo, declare, gamegui, counter) {
         },
 
         wait: function(ms) {
+            // Replays and fast-forwarding skip the pauses; DOM patches still coalesce per frame
+            if (!this.bgaAnimationsActive()) return Promise.resolve();
             return new Promise(resolve => setTimeout(resolve, ms));
         }
     });